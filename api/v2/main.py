@@ -1,17 +1,4 @@
 from common.auth import authenticate
-from api.v1.listing import list_hosts
-from api.v1.register_cidr_block import register_cidr_block
-from api.v1.register_hosts import register_hosts
-from api.v1.register_hosts_cmdb_only import register_hosts_cmdb_only
-from api.v1.deregister_hosts import deregister_hosts
-from api.v1.deregister_hosts_cmdb_only import deregister_hosts_cmdb_only  # ✅ NEW
-from api.v1.deregister_cidr_block import deregister_cidr_block
-from api.v1.cidr_authorized_users import patch_authorized_users
-from api.v1.listing_cidr_block import list_cidr_blocks
-from api.v1.vpc import get_vpc_instance_crn
-from common.db import get_db_session
-from api.v1.tgw_connection import create_and_approve_connection, delete_tgw_connection
-from api.v1.reconciliation import reconciliation_endpoint
 import json
 import base64
 import binascii
@@ -45,10 +32,24 @@ def parse_ce_body(args):
         }, None
 
 
+# Route handlers are imported inside the branch that serves them, and the
+# db session is only opened for routes that use it: a cold start then only
+# loads the dependencies (SQLAlchemy, openpyxl, box_sdk_gen, requests, ...)
+# of the route being called.
+
+
 @authenticate
 def main(args):
-    db_session = get_db_session()
-    print("Successfully created db session")
+    db_sessions = []
+
+    def db_session():
+        if not db_sessions:
+            from common.db import get_db_session
+
+            db_sessions.append(get_db_session())
+            print("Successfully created db session")
+        return db_sessions[0]
+
     try:
         path = args["__ce_path"]
         method = args["__ce_method"]
@@ -61,16 +62,20 @@ def main(args):
             if method.lower() != "post":
                 return {"body": "Method not allowed", "statusCode": 405}
 
+            from api.v1.register_hosts import register_hosts
+
             error_response, request_body = parse_ce_body(args)
             if error_response:
                 return error_response
 
-            return register_hosts(request_body, db_session, user)
+            return register_hosts(request_body, db_session(), user)
 
         elif path == "/hosts/register/cmdb":
             if method.lower() != "post":
                 return {"body": "Method not allowed", "statusCode": 405}
 
+            from api.v1.register_hosts_cmdb_only import register_hosts_cmdb_only
+
             error_response, request_body = parse_ce_body(args)
             if error_response:
                 return error_response
@@ -81,17 +86,21 @@ def main(args):
             if method.lower() != "post":
                 return {"body": "Method not allowed", "statusCode": 405}
 
+            from api.v1.deregister_hosts import deregister_hosts
+
             error_response, request_body = parse_ce_body(args)
             if error_response:
                 return error_response
 
-            return deregister_hosts(request_body, db_session, user)
+            return deregister_hosts(request_body, db_session(), user)
 
         # ✅ NEW CMDB-ONLY DEREGISTER ENDPOINT
         elif path == "/hosts/deregister/cmdb":
             if method.lower() != "post":
                 return {"body": "Method not allowed", "statusCode": 405}
 
+            from api.v1.deregister_hosts_cmdb_only import deregister_hosts_cmdb_only
+
             error_response, request_body = parse_ce_body(args)
             if error_response:
                 return error_response
@@ -99,56 +108,68 @@ def main(args):
             return deregister_hosts_cmdb_only(request_body, user)
 
         elif path == "/hosts/list":
+            from api.v1.listing import list_hosts
+
             all_users_str = query_params.get("all_users", ["false"])[0].lower()
             all_users = all_users_str == "true"
-            return list_hosts(method, db_session, user, all_users)
+            return list_hosts(method, db_session(), user, all_users)
 
         elif path == "/cidr/list":
             if method.lower() != "get":
                 return {"body": "Method not allowed", "statusCode": 405}
 
+            from api.v1.listing_cidr_block import list_cidr_blocks
+
             all_users_str = query_params.get("all_users", ["false"])[0].lower()
             all_users = all_users_str == "true"
 
             is_vcf_for_vpc_str = query_params.get("is_vcf_for_vpc", ["false"])[0].lower()
             is_vcf_for_vpc = is_vcf_for_vpc_str == "true"
 
-            return list_cidr_blocks(db_session, user, all_users, is_vcf_for_vpc)
+            return list_cidr_blocks(db_session(), user, all_users, is_vcf_for_vpc)
 
         elif path == "/cidr/register":
             if method.lower() != "post":
                 return {"body": "Method not allowed", "statusCode": 405}
 
+            from api.v1.register_cidr_block import register_cidr_block
+
             error_response, request_body = parse_ce_body(args)
             if error_response:
                 return error_response
 
-            return register_cidr_block(request_body, db_session, user)
+            return register_cidr_block(request_body, db_session(), user)
 
         elif path == "/cidr/deregister":
             if method.lower() != "post":
                 return {"body": "Method not allowed", "statusCode": 405}
 
+            from api.v1.deregister_cidr_block import deregister_cidr_block
+
             error_response, request_body = parse_ce_body(args)
             if error_response:
                 return error_response
 
-            return deregister_cidr_block(request_body, db_session, user)
+            return deregister_cidr_block(request_body, db_session(), user)
 
         elif path == "/cidr/authorized-users":
             if method.lower() != "patch":
                 return {"body": "Method not allowed", "statusCode": 405}
 
+            from api.v1.cidr_authorized_users import patch_authorized_users
+
             error_response, request_body = parse_ce_body(args)
             if error_response:
                 return error_response
 
-            return patch_authorized_users(request_body, db_session, user)
+            return patch_authorized_users(request_body, db_session(), user)
 
         elif path.startswith("/vpc"):
             if method.lower() != "get":
                 return {"body": "Method not allowed", "statusCode": 405}
 
+            from api.v1.vpc import get_vpc_instance_crn
+
             vpc_id = path.split("/").pop()
             region = query_params.get("region", [False])[0]
 
@@ -168,6 +189,8 @@ def main(args):
             if method not in ["post", "delete"]:
                 return {"body": "Method not allowed", "statusCode": 405}
 
+            from api.v1.tgw_connection import create_and_approve_connection, delete_tgw_connection
+
             error_response, request_data = parse_ce_body(args)
             if error_response:
                 return error_response
@@ -194,7 +217,7 @@ def main(args):
                 return create_and_approve_connection(
                     vpc_crn,
                     vcf_for_vpc_name,
-                    db_session,
+                    db_session(),
                     approve_iam_token=iam_token,
                 )
             else:
@@ -204,9 +227,11 @@ def main(args):
             if method.lower() != "get":
                 return {"body": "Method not allowed", "statusCode": 405}
 
+            from api.v1.reconciliation import reconciliation_endpoint
+
             offering = query_params.get("offering", [None])[0]
             if offering is None or offering.lower() == "vcfaas":
-                response = reconciliation_endpoint(db_session)
+                response = reconciliation_endpoint(db_session())
                 response["body"] = json.dumps(response["body"])
                 response.setdefault("headers", {"Content-Type": "application/json"})
                 return response
@@ -225,4 +250,5 @@ def main(args):
             "statusCode": 500,
         }
     finally:
-        db_session.close()
+        for session in db_sessions:
+            session.close()
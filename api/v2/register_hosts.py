@@ -3,7 +3,7 @@ from typing import Any
 from common.db import Host, CIDR_BLOCK
 import datetime
 from sqlalchemy.orm import Session
-from common.cmdb_client import CMDBClient
+from common.cmdb_client import CMDBClient, CMDB_BULK_MAX_HOSTS
 from common.constants import IBM_CLOUD_DATACENTER_LIST
 from common.constants import IBM_CLOUD_ZONES_MAP
 
@@ -235,13 +235,13 @@ def register_hosts(data: List[Dict], db_session: Session, user: str) -> dict:
     if error_msg:
         return {"statusCode": 400, "body": {"status": "error", "message": error_msg}}
 
-    # Validate if the length of input list of hosts is not > 100
-    if len(data) > 100:
+    # Validate if the length of input list of hosts is not > CMDB_BULK_MAX_HOSTS
+    if len(data) > CMDB_BULK_MAX_HOSTS:
         return {
             "statusCode": 413,  # Payload Too Large
             "body": {
                 "status": "error",
-                "message": "Import Limit Exceeded: Too Many Hosts! You can only import up to 100 at once.",
+                "message": f"Import Limit Exceeded: Too Many Hosts! You can only import up to {CMDB_BULK_MAX_HOSTS} at once.",
             },
         }
 
@@ -302,7 +302,7 @@ def register_hosts(data: List[Dict], db_session: Session, user: str) -> dict:
     )
     try:
         cmdb_client = CMDBClient()
-        cmdb_client.upload_ips_to_cmdb_inventory(ip_hostnames_list)
+        outcomes = cmdb_client.bulk_upload_to_cmdb_inventory(ip_hostnames_list)
     except Exception as cmdb_error:
         print(
             f"[ERROR] Uploading the incoming hosts to CMDB inventory with error : {str(cmdb_error)}"
@@ -315,6 +315,20 @@ def register_hosts(data: List[Dict], db_session: Session, user: str) -> dict:
             },
         }
 
+    failed = [outcome for outcome in outcomes if outcome["status"] == "error"]
+    if failed:
+        print(
+            f"[ERROR] {len(failed)} of the incoming hosts could not be uploaded to CMDB inventory : {failed}"
+        )
+        return {
+            "statusCode": 500,
+            "body": {
+                "status": "error",
+                "message": f"Hosts saved successfully in the database, but CMDB upload failed for {len(failed)} of {len(outcomes)} host(s): {', '.join(outcome['hostname'] for outcome in failed)}",
+                "results": outcomes,
+            },
+        }
+
     # Reached here means that all registeration steps were successful
     print(f"[INFOR] Successfully registered the incoming hosts : {data}.")
     return {
@@ -0,0 +1,305 @@
+"""
+asyncio variant of CMDBClient, for flows that want many CMDB pages or
+batches in flight from one request without threads.
+
+Same methods and results as CMDBClient (fetch_cmdb_server_list,
+fetch_cmdb_server_list_paginated, upload_ips_to_cmdb_inventory,
+remove_hosts_from_cmdb), as coroutines. Requests go through one pooled
+httpx.AsyncClient (CMDB_POOL_SIZE connections), at most
+CMDB_ASYNC_CONCURRENCY at a time, with CMDBClient's retry policy: GETs are
+retried on 429/5xx, POSTs on 429 only, and a 429 pauses every request of
+the client until its Retry-After has passed.
+
+Requires httpx:
+
+    async with AsyncCMDBClient() as cmdb:
+        hosts = await cmdb.fetch_cmdb_server_list_paginated(c_code="ic4vmws", partitions=8)
+"""
+
+import asyncio
+import json
+import os
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from common.cmdb_client import (
+    CMDBClient,
+    CMDB_BACKOFF_FACTOR,
+    CMDB_MAX_RETRIES,
+    CMDB_POOL_SIZE,
+    CMDB_RETRY_STATUSES,
+    CMDB_TIMEOUT,
+    IC4VMWS_UC_CODE,
+    fields_param,
+    keyset_query,
+    live_server_query,
+    load_cmdb_settings,
+    range_query,
+    read_params,
+    record_sys_id,
+    sys_id_ranges,
+)
+
+CMDB_ASYNC_CONCURRENCY = int(os.getenv("CMDB_ASYNC_CONCURRENCY", "10"))
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Retry-After of a response in seconds (delay or HTTP date), None if absent."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AsyncCMDBClient:
+    """
+    Async client to list and upload Hosts in CMDB inventory
+    """
+
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        max_concurrency: int = CMDB_ASYNC_CONCURRENCY,
+    ):
+        (
+            self.CMDB_GETCI_PROD_API_URL,
+            self.CMDB_INSERT_MULTIPLE_PROD_API_URL,
+            self.CMDB_ACCESS_TOKEN,
+        ) = load_cmdb_settings()
+
+        self.client = client or httpx.AsyncClient(
+            timeout=CMDB_TIMEOUT,
+            # Connection errors are retried by the transport, statuses below.
+            # The pool limits belong on the transport: httpx ignores the
+            # client's limits= when a transport is given.
+            transport=httpx.AsyncHTTPTransport(
+                retries=CMDB_MAX_RETRIES,
+                limits=httpx.Limits(
+                    max_connections=CMDB_POOL_SIZE,
+                    max_keepalive_connections=CMDB_POOL_SIZE,
+                ),
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._resume_at = 0.0
+
+    async def __aenter__(self) -> "AsyncCMDBClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.CMDB_ACCESS_TOKEN}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """One CMDB call, retried like CMDBRetry; the last response is returned."""
+        for attempt in range(CMDB_MAX_RETRIES + 1):
+            # A 429 seen by any request holds back all of them
+            delay = self._resume_at - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            async with self._semaphore:
+                response = await self.client.request(method, url, headers=self._headers(), **kwargs)
+
+            status = response.status_code
+            retryable = status == 429 or (method == "GET" and status in CMDB_RETRY_STATUSES)
+            if not retryable or attempt == CMDB_MAX_RETRIES:
+                return response
+
+            seconds = retry_after_seconds(response)
+            if seconds is None:
+                seconds = CMDB_BACKOFF_FACTOR * 2**attempt
+            if status == 429:
+                self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+            else:
+                await asyncio.sleep(seconds)
+        return response
+
+    async def fetch_cmdb_server_list(
+        self,
+        hostname: Optional[str] = None,
+        serial_number: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """This will fetch the servers in the CMDB database
+
+        Args:
+            fields: Columns to return (sysparm_fields); all columns if None
+
+        Returns:
+            List[Dict[str, Any]] : A list of  server records with 'Pre-Live' status.
+        """
+        base_query = f"u_c_code={IC4VMWS_UC_CODE}^u_dcim_status=Pre-live"
+        if hostname:
+            base_query += f"^name={hostname}"
+        if serial_number:
+            base_query += f"^serial_number={serial_number}"
+
+        all_records = []
+        limit = 1000
+        last_sys_id = ""
+
+        while True:
+            params = {
+                "sysparm_query": keyset_query(base_query, last_sys_id),
+                "sysparm_limit": str(limit),
+            }
+            if fields:
+                params["sysparm_fields"] = fields_param(fields)
+
+            try:
+                response = await self._request("GET", self.CMDB_GETCI_PROD_API_URL, params=params)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                print(
+                    f"[Error] Failed after {CMDB_MAX_RETRIES} retries fetching CMDB records for api_url: {self.CMDB_GETCI_PROD_API_URL} and params: {params}: {e}. Giving up."
+                )
+                return all_records
+
+            try:
+                data = response.json()
+            except ValueError:
+                raise ValueError(
+                    f"Invalid JSON response from api_url: {self.CMDB_GETCI_PROD_API_URL}"
+                )
+
+            records = data.get("result")
+            if not records:
+                return all_records
+
+            all_records.extend(records)
+            last_sys_id = records[-1]["sys_id"]
+
+            # If fewer records than limit were found we have reached end of the pagination and we can exit.
+            if len(records) < limit:
+                return all_records
+
+    async def fetch_cmdb_server_list_paginated(
+        self,
+        c_code: Optional[str] = None,
+        dns_domain: Optional[str] = None,
+        hostname: Optional[str] = None,
+        serial_number: Optional[str] = None,
+        partitions: int = 1,
+        fields: Optional[List[str]] = None,
+        display_value: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch ALL server records from CMDB (Live only), as
+        CMDBClient.fetch_cmdb_server_list_paginated does.
+
+        With partitions > 1 every sys_id range is paged concurrently (within
+        the client's concurrency limit); records come back in sys_id order,
+        without duplicates.
+        """
+        base_query = live_server_query(c_code, dns_domain, hostname, serial_number)
+        params = read_params(fields, display_value)
+
+        if partitions <= 1:
+            pages = [await self._fetch_pages(base_query, params)]
+        else:
+            pages = await asyncio.gather(
+                *(self._fetch_pages(range_query(base_query, *bounds), params) for bounds in sys_id_ranges(partitions))
+            )
+
+        all_records = []
+        last_sys_id = ""
+        for records in pages:
+            for record in records:
+                if record_sys_id(record) > last_sys_id:
+                    last_sys_id = record_sys_id(record)
+                    all_records.append(record)
+        return all_records
+
+    async def _fetch_pages(self, base_query: str, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Server records matching base_query, one keyset page after another."""
+        all_records = []
+        limit = 1000
+        last_sys_id = ""
+
+        while True:
+            page_params = {
+                "sysparm_query": keyset_query(base_query, last_sys_id),
+                "sysparm_table": "cmdb_ci_server",
+                "sysparm_limit": limit,
+                **params,
+            }
+            response = await self._request("GET", self.CMDB_GETCI_PROD_API_URL, params=page_params)
+
+            if response.status_code == 416:
+                break  # past the last record, we're done
+
+            if response.status_code != 200:
+                raise RuntimeError(
+                    f"Failed to fetch CMDB records. "
+                    f"Status: {response.status_code}, Response: {response.text}"
+                )
+
+            records = response.json().get("result", [])
+            if not records:
+                break
+
+            all_records.extend(records)
+
+            if len(records) < limit:
+                break  # last page, no need for another request
+
+            last_sys_id = record_sys_id(records[-1])
+
+        return all_records
+
+    async def upload_ips_to_cmdb_inventory(
+        self, ips_list: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        payload = CMDBClient.build_cmdb_payload(ips_list)
+        print(
+            f"[INFO] Uploading payload to CMDB: {json.dumps(payload, indent=2)} with URL : {self.CMDB_INSERT_MULTIPLE_PROD_API_URL}"
+        )
+        response = await self._insert_multiple(payload)
+        print(
+            f"[INFO] Uploaded the above missing ips to CMDB successfully!! : response:{response}"
+        )
+        return response
+
+    async def remove_hosts_from_cmdb(
+        self, hosts_list: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        payload = CMDBClient.build_cmdb_graveyard_payload(hosts_list)
+        print(
+            f"[INFO] Graveyarding hosts payload in CMDB inventory: {json.dumps(payload, indent=2)} with URL : {self.CMDB_INSERT_MULTIPLE_PROD_API_URL}"
+        )
+        return await self._insert_multiple(payload)
+
+    async def _insert_multiple(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = await self._request("POST", self.CMDB_INSERT_MULTIPLE_PROD_API_URL, json=payload)
+            response.raise_for_status()
+            return response.json()
+
+        except httpx.TimeoutException:
+            raise TimeoutError(
+                "CMDB inventory service is currently unavailable (timeout). Please try again later."
+            )
+        except httpx.HTTPError:
+            raise RuntimeError(
+                "Failed to communicate with CMDB inventory service. Please try again later."
+            )
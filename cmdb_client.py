@@ -1,49 +1,366 @@
 import requests
-from typing import Dict, Any, List
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Iterator, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 import os
-from typing import Optional
+import queue
+import threading
 import time
+from urllib.parse import quote
+from typing import Optional
 
 IC4VMWS_UC_CODE = "ic4vmws"
 DECOMMISION_REASON = "Graveyarding the VM"
 HOST_TYPE_VCF_FOR_VPC = "VCFforVPC"
 
+CMDB_TIMEOUT = 60
+CMDB_MAX_RETRIES = int(os.getenv("CMDB_MAX_RETRIES", "5"))
+CMDB_BACKOFF_FACTOR = float(os.getenv("CMDB_BACKOFF_FACTOR", "1"))
+CMDB_POOL_SIZE = int(os.getenv("CMDB_POOL_SIZE", "10"))
+CMDB_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Parallel listing: sys_id ranges fetched concurrently, and at most this many at once
+CMDB_LIST_PARTITIONS = int(os.getenv("CMDB_LIST_PARTITIONS", "8"))
+CMDB_LIST_WORKERS = int(os.getenv("CMDB_LIST_WORKERS", "4"))
+# Pages each range may fetch ahead of the consumer of iter_cmdb_servers
+CMDB_PREFETCH_PAGES = int(os.getenv("CMDB_PREFETCH_PAGES", "2"))
+
+# Bulk uploads: records per insert-multiple request, requests in flight,
+# attempts per chunk, and the most hosts accepted by one register call
+CMDB_UPLOAD_CHUNK_SIZE = int(os.getenv("CMDB_UPLOAD_CHUNK_SIZE", "50"))
+CMDB_UPLOAD_WORKERS = int(os.getenv("CMDB_UPLOAD_WORKERS", "4"))
+CMDB_UPLOAD_ATTEMPTS = int(os.getenv("CMDB_UPLOAD_ATTEMPTS", "3"))
+CMDB_BULK_MAX_HOSTS = int(os.getenv("CMDB_BULK_MAX_HOSTS", "5000"))
+CMDB_SUCCESS_STATUSES = ("success", "ok", "created")
+
+# Batch lookups: longest encoded sysparm_query sent in one request
+CMDB_MAX_QUERY_LENGTH = int(os.getenv("CMDB_MAX_QUERY_LENGTH", "4000"))
+
+# Request rate shared by all threads (requests/second): starting rate, the
+# range it adapts within, the increase per successful request, and burst
+CMDB_RATE_LIMIT = float(os.getenv("CMDB_RATE_LIMIT", "20"))
+CMDB_MIN_RATE_LIMIT = float(os.getenv("CMDB_MIN_RATE_LIMIT", "1"))
+CMDB_MAX_RATE_LIMIT = float(os.getenv("CMDB_MAX_RATE_LIMIT", "50"))
+CMDB_RATE_STEP = float(os.getenv("CMDB_RATE_STEP", "0.5"))
+CMDB_RATE_BURST = float(os.getenv("CMDB_RATE_BURST", "10"))
+
+_session = None
+_session_lock = threading.Lock()
+_RANGE_DONE = object()
+
+
+class CMDBRateLimiter:
+    """
+    Adaptive token bucket shared by every thread using the CMDB session.
+
+    Each request (and each retry) takes a token; tokens refill at `rate`
+    per second, up to `burst`. A 429 halves the rate - once per second at
+    most, however many threads see it - and holds every request back until
+    its Retry-After has passed. No tokens refill during that pause, so
+    requests resume at the new rate rather than in a burst. Successful
+    (2xx/3xx) requests then raise the rate by `step`, at most once per
+    second since the last change, up to `max_rate` - a steady increase,
+    however many workers are running. Workers thus share one rate that
+    settles just under what CMDB accepts, instead of each thread backing
+    off and retrying on its own.
+    """
+
+    def __init__(
+        self,
+        rate: float = CMDB_RATE_LIMIT,
+        min_rate: float = CMDB_MIN_RATE_LIMIT,
+        max_rate: float = CMDB_MAX_RATE_LIMIT,
+        step: float = CMDB_RATE_STEP,
+        burst: float = CMDB_RATE_BURST,
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.step = step
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._resume_at = 0.0
+        self._decreased_at = float("-inf")
+        self._changed_at = float("-inf")
+
+    def _refill(self, now: float) -> None:
+        # The bucket starts refilling when a rate-limit pause ends
+        elapsed = now - max(self._updated, self._resume_at)
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Wait for a token (and for any rate-limit pause to end)."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._resume_at:
+                    delay = self._resume_at - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        """CMDB answered 429: slow down, and pause everyone for retry_after seconds."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now - self._decreased_at >= 1:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._decreased_at = self._changed_at = now
+            self._tokens = min(self._tokens, 0)
+            if retry_after:
+                self._resume_at = max(self._resume_at, now + retry_after)
+
+    def succeeded(self) -> None:
+        """A request went through: probe for a higher rate (once per second at most)."""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._changed_at < 1:
+                return
+            self._refill(now)
+            self.rate = min(self.max_rate, self.rate + self.step)
+            self._changed_at = now
+
+
+cmdb_rate_limiter = CMDBRateLimiter()
+
+
+class CMDBRetry(Retry):
+    """
+    Retry policy for CMDB calls.
+
+    GETs are retried on connection/read errors and on 429/5xx. POSTs
+    (insert-multiple) are only retried on connection errors and 429, where
+    CMDB has not processed the request, so a retry cannot insert twice.
+    Retry-After is honoured; otherwise the wait doubles each attempt.
+    """
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        if method.upper() == "POST" and status_code == 429:
+            return bool(self.total)
+        return super().is_retry(method, status_code, has_retry_after)
+
+    def sleep(self, response=None) -> None:
+        # A 429 slows down and pauses every thread (see CMDBRateLimiter), not
+        # just this request; retries take a token like any other request
+        if response is not None and response.status == 429:
+            seconds = self.get_retry_after(response)
+            cmdb_rate_limiter.throttled(seconds if seconds is not None else self.get_backoff_time())
+        else:
+            super().sleep(response)
+        cmdb_rate_limiter.acquire()
+
+
+class CMDBAdapter(HTTPAdapter):
+    """HTTPAdapter that paces requests through the shared CMDBRateLimiter."""
+
+    def send(self, request, **kwargs):
+        cmdb_rate_limiter.acquire()
+        response = super().send(request, **kwargs)
+        if response.status_code == 429:
+            # Retries used up (or a POST): still slow everyone down
+            retry_after = response.headers.get("Retry-After")
+            try:
+                seconds = self.max_retries.parse_retry_after(retry_after) if retry_after else None
+            except Exception:
+                seconds = None
+            cmdb_rate_limiter.throttled(seconds)
+        elif response.status_code < 400:
+            # Only real successes raise the rate; 5xx and other errors don't
+            cmdb_rate_limiter.succeeded()
+        return response
+
+
+def get_cmdb_session() -> requests.Session:
+    """
+    Process-wide pooled session for CMDB calls.
+
+    Created on first use and kept at module level, so warm serverless
+    invocations reuse the open TLS connections instead of reconnecting for
+    every page and batch.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = CMDBRetry(
+                total=CMDB_MAX_RETRIES,
+                backoff_factor=CMDB_BACKOFF_FACTOR,
+                status_forcelist=CMDB_RETRY_STATUSES,
+                allowed_methods=frozenset({"GET"}),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = CMDBAdapter(
+                pool_connections=CMDB_POOL_SIZE,
+                pool_maxsize=CMDB_POOL_SIZE,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def keyset_query(base_query: str, last_sys_id: str = "") -> str:
+    """
+    Encoded query for the page after last_sys_id.
+
+    Ordering by sys_id keeps the page order stable; filtering on the last
+    sys_id seen replaces sysparm_offset, which CMDB has to skip over.
+    """
+    query = f"{base_query}^ORDERBYsys_id"
+    if last_sys_id:
+        query += f"^sys_id>{last_sys_id}"
+    return query
+
+
+def record_sys_id(record: Dict[str, Any]) -> str:
+    """sys_id of a record fetched with any sysparm_display_value ("all" gives a dict)."""
+    sys_id = record["sys_id"]
+    return sys_id["value"] if isinstance(sys_id, dict) else sys_id
+
+
+def fields_param(fields: List[str]) -> str:
+    """
+    sysparm_fields for the given columns. sys_id is always requested, as
+    keyset pagination and deduplication rely on it.
+    """
+    columns = [field.strip() for field in fields if field.strip()]
+    if "sys_id" not in columns:
+        columns.insert(0, "sys_id")
+    return ",".join(columns)
+
+
+def in_query_chunks(base_query: str, field: str, values: List[str]) -> List[str]:
+    """
+    Encoded queries "base^fieldINa,b,..." covering all values, each at most
+    CMDB_MAX_QUERY_LENGTH characters once URL-encoded - including the
+    keyset suffix (^ORDERBYsys_id^sys_id>...) added to every page.
+    """
+    prefix = f"{base_query}^{field}IN"
+    suffix = keyset_query("", "0" * 32)
+    budget = CMDB_MAX_QUERY_LENGTH - len(quote(prefix, safe="")) - len(quote(suffix, safe=""))
+    queries = []
+    chunk: List[str] = []
+    used = 0
+    for value in values:
+        size = len(quote(value, safe="")) + (3 if chunk else 0)  # "," is sent as %2C
+        if chunk and used + size > budget:
+            queries.append(prefix + ",".join(chunk))
+            chunk, used = [], 0
+            size = len(quote(value, safe=""))
+        chunk.append(value)
+        used += size
+    if chunk:
+        queries.append(prefix + ",".join(chunk))
+    return queries
+
+
+def sys_id_ranges(partitions: int) -> List[Tuple[str, str]]:
+    """
+    Split the sys_id keyspace into contiguous ranges.
+
+    sys_ids are random 32-digit hex strings, so equal hex-prefix ranges hold
+    about the same number of records. Returns (low, high) prefixes; ""
+    leaves that end open.
+    """
+    bounds = [format(i * 16**8 // partitions, "08x") for i in range(1, partitions)]
+    return list(zip([""] + bounds, bounds + [""]))
+
+
+def range_query(base_query: str, low: str = "", high: str = "") -> str:
+    """base_query restricted to sys_ids in [low, high)."""
+    query = base_query
+    if low:
+        query += f"^sys_id>={low}"
+    if high:
+        query += f"^sys_id<{high}"
+    return query
+
+
+def load_cmdb_settings() -> Tuple[str, str, str]:
+    """GETCI URL, insert-multiple URL and access token, from the environment."""
+    getci_url = os.getenv("CMDB_GETCI_PROD_API_URL")
+    insert_multiple_url = os.getenv("CMDB_INSERT_MULTIPLE_PROD_API_URL")
+    access_token = os.getenv("CMDB_ACCESS_TOKEN")
+
+    if not getci_url or not insert_multiple_url or not access_token:
+        raise RuntimeError(
+            "Missing CMDB URL's or Access Token environment variables!!!"
+        )
+    return getci_url, insert_multiple_url, access_token
+
+
+def live_server_query(
+    c_code: Optional[str] = None,
+    dns_domain: Optional[str] = None,
+    hostname: Optional[str] = None,
+    serial_number: Optional[str] = None,
+) -> str:
+    """Encoded query for the Live servers of c_code (ic4vmws by default)."""
+    base_query = f"u_c_code={c_code or IC4VMWS_UC_CODE}^u_dcim_status=Live"
+    if dns_domain:
+        base_query += f"^u_dns_domain={dns_domain}"
+    if hostname:
+        base_query += f"^name={hostname}"
+    if serial_number:
+        base_query += f"^serial_number={serial_number}"
+    return base_query
+
+
+def read_params(fields: Optional[List[str]] = None, display_value: bool = True) -> Dict[str, str]:
+    """sysparm_display_value and sysparm_fields for a read."""
+    params = {"sysparm_display_value": "true" if display_value else "false"}
+    if fields:
+        params["sysparm_fields"] = fields_param(fields)
+    return params
+
 
 class CMDBClient:
     """
     Client to upload Hosts in CMDB inventory
     """
 
-    def __init__(self):
-        self.CMDB_GETCI_PROD_API_URL = os.getenv("CMDB_GETCI_PROD_API_URL")
-        self.CMDB_INSERT_MULTIPLE_PROD_API_URL = os.getenv(
-            "CMDB_INSERT_MULTIPLE_PROD_API_URL"
-        )
-        self.CMDB_ACCESS_TOKEN = os.getenv("CMDB_ACCESS_TOKEN")
+    def __init__(self, session: Optional[requests.Session] = None):
+        (
+            self.CMDB_GETCI_PROD_API_URL,
+            self.CMDB_INSERT_MULTIPLE_PROD_API_URL,
+            self.CMDB_ACCESS_TOKEN,
+        ) = load_cmdb_settings()
+        self.session = session or get_cmdb_session()
 
-        if (
-            not self.CMDB_GETCI_PROD_API_URL
-            or not self.CMDB_INSERT_MULTIPLE_PROD_API_URL
-            or not self.CMDB_ACCESS_TOKEN
-        ):
-            raise RuntimeError(
-                "Missing CMDB URL's or Access Token environment variables!!!"
-            )
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.CMDB_ACCESS_TOKEN}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
 
     def fetch_cmdb_server_list(
-        self, hostname: Optional[str] = None, serial_number: Optional[str] = None
+        self,
+        hostname: Optional[str] = None,
+        serial_number: Optional[str] = None,
+        fields: Optional[List[str]] = None,
     ) -> List[Dict[str, Any]]:
         """This will fetch the servers in the CMDB database
 
+        Args:
+            fields: Columns to return (sysparm_fields); all columns if None
+
         Returns:
             List[Dict[str, Any]] : A list of  server records with 'Pre-Live' status.
         """
-        headers = {
-            "Authorization": f"Bearer {self.CMDB_GETCI_PROD_API_URL}",
-            "Content-Type": "application/json",
-        }
-
         base_query = f"u_c_code={IC4VMWS_UC_CODE}^u_dcim_status=Pre-live"
         if hostname:
             base_query += f"^name={hostname}"
@@ -52,71 +369,47 @@ class CMDBClient:
 
         all_records = []
         limit = 1000
-        page = 1
         last_sys_id = ""
 
         while True:
-            # Append ordering by sys_id to ensure consistent pagination order
-            query = f"{base_query}^ORDERBYsys_id"
-
-            if last_sys_id:
-                query += f"^sys_id>{last_sys_id}"
-
-            params = {"sysparm_query": query, "sysparm_limit": str(limit)}
-
-            max_retries = 5
-            backoff_factor = 2
-
-            retries = 0
-            while retries < max_retries:
-                try:
-                    response = requests.get(
-                        self.CMDB_GETCI_PROD_API_URL,
-                        headers=headers,
-                        params=params,
-                        timeout=60,
-                    )
-                    if response.status_code == 429:
-                        print(response.headers)
-                        retry_after = int(
-                            response.headers.get("Retry-After", backoff_factor**retries)
-                        )
-                        print(
-                            f"[Warning] Rate limited (429). Retrying in {retry_after} seconds..."
-                        )
-                        time.sleep(retry_after)
-                        retries += 1
-                        continue
-
-                    response.raise_for_status()
-                    data = response.json()
+            params = {
+                "sysparm_query": keyset_query(base_query, last_sys_id),
+                "sysparm_limit": str(limit),
+            }
+            if fields:
+                params["sysparm_fields"] = fields_param(fields)
+
+            # 429/5xx and connection errors are retried by the session (CMDBRetry)
+            try:
+                response = self.session.get(
+                    self.CMDB_GETCI_PROD_API_URL,
+                    headers=self._headers(),
+                    params=params,
+                    timeout=CMDB_TIMEOUT,
+                )
+                response.raise_for_status()
+            except requests.RequestException as e:
+                print(
+                    f"[Error] Failed after {CMDB_MAX_RETRIES} retries fetching CMDB records for api_url: {self.CMDB_GETCI_PROD_API_URL} and params: {params}: {e}. Giving up."
+                )
+                return all_records
 
-                    records = data.get("result")
-                    if not records:
-                        return all_records
+            try:
+                data = response.json()
+            except ValueError:
+                raise ValueError(
+                    f"Invalid JSON response from api_url: {self.CMDB_GETCI_PROD_API_URL}"
+                )
 
-                    all_records.extend(records)
-                    last_sys_id = records[-1]["sys_id"]
+            records = data.get("result")
+            if not records:
+                return all_records
 
-                    # If fewer records than limit were found we have reached end of the pagination and we can exit.
-                    if len(records) < limit:
-                        return all_records
+            all_records.extend(records)
+            last_sys_id = records[-1]["sys_id"]
 
-                    page += 1
-                    break  # success, break out of retry loop
-                except requests.RequestException as e:
-                    wait_time = backoff_factor**retries
-                    print(
-                        f"Error {e} fetching CMDB records for api_url: {self.CMDB_GETCI_PROD_API_URL} and params: {params}, Retrying in {wait_time} seconds.."
-                    )
-                    time.sleep(wait_time)
-                    retries += 1
-                except ValueError:
-                    raise ValueError(
-                        f"Invalid JSON response from api_url: {self.CMDB_GETCI_PROD_API_URL}"
-                    )
-            else:
-                print(f"[Error] Failed after {max_retries}. Giving up.")
+            # If fewer records than limit were found we have reached end of the pagination and we can exit.
+            if len(records) < limit:
                 return all_records
 
     def upload_ips_to_cmdb_inventory(
@@ -127,17 +420,12 @@ class CMDBClient:
             f"[INFO] Uploading payload to CMDB: {json.dumps(payload, indent=2)} with URL : {self.CMDB_INSERT_MULTIPLE_PROD_API_URL}"
         )
 
-        headers = {
-            "Authorization": f"Bearer {self.CMDB_ACCESS_TOKEN}",
-            "Content-Type": "application/json",
-        }
-
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.CMDB_INSERT_MULTIPLE_PROD_API_URL,
-                headers=headers,
+                headers=self._headers(),
                 json=payload,
-                timeout=60,
+                timeout=CMDB_TIMEOUT,
             )
             response.raise_for_status()
 
@@ -155,6 +443,126 @@ class CMDBClient:
                 "Failed to communicate with CMDB inventory service. Please try again later."
             )
 
+    def bulk_upload_to_cmdb_inventory(
+        self,
+        ips_list: List[Dict[str, Any]],
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        attempts: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Upload hosts to CMDB in chunks of chunk_size (CMDB_UPLOAD_CHUNK_SIZE)
+        records, with up to max_workers (CMDB_UPLOAD_WORKERS) insert-multiple
+        requests in flight.
+
+        A chunk whose request fails (timeout, connection error, 5xx) is tried
+        again, up to attempts (CMDB_UPLOAD_ATTEMPTS) times in all; chunks
+        that went through are not sent again. Records are coalesced on name
+        in CMDB, so a chunk that failed after being applied is updated, not
+        duplicated, by the next attempt.
+
+        Returns:
+            List[Dict[str, Any]] : One outcome per host, in input order:
+                hostname, ip, status ("inserted", "updated", ... as reported
+                by CMDB, or "error"), message and sys_id when known.
+        """
+        chunk_size = chunk_size or CMDB_UPLOAD_CHUNK_SIZE
+        attempts = attempts or CMDB_UPLOAD_ATTEMPTS
+        chunks = [ips_list[i : i + chunk_size] for i in range(0, len(ips_list), chunk_size)]
+        outcomes: List[Optional[Dict[str, Any]]] = [None] * len(ips_list)
+        errors: Dict[int, str] = {}
+        pending = list(range(len(chunks)))
+
+        for attempt in range(1, attempts + 1):
+            if not pending:
+                break
+            if attempt > 1:
+                delay = CMDB_BACKOFF_FACTOR * 2 ** (attempt - 2)
+                print(
+                    f"[INFO] Retrying {len(pending)} failed CMDB upload chunk(s) in {delay}s (attempt {attempt}/{attempts})"
+                )
+                time.sleep(delay)
+
+            failed = []
+            workers = min(max_workers or CMDB_UPLOAD_WORKERS, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(self._insert_multiple, self.build_cmdb_payload(chunks[i])): i
+                    for i in pending
+                }
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        response = future.result()
+                    except requests.RequestException as e:
+                        errors[i] = str(e)
+                        if self._is_retryable(e):
+                            failed.append(i)
+                        continue
+                    self._record_outcomes(outcomes, i * chunk_size, chunks[i], response)
+            pending = sorted(failed)
+
+        for i, chunk in enumerate(chunks):
+            for offset, host in enumerate(chunk):
+                if outcomes[i * chunk_size + offset] is None:
+                    outcomes[i * chunk_size + offset] = self._outcome(
+                        host, "error", f"CMDB upload failed: {errors.get(i)}"
+                    )
+
+        failures = sum(1 for outcome in outcomes if outcome["status"] == "error")
+        print(
+            f"[INFO] Uploaded {len(ips_list) - failures} of {len(ips_list)} host(s) to CMDB in {len(chunks)} chunk(s), {failures} failed"
+        )
+        return outcomes
+
+    def _insert_multiple(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        response = self.session.post(
+            self.CMDB_INSERT_MULTIPLE_PROD_API_URL,
+            headers=self._headers(),
+            json=payload,
+            timeout=CMDB_TIMEOUT,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def _is_retryable(error: requests.RequestException) -> bool:
+        """Timeouts, connection errors, 429 and 5xx; other 4xx would fail again."""
+        response = getattr(error, "response", None)
+        if response is None:
+            return True
+        return response.status_code == 429 or response.status_code >= 500
+
+    @staticmethod
+    def _outcome(host: Dict[str, Any], status: str, message: str = "", sys_id: Optional[str] = None) -> Dict[str, Any]:
+        outcome = {"hostname": host.get("hostname"), "ip": host.get("ip"), "status": status, "message": message}
+        if sys_id:
+            outcome["sys_id"] = sys_id
+        return outcome
+
+    def _record_outcomes(
+        self, outcomes: List[Optional[Dict[str, Any]]], start: int, chunk: List[Dict[str, Any]], response: Any
+    ) -> None:
+        """Per-record outcomes of one chunk from its insert-multiple response."""
+        response = response if isinstance(response, dict) else {}
+        status = response.get("status")
+        if status and status.lower() not in CMDB_SUCCESS_STATUSES:
+            for offset, host in enumerate(chunk):
+                outcomes[start + offset] = self._outcome(host, "error", f"CMDB did not confirm host creation: {response}")
+            return
+
+        # Import set responses list one result per record, in request order
+        results = response.get("result")
+        if not isinstance(results, list) or len(results) != len(chunk):
+            results = [{}] * len(chunk)
+        for offset, (host, result) in enumerate(zip(chunk, results)):
+            outcomes[start + offset] = self._outcome(
+                host,
+                result.get("status") or "uploaded",
+                result.get("error_message") or result.get("status_message") or "",
+                result.get("sys_id"),
+            )
+
     @staticmethod
     def build_cmdb_payload(
         missing_ips_list: List[Dict[str, str]],
@@ -236,17 +644,12 @@ class CMDBClient:
             f"[INFO] Graveyarding hosts payload in CMDB inventory: {json.dumps(payload, indent=2)} with URL : {self.CMDB_INSERT_MULTIPLE_PROD_API_URL}"
         )
 
-        headers = {
-            "Authorization": f"Bearer {self.CMDB_ACCESS_TOKEN}",
-            "Content-Type": "application/json",
-        }
-
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.CMDB_INSERT_MULTIPLE_PROD_API_URL,
-                headers=headers,
+                headers=self._headers(),
                 json=payload,
-                timeout=60,
+                timeout=CMDB_TIMEOUT,
             )
             response.raise_for_status()
             return response.json()
@@ -260,69 +663,248 @@ class CMDBClient:
                 "Failed to communicate with CMDB inventory service. Please try again later."
             )
 
-   def fetch_cmdb_server_list_paginated(
+    def fetch_cmdb_server_list_paginated(
         self,
         c_code: Optional[str] = None,
         dns_domain: Optional[str] = None,
         hostname: Optional[str] = None,
         serial_number: Optional[str] = None,
+        partitions: int = 1,
+        max_workers: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        display_value: bool = True,
     ) -> List[Dict[str, Any]]:
         """
-        Fetch ALL server records from CMDB (Live only).
-        Uses sysparm_offset pagination, treats 416 as end of results.
+        Fetch ALL server records from CMDB (Live only), as a list.
+
+        Same arguments as iter_cmdb_servers, which should be preferred for
+        large c_codes as it does not hold every record in memory.
         """
-        headers = {
-            "Authorization": f"Bearer {self.CMDB_ACCESS_TOKEN}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
-        effective_c_code = c_code or IC4VMWS_UC_CODE
-        base_query = f"u_c_code={effective_c_code}^u_dcim_status=Live"
-        if dns_domain:
-            base_query += f"^u_dns_domain={dns_domain}"
-        if hostname:
-            base_query += f"^name={hostname}"
-        if serial_number:
-            base_query += f"^serial_number={serial_number}"
-    
-        all_records = []
-        offset = 0
+        return list(
+            self.iter_cmdb_servers(
+                c_code=c_code,
+                dns_domain=dns_domain,
+                hostname=hostname,
+                serial_number=serial_number,
+                partitions=partitions,
+                max_workers=max_workers,
+                fields=fields,
+                display_value=display_value,
+            )
+        )
+
+    def iter_cmdb_servers(
+        self,
+        c_code: Optional[str] = None,
+        dns_domain: Optional[str] = None,
+        hostname: Optional[str] = None,
+        serial_number: Optional[str] = None,
+        partitions: int = 1,
+        max_workers: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+        display_value: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield server records from CMDB (Live only) page by page, in sys_id order.
+
+        Uses keyset pagination (ORDERBYsys_id^sys_id>last) like
+        fetch_cmdb_server_list: each page starts after the last sys_id of the
+        previous one, so the server never skips an offset and every page
+        costs the same however deep the listing goes. Records of the first
+        page are yielded before the next one is requested, and only the
+        pages in flight are held in memory.
+
+        With partitions > 1 the sys_id keyspace is split into that many
+        ranges (sys_id_ranges), each paged on its own, with at most
+        max_workers (default CMDB_LIST_WORKERS) in flight. Throttling on any
+        range slows them all down (CMDBRateLimiter). Records still come out in
+        sys_id order, without duplicates.
+
+        fields limits the columns returned (sysparm_fields), and
+        display_value=False returns raw values instead of display values.
+        Both cut the payload and CMDB's time to build it; callers that only
+        need a few columns should pass them.
+        """
+        base_query = live_server_query(c_code, dns_domain, hostname, serial_number)
+        params = read_params(fields, display_value)
+
+        if partitions <= 1:
+            pages = self._iter_pages(base_query, params)
+        else:
+            pages = self._iter_partitioned_pages(base_query, params, partitions, max_workers)
+
+        last_sys_id = ""
+        for records in pages:
+            for record in records:
+                # Output is sorted by sys_id, so anything not past the last
+                # record yielded is a duplicate
+                if record["sys_id"] > last_sys_id:
+                    last_sys_id = record["sys_id"]
+                    yield record
+
+    def lookup_cmdb_servers(
+        self,
+        hostnames: Optional[List[str]] = None,
+        serial_numbers: Optional[List[str]] = None,
+        c_code: Optional[str] = None,
+        status: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        display_value: bool = False,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+        """
+        Look up many servers by name and/or serial number in a few requests.
+
+        The keys are sent as nameIN.../serial_numberIN... encoded queries,
+        split to stay within CMDB_MAX_QUERY_LENGTH and run concurrently (at
+        most max_workers, default CMDB_LIST_WORKERS, at once). status
+        limits the dcim status (any if None).
+
+        Returns:
+            Dict with "hostname" and "serial_number" entries, each mapping
+            the requested keys found in CMDB (compared case-insensitively, as
+            CMDB does) to their server records. Keys not found are absent.
+        """
+        base_query = f"u_c_code={c_code or IC4VMWS_UC_CODE}"
+        if status:
+            base_query += f"^u_dcim_status={status}"
+        params = read_params([*fields, "name", "serial_number"] if fields else None, display_value)
+
+        keys = {"hostname": ("name", hostnames or []), "serial_number": ("serial_number", serial_numbers or [])}
+        queries = [
+            (key, query)
+            for key, (field, values) in keys.items()
+            for query in in_query_chunks(base_query, field, list(dict.fromkeys(v for v in values if v)))
+        ]
+
+        found: Dict[str, Dict[str, List[Dict[str, Any]]]] = {key: {} for key in keys}
+        if not queries:
+            return found
+        requested = {key: {value.lower(): value for value in values if value} for key, (_, values) in keys.items()}
+
+        def fetch(query: str) -> List[Dict[str, Any]]:
+            return [record for records in self._iter_pages(query, params) for record in records]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers or CMDB_LIST_WORKERS, len(queries))) as executor:
+            results = executor.map(fetch, [query for _, query in queries])
+            for (key, _), records in zip(queries, results):
+                field = keys[key][0]
+                for record in records:
+                    value = requested[key].get(str(record.get(field) or "").lower())
+                    if value is not None:
+                        found[key].setdefault(value, []).append(record)
+        return found
+
+    def iter_cmdb_updates(
+        self,
+        c_code: Optional[str] = None,
+        updated_since: Optional[str] = None,
+        display_value: str = "all",
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every server record of c_code, whatever its dcim status,
+        updated at or after updated_since ("YYYY-MM-DD HH:MM:SS", as in raw
+        sys_updated_on values), in sys_id order. All records if
+        updated_since is None. Used to keep CMDBMirror in sync.
+
+        display_value defaults to "all", giving each field as
+        {"display_value": ..., "value": ...}, so both forms can be served
+        from the one copy.
+        """
+        base_query = f"u_c_code={c_code or IC4VMWS_UC_CODE}"
+        if updated_since:
+            base_query += f"^sys_updated_on>={updated_since}"
+        for records in self._iter_pages(base_query, {"sysparm_display_value": display_value}):
+            yield from records
+
+    def _iter_partitioned_pages(
+        self,
+        base_query: str,
+        params: Dict[str, str],
+        partitions: int,
+        max_workers: Optional[int] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Pages of every sys_id range, fetched concurrently but yielded range
+        after range. Each range buffers at most CMDB_PREFETCH_PAGES pages
+        ahead of the consumer; workers stop once the consumer does.
+        """
+        ranges = sys_id_ranges(partitions)
+        buffers = [queue.Queue(maxsize=CMDB_PREFETCH_PAGES) for _ in ranges]
+        stop = threading.Event()
+
+        def put(buffer: queue.Queue, item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def fetch(bounds: Tuple[str, str], buffer: queue.Queue) -> None:
+            try:
+                for records in self._iter_pages(range_query(base_query, *bounds), params):
+                    if not put(buffer, records):
+                        return
+                put(buffer, _RANGE_DONE)
+            except Exception as e:
+                put(buffer, e)
+
+        executor = ThreadPoolExecutor(max_workers=max_workers or min(partitions, CMDB_LIST_WORKERS))
+        try:
+            for bounds, buffer in zip(ranges, buffers):
+                executor.submit(fetch, bounds, buffer)
+            for buffer in buffers:
+                while True:
+                    records = buffer.get()
+                    if records is _RANGE_DONE:
+                        break
+                    if isinstance(records, Exception):
+                        raise records
+                    yield records
+        finally:
+            stop.set()
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _iter_pages(
+        self, base_query: str, params: Dict[str, str]
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Server records matching base_query, one keyset page at a time (params added to each request)."""
         limit = 1000
-    
+        last_sys_id = ""
+
         while True:
-            params = {
-                "sysparm_query": base_query,
+            page_params = {
+                "sysparm_query": keyset_query(base_query, last_sys_id),
                 "sysparm_table": "cmdb_ci_server",
-                "sysparm_display_value": "true",
                 "sysparm_limit": limit,
-                "sysparm_offset": offset,
+                **params,
             }
-    
-            response = requests.get(
+
+            response = self.session.get(
                 self.CMDB_GETCI_PROD_API_URL,
-                headers=headers,
-                params=params,
-                timeout=60,
+                headers=self._headers(),
+                params=page_params,
+                timeout=CMDB_TIMEOUT,
             )
-    
+
             if response.status_code == 416:
-                break  # offset exceeded total records, we're done
-    
+                return  # past the last record, we're done
+
             if response.status_code != 200:
                 raise RuntimeError(
                     f"Failed to fetch CMDB records. "
                     f"Status: {response.status_code}, Response: {response.text}"
                 )
-    
+
             records = response.json().get("result", [])
             if not records:
-                break
-    
-            all_records.extend(records)
-    
+                return
+
+            yield records
+
             if len(records) < limit:
-                break  # last page, no need for another request
-    
-            offset += limit
-    
-        return all_records
+                return  # last page, no need for another request
+
+            last_sys_id = record_sys_id(records[-1])
@@ -0,0 +1,293 @@
+"""
+Local SQLite mirror of our CMDB server records (cmdb_ci_server), per c_code.
+
+Listings and duplicate checks are answered from the mirror instead of
+pulling every server from CMDB. A c_code is brought up to date at most
+every CMDB_MIRROR_TTL seconds, incrementally: only records with
+sys_updated_on at or after the last one seen (the watermark) are fetched.
+Incremental syncs cannot see records deleted from CMDB, so a full sync,
+replacing all records of the c_code, runs first and then every
+CMDB_MIRROR_FULL_SYNC_TTL seconds.
+
+Records are stored as fetched with sysparm_display_value=all, so both the
+display values and the raw values can be served. Set CMDB_MIRROR_DB to the
+database path to enable the mirror (get_cmdb_mirror).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from common.cmdb_client import CMDBClient, IC4VMWS_UC_CODE, fields_param, record_sys_id
+
+CMDB_MIRROR_TTL = int(os.getenv("CMDB_MIRROR_TTL", "300"))
+CMDB_MIRROR_FULL_SYNC_TTL = int(os.getenv("CMDB_MIRROR_FULL_SYNC_TTL", "86400"))
+CMDB_MIRROR_BATCH = 500
+# The watermark never passes the sync start minus this margin (seconds),
+# for clock skew between us and CMDB
+CMDB_MIRROR_SKEW = int(os.getenv("CMDB_MIRROR_SKEW", "60"))
+
+# Columns indexed for lookups, and the CMDB fields (raw values) they hold.
+# Names, serial numbers and domains compare case-insensitively, as in CMDB
+# encoded queries.
+INDEXED_FIELDS = {
+    "name": "name",
+    "serial_number": "serial_number",
+    "ip_address": "ip_address",
+    "dns_domain": "u_dns_domain",
+    "dcim_status": "u_dcim_status",
+    "sys_updated_on": "sys_updated_on",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS servers (
+    c_code         TEXT NOT NULL,
+    sys_id         TEXT NOT NULL,
+    name           TEXT COLLATE NOCASE,
+    serial_number  TEXT COLLATE NOCASE,
+    ip_address     TEXT,
+    dns_domain     TEXT COLLATE NOCASE,
+    dcim_status    TEXT,
+    sys_updated_on TEXT,
+    record         TEXT NOT NULL,
+    PRIMARY KEY (c_code, sys_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS servers_name ON servers (c_code, name);
+CREATE INDEX IF NOT EXISTS servers_serial_number ON servers (c_code, serial_number);
+CREATE INDEX IF NOT EXISTS servers_ip_address ON servers (c_code, ip_address);
+CREATE INDEX IF NOT EXISTS servers_dns_domain ON servers (c_code, dns_domain, dcim_status);
+CREATE TABLE IF NOT EXISTS sync_state (
+    c_code         TEXT PRIMARY KEY,
+    watermark      TEXT,
+    synced_at      REAL NOT NULL,
+    full_synced_at REAL NOT NULL
+);
+"""
+
+_mirror = None
+_mirror_lock = threading.Lock()
+
+
+def field_value(record: Dict[str, Any], field: str, display_value: bool = True) -> Any:
+    """
+    A field of a display_value=all record, as CMDB returns it with
+    sysparm_display_value=true (or false).
+    """
+    value = record.get(field)
+    if not isinstance(value, dict):
+        return value
+    key = "display_value" if display_value else "value"
+    if "link" in value:
+        return {key: value.get(key), "link": value["link"]}
+    return value.get(key)
+
+
+def project(
+    record: Dict[str, Any], fields: Optional[List[str]] = None, display_value: bool = True
+) -> Dict[str, Any]:
+    """A mirrored record limited to fields (as sysparm_fields would), in display or raw form."""
+    names = fields_param(fields).split(",") if fields else list(record)
+    return {name: field_value(record, name, display_value) for name in names if name in record}
+
+
+class CMDBMirror:
+    """
+    SQLite mirror of CMDB server records, kept fresh per c_code.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        client: Optional[CMDBClient] = None,
+        ttl: int = CMDB_MIRROR_TTL,
+        full_sync_ttl: int = CMDB_MIRROR_FULL_SYNC_TTL,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.full_sync_ttl = full_sync_ttl
+        self._client = client
+        self._local = threading.local()
+        self._sync_lock = threading.RLock()
+        self._connection().executescript(SCHEMA)
+
+    @property
+    def client(self) -> CMDBClient:
+        if self._client is None:
+            self._client = CMDBClient()
+        return self._client
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; WAL lets readers run alongside a sync
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _state(self, c_code: str) -> Optional[tuple]:
+        return self._connection().execute(
+            "SELECT watermark, synced_at, full_synced_at FROM sync_state WHERE c_code = ?",
+            (c_code,),
+        ).fetchone()
+
+    def is_fresh(self, c_code: Optional[str] = None) -> bool:
+        """Whether c_code was synced less than ttl seconds ago."""
+        state = self._state(c_code or IC4VMWS_UC_CODE)
+        return state is not None and time.time() - state[1] < self.ttl
+
+    def refresh(self, c_code: Optional[str] = None) -> None:
+        """Sync c_code unless it is fresh; a full sync if none was done in full_sync_ttl."""
+        c_code = c_code or IC4VMWS_UC_CODE
+        if self.is_fresh(c_code):
+            return
+        with self._sync_lock:
+            # Another thread may have synced while we waited
+            if self.is_fresh(c_code):
+                return
+            state = self._state(c_code)
+            full = state is None or time.time() - state[2] >= self.full_sync_ttl
+            self.sync(c_code, full=full)
+
+    def sync(self, c_code: Optional[str] = None, full: bool = False) -> int:
+        """
+        Fetch the records of c_code updated since the watermark (all of them
+        when full, replacing the mirrored ones) and store them. Runs in one
+        transaction: a failed sync leaves the mirror as it was.
+
+        The scan is in sys_id order, so a record already passed can be
+        updated in CMDB while later ones are read. The new watermark is
+        therefore capped at the sync start (less CMDB_MIRROR_SKEW), and the
+        next sync fetches such records again.
+
+        Returns:
+            int: Number of records fetched
+        """
+        c_code = c_code or IC4VMWS_UC_CODE
+        connection = self._connection()
+        with self._sync_lock:
+            state = self._state(c_code)
+            full = full or state is None
+            since = None if full else state[0]
+            started = time.time()
+            watermark = since or ""
+            count = 0
+            batch = []
+
+            with connection:
+                if full:
+                    connection.execute("DELETE FROM servers WHERE c_code = ?", (c_code,))
+                for record in self.client.iter_cmdb_updates(c_code=c_code, updated_since=since):
+                    row = self._row(c_code, record)
+                    watermark = max(watermark, row[-2] or "")
+                    batch.append(row)
+                    count += 1
+                    if len(batch) >= CMDB_MIRROR_BATCH:
+                        self._store(connection, batch)
+                        batch = []
+                self._store(connection, batch)
+                # CMDB raw sys_updated_on format, UTC
+                cap = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(started - CMDB_MIRROR_SKEW))
+                watermark = min(watermark, cap)
+                connection.execute(
+                    "INSERT INTO sync_state (c_code, watermark, synced_at, full_synced_at) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT (c_code) DO UPDATE SET "
+                    "watermark = excluded.watermark, synced_at = excluded.synced_at, "
+                    "full_synced_at = CASE WHEN ? THEN excluded.full_synced_at "
+                    "ELSE sync_state.full_synced_at END",
+                    (c_code, watermark or None, started, started, full),
+                )
+
+        print(
+            f"[INFO] CMDB mirror {'full' if full else 'incremental'} sync of c_code {c_code}: "
+            f"{count} record(s) in {time.time() - started:.1f}s"
+        )
+        return count
+
+    @staticmethod
+    def _row(c_code: str, record: Dict[str, Any]) -> tuple:
+        indexed = [field_value(record, field, display_value=False) for field in INDEXED_FIELDS.values()]
+        return (c_code, record_sys_id(record), *indexed, json.dumps(record))
+
+    @staticmethod
+    def _store(connection: sqlite3.Connection, rows: List[tuple]) -> None:
+        columns = ", ".join(["c_code", "sys_id", *INDEXED_FIELDS, "record"])
+        connection.executemany(
+            f"INSERT OR REPLACE INTO servers ({columns}) VALUES ({', '.join('?' * (len(INDEXED_FIELDS) + 3))})",
+            rows,
+        )
+
+    def iter_servers(
+        self,
+        c_code: Optional[str] = None,
+        dns_domain: Optional[str] = None,
+        hostname: Optional[str] = None,
+        serial_number: Optional[str] = None,
+        status: str = "Live",
+        fields: Optional[List[str]] = None,
+        display_value: bool = True,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Mirrored records of c_code with the given dcim status, in sys_id
+        order, as CMDBClient.iter_cmdb_servers would return them. Refreshes
+        the c_code first if it is stale.
+        """
+        c_code = c_code or IC4VMWS_UC_CODE
+        self.refresh(c_code)
+
+        query = "SELECT record FROM servers WHERE c_code = ? AND dcim_status = ?"
+        params = [c_code, status]
+        for column, value in (("dns_domain", dns_domain), ("name", hostname), ("serial_number", serial_number)):
+            if value:
+                query += f" AND {column} = ?"
+                params.append(value)
+        rows = self._connection().execute(query + " ORDER BY sys_id", params)
+        return (project(json.loads(record), fields, display_value) for (record,) in rows)
+
+    def find(
+        self,
+        c_code: Optional[str] = None,
+        names: Iterable[str] = (),
+        serial_numbers: Iterable[str] = (),
+        ip_addresses: Iterable[str] = (),
+        fields: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Records of c_code, any dcim status, matching any of the names, serial
+        numbers or IP addresses, with raw values - for duplicate checks.
+        """
+        c_code = c_code or IC4VMWS_UC_CODE
+        self.refresh(c_code)
+
+        connection = self._connection()
+        found = {}
+        for column, values in (("name", names), ("serial_number", serial_numbers), ("ip_address", ip_addresses)):
+            values = [value for value in values if value]
+            for start in range(0, len(values), CMDB_MIRROR_BATCH):
+                chunk = values[start:start + CMDB_MIRROR_BATCH]
+                rows = connection.execute(
+                    f"SELECT sys_id, record FROM servers WHERE c_code = ? "
+                    f"AND {column} IN ({', '.join('?' * len(chunk))})",
+                    [c_code, *chunk],
+                )
+                for sys_id, record in rows:
+                    if sys_id not in found:
+                        found[sys_id] = project(json.loads(record), fields, display_value=False)
+        return [found[sys_id] for sys_id in sorted(found)]
+
+
+def get_cmdb_mirror() -> Optional[CMDBMirror]:
+    """The process-wide mirror at CMDB_MIRROR_DB, or None when it is not configured."""
+    global _mirror
+    path = os.getenv("CMDB_MIRROR_DB")
+    if not path:
+        return None
+    if _mirror is None or _mirror.path != path:
+        with _mirror_lock:
+            if _mirror is None or _mirror.path != path:
+                _mirror = CMDBMirror(path)
+    return _mirror
@@ -0,0 +1,91 @@
+import base64
+import copy
+import json
+
+import pytest
+import requests
+
+
+class FakeGitHub:
+    """
+    GitHub API stand-in for the github_rules scripts: answers get() and
+    paginate() from a table of endpoints (a missing endpoint is a 404) and
+    records every call.
+    """
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+        self.etags = {}
+
+    def get(self, endpoint, allow_404=False):
+        self.calls.append(endpoint)
+        if endpoint not in self.responses:
+            if allow_404:
+                return None
+            raise requests.exceptions.HTTPError(f"404 Client Error: Not Found for {endpoint}")
+        return copy.deepcopy(self.responses[endpoint])
+
+    def paginate(self, endpoint):
+        data = self.get(endpoint)
+        return data if isinstance(data, list) else [data]
+
+
+def contents(path, text, sha):
+    return {"name": path.rsplit("/", 1)[-1], "path": path, "sha": sha, "type": "file",
+            "content": base64.b64encode(text.encode("utf-8")).decode("ascii")}
+
+
+def tree(*entries):
+    return {"tree": [{"path": path, "type": kind, "sha": sha} for path, kind, sha in entries]}
+
+
+@pytest.fixture
+def github():
+    """
+    Organization "acme" with two repositories:
+
+        api   production repo (.metadata on master, production branches
+              master and release), .github/CODEOWNERS, protected master,
+              an insecure webhook and one team
+        docs  public repo without .metadata or CODEOWNERS
+    """
+    api = {"name": "api", "full_name": "acme/api", "default_branch": "master",
+           "private": True, "archived": False, "visibility": "private"}
+    docs = {"name": "docs", "full_name": "acme/docs", "default_branch": "master",
+            "private": False, "archived": False, "visibility": "public"}
+    metadata = json.dumps({"production_code": "yes", "production_branches": ["master", "release"]})
+    return FakeGitHub({
+        "/orgs/acme": {"login": "acme", "default_repository_permission": "read",
+                       "members_can_create_repositories": False, "two_factor_requirement_enabled": True},
+        "/orgs/acme/hooks": [],
+        "/orgs/acme/members?role=admin&per_page=100": [{"login": "alice"}],
+        "/users/alice/events?per_page=10": [{"type": "PushEvent", "created_at": "2020-01-01T00:00:00Z"}],
+        "/orgs/acme/repos?per_page=100": [api, docs],
+        "/repos/acme/api": api,
+        "/repos/acme/docs": docs,
+        "/repos/acme/api/branches?per_page=100": [
+            {"name": "master", "protected": True, "commit": {"sha": "head1"}},
+            {"name": "release", "protected": False, "commit": {"sha": "head2"}},
+        ],
+        "/repos/acme/api/git/trees/head1": tree((".metadata", "blob", "meta1"), (".github", "tree", "gh1")),
+        "/repos/acme/api/git/trees/head2": tree((".metadata", "blob", "meta1")),
+        "/repos/acme/api/git/trees/gh1": tree(("CODEOWNERS", "blob", "owners1")),
+        "/repos/acme/api/contents/.metadata?ref=master": contents(".metadata", metadata, "meta1"),
+        "/repos/acme/api/contents/.github/CODEOWNERS?ref=master": contents(".github/CODEOWNERS", "* @acme/devs\n", "owners1"),
+        "/repos/acme/api/branches/master/protection": {
+            "required_pull_request_reviews": {"dismiss_stale_reviews": True, "require_code_owner_reviews": True,
+                                              "required_approving_review_count": 1},
+            "enforce_admins": {"enabled": True},
+        },
+        "/repos/acme/api/hooks": [{"id": 7, "config": {"url": "http://ci.example.com", "insecure_ssl": "1"}}],
+        "/repos/acme/api/collaborators?affiliation=outside&per_page=100": [],
+        "/repos/acme/api/collaborators?affiliation=direct&per_page=100": [],
+        "/repos/acme/api/teams?per_page=100": [{"slug": "devs", "name": "devs", "permission": "push"}],
+        "/repos/acme/docs/branches?per_page=100": [{"name": "master", "protected": False, "commit": {"sha": "head3"}}],
+        "/repos/acme/docs/git/trees/head3": tree(("README.md", "blob", "readme1")),
+        "/repos/acme/docs/hooks": [],
+        "/repos/acme/docs/collaborators?affiliation=outside&per_page=100": [{"login": "bob"}],
+        "/repos/acme/docs/collaborators?affiliation=direct&per_page=100": [],
+        "/repos/acme/docs/teams?per_page=100": [],
+    })
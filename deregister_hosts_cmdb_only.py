@@ -1,5 +1,5 @@
 from typing import List, Dict
-from common.cmdb_client import CMDBClient
+from common.cmdb_client import CMDBClient, CMDB_UPLOAD_WORKERS
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # CMDB graveyard API requires hostname + serial_number
@@ -64,9 +64,10 @@ def deregister_hosts_cmdb_only(data: List[Dict], user: str) -> dict:
     # 3. Prepare CMDB payload
     extracted_hosts = extract_hosts(data)
 
-    # 4. Graveyard hosts in CMDB
+    # 4. Graveyard hosts in CMDB. All workers draw from the client's shared
+    # rate limiter, so more workers don't mean more 429s
     batch_size = 25
-    max_workers = 2
+    max_workers = CMDB_UPLOAD_WORKERS
 
     try:
         cmdb_client = CMDBClient()
@@ -3,8 +3,6 @@ import requests
 import time
 import json
 from datetime import datetime, timedelta, timezone
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
 
 # =============================================================================
 # TEST MODE - Using sample data (comment this section and uncomment below for production)
@@ -31,11 +31,32 @@ HOW TO RUN:
     4. Run in ROLLBACK mode (revert to previous settings):
        python branch_compliance.py --rollback backup_2024-01-15_120000.json
     
-    5. Output files will be generated:
+    5. Or split APPLY into a reviewed PLAN and a later EXECUTE:
+       python branch_compliance.py --plan plan.json      # check + record writes
+       python branch_compliance.py --execute plan.json   # replay concurrently
+    
+    6. Or check several organizations concurrently (GITHUB_ORG not needed):
+       python branch_compliance.py --orgs org-a,org-b,org-c
+    
+    7. Or evaluate offline from an inventory snapshot (check only, no API
+       calls, see inventory_snapshot.py):
+       python branch_compliance.py --offline inventory_snapshot.db
+    
+    8. Any check can be limited to some rules (check only); data that no
+       selected rule reads is not fetched:
+       python branch_compliance.py --rules codeowners_existing
+    
+    9. Output files will be generated:
        - branch_compliance_report.json
        - branch_compliance_report.md
        - branch_compliance_report.xlsx
-       - backup_TIMESTAMP.json (when using --apply)
+       - backup_TIMESTAMP.json (when using --apply or --execute)
+       With --orgs: branch_compliance_report_<org>.* per organization
+       plus branch_compliance_report_combined.json
+       The formats are rendered in parallel worker processes; leave some
+       out with --skip-formats (e.g. --skip-formats excel,markdown).
+       With --history DB the rule outcomes are also recorded for run-to-run
+       deltas: python compliance_history.py delta --scope branch --org <org>
 
 RULES CHECKED (Reference: IBM Cloud Policy 3.4.1, 3.1.1, 3.1.2):
 
@@ -126,26 +147,23 @@ import os
 import sys
 import json
 import time
-import base64
 import argparse
 import requests
 import urllib3
 from datetime import datetime, timezone
 
+from remediation_plan import RemediationPlan, execute_plan, DEFAULT_WORKERS
+from multi_org import RateLimitedSession, parse_orgs, run_orgs, write_combined_report
+from rule_registry import Rule, RuleRegistry, RuleEngine, RuleInputs, parse_rule_names, json_default
+from report_renderer import render_reports, parse_formats
+from compliance_history import record_results
+from result_matrix import ResultMatrix
+from metadata_parser import parse_metadata_response
+from inventory_snapshot import open_offline_client, SnapshotError
+
 # Suppress SSL warnings when using verify=False
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# Excel support
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Border, Side
-
-# YAML support (optional)
-try:
-    import yaml
-    YAML_AVAILABLE = True
-except ImportError:
-    YAML_AVAILABLE = False
-
 
 # =============================================================================
 # CONFIGURATION
@@ -166,31 +184,58 @@ SLEEP_INTERVAL = 0.3
 class GitHubAPIClient:
     """Simple GitHub API client with authentication and pagination support."""
     
-    def __init__(self, base_url, token):
+    def __init__(self, base_url, token, session=None):
         self.base_url = base_url.rstrip("/")
         self.headers = {
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github.v3+json"
         }
+        # ETag of the last successful GET per endpoint (used as --plan preconditions)
+        self.etags = {}
+        # Shared RateLimitedSession in --orgs mode, plain requests otherwise
+        self.http = session or requests
     
     def get(self, endpoint, allow_404=False):
         """Make a GET request to the GitHub API."""
         url = f"{self.base_url}{endpoint}"
-        response = requests.get(url, headers=self.headers, verify=False)
+        response = self.http.get(url, headers=self.headers, verify=False)
         
         if response.status_code == 404 and allow_404:
             return None
         
         response.raise_for_status()
+        self.etags[endpoint] = response.headers.get("ETag")
         return response.json()
     
+    def get_conditional(self, endpoint, etag=None):
+        """
+        Make a conditional GET request (If-None-Match) to the GitHub API.
+        
+        Used by --execute to verify plan preconditions. A 304 response does
+        not count against the rate limit.
+        
+        Returns:
+            tuple: (status_code, JSON data or None for 304/404)
+        """
+        url = f"{self.base_url}{endpoint}"
+        headers = dict(self.headers)
+        if etag:
+            headers["If-None-Match"] = etag
+        response = self.http.get(url, headers=headers, verify=False)
+        
+        if response.status_code in (304, 404):
+            return response.status_code, None
+        
+        response.raise_for_status()
+        return response.status_code, response.json()
+    
     def paginate(self, endpoint):
         """Fetch all pages of a paginated API endpoint."""
         results = []
         url = f"{self.base_url}{endpoint}"
         
         while url:
-            response = requests.get(url, headers=self.headers, verify=False)
+            response = self.http.get(url, headers=self.headers, verify=False)
             response.raise_for_status()
             data = response.json()
             
@@ -224,7 +269,7 @@ class GitHubAPIClient:
             dict: Response JSON
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.put(url, headers=self.headers, json=data, verify=False)
+        response = self.http.put(url, headers=self.headers, json=data, verify=False)
         response.raise_for_status()
         return response.json()
     
@@ -241,7 +286,7 @@ class GitHubAPIClient:
             bool: True if successful
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.delete(url, headers=self.headers, verify=False)
+        response = self.http.delete(url, headers=self.headers, verify=False)
         response.raise_for_status()
         return True
     
@@ -256,7 +301,7 @@ class GitHubAPIClient:
             dict: Response JSON
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.post(url, headers=self.headers, verify=False)
+        response = self.http.post(url, headers=self.headers, verify=False)
         response.raise_for_status()
         return response.json()
 
@@ -298,21 +343,7 @@ class OrgQualificationChecker:
         if not response:
             return None
         try:
-            content = base64.b64decode(response.get("content", "")).decode("utf-8")
-            # Fix non-breaking spaces and smart quotes that break parsing
-            content = content.replace('\u00a0', ' ')
-            content = content.replace('\u201c', '"').replace('\u201d', '"')
-            content = content.replace('\u2018', "'").replace('\u2019', "'")
-            if YAML_AVAILABLE:
-                try:
-                    return yaml.safe_load(content)
-                except:
-                    pass
-            try:
-                return json.loads(content)
-            except:
-                pass
-            return None
+            return parse_metadata_response(response)
         except Exception:
             return None
     
@@ -418,11 +449,16 @@ class BranchComplianceChecker:
     Only checks repositories with production code.
     """
     
-    def __init__(self, api_client, org_name, target_repo=None):
+    def __init__(self, api_client, org_name, target_repo=None, rules=None):
         self.api = api_client
         self.org = org_name
         self.target_repo = target_repo
         self.results = []
+        # Protection settings seen during the check, keyed by (repo, branch).
+        # Reused by --plan so planning needs no extra API calls.
+        self.protections = {}
+        # Selected rules (all by default); only their inputs are fetched
+        self.engine = RuleEngine(BRANCH_RULES, rules)
         # Set of repos to skip status_check rule
         self.status_check_skip_repos = set([
             # Tornado repos
@@ -466,24 +502,7 @@ class BranchComplianceChecker:
             return None
         
         try:
-            content = base64.b64decode(response.get("content", "")).decode("utf-8")
-            # Fix non-breaking spaces and smart quotes that break parsing
-            content = content.replace('\u00a0', ' ')
-            content = content.replace('\u201c', '"').replace('\u201d', '"')
-            content = content.replace('\u2018', "'").replace('\u2019', "'")
-            
-            if YAML_AVAILABLE:
-                try:
-                    return yaml.safe_load(content)
-                except:
-                    pass
-            
-            try:
-                return json.loads(content)
-            except:
-                pass
-            
-            return None
+            return parse_metadata_response(response)
         except Exception:
             return None
     
@@ -576,6 +595,45 @@ class BranchComplianceChecker:
         time.sleep(SLEEP_INTERVAL)
         return protection
     
+    # =========================================================================
+    # RULE INPUTS (fetched only when a selected rule needs them)
+    # =========================================================================
+    
+    def load_protection(self, repo_name, branch):
+        """Fetch branch protection and keep it for --plan."""
+        protection = self.get_branch_protection(repo_name, branch)
+        self.protections[(repo_name, branch)] = protection
+        return protection
+    
+    def find_codeowners(self, repo_name, ref):
+        """
+        Return the location of the CODEOWNERS file on ref, or None.
+        
+        API Endpoints tried (in order, stopping at the first hit):
+        - GET /repos/{org}/{repo}/contents/CODEOWNERS?ref={ref}
+        - GET /repos/{org}/{repo}/contents/docs/CODEOWNERS?ref={ref}
+        - GET /repos/{org}/{repo}/contents/.github/CODEOWNERS?ref={ref}
+        """
+        locations = [
+            ("CODEOWNERS", f"/repos/{self.org}/{repo_name}/contents/CODEOWNERS?ref={ref}"),
+            ("docs/CODEOWNERS", f"/repos/{self.org}/{repo_name}/contents/docs/CODEOWNERS?ref={ref}"),
+            (".github/CODEOWNERS", f"/repos/{self.org}/{repo_name}/contents/.github/CODEOWNERS?ref={ref}"),
+        ]
+        
+        for loc_name, url in locations:
+            result = self.api.get(url, allow_404=True)
+            time.sleep(SLEEP_INTERVAL)
+            if result:
+                return loc_name
+        return None
+    
+    def repo_inputs(self, repo_name):
+        """Inputs shared by all branches of a repository (CODEOWNERS is looked up once)."""
+        return RuleInputs(
+            {"codeowners": lambda: self.find_codeowners(repo_name, "master")},
+            repo_name=repo_name
+        )
+    
     # =========================================================================
     # REQUIRED RULES
     # =========================================================================
@@ -892,44 +950,25 @@ class BranchComplianceChecker:
             )
         }
     
-    def check_codeowners_existing(self, repo_name, default_branch):
+    def check_codeowners_existing(self, found_location):
         """
         REQUIRED RULE: codeowners_existing
         
         HOW WE APPLY THIS RULE:
         -----------------------
-        1. Try to fetch CODEOWNERS from three locations:
+        1. Look for CODEOWNERS in three locations (find_codeowners, once
+           per repository and shared by all its branches):
            - /CODEOWNERS (root)
            - /docs/CODEOWNERS
            - /.github/CODEOWNERS
         2. If found in any location, rule passes
         3. If not found anywhere, rule fails
         
-        API Endpoints tried:
-        - GET /repos/{org}/{repo}/contents/CODEOWNERS?ref={branch}
-        - GET /repos/{org}/{repo}/contents/docs/CODEOWNERS?ref={branch}
-        - GET /repos/{org}/{repo}/contents/.github/CODEOWNERS?ref={branch}
-        
         Why this matters:
         - Required for "Require review from Code Owners" to work
         - Defines who is authorized to approve changes
         - Without CODEOWNERS, code owner review requirement is meaningless
         """
-        # Check all standard CODEOWNERS locations
-        locations = [
-            ("CODEOWNERS", f"/repos/{self.org}/{repo_name}/contents/CODEOWNERS?ref={default_branch}"),
-            ("docs/CODEOWNERS", f"/repos/{self.org}/{repo_name}/contents/docs/CODEOWNERS?ref={default_branch}"),
-            (".github/CODEOWNERS", f"/repos/{self.org}/{repo_name}/contents/.github/CODEOWNERS?ref={default_branch}"),
-        ]
-        
-        found_location = None
-        for loc_name, url in locations:
-            result = self.api.get(url, allow_404=True)
-            time.sleep(SLEEP_INTERVAL)
-            if result:
-                found_location = loc_name
-                break
-        
         passed = found_location is not None
         
         return {
@@ -1093,36 +1132,26 @@ class BranchComplianceChecker:
     # CHECK SINGLE BRANCH
     # =========================================================================
     
-    def check_branch(self, repo_name, branch_name, default_branch):
-        """
-        Run all compliance checks on a single branch.
-        
-        Returns dict with all rule results for this branch.
+    def check_branch(self, repo_name, branch_name, default_branch, repo_inputs=None):
         """
-        protection = self.get_branch_protection(repo_name, branch_name)
-        
-        rules = []
+        Run the selected compliance checks on a single branch.
         
-        # Required rules
-        rules.append(self.check_needed_protection(protection))
-        rules.append(self.check_required_pr_review(protection))
-        rules.append(self.check_approvers_count(protection))
-        rules.append(self.check_dismiss_stale(protection))
-        rules.append(self.check_code_owners_review(protection))
-        rules.append(self.check_require_last_push_approval(protection))
-        rules.append(self.check_not_bypass(protection))
-        rules.append(self.check_codeowners_existing(repo_name, "master"))
+        Args:
+            repo_inputs: RuleInputs shared by the branches of the repository
         
-        # Recommended rules
-        status_check_result = self.check_status_check(protection, repo_name=repo_name)
-        if status_check_result is not None:
-            rules.append(status_check_result)
-        rules.append(self.check_branch_uptodate(protection))
-        rules.append(self.check_conversation_resolution(protection))
+        Returns dict with all rule results for this branch. has_protection is
+        None when no selected rule needed the protection settings.
+        """
+        inputs = RuleInputs(
+            {"protection": lambda: self.load_protection(repo_name, branch_name)},
+            parent=repo_inputs or self.repo_inputs(repo_name),
+            repo_name=repo_name, branch=branch_name, default_branch=default_branch
+        )
+        rules = self.engine.evaluate(self, inputs)
         
         return {
             "branch": branch_name,
-            "has_protection": protection is not None,
+            "has_protection": (inputs["protection"] is not None) if inputs.loaded("protection") else None,
             "rules": rules
         }
     
@@ -1171,12 +1200,13 @@ class BranchComplianceChecker:
         print(f"      production_code: yes")
         print(f"      production_branches: {production_branches}")
         branch_results = []
+        repo_inputs = self.repo_inputs(repo_name)
         for branch in production_branches:
             branch = branch.strip()
             if not branch:
                 continue
             print(f"      Branch: {branch}")
-            result = self.check_branch(repo_name, branch, default_branch)
+            result = self.check_branch(repo_name, branch, default_branch, repo_inputs)
             branch_results.append(result)
         if not branch_results:
             print(f"      SKIP: No valid production branches to check")
@@ -1220,6 +1250,52 @@ class BranchComplianceChecker:
         return self.results
 
 
+# =============================================================================
+# RULE REGISTRY
+# =============================================================================
+# Each rule declares the inputs it reads; RuleEngine fetches only the inputs
+# of the selected rules (--rules). Order here is the order in the reports.
+
+BRANCH_RULES = RuleRegistry("branch", [
+    # Required
+    Rule("needed_protection", "Required", ["protection"],
+         lambda c, i: c.check_needed_protection(i["protection"]),
+         expected_value="Configured"),
+    Rule("required_pr_review", "Required", ["protection"],
+         lambda c, i: c.check_required_pr_review(i["protection"]),
+         expected_value="Enabled"),
+    Rule("approvers_count", "Required", ["protection"],
+         lambda c, i: c.check_approvers_count(i["protection"]),
+         expected_value=">= 1"),
+    Rule("dismiss_stale", "Required", ["protection"],
+         lambda c, i: c.check_dismiss_stale(i["protection"]),
+         expected_value="Enabled"),
+    Rule("code_owners_review", "Required", ["protection"],
+         lambda c, i: c.check_code_owners_review(i["protection"]),
+         expected_value="Enabled"),
+    Rule("require_last_push_approval", "Required", ["protection"],
+         lambda c, i: c.check_require_last_push_approval(i["protection"]),
+         expected_value="Enabled"),
+    Rule("not_bypass", "Required", ["protection"],
+         lambda c, i: c.check_not_bypass(i["protection"]),
+         expected_value="No bypass"),
+    Rule("codeowners_existing", "Required", ["codeowners"],
+         lambda c, i: c.check_codeowners_existing(i["codeowners"]),
+         expected_value="Exists in root, docs/, or .github/"),
+    # Recommended (status_check is skipped for repos in status_check_skip_repos)
+    Rule("status_check", "Recommended", ["repo_name", "protection"],
+         lambda c, i: None if i["repo_name"] in c.status_check_skip_repos
+         else c.check_status_check(i["protection"], repo_name=i["repo_name"]),
+         expected_value="At least 1 check"),
+    Rule("branch_uptodate", "Recommended", ["protection"],
+         lambda c, i: c.check_branch_uptodate(i["protection"]),
+         expected_value="Enabled"),
+    Rule("conversation_resolution", "Recommended", ["protection"],
+         lambda c, i: c.check_conversation_resolution(i["protection"]),
+         expected_value="Enabled"),
+])
+
+
 # =============================================================================
 # REPORT GENERATOR
 # =============================================================================
@@ -1231,26 +1307,20 @@ class ReportGenerator:
     
     def __init__(self, org_name, results):
         self.org = org_name
+        # Columnar results (see result_matrix.py); expanded back to dicts
+        # only for the JSON report
+        if not isinstance(results, ResultMatrix):
+            results = ResultMatrix.from_results("branch", results)
         self.results = results
         self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     def _calculate_summary(self):
         """Calculate summary statistics."""
-        total_repos = len(self.results)
-        total_branches = sum(len(r["branches"]) for r in self.results)
-        
-        total_rules = 0
-        passed_rules = 0
-        required_failed = 0
-        
-        for repo in self.results:
-            for branch in repo["branches"]:
-                for rule in branch["rules"]:
-                    total_rules += 1
-                    if rule["passed"]:
-                        passed_rules += 1
-                    elif rule["enforcement"] == "Required":
-                        required_failed += 1
+        total_repos = len(self.results.groups)
+        total_branches = len(self.results.rows)
+        total_rules = len(self.results)
+        passed_rules = self.results.count(passed=True)
+        required_failed = self.results.count(passed=False, enforcement="Required")
         
         return {
             "total_repositories": total_repos,
@@ -1275,11 +1345,11 @@ class ReportGenerator:
                 "branches_field": "production_branches"
             },
             "summary": summary,
-            "repositories": self.results
+            "repositories": self.results.to_results()
         }
         
         with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(report, f, indent=2, default=str)
+            json.dump(report, f, indent=2, default=json_default)
         
         print(f"  JSON report saved: {filepath}")
         return filepath
@@ -1316,7 +1386,10 @@ class ReportGenerator:
             ""
         ]
         
-        for repo in self.results:
+        matrix = self.results
+        failed_counts = matrix.row_counts(passed=False)
+        req_failed_counts = matrix.row_counts(passed=False, enforcement="Required")
+        for repo, rows in zip(matrix.groups, matrix.group_rows()):
             prod_branches = repo.get('production_branches', [])
             lines.append(f"### {repo['repository']}")
             lines.append("")
@@ -1324,18 +1397,21 @@ class ReportGenerator:
             lines.append(f"- **production_branches:** {prod_branches}")
             lines.append(f"- **Default branch:** `{repo['default_branch']}`")
             
-            for branch_result in repo["branches"]:
+            for row in rows:
+                branch_result = matrix.rows[row]
                 branch = branch_result["branch"]
-                rules = branch_result["rules"]
-                passed = sum(1 for r in rules if r["passed"])
-                failed = len(rules) - passed
-                req_failed = sum(1 for r in rules if not r["passed"] and r["enforcement"] == "Required")
+                total = matrix.offsets[row + 1] - matrix.offsets[row]
+                failed = failed_counts[row]
+                passed = total - failed
+                req_failed = req_failed_counts[row]
                 
                 status = "✅" if req_failed == 0 else "❌"
                 lines.append(f"#### {status} Branch: `{branch}`")
                 lines.append("")
-                lines.append(f"- Protection configured: {'Yes' if branch_result['has_protection'] else 'No'}")
-                lines.append(f"- Rules: {passed}/{len(rules)} passed")
+                has_protection = branch_result["has_protection"]
+                protection_label = "Not checked" if has_protection is None else ("Yes" if has_protection else "No")
+                lines.append(f"- Protection configured: {protection_label}")
+                lines.append(f"- Rules: {passed}/{total} passed")
                 lines.append("")
                 
                 if failed > 0:
@@ -1343,9 +1419,9 @@ class ReportGenerator:
                     lines.append("")
                     lines.append("| Rule | Enforcement | Current | Expected |")
                     lines.append("|------|-------------|---------|----------|")
-                    for rule in rules:
-                        if not rule["passed"]:
-                            lines.append(f"| {rule['rule']} | {rule['enforcement']} | {rule['current_value']} | {rule['expected_value']} |")
+                    for i in matrix.cells(row, passed=False):
+                        rule = matrix.result(i)
+                        lines.append(f"| {rule['rule']} | {rule['enforcement']} | {rule['current_value']} | {rule['expected_value']} |")
                     lines.append("")
         
         with open(filepath, "w", encoding="utf-8") as f:
@@ -1356,6 +1432,10 @@ class ReportGenerator:
     
     def generate_excel_report(self, filepath="branch_compliance_report.xlsx"):
         """Generate Excel report."""
+        # Imported on first use: runs that write no Excel report never load openpyxl
+        import openpyxl
+        from openpyxl.styles import Font, PatternFill, Border, Side
+        
         wb = openpyxl.Workbook()
         
         # Styles
@@ -1413,12 +1493,13 @@ class ReportGenerator:
             cell.border = thin_border
         
         row_idx = 2
-        for repo in self.results:
+        matrix = self.results
+        for repo, rows in zip(matrix.groups, matrix.group_rows()):
             repo_name = repo["repository"]
             prod_branches = ", ".join(repo.get("production_branches", []))
-            for branch_result in repo["branches"]:
-                branch_name = branch_result["branch"]
-                for rule in branch_result["rules"]:
+            for row in rows:
+                branch_name = matrix.rows[row]["branch"]
+                for rule in map(matrix.result, matrix.cells(row)):
                     values = [
                         repo_name,
                         prod_branches,
@@ -1453,16 +1534,40 @@ class ReportGenerator:
         ws2.column_dimensions['H'].width = 25  # Expected Value
         ws2.column_dimensions['I'].width = 60  # Reason
         
+        # By Rule Sheet: pass/fail counts per rule across branches
+        ws3 = wb.create_sheet("By Rule")
+        for col, header in enumerate(["Rule", "Passed", "Failed"], 1):
+            cell = ws3.cell(row=1, column=col, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.border = thin_border
+        for row_idx, (rule, counts) in enumerate(matrix.rule_counts().items(), 2):
+            for col_idx, value in enumerate([rule, counts["passed"], counts["failed"] + counts["info"]], 1):
+                ws3.cell(row=row_idx, column=col_idx, value=value).border = thin_border
+        ws3.column_dimensions['A'].width = 30
+        
         wb.save(filepath)
         print(f"  Excel report saved: {filepath}")
         return filepath
     
-    def generate_all_reports(self):
-        """Generate all report formats."""
+    def generate_all_reports(self, suffix="", skip=None):
+        """
+        Generate all report formats, each in its own worker process
+        (see report_renderer.py).
+        
+        Args:
+            suffix: Appended to the file names (e.g. "_my-org" in --orgs mode)
+            skip: Formats not to generate (--skip-formats)
+        
+        Returns:
+            dict: Report paths keyed by format
+        """
         print("\nGenerating Reports...")
-        self.generate_json_report()
-        self.generate_markdown_report()
-        self.generate_excel_report()
+        return render_reports(self, {
+            "json": f"branch_compliance_report{suffix}.json",
+            "markdown": f"branch_compliance_report{suffix}.md",
+            "excel": f"branch_compliance_report{suffix}.xlsx"
+        }, skip=skip)
 
 
 # =============================================================================
@@ -1633,7 +1738,7 @@ class BranchProtectionApplier:
                 })
         
         with open(backup_file, "w", encoding="utf-8") as f:
-            json.dump(backup_data, f, indent=2, default=str)
+            json.dump(backup_data, f, indent=2, default=json_default)
         
         print(f"    Backup saved: {backup_file}")
         print(f"    Backed up {len(backup_data['branches'])} branch configurations")
@@ -1691,6 +1796,102 @@ class BranchProtectionApplier:
                 "error": str(e)
             }
     
+    def find_non_compliant(self, checker_results):
+        """
+        Identify branches whose failed rules can be fixed by applying protection.
+        
+        A branch qualifies if any REQUIRED rule failed, or one of the
+        settings-based RECOMMENDED rules that need no external CI/CD setup.
+        status_check is excluded because it needs an actual CI pipeline.
+        
+        Args:
+            checker_results: Results from BranchComplianceChecker.run_all_checks()
+        
+        Returns:
+            list: Non-compliant branch dicts with their fixable failed rules
+        """
+        applyable_recommended = {"conversation_resolution", "branch_uptodate"}
+        non_compliant = []
+        
+        for repo_result in checker_results:
+            repo_name = repo_result["repository"]
+            default_branch = repo_result.get("default_branch", "master")
+            
+            for branch_result in repo_result["branches"]:
+                failed_rules = [
+                    rule["rule"] for rule in branch_result["rules"]
+                    if not rule["passed"] and (
+                        rule["enforcement"] == "Required"
+                        or rule["rule"] in applyable_recommended
+                    )
+                ]
+                
+                if failed_rules:
+                    non_compliant.append({
+                        "repository": repo_name,
+                        "branch": branch_result["branch"],
+                        "default_branch": default_branch,
+                        "has_protection": branch_result["has_protection"],
+                        "has_codeowners": any(
+                            rule["rule"] == "codeowners_existing" and rule["passed"]
+                            for rule in branch_result["rules"]
+                        ),
+                        "failed_rules": failed_rules
+                    })
+        
+        return non_compliant
+    
+    def build_plan(self, checker_results, protections):
+        """
+        Record the writes apply_all would make, without making any API calls.
+        
+        Everything comes from the check: existing protection settings (for the
+        payload and the backup), the protection endpoint's ETag (precondition),
+        and the codeowners_existing result (for require_code_owner_reviews).
+        
+        Args:
+            checker_results: Results from BranchComplianceChecker.run_all_checks()
+            protections: BranchComplianceChecker.protections
+        
+        Returns:
+            RemediationPlan: Plan ready to be saved and reviewed
+        """
+        backup = {"branches": []}
+        for repo_result in checker_results:
+            for branch_result in repo_result["branches"]:
+                protection = protections.get((repo_result["repository"], branch_result["branch"]))
+                backup["branches"].append({
+                    "repository": repo_result["repository"],
+                    "branch": branch_result["branch"],
+                    "had_protection": protection is not None,
+                    "protection_settings": protection
+                })
+        
+        plan = RemediationPlan("branch_compliance", self.org, "backup", "branch", backup)
+        
+        for item in self.find_non_compliant(checker_results):
+            repo_name = item["repository"]
+            branch_name = item["branch"]
+            existing = protections.get((repo_name, branch_name))
+            endpoint = f"/repos/{self.org}/{repo_name}/branches/{branch_name}/protection"
+            
+            if existing is None:
+                precondition = {"endpoint": endpoint, "absent": True}
+            else:
+                precondition = {"endpoint": endpoint, "etag": self.api.etags.get(endpoint)}
+            
+            plan.add(
+                "PUT", endpoint,
+                payload=self.get_compliant_protection_payload(existing, has_codeowners=item["has_codeowners"]),
+                precondition=precondition,
+                repository=repo_name,
+                branch=branch_name,
+                rules=item["failed_rules"],
+                description=f"Apply compliant protection to {branch_name} (code_owner_reviews={item['has_codeowners']})"
+            )
+        
+        return plan
+    
     def apply_all(self, checker_results):
         """
         Apply compliant settings to all non-compliant branches.
@@ -1719,46 +1920,7 @@ class BranchProtectionApplier:
         
         # Step 2: Find non-compliant branches
         print("\n  Identifying non-compliant branches...")
-        non_compliant = []
-        
-        for repo_result in checker_results:
-            repo_name = repo_result["repository"]
-            default_branch = repo_result.get("default_branch", "master")
-            
-            for branch_result in repo_result["branches"]:
-                branch_name = branch_result["branch"]
-                
-                # Check if any REQUIRED rules failed
-                required_failed = any(
-                    not rule["passed"] and rule["enforcement"] == "Required"
-                    for rule in branch_result["rules"]
-                )
-                
-                # Also check settings-based Recommended rules that can be
-                # applied without external CI/CD setup.
-                # status_check is excluded because it needs an actual CI pipeline.
-                applyable_recommended = {"conversation_resolution", "branch_uptodate"}
-                recommended_failed = any(
-                    not rule["passed"]
-                    and rule["enforcement"] == "Recommended"
-                    and rule["rule"] in applyable_recommended
-                    for rule in branch_result["rules"]
-                )
-                
-                if required_failed or recommended_failed:
-                    non_compliant.append({
-                        "repository": repo_name,
-                        "branch": branch_name,
-                        "default_branch": default_branch,
-                        "has_protection": branch_result["has_protection"],
-                        "failed_rules": [
-                            rule["rule"] for rule in branch_result["rules"]
-                            if not rule["passed"] and (
-                                rule["enforcement"] == "Required"
-                                or rule["rule"] in applyable_recommended
-                            )
-                        ]
-                    })
+        non_compliant = self.find_non_compliant(checker_results)
         
         print(f"    Found {len(non_compliant)} non-compliant branches")
         
@@ -1981,6 +2143,10 @@ Examples:
   %(prog)s --repo my-repo --apply --dry-run   Test apply on one repo first
   %(prog)s --rollback backup.json  Restore settings from backup file
   %(prog)s --qualification-only   Only check if org requires compliance
+  %(prog)s --plan plan.json       Check and save intended changes for review
+  %(prog)s --execute plan.json    Apply a reviewed plan (e.g. in a change window)
+  %(prog)s --rules not_bypass     Check only the listed rules
+  %(prog)s --orgs org-a,org-b     Check several organizations concurrently
 
 Organization Qualification:
   Compliance checks only apply to organizations that contain at least
@@ -2006,11 +2172,63 @@ Organization Qualification:
         metavar="BACKUP_FILE",
         help="Rollback to settings from backup file"
     )
+    mode_group.add_argument(
+        "--plan",
+        metavar="PLAN_FILE",
+        help="Check compliance and record the writes --apply would make, without applying"
+    )
+    mode_group.add_argument(
+        "--execute",
+        metavar="PLAN_FILE",
+        help="Replay a plan file concurrently, skipping resources changed since planning"
+    )
     
     parser.add_argument(
         "--dry-run", "-n",
         action="store_true",
-        help="Preview changes without applying (use with --apply)"
+        help="Preview changes without applying (use with --apply or --execute)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent workers for --execute, or organizations at a time for --orgs (default: {DEFAULT_WORKERS})"
+    )
+    
+    parser.add_argument(
+        "--orgs",
+        type=parse_orgs,
+        metavar="ORG1,ORG2,...",
+        help="Check several organizations concurrently over one shared API client (check mode only)"
+    )
+    
+    parser.add_argument(
+        "--offline",
+        metavar="SNAPSHOT",
+        help="Evaluate rules against an inventory snapshot instead of the API (check mode only)"
+    )
+    
+    parser.add_argument(
+        "--skip-formats",
+        type=parse_formats,
+        default=[],
+        metavar="FORMAT,...",
+        help="Report formats not to generate: json, markdown, excel (e.g. --skip-formats excel)"
+    )
+    
+    parser.add_argument(
+        "--history",
+        metavar="DB",
+        help="Also record rule outcomes in this compliance history (see compliance_history.py)"
+    )
+    
+    parser.add_argument(
+        "--rules",
+        type=parse_rule_names,
+        metavar="RULE1,RULE2,...",
+        help=f"Only evaluate these rules and fetch only the data they read (check mode only). "
+             f"Available: {', '.join(BRANCH_RULES.names())}"
     )
     
     parser.add_argument(
@@ -2034,12 +2252,89 @@ Organization Qualification:
     return parser.parse_args()
 
 
+# =============================================================================
+# MULTI-ORGANIZATION MODE
+# =============================================================================
+
+def check_org(api_client, org_name, args):
+    """
+    Run qualification and compliance checks for one organization (--orgs mode).
+    
+    Writes the per-org reports and returns where they are, or why the
+    organization was skipped, for the combined report.
+    """
+    if not args.skip_qualification:
+        qual_result = OrgQualificationChecker(api_client, org_name).check_qualification()
+        if args.qualification_only:
+            return {"qualification": qual_result, "skipped_reason": "Qualification only"}
+        if not qual_result["qualified"]:
+            return {"qualification": qual_result,
+                    "skipped_reason": "Organization does not require compliance checks"}
+    
+    checker = BranchComplianceChecker(api_client, org_name, target_repo=args.repo, rules=args.rules)
+    results = checker.run_all_checks()
+    if not results:
+        return {"skipped_reason": "No repositories with production branches found"}
+    
+    report_gen = ReportGenerator(org_name, results)
+    reports = report_gen.generate_all_reports(suffix=f"_{org_name}", skip=args.skip_formats)
+    if args.history:
+        record_results(args.history, "branch", org_name, results,
+                       generated_at=report_gen.timestamp, complete=not (args.rules or args.repo))
+    return {"json_report": reports["json"]}
+
+
+def run_multi_org(args):
+    """Check several organizations concurrently over one shared client (--orgs)."""
+    if args.apply or args.rollback or args.plan or args.execute:
+        print("ERROR: --orgs only supports check mode. Remediate one organization at a time.")
+        sys.exit(1)
+    if "json" in args.skip_formats:
+        print("ERROR: --orgs needs the JSON reports to build the combined report.")
+        sys.exit(1)
+    
+    print(f"  Organizations: {', '.join(args.orgs)}")
+    print(f"  Mode: CHECK (report only, {args.workers} organizations at a time)")
+    
+    # One client and session: shared connection pool and rate-limit budget
+    api_client = create_api_client(args, session=RateLimitedSession())
+    outcomes = run_orgs(args.orgs, lambda org: check_org(api_client, org, args), max_workers=args.workers)
+    
+    print("\nGenerating Combined Report...")
+    combined = write_combined_report("Branch Protection Compliance", outcomes, "branch_compliance_report_combined.json")
+    
+    print("\n" + "=" * 60)
+    print("MULTI-ORGANIZATION SUMMARY")
+    print("=" * 60)
+    for org, outcome in outcomes.items():
+        summary = combined["summary"].get(org) or {}
+        if "error" in outcome:
+            print(f"  {org}: ERROR ({outcome['error']})")
+        elif "skipped_reason" in summary:
+            print(f"  {org}: SKIPPED ({summary['skipped_reason']})")
+        else:
+            print(f"  {org}: {summary['total_branches']} branch(es) checked, {summary['required_failed']} required rule(s) failed")
+    print("\n" + "=" * 60)
+
+
 # =============================================================================
 # MAIN ENTRY POINT
 # =============================================================================
 
+def create_api_client(args, session=None):
+    """GitHub API client, or a snapshot-backed one that makes no calls with --offline."""
+    if args.offline:
+        try:
+            return open_offline_client(args.offline)
+        except SnapshotError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+    return GitHubAPIClient(GITHUB_BASE, GITHUB_TOKEN, session=session)
+
+
 def main():
     """Main entry point."""
+    global SLEEP_INTERVAL
     args = parse_arguments()
     
     print("\n" + "=" * 60)
@@ -2047,21 +2342,44 @@ def main():
     print("=" * 60)
     
     # Validate configuration
-    if not GITHUB_TOKEN:
+    if args.offline:
+        if args.apply or args.rollback or args.plan or args.execute:
+            print("ERROR: --offline only supports check mode. Remediation needs the live API.")
+            sys.exit(1)
+        # No API calls are made, so there is nothing to pace
+        SLEEP_INTERVAL = 0
+    elif not GITHUB_TOKEN:
         print("ERROR: GITHUB_TOKEN environment variable is not set.")
         sys.exit(1)
+    
+    if args.rules:
+        if args.apply or args.rollback or args.plan or args.execute:
+            print("ERROR: --rules only supports check mode. Remediation needs every rule's result.")
+            sys.exit(1)
+        try:
+            BRANCH_RULES.select(args.rules)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+    
+    if args.orgs:
+        print(f"\nConfiguration:")
+        print(f"  Snapshot: {args.offline} (offline)" if args.offline else f"  API Base URL: {GITHUB_BASE}")
+        run_multi_org(args)
+        return
+    
     if not GITHUB_ORG:
         print("ERROR: GITHUB_ORG environment variable is not set.")
         sys.exit(1)
     
     print(f"\nConfiguration:")
     print(f"  Organization: {GITHUB_ORG}")
-    print(f"  API Base URL: {GITHUB_BASE}")
+    print(f"  Snapshot: {args.offline} (offline)" if args.offline else f"  API Base URL: {GITHUB_BASE}")
     if args.repo:
         print(f"  Target Repo: {args.repo}")
     
     # Initialize API client
-    api_client = GitHubAPIClient(GITHUB_BASE, GITHUB_TOKEN)
+    api_client = create_api_client(args)
     
     # Handle ROLLBACK mode
     if args.rollback:
@@ -2070,6 +2388,14 @@ def main():
         print("\n" + "=" * 60)
         return
     
+    # Handle EXECUTE mode (no checks - the plan already holds everything)
+    if args.execute:
+        print(f"  Mode: EXECUTE {args.execute} {'(DRY RUN)' if args.dry_run else ''}")
+        execute_plan(api_client, args.execute, org_name=GITHUB_ORG,
+                     max_workers=args.workers, dry_run=args.dry_run)
+        print("\n" + "=" * 60)
+        return
+    
     # =========================================================================
     # STEP 1: QUALIFICATION CHECK
     # =========================================================================
@@ -2094,7 +2420,7 @@ def main():
                 "timestamp": datetime.now().isoformat(),
                 "organization": GITHUB_ORG,
                 "qualification": qual_result
-            }, f, indent=2, default=str)
+            }, f, indent=2, default=json_default)
         print(f"\n  Qualification report saved: {qual_report_file}")
         
         if args.qualification_only:
@@ -2116,14 +2442,16 @@ def main():
     # STEP 2: COMPLIANCE CHECKS
     # =========================================================================
     
-    # Handle CHECK and APPLY modes (both need to run checks first)
+    # Handle CHECK, APPLY and PLAN modes (all need to run checks first)
     if args.apply:
         print(f"  Mode: APPLY {'(DRY RUN)' if args.dry_run else ''}")
+    elif args.plan:
+        print(f"  Mode: PLAN to {args.plan}")
     else:
         print(f"  Mode: CHECK (report only)")
     
     # Initialize checker and run checks
-    checker = BranchComplianceChecker(api_client, GITHUB_ORG, target_repo=args.repo)
+    checker = BranchComplianceChecker(api_client, GITHUB_ORG, target_repo=args.repo, rules=args.rules)
     results = checker.run_all_checks()
     
     if not results:
@@ -2133,7 +2461,10 @@ def main():
     
     # Generate reports
     report_gen = ReportGenerator(GITHUB_ORG, results)
-    report_gen.generate_all_reports()
+    report_gen.generate_all_reports(skip=args.skip_formats)
+    if args.history:
+        record_results(args.history, "branch", GITHUB_ORG, results,
+                       generated_at=report_gen.timestamp, complete=not (args.rules or args.repo))
     
     # Print summary
     summary = report_gen._calculate_summary()
@@ -2171,9 +2502,19 @@ def main():
                     "summary": apply_result,
                     "changes": applier.changes_made,
                     "errors": applier.errors
-                }, f, indent=2, default=str)
+                }, f, indent=2, default=json_default)
             print(f"\n  Apply log saved: {apply_log_file}")
     
+    # Handle PLAN mode
+    if args.plan:
+        applier = BranchProtectionApplier(api_client, GITHUB_ORG)
+        plan = applier.build_plan(results, checker.protections)
+        print("\n" + "=" * 60)
+        print("REMEDIATION PLAN")
+        print("=" * 60)
+        plan.save(args.plan)
+        print(f"  Review it, then run: --execute {args.plan}")
+    
     print("\n" + "=" * 60)
 
 
@@ -0,0 +1,550 @@
+"""
+================================================================================
+COMPLIANCE HISTORY
+================================================================================
+
+Append-only SQLite history of rule outcomes, so "what regressed since
+yesterday" is one query instead of a hand diff of two report files.
+
+Runs of org_compliance.py, repo_compliance.py and branch_compliance.py are
+recorded with --history DB, or afterwards from their JSON reports (including
+the --orgs combined report) with the record command below.
+
+WHAT IS STORED:
+---------------
+    runs      One row per recorded run: scope (organization, repository or
+              branch), organization, when it was generated, and counts
+    subjects  Interned (scope, org, repo, branch) - "" for org-level rules
+    rules     Interned (scope, rule, enforcement)
+    changes   One row per CHANGE of a (subject, rule) outcome, keyed by the
+              run that saw it: passed 1/0, or NULL once a complete run no
+              longer evaluates it (repo archived, branch dropped, ...)
+    current   Latest outcome per (subject, rule); derived from changes and
+              maintained with them
+
+Unchanged outcomes are not stored again, so months of daily runs cost about
+as much as the outcomes that actually changed. The outcome of a rule at run R
+is its latest change at or before R.
+
+DELTA:
+------
+    Only (subject, rule) pairs with a change between the two runs are looked
+    at - an indexed range scan of changes by run - and for each the outcome at
+    both runs is read from the primary key. Results:
+      newly failing   failed at the later run, passed (or was not evaluated)
+                      at the earlier one
+      newly passing   passed at the later run, failed at the earlier one
+      removed         evaluated at the earlier run, not at the later one
+
+HOW TO RUN:
+    1. Record runs:
+       python branch_compliance.py --history compliance_history.db
+       python compliance_history.py record branch_compliance_report.json
+
+    2. List recorded runs:
+       python compliance_history.py runs --org tornado
+
+    3. What changed between the last two runs (or any two):
+       python compliance_history.py delta --scope branch --org tornado
+       python compliance_history.py delta --scope branch --org tornado --from 12 --to 40
+       python compliance_history.py delta --scope repository --org tornado --since 2026-01-01
+================================================================================
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_DB = "compliance_history.db"
+SCHEMA_VERSION = 1
+
+# Report type (JSON "report_type") -> rule scope (RuleRegistry.scope)
+REPORT_SCOPES = {
+    "Organization Compliance": "organization",
+    "Repository Compliance": "repository",
+    "Branch Protection Compliance": "branch",
+}
+SCOPES = list(REPORT_SCOPES.values())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history_info (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id       INTEGER PRIMARY KEY,
+    scope        TEXT NOT NULL,
+    org          TEXT NOT NULL,
+    generated_at TEXT NOT NULL,
+    recorded_at  TEXT NOT NULL,
+    complete     INTEGER NOT NULL,
+    outcomes     INTEGER NOT NULL,
+    failed       INTEGER NOT NULL,
+    changes      INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_scope_org ON runs (scope, org, run_id);
+CREATE INDEX IF NOT EXISTS runs_generated ON runs (scope, org, generated_at);
+CREATE TABLE IF NOT EXISTS subjects (
+    subject_id INTEGER PRIMARY KEY,
+    scope      TEXT NOT NULL,
+    org        TEXT NOT NULL,
+    repo       TEXT NOT NULL,
+    branch     TEXT NOT NULL,
+    UNIQUE (scope, org, repo, branch)
+);
+CREATE TABLE IF NOT EXISTS rules (
+    rule_id     INTEGER PRIMARY KEY,
+    scope       TEXT NOT NULL,
+    rule        TEXT NOT NULL,
+    enforcement TEXT,
+    UNIQUE (scope, rule)
+);
+CREATE TABLE IF NOT EXISTS changes (
+    subject_id INTEGER NOT NULL,
+    rule_id    INTEGER NOT NULL,
+    run_id     INTEGER NOT NULL,
+    passed     INTEGER,
+    PRIMARY KEY (subject_id, rule_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS changes_run ON changes (run_id);
+CREATE TABLE IF NOT EXISTS current (
+    subject_id INTEGER NOT NULL,
+    rule_id    INTEGER NOT NULL,
+    passed     INTEGER,
+    since_run  INTEGER NOT NULL,
+    PRIMARY KEY (subject_id, rule_id)
+) WITHOUT ROWID;
+"""
+
+
+class HistoryError(Exception):
+    """A run or report cannot be recorded or compared."""
+
+
+# =============================================================================
+# OUTCOMES
+# =============================================================================
+
+def iter_outcomes(scope, results):
+    """
+    Flatten checker results to (repo, branch, rule, enforcement, passed).
+
+    Args:
+        scope: "organization", "repository" or "branch"
+        results: The checker's run_all_checks() result (the report's
+                 "results"/"repositories" list)
+    """
+    if scope == "organization":
+        for rule in results:
+            yield "", "", rule["rule"], rule.get("enforcement"), bool(rule["passed"])
+    elif scope == "repository":
+        for repo in results:
+            for rule in repo["rules"]:
+                yield repo["repository"], "", rule["rule"], rule.get("enforcement"), bool(rule["passed"])
+    elif scope == "branch":
+        for repo in results:
+            for branch in repo["branches"]:
+                for rule in branch["rules"]:
+                    yield (repo["repository"], branch["branch"], rule["rule"],
+                           rule.get("enforcement"), bool(rule["passed"]))
+    else:
+        raise HistoryError(f"unknown scope '{scope}' (choose from {', '.join(SCOPES)})")
+
+
+def report_runs(report):
+    """
+    (scope, org, generated_at, results) for each organization in a JSON
+    report, or in each per-org report of an --orgs combined report.
+    """
+    if "reports" in report:
+        for org_report in report["reports"].values():
+            yield from report_runs(org_report)
+        return
+    scope = REPORT_SCOPES.get(report.get("report_type"))
+    if scope is None:
+        raise HistoryError(f"not a compliance report: report_type={report.get('report_type')!r}")
+    results = report["results"] if scope == "organization" else report["repositories"]
+    yield scope, report["organization"], report["generated_at"], results
+
+
+# =============================================================================
+# HISTORY STORE
+# =============================================================================
+
+class ComplianceHistory:
+    """
+    SQLite history of rule outcomes.
+
+    Rows are only ever added to runs and changes; current is a derived cache
+    of the latest change per (subject, rule). Safe to share between threads
+    (--orgs records several organizations concurrently).
+    """
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._lock = threading.RLock()
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO history_info (key, value) VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),)
+            )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def _rows(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _row(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    # -------------------------------------------------------------------------
+    # Recording
+    # -------------------------------------------------------------------------
+
+    def _ids(self, table, key_columns, keys, extra=None):
+        """Intern keys in subjects/rules; returns {key tuple: id}."""
+        id_column = "subject_id" if table == "subjects" else "rule_id"
+        columns = key_columns + (list(extra) if extra else [])
+        for key in keys:
+            values = key + (tuple(extra[k] for k in extra) if extra else ())
+            self.conn.execute(
+                f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})", values
+            )
+        ids = {}
+        where = " AND ".join(f"{c} = ?" for c in key_columns)
+        for key in keys:
+            ids[key] = self.conn.execute(f"SELECT {id_column} FROM {table} WHERE {where}", key).fetchone()[0]
+        return ids
+
+    def record(self, scope, org, results, generated_at=None, complete=True):
+        """
+        Append one run.
+
+        Args:
+            scope: "organization", "repository" or "branch"
+            org: Organization name
+            results: Checker results (see iter_outcomes)
+            generated_at: Report timestamp (default: now)
+            complete: The run checked every repository/branch. Outcomes it
+                      did not report are then recorded as no longer
+                      evaluated - but only for rules it evaluated at all, so
+                      a --rules run never drops the other rules.
+
+        Returns:
+            dict: {"run_id", "outcomes", "failed", "changes"}
+        """
+        outcomes = list(iter_outcomes(scope, results))
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        generated_at = generated_at or now
+
+        with self._lock, self.conn:
+            # Intern subjects and rules first (rules keep their latest enforcement)
+            subject_ids = self._ids(
+                "subjects", ["scope", "org", "repo", "branch"],
+                list(dict.fromkeys((scope, org, repo, branch) for repo, branch, _, _, _ in outcomes))
+            )
+            enforcement = {rule: enf for _, _, rule, enf, _ in outcomes}
+            rule_ids = self._ids("rules", ["scope", "rule"], [(scope, rule) for rule in enforcement])
+            self.conn.executemany(
+                "UPDATE rules SET enforcement = ? WHERE scope = ? AND rule = ?",
+                [(enf, scope, rule) for rule, enf in enforcement.items()]
+            )
+
+            current = {
+                (subject_id, rule_id): passed
+                for subject_id, rule_id, passed in self.conn.execute(
+                    "SELECT c.subject_id, c.rule_id, c.passed FROM current c "
+                    "JOIN subjects s ON s.subject_id = c.subject_id "
+                    "WHERE s.scope = ? AND s.org = ?", (scope, org)
+                )
+            }
+
+            run_id = self.conn.execute(
+                "INSERT INTO runs (scope, org, generated_at, recorded_at, complete, outcomes, failed, changes) "
+                "VALUES (?, ?, ?, ?, ?, 0, 0, 0)",
+                (scope, org, generated_at, now, int(bool(complete)))
+            ).lastrowid
+
+            changes = []
+            seen = set()
+            failed = 0
+            for repo, branch, rule, _, passed in outcomes:
+                key = (subject_ids[(scope, org, repo, branch)], rule_ids[(scope, rule)])
+                seen.add(key)
+                passed = int(passed)
+                failed += not passed
+                if current.get(key, -1) != passed:
+                    changes.append(key + (run_id, passed))
+
+            if complete:
+                evaluated_rules = set(rule_ids.values())
+                for key, passed in current.items():
+                    if passed is not None and key not in seen and key[1] in evaluated_rules:
+                        changes.append(key + (run_id, None))
+
+            self.conn.executemany(
+                "INSERT INTO changes (subject_id, rule_id, run_id, passed) VALUES (?, ?, ?, ?)", changes
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO current (subject_id, rule_id, passed, since_run) VALUES (?, ?, ?, ?)",
+                [(s, r, passed, run) for s, r, run, passed in changes]
+            )
+            self.conn.execute(
+                "UPDATE runs SET outcomes = ?, failed = ?, changes = ? WHERE run_id = ?",
+                (len(outcomes), failed, len(changes), run_id)
+            )
+
+        return {"run_id": run_id, "outcomes": len(outcomes), "failed": failed, "changes": len(changes)}
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+
+    def runs(self, scope=None, org=None, limit=None):
+        """Recorded runs, newest first, as dicts."""
+        sql = "SELECT run_id, scope, org, generated_at, complete, outcomes, failed, changes FROM runs"
+        where, params = [], []
+        if scope:
+            where.append("scope = ?")
+            params.append(scope)
+        if org:
+            where.append("org = ?")
+            params.append(org)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY run_id DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        columns = ["run_id", "scope", "org", "generated_at", "complete", "outcomes", "failed", "changes"]
+        return [dict(zip(columns, row)) for row in self._rows(sql, params)]
+
+    def run_before(self, scope, org, date):
+        """Last run generated before the date (YYYY-MM-DD[ HH:MM:SS]), or None."""
+        row = self._row(
+            "SELECT run_id FROM runs WHERE scope = ? AND org = ? AND generated_at < ? "
+            "ORDER BY generated_at DESC, run_id DESC LIMIT 1", (scope, org, date)
+        )
+        return row[0] if row else None
+
+    def _check_run(self, run_id, scope, org):
+        row = self._row("SELECT scope, org FROM runs WHERE run_id = ?", (run_id,))
+        if row is None:
+            raise HistoryError(f"run {run_id} is not in the history")
+        if tuple(row) != (scope, org):
+            raise HistoryError(f"run {run_id} is a {row[0]} run of {row[1]}, not a {scope} run of {org}")
+
+    def delta(self, scope, org, from_run=None, to_run=None):
+        """
+        Rule outcomes that changed between two runs of the same scope/org.
+
+        Args:
+            from_run: Earlier run (default: the run before to_run)
+            to_run: Later run (default: the latest run)
+
+        Returns:
+            dict: {"from_run", "to_run", "newly_failing", "newly_passing",
+                   "removed"} - the lists hold {"repository", "branch",
+                   "rule", "enforcement", "before", "after"} dicts, where
+                   before/after are True, False or None (not evaluated)
+        """
+        if to_run is None:
+            latest = self.runs(scope, org, limit=1)
+            if not latest:
+                raise HistoryError(f"no {scope} runs recorded for {org}")
+            to_run = latest[0]["run_id"]
+        self._check_run(to_run, scope, org)
+        if from_run is None:
+            row = self._row(
+                "SELECT MAX(run_id) FROM runs WHERE scope = ? AND org = ? AND run_id < ?", (scope, org, to_run)
+            )
+            if row[0] is None:
+                raise HistoryError(f"run {to_run} is the first {scope} run of {org}; nothing to compare")
+            from_run = row[0]
+        self._check_run(from_run, scope, org)
+        if from_run > to_run:
+            from_run, to_run = to_run, from_run
+
+        rows = self._rows("""
+            WITH touched AS (
+                SELECT DISTINCT c.subject_id, c.rule_id
+                FROM changes c JOIN subjects s ON s.subject_id = c.subject_id
+                WHERE c.run_id > ? AND c.run_id <= ? AND s.scope = ? AND s.org = ?
+            )
+            SELECT s.repo, s.branch, r.rule, r.enforcement,
+                   (SELECT passed FROM changes WHERE subject_id = t.subject_id AND rule_id = t.rule_id
+                        AND run_id <= ? ORDER BY run_id DESC LIMIT 1) AS before,
+                   (SELECT passed FROM changes WHERE subject_id = t.subject_id AND rule_id = t.rule_id
+                        AND run_id <= ? ORDER BY run_id DESC LIMIT 1) AS after
+            FROM touched t
+            JOIN subjects s ON s.subject_id = t.subject_id
+            JOIN rules r ON r.rule_id = t.rule_id
+            ORDER BY s.repo, s.branch, r.rule_id
+        """, (from_run, to_run, scope, org, from_run, to_run))
+
+        delta = {"scope": scope, "organization": org, "from_run": from_run, "to_run": to_run,
+                 "newly_failing": [], "newly_passing": [], "removed": []}
+        for repo, branch, rule, enforcement, before, after in rows:
+            if before == after:
+                continue
+            item = {
+                "repository": repo or None,
+                "branch": branch or None,
+                "rule": rule,
+                "enforcement": enforcement,
+                "before": None if before is None else bool(before),
+                "after": None if after is None else bool(after),
+            }
+            if after == 0:
+                delta["newly_failing"].append(item)
+            elif after == 1:
+                if before == 0:
+                    delta["newly_passing"].append(item)
+            else:
+                delta["removed"].append(item)
+        return delta
+
+
+def record_results(path, scope, org, results, generated_at=None, complete=True):
+    """Record one checker run in the history at path (used by --history)."""
+    history = ComplianceHistory(path)
+    try:
+        run = history.record(scope, org, results, generated_at=generated_at, complete=complete)
+    finally:
+        history.close()
+    print(f"  History: {scope} run {run['run_id']} of {org} recorded in {path} "
+          f"({run['outcomes']} outcomes, {run['changes']} changed)")
+    return run
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def _subject(item):
+    parts = [p for p in (item["repository"], item["branch"]) if p]
+    return "/".join(parts) or "(organization)"
+
+
+def _state(value):
+    return {True: "pass", False: "FAIL", None: "-"}[value]
+
+
+def print_delta(delta):
+    print(f"  {delta['scope']} rules of {delta['organization']}: run {delta['from_run']} -> run {delta['to_run']}")
+    for title, key in [("NEWLY FAILING", "newly_failing"), ("NEWLY PASSING", "newly_passing"),
+                       ("NO LONGER EVALUATED", "removed")]:
+        items = delta[key]
+        print(f"\n  {title}: {len(items)}")
+        for item in items:
+            print(f"    {_subject(item):<50} {item['rule']:<40} "
+                  f"{_state(item['before'])} -> {_state(item['after'])} ({item['enforcement']})")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Append-only history of compliance rule outcomes, with run-to-run deltas.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python compliance_history.py record branch_compliance_report.json repo_compliance_report.json
+  python compliance_history.py runs --org tornado
+  python compliance_history.py delta --scope branch --org tornado
+  python compliance_history.py delta --scope branch --org tornado --since 2026-01-01 --json delta.json
+        """
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="Record runs from JSON reports")
+    record.add_argument("reports", nargs="+", help="org/repo/branch compliance JSON reports (or combined reports)")
+    record.add_argument("--partial", action="store_true",
+                        help="The reports cover only some repositories (--repo runs); keep outcomes they omit")
+    record.add_argument("--db", default=DEFAULT_DB, help=f"History file (default: {DEFAULT_DB})")
+
+    runs = subparsers.add_parser("runs", help="List recorded runs")
+    runs.add_argument("--scope", choices=SCOPES)
+    runs.add_argument("--org")
+    runs.add_argument("--limit", type=int, default=20, help="Runs to show (default: 20)")
+    runs.add_argument("--db", default=DEFAULT_DB, help=f"History file (default: {DEFAULT_DB})")
+
+    delta = subparsers.add_parser("delta", help="Rules newly failing/passing between two runs")
+    delta.add_argument("--scope", choices=SCOPES, required=True)
+    delta.add_argument("--org", required=True)
+    delta.add_argument("--from", dest="from_run", type=int, metavar="RUN_ID",
+                       help="Earlier run (default: the run before --to)")
+    delta.add_argument("--to", dest="to_run", type=int, metavar="RUN_ID", help="Later run (default: latest)")
+    delta.add_argument("--since", metavar="DATE",
+                       help="Compare with the last run generated before DATE (YYYY-MM-DD) instead of --from")
+    delta.add_argument("--json", metavar="FILE", help="Also write the delta as JSON")
+    delta.add_argument("--db", default=DEFAULT_DB, help=f"History file (default: {DEFAULT_DB})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("\n" + "=" * 60)
+    print("COMPLIANCE HISTORY")
+    print("=" * 60)
+
+    if args.command != "record" and not os.path.exists(args.db):
+        print(f"ERROR: history not found: {args.db}")
+        sys.exit(1)
+
+    history = ComplianceHistory(args.db)
+    try:
+        if args.command == "record":
+            for path in args.reports:
+                with open(path, "r", encoding="utf-8") as f:
+                    report = json.load(f)
+                for scope, org, generated_at, results in report_runs(report):
+                    run = history.record(scope, org, results, generated_at=generated_at, complete=not args.partial)
+                    print(f"  {path}: {scope} run {run['run_id']} of {org} "
+                          f"({run['outcomes']} outcomes, {run['failed']} failed, {run['changes']} changed)")
+
+        elif args.command == "runs":
+            print(f"  {'RUN':>5}  {'SCOPE':<12} {'ORGANIZATION':<20} {'GENERATED':<19}  "
+                  f"{'OUTCOMES':>8} {'FAILED':>6} {'CHANGED':>7}")
+            for run in history.runs(args.scope, args.org, limit=args.limit):
+                print(f"  {run['run_id']:>5}  {run['scope']:<12} {run['org']:<20} {run['generated_at']:<19}  "
+                      f"{run['outcomes']:>8} {run['failed']:>6} {run['changes']:>7}"
+                      + ("" if run["complete"] else "  (partial)"))
+
+        else:
+            from_run = args.from_run
+            if args.since:
+                from_run = history.run_before(args.scope, args.org, args.since)
+                if from_run is None:
+                    raise HistoryError(f"no {args.scope} run of {args.org} before {args.since}")
+            delta = history.delta(args.scope, args.org, from_run=from_run, to_run=args.to_run)
+            print_delta(delta)
+            if args.json:
+                with open(args.json, "w", encoding="utf-8") as f:
+                    json.dump(delta, f, indent=2)
+                print(f"\n  Delta saved: {args.json}")
+    except (HistoryError, OSError, ValueError, KeyError) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+    finally:
+        history.close()
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,12 @@
 import requests
 import base64
-import json
 import time
 import os
 import urllib3
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from metadata_parser import parse_metadata_response
 
-# Try YAML support (optional, same as branch_compliance.py)
-try:
-    import yaml
-    YAML_AVAILABLE = True
-except ImportError:
-    YAML_AVAILABLE = False
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # -----------------------------
 # Owners per org
@@ -85,14 +79,8 @@ def fetch_metadata(org, repo, branch):
         return None
     resp.raise_for_status()
     try:
-        content = base64.b64decode(resp.json().get("content", "")).decode("utf-8")
-        if YAML_AVAILABLE:
-            try:
-                return yaml.safe_load(content)
-            except:
-                pass
-        return json.loads(content)
-    except:
+        return parse_metadata_response(resp.json())
+    except Exception:
         return None
 
 # -----------------------------
@@ -4,6 +4,8 @@ CREATE CODEOWNERS — Specific Repos
 ================================================================================
 
 Creates CODEOWNERS files for specific repos that are missing them.
+An existing CODEOWNERS is never rewritten when its blob SHA already equals
+the git blob SHA of CODEOWNERS_CONTENT (computed locally).
 
 Repos:
   - tornado/secretsmanager-utils
@@ -31,6 +33,8 @@ import argparse
 import requests
 import urllib3
 
+from git_data_writer import git_blob_sha
+
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # =============================================================================
@@ -54,6 +58,7 @@ OWNERS = [
     "@Pinto-Yvens",
 ]
 CODEOWNERS_CONTENT = "* " + " ".join(OWNERS) + "\n"
+CODEOWNERS_SHA     = git_blob_sha(CODEOWNERS_CONTENT)
 
 # Repos to process
 TARGET_REPOS = [
@@ -88,15 +93,15 @@ def get_repo_info(repo_name):
 
 
 def find_codeowners(repo_name, branch):
-    """Return the path of existing CODEOWNERS file, or None."""
+    """Return (path, sha) of the existing CODEOWNERS file, or (None, None)."""
     for path in [".github/CODEOWNERS", "CODEOWNERS", "docs/CODEOWNERS"]:
         url = f"{GITHUB_BASE}/repos/{GITHUB_ORG}/{repo_name}/contents/{path}?ref={branch}"
         resp = session.get(url, verify=False, timeout=20)
         if resp.status_code == 200:
-            return path
+            return path, resp.json().get("sha")
         if resp.status_code not in (200, 404):
             resp.raise_for_status()
-    return None
+    return None, None
 
 
 def get_codeowners_sha(repo_name, branch, path):
@@ -137,6 +142,8 @@ def create_codeowners(repo_name, branch, dry_run):
             # File exists but wasn't found by earlier GET — fetch sha and overwrite
             print(f"    409 on {path} — fetching sha and retrying as update...")
             sha = get_codeowners_sha(repo_name, branch, path)
+            if sha == CODEOWNERS_SHA:
+                return {"success": True, "path": path, "reason": f"{path} already up to date (no write)"}
             if sha:
                 payload["sha"] = sha
                 payload["message"] = msg.replace("Add", "Update")
@@ -236,9 +243,10 @@ def main():
             continue
 
         # Check if CODEOWNERS already exists
-        existing_path = find_codeowners(repo_name, branch)
+        existing_path, existing_sha = find_codeowners(repo_name, branch)
         if existing_path:
-            print(f"    CODEOWNERS already exists: {existing_path}")
+            state = "up to date" if existing_sha == CODEOWNERS_SHA else "different content, not modified"
+            print(f"    CODEOWNERS already exists: {existing_path} ({state})")
             print(f"    URL: {GITHUB_WEB}/{GITHUB_ORG}/{repo_name}/blob/{branch}/{existing_path}")
             existed += 1
             continue
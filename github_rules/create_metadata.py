@@ -1,8 +1,10 @@
 import requests
-import base64
 import json
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+from git_data_writer import GitDataWriter
 
 # -------------------------------
 # Repo Lists
@@ -58,6 +60,7 @@ VMW_ORG = os.getenv("VMW_ORG")
 GITHUB_BASE = "https://github.ibm.com/api/v3"
 
 SLEEP_INTERVAL = 0.3
+MAX_WORKERS = 4
 
 session = requests.Session()
 session.headers.update({
@@ -65,6 +68,9 @@ session.headers.update({
     "Accept": "application/vnd.github.v3+json"
 })
 
+# Writes .metadata via the Git Data API; skips repos that already have it
+writer = GitDataWriter(GITHUB_BASE, session=session)
+
 
 # -------------------------------
 # Helpers
@@ -81,15 +87,7 @@ def get_default_branch(org, repo):
     return r.json()["default_branch"]
 
 
-def metadata_exists(org, repo, branch):
-
-    url = f"{GITHUB_BASE}/repos/{org}/{repo}/contents/.metadata?ref={branch}"
-    r = session.get(url)
-
-    return r.status_code == 200
-
-
-def create_metadata(org, repo, branch, service):
+def metadata_body(service):
 
     metadata = {
         "service": service,
@@ -100,31 +98,28 @@ def create_metadata(org, repo, branch, service):
         "allow_cloud_readers": "yes"
     }
 
-    encoded = base64.b64encode(
-        json.dumps(metadata, indent=2).encode()
-    ).decode()
+    return json.dumps(metadata, indent=2)
 
-    data = {
-        "message": "Add .metadata file",
-        "content": encoded,
-        "branch": branch
-    }
 
-    url = f"{GITHUB_BASE}/repos/{org}/{repo}/contents/.metadata"
+def create_metadata(org, repo, branch, service):
 
-    r = session.put(url, json=data)
+    outcome = writer.write_file(
+        org, repo, branch, ".metadata", metadata_body(service),
+        message="Add .metadata file",
+        create_only=True
+    )
 
-    if r.status_code == 201:
+    if outcome["applied"]:
         print(f"SUCCESS: .metadata created -> {repo}")
 
-    elif r.status_code == 409:
-        print(f"SKIP already exists -> {repo}")
+    elif outcome["action"] in ("exists", "unchanged"):
+        print(f"SKIP metadata exists: {repo}")
 
-    elif r.status_code == 403:
+    elif outcome["status_code"] == 403:
         print(f"NO PERMISSION -> {repo}")
 
     else:
-        print(f"ERROR {repo}: {r.status_code}")
+        print(f"ERROR {repo}: {outcome['error']}")
 
 
 def process_repo(org, repo, service):
@@ -147,10 +142,6 @@ def process_repo(org, repo, service):
             print(f"SKIP main branch repo: {repo}")
             return
 
-        if metadata_exists(org, repo, branch):
-            print(f"SKIP metadata exists: {repo}")
-            return
-
         create_metadata(org, repo, branch, service)
 
         time.sleep(SLEEP_INTERVAL)
@@ -165,15 +156,15 @@ def process_repo(org, repo, service):
 
 def main():
 
-    print("\nProcessing Tornado repos...\n")
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+
+        print("\nProcessing Tornado repos...\n")
 
-    for repo in TORNADO_REPOS:
-        process_repo(TORNADO_ORG, repo, "vmware-solutions")
+        list(executor.map(lambda repo: process_repo(TORNADO_ORG, repo, "vmware-solutions"), TORNADO_REPOS))
 
-    print("\nProcessing VMW repos...\n")
+        print("\nProcessing VMW repos...\n")
 
-    for repo in VMW_REPOS:
-        process_repo(VMW_ORG, repo, "vmware")
+        list(executor.map(lambda repo: process_repo(VMW_ORG, repo, "vmware"), VMW_REPOS))
 
 
 if __name__ == "__main__":
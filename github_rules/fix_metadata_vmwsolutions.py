@@ -26,9 +26,18 @@ OUTPUT:
     - fix_metadata_vmwsolutions_log_<timestamp>.json   (per-repo result log)
 
 NOTES:
-    - If .metadata already exists (HTTP 422/409), repo is skipped.
+    - .metadata is written through the Git Data API (git_data_writer.py).
+      Active repos whose .metadata blob already matches METADATA_CONTENT and
+      archived repos that already have a .metadata are skipped with no writes
+      (archived ones are not even unarchived), so re-runs are cheap.
     - Archived repos are re-archived even if .metadata creation fails,
-      so the repo is never left unarchived accidentally.
+      so the repo is never left unarchived accidentally. Re-archiving is
+      retried with backoff; any repo still left unarchived is listed in the
+      summary and the log.
+    - After unarchiving, the repo is polled until GitHub reports it
+      unarchived and the write is retried while it is still read-only
+      (403/409) — no fixed wait.
+    - Repos are processed concurrently (--workers, default 4).
 ================================================================================
 """
 
@@ -36,11 +45,13 @@ import os
 import sys
 import json
 import time
-import base64
 import argparse
 import requests
 import urllib3
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from git_data_writer import GitDataWriter
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -53,6 +64,8 @@ GITHUB_BASE  = os.environ.get("GITHUB_BASE", "https://api.github.com")
 GITHUB_ORG   = "VMWSolutions"
 
 SLEEP_INTERVAL = 0.3   # seconds between API calls
+READY_BACKOFF  = [0.5, 1, 2, 4, 8]   # seconds between readiness polls / write retries
+DEFAULT_WORKERS = 4   # repos processed concurrently
 
 # .metadata content for VMWSolutions Non-Prod repos
 METADATA_CONTENT = {
@@ -63,6 +76,10 @@ METADATA_CONTENT = {
     "allow_cloud_readers": "yes"
 }
 
+# Exact file body written to .metadata
+METADATA_PATH = ".metadata"
+METADATA_BODY = json.dumps(METADATA_CONTENT, indent=2)
+
 # -----------------------------------------------------------------------------
 # Repos that are ARCHIVED — unarchive → add .metadata → re-archive
 # -----------------------------------------------------------------------------
@@ -129,6 +146,7 @@ class GitHubAPIClient:
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github.v3+json",
         }
+        self.git = GitDataWriter(self.base_url, self.headers, verify=False)
 
     def get(self, endpoint, allow_404=False):
         url = f"{self.base_url}{endpoint}"
@@ -144,11 +162,6 @@ class GitHubAPIClient:
         response.raise_for_status()
         return response.json() if response.text else {}
 
-    def put(self, endpoint, data):
-        url = f"{self.base_url}{endpoint}"
-        response = requests.put(url, headers=self.headers, json=data, verify=False)
-        return response  # caller checks status code
-
 
 # =============================================================================
 # CORE HELPERS
@@ -163,58 +176,67 @@ def get_default_branch(api, repo_name):
     return repo_data.get("default_branch", "master")
 
 
-def get_metadata_sha(api, repo_name, branch):
-    """Return the sha of the existing .metadata file, or None if it doesn't exist."""
-    result = api.get(
-        f"/repos/{GITHUB_ORG}/{repo_name}/contents/.metadata?ref={branch}",
-        allow_404=True,
-    )
-    time.sleep(SLEEP_INTERVAL)
-    if result is None:
-        return None
-    return result.get("sha")
+def wait_until_unarchived(api, repo_name):
+    """
+    Poll the repo until GitHub reports it unarchived.
+
+    Replaces a fixed wait after unarchiving — most repos are ready on the
+    first poll. Returns True once archived is False, False if it never is.
+    """
+    for delay in [0] + READY_BACKOFF:
+        time.sleep(delay)
+        repo_data = api.get(f"/repos/{GITHUB_ORG}/{repo_name}", allow_404=True)
+        if repo_data and not repo_data.get("archived"):
+            return True
+    return False
+
+
+def is_read_only(outcome):
+    """True if a write was refused because the repo is still read-only (archived)."""
+    if outcome["status_code"] == 403:
+        return True
+    return outcome["status_code"] == 409 and "archived" in outcome["error"].lower()
 
 
-def add_metadata(api, repo_name, branch, dry_run, sha=None):
+def add_metadata(api, repo_name, branch, dry_run, create_only=False, just_unarchived=False):
     """
-    PUT .metadata onto the repo. If sha is provided, overwrites the existing file.
+    Write .metadata onto the repo through the Git Data API (see git_data_writer.py).
+    An existing .metadata is overwritten unless create_only; repos where it
+    already matches METADATA_CONTENT are skipped without any write.
+    If just_unarchived, 403/409 "read-only" responses are retried with backoff.
 
     Returns a dict:
       {"success": True/False, "skipped": True/False, "reason": str}
     """
-    action = "update" if sha else "create"
-    if dry_run:
-        return {"success": True, "skipped": False, "reason": f"(dry-run) would {action} .metadata"}
-
-    encoded = base64.b64encode(
-        json.dumps(METADATA_CONTENT, indent=2).encode("utf-8")
-    ).decode("utf-8")
-
-    payload = {
-        "message": "Add .metadata file for compliance" if not sha else "Update .metadata file for compliance",
-        "content": encoded,
-        "branch": branch,
-    }
-    if sha:
-        payload["sha"] = sha
+    def write():
+        return api.git.write_file(
+            GITHUB_ORG, repo_name, branch, METADATA_PATH, METADATA_BODY,
+            message="Add .metadata file for compliance",
+            update_message="Update .metadata file for compliance",
+            create_only=create_only,
+            dry_run=dry_run,
+        )
 
-    response = api.put(
-        f"/repos/{GITHUB_ORG}/{repo_name}/contents/.metadata", payload
-    )
+    outcome = write()
+    if just_unarchived:
+        for delay in READY_BACKOFF:
+            if not is_read_only(outcome):
+                break
+            print(f"      [{repo_name}] repo still read-only (HTTP {outcome['status_code']}) — retrying in {delay}s...")
+            time.sleep(delay)
+            outcome = write()
     time.sleep(SLEEP_INTERVAL)
 
-    if response.status_code in (200, 201):
-        verb = "updated" if sha else "created"
-        return {"success": True, "skipped": False, "reason": f".metadata {verb} successfully"}
-
-    if response.status_code in (409, 422):
-        return {"success": True, "skipped": True, "reason": ".metadata already exists — skipped (use sha to overwrite)"}
-
-    try:
-        msg = response.json().get("message", response.text)
-    except Exception:
-        msg = response.text
-    return {"success": False, "skipped": False, "reason": f"HTTP {response.status_code}: {msg}"}
+    if outcome["error"]:
+        return {"success": False, "skipped": False, "reason": outcome["error"]}
+    if outcome["action"] == "unchanged":
+        return {"success": True, "skipped": True, "reason": ".metadata already up to date — skipped"}
+    if outcome["action"] == "exists":
+        return {"success": True, "skipped": True, "reason": ".metadata already exists — skipped"}
+    if dry_run:
+        return {"success": True, "skipped": False, "reason": f"(dry-run) would {outcome['action']} .metadata"}
+    verb = "created" if outcome["action"] == "create" else "updated"
+    return {"success": True, "skipped": False, "reason": f".metadata {verb} successfully"}
 
 
 def set_archived(api, repo_name, archived, dry_run):
@@ -232,6 +254,18 @@ def set_archived(api, repo_name, archived, dry_run):
         return False
 
 
+def rearchive(api, repo_name, dry_run):
+    """Re-archive a repo, retrying with backoff so it is not left unarchived."""
+    for delay in [0] + READY_BACKOFF:
+        time.sleep(delay)
+        try:
+            if set_archived(api, repo_name, archived=True, dry_run=dry_run):
+                return True
+        except requests.exceptions.RequestException as e:
+            print(f"      ERROR archive {repo_name}: {e}")
+    return False
+
+
 # =============================================================================
 # PER-REPO WORKFLOWS
 # =============================================================================
@@ -239,7 +273,7 @@ def set_archived(api, repo_name, archived, dry_run):
 def process_active_repo(api, repo_name, dry_run):
     """
     Workflow for a non-archived repo:
-      - If .metadata exists (validation_error): fetch sha → overwrite
+      - If .metadata exists (validation_error): overwrite (skip if already up to date)
       - If .metadata missing:                   create fresh
     """
     result = {
@@ -257,27 +291,21 @@ def process_active_repo(api, repo_name, dry_run):
     branch = get_default_branch(api, repo_name)
     if branch is None:
         msg = "repo not found (404)"
-        print(f"    SKIP: {msg}")
+        print(f"    [{repo_name}] SKIP: {msg}")
         result["error"] = msg
         return result
 
-    print(f"    default branch: {branch}")
+    print(f"    [{repo_name}] default branch: {branch}")
 
-    # Check if .metadata already exists and get its sha for overwrite
-    sha = get_metadata_sha(api, repo_name, branch)
-    if sha:
-        print(f"    .metadata exists (sha: {sha[:7]}...) — will overwrite")
-    else:
-        print(f"    .metadata missing — will create")
-
-    meta_result = add_metadata(api, repo_name, branch, dry_run, sha=sha)
+    # Creates .metadata, overwrites it, or skips it if already up to date
+    meta_result = add_metadata(api, repo_name, branch, dry_run)
     result["metadata_added"]   = meta_result["success"] and not meta_result["skipped"]
     result["metadata_skipped"] = meta_result["skipped"]
     if not meta_result["success"]:
         result["error"] = meta_result["reason"]
-        print(f"    FAILED — {meta_result['reason']}")
+        print(f"    [{repo_name}] FAILED — {meta_result['reason']}")
     else:
-        print(f"    {meta_result['reason']}")
+        print(f"    [{repo_name}] {meta_result['reason']}")
 
     return result
 
@@ -286,8 +314,10 @@ def process_archived_repo(api, repo_name, dry_run):
     """
     Workflow:
       1. Unarchive
-      2. Add .metadata
-      3. Re-archive (always, even on .metadata failure)
+      2. Add .metadata (once GitHub reports the repo unarchived)
+      3. Re-archive (always, even on .metadata failure or error)
+
+    Safe to run for several repos concurrently.
     """
     result = {
         "repo": repo_name,
@@ -305,41 +335,57 @@ def process_archived_repo(api, repo_name, dry_run):
     branch = get_default_branch(api, repo_name)
     if branch is None:
         msg = "repo not found (404)"
-        print(f"    SKIP: {msg}")
+        print(f"    [{repo_name}] SKIP: {msg}")
         result["error"] = msg
         return result
 
-    print(f"    default branch: {branch}")
+    print(f"    [{repo_name}] default branch: {branch}")
+
+    # Archived repos are readable: if nothing would be written, don't unarchive at all
+    _, existing_sha = api.git.existing_blob_sha(GITHUB_ORG, repo_name, branch, METADATA_PATH)
+    if existing_sha is not None:
+        print(f"    [{repo_name}] .metadata already exists — skipped (left archived)")
+        result["metadata_skipped"] = True
+        return result
 
     # Step 1: Unarchive
-    print(f"    Step 1: unarchiving...")
+    print(f"    [{repo_name}] Step 1: unarchiving...")
     ok = set_archived(api, repo_name, archived=False, dry_run=dry_run)
     result["unarchived"] = ok
     if not ok:
         result["error"] = "failed to unarchive"
         return result
-    print(f"    Step 1: {'(dry-run) unarchive OK' if dry_run else 'unarchived OK'}")
+    print(f"    [{repo_name}] Step 1: {'(dry-run) unarchive OK' if dry_run else 'unarchived OK'}")
 
-    # Step 2: Add .metadata
-    print(f"    Step 2: adding .metadata...")
-    meta_result = add_metadata(api, repo_name, branch, dry_run)
-    result["metadata_added"]   = meta_result["success"] and not meta_result["skipped"]
-    result["metadata_skipped"] = meta_result["skipped"]
-    if not meta_result["success"]:
-        result["error"] = meta_result["reason"]
-        print(f"    Step 2: FAILED — {meta_result['reason']}")
-    else:
-        print(f"    Step 2: {meta_result['reason']}")
-
-    # Step 3: Re-archive (always)
-    print(f"    Step 3: re-archiving...")
-    re_ok = set_archived(api, repo_name, archived=True, dry_run=dry_run)
-    result["re_archived"] = re_ok
-    if not re_ok:
-        result["error"] = (result["error"] or "") + " | failed to re-archive"
-        print(f"    Step 3: FAILED to re-archive")
-    else:
-        print(f"    Step 3: {'(dry-run) re-archive OK' if dry_run else 're-archived OK'}")
+    try:
+        # Poll until GitHub reports the repo unarchived instead of a fixed wait;
+        # the write below is also retried while the repo is still read-only
+        if not dry_run and not wait_until_unarchived(api, repo_name):
+            print(f"    [{repo_name}] WARNING: still reported as archived — attempting write anyway")
+
+        # Step 2: Add .metadata
+        print(f"    [{repo_name}] Step 2: adding .metadata...")
+        meta_result = add_metadata(api, repo_name, branch, dry_run, create_only=True, just_unarchived=True)
+        result["metadata_added"]   = meta_result["success"] and not meta_result["skipped"]
+        result["metadata_skipped"] = meta_result["skipped"]
+        if not meta_result["success"]:
+            result["error"] = meta_result["reason"]
+            print(f"    [{repo_name}] Step 2: FAILED — {meta_result['reason']}")
+        else:
+            print(f"    [{repo_name}] Step 2: {meta_result['reason']}")
+    except requests.exceptions.RequestException as e:
+        result["error"] = str(e)
+        print(f"    [{repo_name}] Step 2: FAILED — {e}")
+    finally:
+        # Step 3: Re-archive (always)
+        print(f"    [{repo_name}] Step 3: re-archiving...")
+        re_ok = rearchive(api, repo_name, dry_run=dry_run)
+        result["re_archived"] = re_ok
+        if not re_ok:
+            result["error"] = (result["error"] or "") + " | failed to re-archive"
+            print(f"    [{repo_name}] Step 3: FAILED to re-archive — repo left UNARCHIVED")
+        else:
+            print(f"    [{repo_name}] Step 3: {'(dry-run) re-archive OK' if dry_run else 're-archived OK'}")
 
     return result
 
@@ -369,6 +415,12 @@ Examples:
         metavar="REPO_NAME",
         help="Process a single repository (for testing)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Repos processed concurrently (default: {DEFAULT_WORKERS})",
+    )
     parser.add_argument(
         "--active-only",
         action="store_true",
@@ -429,30 +481,37 @@ def main():
         print("\n" + "-" * 40)
         print(f"ARCHIVED REPOS ({len(archived_work)})")
         print("-" * 40)
-        for repo_name in archived_work:
-            result = process_archived_repo(api, repo_name, dry_run=args.dry_run)
-            all_results.append(result)
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            all_results.extend(executor.map(
+                lambda repo_name: process_archived_repo(api, repo_name, dry_run=args.dry_run),
+                archived_work,
+            ))
 
     if active_work:
         print("\n" + "-" * 40)
         print(f"ACTIVE REPOS ({len(active_work)})")
         print("-" * 40)
-        for repo_name in active_work:
-            result = process_active_repo(api, repo_name, dry_run=args.dry_run)
-            all_results.append(result)
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            all_results.extend(executor.map(
+                lambda repo_name: process_active_repo(api, repo_name, dry_run=args.dry_run),
+                active_work,
+            ))
 
     # Summary
     added   = sum(1 for r in all_results if r["metadata_added"])
     skipped = sum(1 for r in all_results if r["metadata_skipped"])
     failed  = sum(1 for r in all_results if r["error"] and not r["metadata_skipped"])
+    left_unarchived = [r["repo"] for r in all_results if r["unarchived"] and not r["re_archived"]]
 
     print("\n" + "=" * 60)
     print("SUMMARY")
     print("=" * 60)
     print(f"  Total repos processed : {len(all_results)}")
     print(f"  .metadata added       : {added}")
-    print(f"  .metadata skipped     : {skipped}  (already existed)")
+    print(f"  .metadata skipped     : {skipped}  (already present)")
     print(f"  Errors                : {failed}")
+    if left_unarchived:
+        print(f"\n  WARNING: left UNARCHIVED — re-archive manually: {', '.join(left_unarchived)}")
 
     if args.dry_run:
         print("\n  *** DRY-RUN — no actual changes were made ***")
@@ -470,6 +529,7 @@ def main():
                     "metadata_added": added,
                     "metadata_skipped": skipped,
                     "errors": failed,
+                    "left_unarchived": left_unarchived,
                 },
                 "results": all_results,
             },
@@ -0,0 +1,184 @@
+"""
+================================================================================
+GIT DATA API FILE WRITER
+================================================================================
+
+Shared by create_metadata.py, fix_metadata.py and fix_metadata_vmwsolutions.py
+to write a single file (e.g. .metadata) to many repositories through the Git
+Data API instead of the contents API.
+
+PER REPOSITORY:
+---------------
+    1. GET   /repos/{org}/{repo}/git/trees/{branch}
+       Top-level tree of the branch head. The existing file's blob SHA is
+       compared with the git blob SHA of the desired content, computed
+       locally (git_blob_sha). If they match nothing is written — re-runs
+       over already-fixed repos cost one read per repo and zero writes.
+
+    Only when the content differs:
+    2. GET   /repos/{org}/{repo}/branches/{branch}   (head commit + tree)
+    3. POST  /repos/{org}/{repo}/git/trees           (blob inlined, base_tree)
+    4. POST  /repos/{org}/{repo}/git/commits
+    5. PATCH /repos/{org}/{repo}/git/refs/heads/{branch}  (fast-forward only)
+
+    If the branch moved between 2 and 5 the ref update is rejected (422) and
+    the write is retried once on top of the new head.
+
+The writer is thread-safe; callers write many repositories concurrently.
+================================================================================
+"""
+
+import hashlib
+import requests
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+FILE_MODE = "100644"  # Regular, non-executable file
+
+
+def git_blob_sha(content):
+    """
+    Return the SHA git (and GitHub) assigns to a blob with this content.
+
+    Args:
+        content: File content (str or bytes)
+
+    Returns:
+        str: 40-character hex SHA-1
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    header = f"blob {len(content)}\0".encode("utf-8")
+    return hashlib.sha1(header + content).hexdigest()
+
+
+def _message(response):
+    try:
+        return response.json().get("message", response.text)
+    except Exception:
+        return response.text
+
+
+# =============================================================================
+# WRITER
+# =============================================================================
+
+class GitDataWriter:
+    """
+    Writes one file per repository with the Git Data API, skipping repos
+    where the file already has the desired content.
+    """
+
+    def __init__(self, base_url, headers=None, session=None, verify=True):
+        self.base_url = base_url.rstrip("/")
+        self.session = session or requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        self.verify = verify
+
+    def _call(self, method, endpoint, data=None):
+        url = f"{self.base_url}{endpoint}"
+        return self.session.request(method, url, json=data, verify=self.verify)
+
+    def existing_blob_sha(self, org, repo, branch, path):
+        """
+        Return (status_code, blob SHA or None) for path on the branch head.
+
+        Only files in the top-level tree are looked up without recursion.
+        """
+        endpoint = f"/repos/{org}/{repo}/git/trees/{branch}"
+        if "/" in path:
+            endpoint += "?recursive=1"
+        response = self._call("GET", endpoint)
+        if response.status_code != 200:
+            return response.status_code, None
+        for entry in response.json().get("tree", []):
+            if entry.get("path") == path and entry.get("type") == "blob":
+                return 200, entry["sha"]
+        return 200, None
+
+    def write_file(self, org, repo, branch, path, content, message,
+                   update_message=None, create_only=False, dry_run=False):
+        """
+        Make path on branch hold exactly content.
+
+        Args:
+            org, repo, branch: Target branch
+            path: File path in the repository (e.g. ".metadata")
+            content: Desired file content (str or bytes)
+            message: Commit message
+            update_message: Commit message when replacing an existing file
+            create_only: Leave an existing file with different content alone
+            dry_run: Only report what would be done (reads, no writes)
+
+        Returns:
+            dict: {
+                "action": "unchanged" | "exists" | "create" | "update" | None,
+                "applied": bool,        # a commit was made
+                "commit": str or None,
+                "status_code": int or None,  # of the failing call
+                "error": str or None
+            }
+        """
+        if isinstance(content, bytes):
+            content = content.decode("utf-8")
+        desired_sha = git_blob_sha(content)
+        result = {"action": None, "applied": False, "commit": None, "status_code": None, "error": None}
+
+        status, existing_sha = self.existing_blob_sha(org, repo, branch, path)
+        if status != 200:
+            result.update({"status_code": status, "error": f"HTTP {status} reading tree of {branch}"})
+            return result
+
+        if existing_sha == desired_sha:
+            result["action"] = "unchanged"
+            return result
+        if existing_sha and create_only:
+            result["action"] = "exists"
+            return result
+
+        result["action"] = "update" if existing_sha else "create"
+        if dry_run:
+            return result
+
+        for _ in range(2):
+            response = self._call("GET", f"/repos/{org}/{repo}/branches/{branch}")
+            if response.status_code != 200:
+                break
+            head = response.json()["commit"]
+            parent_sha = head["sha"]
+            base_tree = head["commit"]["tree"]["sha"]
+
+            response = self._call("POST", f"/repos/{org}/{repo}/git/trees", {
+                "base_tree": base_tree,
+                "tree": [{"path": path, "mode": FILE_MODE, "type": "blob", "content": content}]
+            })
+            if response.status_code != 201:
+                break
+
+            response = self._call("POST", f"/repos/{org}/{repo}/git/commits", {
+                "message": update_message if existing_sha and update_message else message,
+                "tree": response.json()["sha"],
+                "parents": [parent_sha]
+            })
+            if response.status_code != 201:
+                break
+            commit_sha = response.json()["sha"]
+
+            response = self._call("PATCH", f"/repos/{org}/{repo}/git/refs/heads/{branch}", {
+                "sha": commit_sha,
+                "force": False
+            })
+            if response.status_code == 200:
+                result.update({"applied": True, "commit": commit_sha})
+                return result
+            if response.status_code != 422:
+                break
+            # Branch moved since we read it - rebuild on the new head once
+
+        result.update({"status_code": response.status_code,
+                       "error": f"HTTP {response.status_code}: {_message(response)}"})
+        return result
@@ -0,0 +1,979 @@
+"""
+================================================================================
+INVENTORY SNAPSHOT
+================================================================================
+
+Crawls GitHub organizations ONCE and stores everything the compliance scripts
+read in an indexed SQLite file, so the org/repo/branch checkers,
+update_codeowners.discover_production_repos and list_archived_repos can run
+from the snapshot instead of each re-crawling the same organizations.
+
+WHAT IS STORED:
+---------------
+    orgs           Org settings, org webhooks, admins
+    user_events    Recent public events of each org admin
+    repos          Every repository (default branch, archived, visibility)
+    metadata       .metadata on the default branch, master and main
+                   (raw contents response + parsed JSON)
+    codeowners     CODEOWNERS, docs/CODEOWNERS, .github/CODEOWNERS locations
+    branches       Every branch and whether it is protected
+    protection     Branch protection of every protected branch
+    hooks          Repository webhooks
+    collaborators  Outside and direct collaborators
+    teams          Teams with repository access
+    evaluations    Latest per-repository checker results (kept current by
+                   webhook_receiver.py)
+
+A row with a NULL sha/data records that something was looked up and does not
+exist (the API returned 404); a missing row means it was never crawled, and
+reading it raises SnapshotMissError instead of silently reporting "absent".
+
+CRAWL COST PER REPOSITORY:
+--------------------------
+    Branches are listed first, so .metadata/CODEOWNERS lookups on branches
+    that do not exist cost nothing. For each existing ref one tree read shows
+    which files exist; contents are only fetched for a .metadata that exists,
+    and docs/ or .github/ are only read when those directories exist.
+    Protection is only fetched for branches GitHub marks as protected.
+
+HOW TO RUN:
+    1. Set environment variables:
+       - GITHUB_TOKEN: Your GitHub personal access token
+       - GITHUB_BASE: GitHub API base URL (default: https://api.github.com)
+
+    2. Crawl:
+       python inventory_snapshot.py snapshot --orgs tornado,vmwsolutions
+       python inventory_snapshot.py snapshot --orgs tornado --db tornado.db
+
+    3. Inspect:
+       python inventory_snapshot.py info --db inventory_snapshot.db
+
+    4. Use it from Python - SnapshotAPIClient answers the same get()/paginate()
+       calls as each script's GitHubAPIClient:
+
+       snapshot = InventorySnapshot("inventory_snapshot.db")
+       checker = RepoComplianceChecker(SnapshotAPIClient(snapshot), "tornado")
+================================================================================
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import argparse
+import threading
+import requests
+import urllib3
+from datetime import datetime
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+from multi_org import RateLimitedSession, parse_orgs, run_orgs, DEFAULT_ORG_WORKERS
+from metadata_parser import parse_metadata_response
+from rule_registry import json_default
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
+GITHUB_BASE = os.environ.get("GITHUB_BASE", "https://api.github.com")
+
+DEFAULT_DB = "inventory_snapshot.db"
+DEFAULT_REPO_WORKERS = 8  # Repositories crawled concurrently per organization
+SCHEMA_VERSION = 1
+
+METADATA_PATH = ".metadata"
+CODEOWNERS_LOCATIONS = ["CODEOWNERS", "docs/CODEOWNERS", ".github/CODEOWNERS"]
+# Refs the checkers read .metadata/CODEOWNERS from besides the default branch
+METADATA_REFS = ["master", "main"]
+COLLABORATOR_AFFILIATIONS = ["outside", "direct"]
+# Independently refreshable parts of a repository (see SnapshotCrawler.crawl_repo)
+REPO_PARTS = ["branches", "files", "protection", "hooks", "collaborators", "teams"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshot_info (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS orgs (
+    org        TEXT PRIMARY KEY,
+    data       TEXT,
+    hooks      TEXT,
+    admins     TEXT,
+    crawled_at TEXT
+);
+CREATE TABLE IF NOT EXISTS user_events (
+    login  TEXT PRIMARY KEY,
+    events TEXT
+);
+CREATE TABLE IF NOT EXISTS repos (
+    org            TEXT NOT NULL,
+    name           TEXT NOT NULL,
+    position       INTEGER,
+    default_branch TEXT,
+    archived       INTEGER,
+    private        INTEGER,
+    visibility     TEXT,
+    data           TEXT,
+    PRIMARY KEY (org, name)
+);
+CREATE INDEX IF NOT EXISTS repos_by_archived ON repos (org, archived);
+CREATE INDEX IF NOT EXISTS repos_by_default_branch ON repos (org, default_branch);
+CREATE TABLE IF NOT EXISTS metadata (
+    org             TEXT NOT NULL,
+    repo            TEXT NOT NULL,
+    ref             TEXT NOT NULL,
+    sha             TEXT,
+    response        TEXT,
+    parsed          TEXT,
+    production_code TEXT,
+    PRIMARY KEY (org, repo, ref)
+);
+CREATE INDEX IF NOT EXISTS metadata_by_production ON metadata (org, ref, production_code);
+CREATE TABLE IF NOT EXISTS codeowners (
+    org  TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    ref  TEXT NOT NULL,
+    path TEXT NOT NULL,
+    sha  TEXT,
+    PRIMARY KEY (org, repo, ref, path)
+);
+CREATE TABLE IF NOT EXISTS branches (
+    org       TEXT NOT NULL,
+    repo      TEXT NOT NULL,
+    name      TEXT NOT NULL,
+    position  INTEGER,
+    protected INTEGER,
+    sha       TEXT,
+    data      TEXT,
+    PRIMARY KEY (org, repo, name)
+);
+CREATE TABLE IF NOT EXISTS protection (
+    org    TEXT NOT NULL,
+    repo   TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    data   TEXT,
+    PRIMARY KEY (org, repo, branch)
+);
+CREATE TABLE IF NOT EXISTS hooks (
+    org          TEXT NOT NULL,
+    repo         TEXT NOT NULL,
+    id           INTEGER NOT NULL,
+    position     INTEGER,
+    insecure_ssl TEXT,
+    data         TEXT,
+    PRIMARY KEY (org, repo, id)
+);
+CREATE TABLE IF NOT EXISTS collaborators (
+    org         TEXT NOT NULL,
+    repo        TEXT NOT NULL,
+    affiliation TEXT NOT NULL,
+    login       TEXT NOT NULL,
+    position    INTEGER,
+    data        TEXT,
+    PRIMARY KEY (org, repo, affiliation, login)
+);
+CREATE INDEX IF NOT EXISTS collaborators_by_login ON collaborators (login);
+CREATE TABLE IF NOT EXISTS teams (
+    org        TEXT NOT NULL,
+    repo       TEXT NOT NULL,
+    slug       TEXT NOT NULL,
+    position   INTEGER,
+    name       TEXT,
+    permission TEXT,
+    data       TEXT,
+    PRIMARY KEY (org, repo, slug)
+);
+CREATE INDEX IF NOT EXISTS teams_by_slug ON teams (org, slug);
+CREATE TABLE IF NOT EXISTS coverage (
+    org  TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    part TEXT NOT NULL,
+    PRIMARY KEY (org, repo, part)
+);
+CREATE TABLE IF NOT EXISTS evaluations (
+    org          TEXT NOT NULL,
+    repo         TEXT NOT NULL,
+    checker      TEXT NOT NULL,
+    result       TEXT,
+    evaluated_at TEXT,
+    PRIMARY KEY (org, repo, checker)
+);
+CREATE TABLE IF NOT EXISTS crawl_errors (
+    org   TEXT NOT NULL,
+    repo  TEXT NOT NULL,
+    part  TEXT NOT NULL,
+    error TEXT,
+    PRIMARY KEY (org, repo, part)
+);
+"""
+
+# Child tables cleared when a repository is re-crawled or removed
+REPO_TABLES = ["metadata", "codeowners", "branches", "protection", "hooks",
+               "collaborators", "teams", "coverage", "crawl_errors", "evaluations"]
+
+
+class SnapshotError(Exception):
+    """Raised for operations a snapshot cannot serve (e.g. writes)."""
+
+
+class SnapshotMissError(SnapshotError, LookupError):
+    """Raised when the snapshot holds no data for the requested endpoint."""
+
+
+def _dumps(value):
+    return json.dumps(value, default=json_default)
+
+
+def _loads(text):
+    return json.loads(text) if text is not None else None
+
+
+def tracked_refs(repo_data):
+    """Refs whose .metadata/CODEOWNERS are stored: the default branch, master and main."""
+    return list(dict.fromkeys([repo_data.get("default_branch") or "master"] + METADATA_REFS))
+
+
+# =============================================================================
+# SNAPSHOT STORE
+# =============================================================================
+
+class InventorySnapshot:
+    """
+    SQLite inventory of one or more organizations.
+
+    One connection is shared by all threads; every statement runs under a
+    lock, so crawler workers can write concurrently.
+    """
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        with self._lock, self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(
+                "INSERT OR IGNORE INTO snapshot_info (key, value) VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),)
+            )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def _rows(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def _row(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()
+
+    def _write(self, statements):
+        """Run [(sql, params), ...] in one transaction."""
+        with self._lock, self.conn:
+            for sql, params in statements:
+                self.conn.execute(sql, params)
+
+    def _covered(self, org, repo, part):
+        return self._row(
+            "SELECT 1 FROM coverage WHERE org = ? AND repo = ? AND part = ?", (org, repo, part)
+        ) is not None
+
+    def _require(self, org, repo, part):
+        if not self._covered(org, repo, part):
+            raise SnapshotMissError(f"{part} of {org}/{repo} is not in the snapshot")
+
+    def _cover(self, org, repo, part):
+        return ("INSERT OR REPLACE INTO coverage (org, repo, part) VALUES (?, ?, ?)", (org, repo, part))
+
+    # -------------------------------------------------------------------------
+    # Writes
+    # -------------------------------------------------------------------------
+
+    def set_info(self, key, value):
+        self._write([("INSERT OR REPLACE INTO snapshot_info (key, value) VALUES (?, ?)", (key, value))])
+
+    def put_org(self, org, data, hooks=None, admins=None):
+        """Store org settings; hooks/admins of None mean 'not crawled'."""
+        self._write([(
+            "INSERT OR REPLACE INTO orgs (org, data, hooks, admins, crawled_at) VALUES (?, ?, ?, ?, ?)",
+            (org, _dumps(data),
+             _dumps(hooks) if hooks is not None else None,
+             _dumps(admins) if admins is not None else None,
+             datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        )])
+
+    def put_user_events(self, login, events):
+        self._write([("INSERT OR REPLACE INTO user_events (login, events) VALUES (?, ?)",
+                      (login, _dumps(events)))])
+
+    def _repo_row(self, org, repo_data, position):
+        return (
+            "INSERT OR REPLACE INTO repos "
+            "(org, name, position, default_branch, archived, private, visibility, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (org, repo_data["name"], position, repo_data.get("default_branch"),
+             int(bool(repo_data.get("archived", False))), int(bool(repo_data.get("private", False))),
+             repo_data.get("visibility"), _dumps(repo_data))
+        )
+
+    def put_repos(self, org, repos):
+        """Replace the organization's repository list, dropping repos that are gone."""
+        names = {r["name"] for r in repos}
+        stale = [name for name in self.repo_names(org) if name not in names]
+        statements = [self._repo_row(org, r, i) for i, r in enumerate(repos)]
+        for name in stale:
+            statements.extend(self._drop_statements(org, name))
+        self._write(statements)
+
+    def put_repo(self, org, repo_data):
+        """Insert or update one repository, keeping its place in the list."""
+        row = self._row("SELECT position FROM repos WHERE org = ? AND name = ?", (org, repo_data["name"]))
+        if row:
+            position = row[0]
+        else:
+            position = (self._row("SELECT MAX(position) FROM repos WHERE org = ?", (org,))[0] or 0) + 1
+        self._write([self._repo_row(org, repo_data, position)])
+
+    def _drop_statements(self, org, repo):
+        statements = [("DELETE FROM repos WHERE org = ? AND name = ?", (org, repo))]
+        for table in REPO_TABLES:
+            statements.append((f"DELETE FROM {table} WHERE org = ? AND repo = ?", (org, repo)))
+        return statements
+
+    def reset_repo(self, org, repo):
+        """Forget everything stored about a repository except the repo row itself."""
+        self._write([(f"DELETE FROM {table} WHERE org = ? AND repo = ?", (org, repo)) for table in REPO_TABLES])
+
+    def drop_repo(self, org, repo):
+        """Remove a repository and everything stored about it."""
+        self._write(self._drop_statements(org, repo))
+
+    def put_metadata(self, org, repo, ref, response):
+        """Store the .metadata contents response on ref (None = not found)."""
+        if response is None:
+            row = (org, repo, ref, None, None, None, None)
+        else:
+            parsed = None
+            try:
+                parsed = parse_metadata_response(response)
+            except Exception:
+                pass
+            production_code = None
+            if isinstance(parsed, dict):
+                production_code = str(parsed.get("production_code", "no")).lower()
+            row = (org, repo, ref, response.get("sha"), _dumps(response),
+                   _dumps(parsed) if parsed is not None else None, production_code)
+        self._write([(
+            "INSERT OR REPLACE INTO metadata "
+            "(org, repo, ref, sha, response, parsed, production_code) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            row
+        )])
+
+    def put_codeowners(self, org, repo, ref, locations):
+        """Store {path: blob sha or None} for every CODEOWNERS location on ref."""
+        self._write([
+            ("INSERT OR REPLACE INTO codeowners (org, repo, ref, path, sha) VALUES (?, ?, ?, ?, ?)",
+             (org, repo, ref, path, locations.get(path)))
+            for path in CODEOWNERS_LOCATIONS
+        ])
+
+    def put_branches(self, org, repo, branches):
+        statements = [("DELETE FROM branches WHERE org = ? AND repo = ?", (org, repo))]
+        for i, b in enumerate(branches):
+            statements.append((
+                "INSERT OR REPLACE INTO branches (org, repo, name, position, protected, sha, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (org, repo, b["name"], i, int(bool(b.get("protected", False))),
+                 (b.get("commit") or {}).get("sha"), _dumps(b))
+            ))
+        statements.append(self._cover(org, repo, "branches"))
+        self._write(statements)
+
+    def put_protections(self, org, repo, protections):
+        """Replace the stored protection of a repository's protected branches ({branch: data})."""
+        statements = [("DELETE FROM protection WHERE org = ? AND repo = ?", (org, repo))]
+        for branch, protection in protections.items():
+            statements.append((
+                "INSERT OR REPLACE INTO protection (org, repo, branch, data) VALUES (?, ?, ?, ?)",
+                (org, repo, branch, _dumps(protection) if protection is not None else None)
+            ))
+        self._write(statements)
+
+    def put_hooks(self, org, repo, hooks):
+        statements = [("DELETE FROM hooks WHERE org = ? AND repo = ?", (org, repo))]
+        for i, h in enumerate(hooks or []):
+            statements.append((
+                "INSERT OR REPLACE INTO hooks (org, repo, id, position, insecure_ssl, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (org, repo, h["id"], i, str((h.get("config") or {}).get("insecure_ssl")), _dumps(h))
+            ))
+        statements.append(self._cover(org, repo, "hooks"))
+        self._write(statements)
+
+    def put_collaborators(self, org, repo, affiliation, collaborators):
+        statements = [("DELETE FROM collaborators WHERE org = ? AND repo = ? AND affiliation = ?",
+                       (org, repo, affiliation))]
+        for i, c in enumerate(collaborators):
+            statements.append((
+                "INSERT OR REPLACE INTO collaborators (org, repo, affiliation, login, position, data) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (org, repo, affiliation, c["login"], i, _dumps(c))
+            ))
+        statements.append(self._cover(org, repo, f"collaborators:{affiliation}"))
+        self._write(statements)
+
+    def put_teams(self, org, repo, teams):
+        statements = [("DELETE FROM teams WHERE org = ? AND repo = ?", (org, repo))]
+        for i, t in enumerate(teams):
+            statements.append((
+                "INSERT OR REPLACE INTO teams (org, repo, slug, position, name, permission, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (org, repo, t["slug"], i, t.get("name"), t.get("permission"), _dumps(t))
+            ))
+        statements.append(self._cover(org, repo, "teams"))
+        self._write(statements)
+
+    def put_evaluation(self, org, repo, checker, result):
+        """Store the latest result of a checker for one repository (None = skipped)."""
+        self._write([(
+            "INSERT OR REPLACE INTO evaluations (org, repo, checker, result, evaluated_at) VALUES (?, ?, ?, ?, ?)",
+            (org, repo, checker, _dumps(result), datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        )])
+
+    def record_error(self, org, repo, part, error):
+        self._write([("INSERT OR REPLACE INTO crawl_errors (org, repo, part, error) VALUES (?, ?, ?, ?)",
+                      (org, repo, part, str(error)))])
+
+    # -------------------------------------------------------------------------
+    # Reads
+    # -------------------------------------------------------------------------
+
+    def orgs(self):
+        return [row[0] for row in self._rows("SELECT org FROM orgs ORDER BY org")]
+
+    def _org_column(self, org, column):
+        row = self._row(f"SELECT {column} FROM orgs WHERE org = ?", (org,))
+        if row is None or row[0] is None:
+            raise SnapshotMissError(f"{column} of organization {org} is not in the snapshot")
+        return _loads(row[0])
+
+    def org(self, org):
+        return self._org_column(org, "data")
+
+    def org_hooks(self, org):
+        return self._org_column(org, "hooks")
+
+    def org_admins(self, org):
+        return self._org_column(org, "admins")
+
+    def user_events(self, login):
+        row = self._row("SELECT events FROM user_events WHERE login = ?", (login,))
+        if row is None:
+            raise SnapshotMissError(f"events of user {login} are not in the snapshot")
+        return _loads(row[0])
+
+    def repo_names(self, org):
+        return [row[0] for row in self._rows("SELECT name FROM repos WHERE org = ? ORDER BY position", (org,))]
+
+    def repos(self, org, archived=None):
+        """Repository objects of org in API order, optionally filtered on archived."""
+        self.org(org)  # Raises if the organization was never crawled
+        if archived is None:
+            rows = self._rows("SELECT data FROM repos WHERE org = ? ORDER BY position", (org,))
+        else:
+            rows = self._rows("SELECT data FROM repos WHERE org = ? AND archived = ? ORDER BY position",
+                              (org, int(archived)))
+        return [_loads(row[0]) for row in rows]
+
+    def repo(self, org, name):
+        """Repository object, or None if the organization has no such repo."""
+        self.org(org)
+        row = self._row("SELECT data FROM repos WHERE org = ? AND name = ?", (org, name))
+        return _loads(row[0]) if row else None
+
+    def metadata_response(self, org, repo, ref):
+        """The .metadata contents response on ref, or None if it does not exist."""
+        row = self._row("SELECT response FROM metadata WHERE org = ? AND repo = ? AND ref = ?", (org, repo, ref))
+        if row is None:
+            raise SnapshotMissError(f".metadata of {org}/{repo}@{ref} is not in the snapshot")
+        return _loads(row[0])
+
+    def metadata(self, org, repo, ref):
+        """Parsed .metadata on ref, or None if missing or unparseable."""
+        self.metadata_response(org, repo, ref)
+        row = self._row("SELECT parsed FROM metadata WHERE org = ? AND repo = ? AND ref = ?", (org, repo, ref))
+        return _loads(row[0])
+
+    def codeowners(self, org, repo, ref, path):
+        """Blob sha of the CODEOWNERS file at path on ref, or None if absent."""
+        row = self._row("SELECT sha FROM codeowners WHERE org = ? AND repo = ? AND ref = ? AND path = ?",
+                        (org, repo, ref, path))
+        if row is None:
+            raise SnapshotMissError(f"{path} of {org}/{repo}@{ref} is not in the snapshot")
+        return row[0]
+
+    def branches(self, org, repo):
+        self._require(org, repo, "branches")
+        rows = self._rows("SELECT data FROM branches WHERE org = ? AND repo = ? ORDER BY position", (org, repo))
+        return [_loads(row[0]) for row in rows]
+
+    def protection(self, org, repo, branch):
+        """
+        Branch protection, or None when the branch is unprotected or missing.
+
+        Branches listed as unprotected (or absent from the branch list) need
+        no stored row - the API would answer 404 for them.
+        """
+        row = self._row("SELECT data FROM protection WHERE org = ? AND repo = ? AND branch = ?",
+                        (org, repo, branch))
+        if row is not None:
+            return _loads(row[0])
+        self._require(org, repo, "branches")
+        listed = self._row("SELECT protected FROM branches WHERE org = ? AND repo = ? AND name = ?",
+                           (org, repo, branch))
+        if listed is None or not listed[0]:
+            return None
+        raise SnapshotMissError(f"protection of {org}/{repo}@{branch} is not in the snapshot")
+
+    def hooks(self, org, repo):
+        self._require(org, repo, "hooks")
+        rows = self._rows("SELECT data FROM hooks WHERE org = ? AND repo = ? ORDER BY position", (org, repo))
+        return [_loads(row[0]) for row in rows]
+
+    def collaborators(self, org, repo, affiliation):
+        self._require(org, repo, f"collaborators:{affiliation}")
+        rows = self._rows(
+            "SELECT data FROM collaborators WHERE org = ? AND repo = ? AND affiliation = ? ORDER BY position",
+            (org, repo, affiliation)
+        )
+        return [_loads(row[0]) for row in rows]
+
+    def teams(self, org, repo):
+        self._require(org, repo, "teams")
+        rows = self._rows("SELECT data FROM teams WHERE org = ? AND repo = ? ORDER BY position", (org, repo))
+        return [_loads(row[0]) for row in rows]
+
+    def repos_with_team(self, org, slug):
+        """Names of the repositories a team has access to."""
+        return [row[0] for row in self._rows(
+            "SELECT DISTINCT repo FROM teams WHERE org = ? AND slug = ? ORDER BY repo", (org, slug)
+        )]
+
+    def evaluations(self, org, repo):
+        """{checker: {"result": ..., "evaluated_at": ...}} for one repository."""
+        rows = self._rows("SELECT checker, result, evaluated_at FROM evaluations WHERE org = ? AND repo = ?",
+                          (org, repo))
+        return {checker: {"result": _loads(result), "evaluated_at": at} for checker, result, at in rows}
+
+    def counts(self):
+        """Row count per table (for the info command)."""
+        tables = ["orgs", "user_events", "repos"] + REPO_TABLES
+        return {t: self._row(f"SELECT COUNT(*) FROM {t}")[0] for t in tables}
+
+
+# =============================================================================
+# SNAPSHOT-BACKED API CLIENT
+# =============================================================================
+
+_ORG = r"/orgs/(?P<org>[^/]+)"
+_REPO = r"/repos/(?P<org>[^/]+)/(?P<repo>[^/]+)"
+
+ROUTES = [
+    (re.compile(rf"^{_ORG}$"), "_org"),
+    (re.compile(rf"^{_ORG}/hooks$"), "_org_hooks"),
+    (re.compile(rf"^{_ORG}/members$"), "_org_members"),
+    (re.compile(rf"^{_ORG}/repos$"), "_org_repos"),
+    (re.compile(r"^/users/(?P<login>[^/]+)/events$"), "_user_events"),
+    (re.compile(rf"^{_REPO}$"), "_repo"),
+    (re.compile(rf"^{_REPO}/contents/(?P<path>.+)$"), "_contents"),
+    (re.compile(rf"^{_REPO}/branches$"), "_branches"),
+    (re.compile(rf"^{_REPO}/branches/(?P<branch>.+)/protection$"), "_protection"),
+    (re.compile(rf"^{_REPO}/hooks$"), "_hooks"),
+    (re.compile(rf"^{_REPO}/collaborators$"), "_collaborators"),
+    (re.compile(rf"^{_REPO}/teams$"), "_teams"),
+]
+
+
+class SnapshotAPIClient:
+    """
+    Read-only stand-in for the scripts' GitHubAPIClient that answers GET
+    endpoints from an InventorySnapshot. Makes no network calls.
+
+    Endpoints the snapshot cannot answer raise SnapshotMissError; writes
+    raise SnapshotError.
+    """
+
+    def __init__(self, snapshot):
+        self.snapshot = snapshot
+        self.etags = {}
+
+    def _route(self, endpoint):
+        parts = urlsplit(endpoint)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        for pattern, handler in ROUTES:
+            match = pattern.match(parts.path)
+            if match:
+                return getattr(self, handler)(query, **match.groupdict())
+        raise SnapshotMissError(f"{endpoint} is not served from the snapshot")
+
+    def _org(self, query, org):
+        return self.snapshot.org(org)
+
+    def _org_hooks(self, query, org):
+        return self.snapshot.org_hooks(org)
+
+    def _org_members(self, query, org):
+        if query.get("role") != "admin":
+            raise SnapshotMissError(f"only admin members of {org} are in the snapshot")
+        return self.snapshot.org_admins(org)
+
+    def _org_repos(self, query, org):
+        return self.snapshot.repos(org)
+
+    def _user_events(self, query, login):
+        return self.snapshot.user_events(login)
+
+    def _repo(self, query, org, repo):
+        return self.snapshot.repo(org, repo)
+
+    def _contents(self, query, org, repo, path):
+        ref = query.get("ref")
+        if ref is None:
+            data = self.snapshot.repo(org, repo)
+            ref = data.get("default_branch") if data else None
+        if path == METADATA_PATH:
+            return self.snapshot.metadata_response(org, repo, ref)
+        if path in CODEOWNERS_LOCATIONS:
+            sha = self.snapshot.codeowners(org, repo, ref, path)
+            if sha is None:
+                return None
+            return {"name": "CODEOWNERS", "path": path, "sha": sha, "type": "file"}
+        raise SnapshotMissError(f"{path} of {org}/{repo} is not in the snapshot")
+
+    def _branches(self, query, org, repo):
+        return self.snapshot.branches(org, repo)
+
+    def _protection(self, query, org, repo, branch):
+        return self.snapshot.protection(org, repo, branch)
+
+    def _hooks(self, query, org, repo):
+        return self.snapshot.hooks(org, repo)
+
+    def _collaborators(self, query, org, repo):
+        affiliation = query.get("affiliation")
+        if affiliation not in COLLABORATOR_AFFILIATIONS:
+            raise SnapshotMissError(f"collaborators of {org}/{repo} with affiliation={affiliation} are not in the snapshot")
+        return self.snapshot.collaborators(org, repo, affiliation)
+
+    def _teams(self, query, org, repo):
+        return self.snapshot.teams(org, repo)
+
+    def get(self, endpoint, allow_404=False):
+        """Answer a GET from the snapshot (None for a recorded 404 if allow_404)."""
+        data = self._route(endpoint)
+        if data is None and not allow_404:
+            raise requests.exceptions.HTTPError(f"404 Client Error: Not Found (snapshot) for {endpoint}")
+        return data
+
+    def get_conditional(self, endpoint, etag=None):
+        data = self._route(endpoint)
+        return (404, None) if data is None else (200, data)
+
+    def paginate(self, endpoint):
+        data = self.get(endpoint)
+        return list(data) if isinstance(data, list) else [data]
+
+    def put(self, endpoint, data):
+        raise SnapshotError(f"PUT {endpoint}: the snapshot is read-only")
+
+    def patch(self, endpoint, data):
+        raise SnapshotError(f"PATCH {endpoint}: the snapshot is read-only")
+
+    def delete(self, endpoint):
+        raise SnapshotError(f"DELETE {endpoint}: the snapshot is read-only")
+
+
+def open_offline_client(path):
+    """
+    SnapshotAPIClient over an existing snapshot file (--offline).
+
+    Raises SnapshotError for a missing file rather than creating an empty
+    snapshot that would report every repository as missing.
+    """
+    if not os.path.exists(path):
+        raise SnapshotError(f"snapshot not found: {path}")
+    return SnapshotAPIClient(InventorySnapshot(path))
+
+
+# =============================================================================
+# CRAWLER
+# =============================================================================
+
+class GitHubAPIClient:
+    """Minimal GitHub GET client used by the crawler."""
+
+    def __init__(self, base_url, token, session=None):
+        self.base_url = base_url.rstrip("/")
+        self.headers = {
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json"
+        }
+        self.http = session or requests
+
+    def get(self, endpoint, allow_404=False):
+        response = self.http.get(f"{self.base_url}{endpoint}", headers=self.headers, verify=False)
+        if response.status_code == 404 and allow_404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    def paginate(self, endpoint):
+        results = []
+        url = f"{self.base_url}{endpoint}"
+        while url:
+            response = self.http.get(url, headers=self.headers, verify=False)
+            response.raise_for_status()
+            data = response.json()
+            if isinstance(data, list):
+                results.extend(data)
+            else:
+                results.append(data)
+            url = None
+            for link in response.headers.get("Link", "").split(","):
+                if 'rel="next"' in link:
+                    url = link.split(";")[0].strip()[1:-1]
+                    break
+        return results
+
+
+class SnapshotCrawler:
+    """
+    Fills an InventorySnapshot from the GitHub API.
+
+    A failure on one part of one repository is recorded in crawl_errors and
+    does not stop the crawl; reading that part later raises SnapshotMissError.
+    """
+
+    def __init__(self, api_client, snapshot, workers=DEFAULT_REPO_WORKERS):
+        self.api = api_client
+        self.snapshot = snapshot
+        self.workers = workers
+
+    def crawl_org(self, org):
+        """
+        Crawl one organization and all of its repositories.
+
+        Returns:
+            dict: {"repositories": int, "errors": int}
+        """
+        print(f"  [{org}] Fetching organization settings...")
+        org_data = self.api.get(f"/orgs/{org}")
+        try:
+            hooks = self.api.get(f"/orgs/{org}/hooks", allow_404=True) or []
+        except requests.exceptions.RequestException as e:
+            print(f"  [{org}] WARNING: org hooks not readable: {e}")
+            hooks = None  # Left out of the snapshot rather than recorded as "no hooks"
+        admins = self.api.paginate(f"/orgs/{org}/members?role=admin&per_page=100")
+        for admin in admins:
+            events = self.api.get(f"/users/{admin['login']}/events?per_page=10", allow_404=True)
+            self.snapshot.put_user_events(admin["login"], events)
+        self.snapshot.put_org(org, org_data, hooks, admins)
+
+        repos = self.api.paginate(f"/orgs/{org}/repos?per_page=100")
+        print(f"  [{org}] Crawling {len(repos)} repositories...")
+        self.snapshot.put_repos(org, repos)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            errors = sum(executor.map(lambda repo_data: self.crawl_repo(org, repo_data), repos))
+
+        print(f"  [{org}] {len(repos)} repositories crawled, {errors} error(s)")
+        return {"repositories": len(repos), "errors": errors}
+
+    def crawl_repo(self, org, repo_data, parts=None):
+        """
+        Crawl one repository into the snapshot.
+
+        Args:
+            org: Organization name
+            repo_data: Repository object (as listed by /orgs/{org}/repos)
+            parts: Subset of REPO_PARTS to refresh; None re-crawls everything
+                   and forgets what was stored before
+
+        Returns:
+            int: Number of parts that could not be crawled
+        """
+        name = repo_data["name"]
+        self.snapshot.put_repo(org, repo_data)
+        if parts is None:
+            parts = REPO_PARTS
+            self.snapshot.reset_repo(org, name)
+        errors = 0
+
+        def attempt(part, fn):
+            nonlocal errors
+            try:
+                fn()
+            except requests.exceptions.RequestException as e:
+                errors += 1
+                self.snapshot.record_error(org, name, part, e)
+                print(f"    [{name}] ERROR crawling {part}: {e}")
+
+        if "branches" in parts:
+            attempt("branches", lambda: self.snapshot.put_branches(
+                org, name, self.api.paginate(f"/repos/{org}/{name}/branches?per_page=100")
+            ))
+        try:
+            branches = self.snapshot.branches(org, name)
+        except SnapshotMissError:
+            branches = []
+
+        if "files" in parts:
+            heads = {b["name"]: (b.get("commit") or {}).get("sha") for b in branches}
+            for ref in tracked_refs(repo_data):
+                attempt(f"files:{ref}", lambda ref=ref: self.crawl_files(org, name, ref, heads.get(ref)))
+
+        if "protection" in parts:
+            attempt("protection", lambda: self.snapshot.put_protections(org, name, {
+                b["name"]: self.api.get(f"/repos/{org}/{name}/branches/{b['name']}/protection", allow_404=True)
+                for b in branches if b.get("protected")
+            }))
+
+        if "hooks" in parts:
+            attempt("hooks", lambda: self.snapshot.put_hooks(
+                org, name, self.api.get(f"/repos/{org}/{name}/hooks", allow_404=True)
+            ))
+        if "collaborators" in parts:
+            for affiliation in COLLABORATOR_AFFILIATIONS:
+                attempt(f"collaborators:{affiliation}", lambda affiliation=affiliation: self.snapshot.put_collaborators(
+                    org, name, affiliation,
+                    self.api.paginate(f"/repos/{org}/{name}/collaborators?affiliation={affiliation}&per_page=100")
+                ))
+        if "teams" in parts:
+            attempt("teams", lambda: self.snapshot.put_teams(
+                org, name, self.api.paginate(f"/repos/{org}/{name}/teams?per_page=100")
+            ))
+        return errors
+
+    def crawl_files(self, org, repo, ref, head_sha):
+        """
+        Record .metadata and CODEOWNERS on ref, reading only what exists.
+
+        head_sha is the branch head from the branch list (None if the branch
+        does not exist, in which case nothing is read).
+        """
+        if not head_sha:
+            self.snapshot.put_metadata(org, repo, ref, None)
+            self.snapshot.put_codeowners(org, repo, ref, {})
+            return
+
+        root = self._tree(org, repo, head_sha)
+        locations = {}
+        if root.get("CODEOWNERS", {}).get("type") == "blob":
+            locations["CODEOWNERS"] = root["CODEOWNERS"]["sha"]
+        for directory in ("docs", ".github"):
+            entry = root.get(directory)
+            if entry and entry.get("type") == "tree":
+                sub = self._tree(org, repo, entry["sha"]).get("CODEOWNERS")
+                if sub and sub.get("type") == "blob":
+                    locations[f"{directory}/CODEOWNERS"] = sub["sha"]
+        self.snapshot.put_codeowners(org, repo, ref, locations)
+
+        metadata = None
+        if root.get(METADATA_PATH, {}).get("type") == "blob":
+            metadata = self.api.get(f"/repos/{org}/{repo}/contents/{METADATA_PATH}?ref={ref}", allow_404=True)
+        self.snapshot.put_metadata(org, repo, ref, metadata)
+
+    def _tree(self, org, repo, sha):
+        tree = self.api.get(f"/repos/{org}/{repo}/git/trees/{sha}")
+        return {entry["path"]: entry for entry in tree.get("tree", [])}
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Crawl GitHub organizations into an SQLite inventory snapshot.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python inventory_snapshot.py snapshot --orgs tornado,vmwsolutions
+  python inventory_snapshot.py snapshot --orgs tornado --db tornado.db --workers 16
+  python inventory_snapshot.py info --db tornado.db
+        """
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    crawl = subparsers.add_parser("snapshot", help="Crawl organizations into the snapshot")
+    crawl.add_argument("--orgs", type=parse_orgs, required=True,
+                       help="Comma-separated organizations to crawl")
+    crawl.add_argument("--db", default=DEFAULT_DB, help=f"Snapshot file (default: {DEFAULT_DB})")
+    crawl.add_argument("--workers", type=int, default=DEFAULT_REPO_WORKERS,
+                       help=f"Repositories crawled concurrently per organization (default: {DEFAULT_REPO_WORKERS})")
+
+    info = subparsers.add_parser("info", help="Show what a snapshot contains")
+    info.add_argument("--db", default=DEFAULT_DB, help=f"Snapshot file (default: {DEFAULT_DB})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("\n" + "=" * 60)
+    print("INVENTORY SNAPSHOT")
+    print("=" * 60)
+
+    if args.command == "info":
+        if not os.path.exists(args.db):
+            print(f"ERROR: snapshot not found: {args.db}")
+            return
+        snapshot = InventorySnapshot(args.db)
+        print(f"  Snapshot     : {args.db}")
+        for org in snapshot.orgs():
+            row = snapshot._row("SELECT crawled_at FROM orgs WHERE org = ?", (org,))
+            print(f"  Organization : {org} (crawled {row[0]})")
+        for table, count in snapshot.counts().items():
+            print(f"    {table:<14}: {count}")
+        return
+
+    if not GITHUB_TOKEN:
+        print("ERROR: GITHUB_TOKEN environment variable is not set.")
+        return
+
+    print(f"  API Base URL : {GITHUB_BASE}")
+    print(f"  Organizations: {', '.join(args.orgs)}")
+    print(f"  Snapshot     : {args.db}")
+
+    session = RateLimitedSession(pool_size=max(DEFAULT_ORG_WORKERS, args.workers) * 2)
+    api_client = GitHubAPIClient(GITHUB_BASE, GITHUB_TOKEN, session=session)
+    snapshot = InventorySnapshot(args.db)
+    crawler = SnapshotCrawler(api_client, snapshot, workers=args.workers)
+
+    start = time.monotonic()
+    outcomes = run_orgs(args.orgs, crawler.crawl_org, max_workers=min(len(args.orgs), DEFAULT_ORG_WORKERS))
+    snapshot.set_info("crawled_at", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    snapshot.close()
+
+    print("\n" + "=" * 60)
+    print("SUMMARY")
+    print("=" * 60)
+    for org, outcome in outcomes.items():
+        if "error" in outcome:
+            print(f"  {org}: FAILED ({outcome['error']})")
+        else:
+            result = outcome["result"]
+            print(f"  {org}: {result['repositories']} repositories, {result['errors']} error(s)")
+    print(f"\n  Elapsed: {time.monotonic() - start:.0f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -12,10 +12,18 @@ HOW TO RUN:
 
     2. Run:
        python list_archived_repos.py
+       python list_archived_repos.py --orgs tornado,vmwsolution,other-org
+       python list_archived_repos.py --snapshot inventory_snapshot.db
 
     3. Output files will be generated:
-       - archived_repos_report.json
-       - archived_repos_report.xlsx
+       - archived_repos_report.json          (all organizations)
+       - archived_repos_report.xlsx          (all organizations)
+       - archived_repos_report_<org>.json    (one per organization)
+
+    Organizations are scanned concurrently over one shared client, so they
+    share a single connection pool and rate-limit budget (see multi_org.py).
+    With --snapshot the repositories are read from an inventory snapshot
+    (see inventory_snapshot.py) and no API calls are made.
 
 Author: GitHub Compliance Team
 Last Updated: 2026
@@ -25,14 +33,15 @@ Last Updated: 2026
 import os
 import json
 import time
+import argparse
 import requests
 import urllib3
 from datetime import datetime
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Border, Side
+from multi_org import RateLimitedSession, parse_orgs, run_orgs, DEFAULT_ORG_WORKERS
+from inventory_snapshot import InventorySnapshot, SnapshotAPIClient
 
 # =============================================================================
 # CONFIGURATION
@@ -52,18 +61,19 @@ SLEEP_INTERVAL = 0.3
 # =============================================================================
 
 class GitHubAPIClient:
-    def __init__(self, base_url, token):
+    def __init__(self, base_url, token, session=None):
         self.base_url = base_url.rstrip("/")
         self.headers = {
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github.v3+json"
         }
+        self.http = session or requests
 
     def paginate(self, endpoint):
         results = []
         url = f"{self.base_url}{endpoint}"
         while url:
-            response = requests.get(url, headers=self.headers, verify=False)
+            response = self.http.get(url, headers=self.headers, verify=False)
             response.raise_for_status()
             data = response.json()
             if isinstance(data, list):
@@ -107,13 +117,13 @@ def list_archived_repos(api_client, org_name):
 # REPORT GENERATORS
 # =============================================================================
 
-def generate_json_report(all_archived, filepath="archived_repos_report.json"):
+def generate_json_report(all_archived, orgs=TARGET_ORGS, filepath="archived_repos_report.json"):
     report = {
         "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "organizations": TARGET_ORGS,
+        "organizations": orgs,
         "summary": {
             org: sum(1 for r in all_archived if r["organization"] == org)
-            for org in TARGET_ORGS
+            for org in orgs
         },
         "total_archived": len(all_archived),
         "archived_repos": all_archived
@@ -123,7 +133,11 @@ def generate_json_report(all_archived, filepath="archived_repos_report.json"):
     print(f"  JSON report saved: {filepath}")
 
 
-def generate_excel_report(all_archived, filepath="archived_repos_report.xlsx"):
+def generate_excel_report(all_archived, orgs=TARGET_ORGS, filepath="archived_repos_report.xlsx"):
+    # Imported here so JSON-only runs never load openpyxl
+    import openpyxl
+    from openpyxl.styles import Font, PatternFill, Border, Side
+
     wb = openpyxl.Workbook()
 
     # Styles
@@ -147,7 +161,7 @@ def generate_excel_report(all_archived, filepath="archived_repos_report.xlsx"):
         ["", ""],
         ["Organization", "Archived Repos"],
     ]
-    for org in TARGET_ORGS:
+    for org in orgs:
         count = sum(1 for r in all_archived if r["organization"] == org)
         summary_data.append([org, count])
     summary_data.append(["", ""])
@@ -165,7 +179,7 @@ def generate_excel_report(all_archived, filepath="archived_repos_report.xlsx"):
     ws_summary.column_dimensions['B'].width = 20
 
     # Per-org sheets
-    for org in TARGET_ORGS:
+    for org in orgs:
         org_repos = [r for r in all_archived if r["organization"] == org]
         ws = wb.create_sheet(org)
 
@@ -233,40 +247,77 @@ def generate_excel_report(all_archived, filepath="archived_repos_report.xlsx"):
 # MAIN
 # =============================================================================
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="List archived repositories for GitHub organizations")
+    parser.add_argument(
+        "--orgs",
+        type=parse_orgs,
+        default=TARGET_ORGS,
+        help=f"Comma-separated organizations to scan (default: {','.join(TARGET_ORGS)})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_ORG_WORKERS,
+        help=f"Organizations scanned concurrently (default: {DEFAULT_ORG_WORKERS})"
+    )
+    parser.add_argument(
+        "--snapshot",
+        metavar="DB",
+        help="Read repositories from this inventory snapshot instead of the API"
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    orgs = args.orgs
+
     print("\n" + "=" * 60)
     print("ARCHIVED REPOSITORY LISTER")
     print("=" * 60)
 
-    if not GITHUB_TOKEN:
-        print("ERROR: GITHUB_TOKEN environment variable is not set.")
-        return
-    if not GITHUB_BASE:
-        print("ERROR: GITHUB_BASE environment variable is not set.")
-        return
-
-    print(f"\n  API Base URL : {GITHUB_BASE}")
-    print(f"  Organizations: {', '.join(TARGET_ORGS)}")
-
-    api_client = GitHubAPIClient(GITHUB_BASE, GITHUB_TOKEN)
+    if args.snapshot:
+        if not os.path.exists(args.snapshot):
+            print(f"ERROR: snapshot not found: {args.snapshot}")
+            return
+        print(f"\n  Snapshot     : {args.snapshot}")
+        api_client = SnapshotAPIClient(InventorySnapshot(args.snapshot))
+    else:
+        if not GITHUB_TOKEN:
+            print("ERROR: GITHUB_TOKEN environment variable is not set.")
+            return
+        if not GITHUB_BASE:
+            print("ERROR: GITHUB_BASE environment variable is not set.")
+            return
+        print(f"\n  API Base URL : {GITHUB_BASE}")
+        api_client = GitHubAPIClient(GITHUB_BASE, GITHUB_TOKEN, session=RateLimitedSession())
+
+    print(f"  Organizations: {', '.join(orgs)}")
+
+    outcomes = run_orgs(orgs, lambda org: list_archived_repos(api_client, org), max_workers=args.workers)
 
     all_archived = []
-    for org in TARGET_ORGS:
-        archived = list_archived_repos(api_client, org)
-        all_archived.extend(archived)
+    for org, outcome in outcomes.items():
+        all_archived.extend(outcome.get("result") or [])
 
     print(f"\n  Total archived repos found: {len(all_archived)}")
 
     print("\nGenerating Reports...")
-    generate_json_report(all_archived)
-    generate_excel_report(all_archived)
+    generate_json_report(all_archived, orgs)
+    generate_excel_report(all_archived, orgs)
+    for org, outcome in outcomes.items():
+        if "result" in outcome:
+            generate_json_report(outcome["result"], [org], f"archived_repos_report_{org}.json")
 
     print("\n" + "=" * 60)
     print("SUMMARY")
     print("=" * 60)
-    for org in TARGET_ORGS:
-        count = sum(1 for r in all_archived if r["organization"] == org)
-        print(f"  {org}: {count} archived repo(s)")
+    for org, outcome in outcomes.items():
+        if "error" in outcome:
+            print(f"  {org}: FAILED ({outcome['error']})")
+        else:
+            print(f"  {org}: {len(outcome['result'])} archived repo(s)")
     print(f"\n  Total: {len(all_archived)} archived repo(s)")
     print("\n" + "=" * 60)
 
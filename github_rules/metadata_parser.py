@@ -0,0 +1,152 @@
+"""
+================================================================================
+.METADATA PARSER
+================================================================================
+
+Shared by the compliance checkers, inventory_snapshot.py and the CODEOWNERS
+scripts to parse .metadata files the same way everywhere:
+
+    1. Normalise characters that break YAML/JSON parsing in hand-edited
+       files (non-breaking spaces, smart quotes) with one str.translate
+       table.
+    2. Parse as YAML with the C loader (libyaml) when PyYAML was built with
+       it, the pure-Python SafeLoader otherwise. PyYAML is imported on the
+       first parse, not when this module is imported.
+    3. Fall back to JSON if YAML fails (or PyYAML is not installed).
+
+Results are cached by the git blob SHA of the content - the "sha" GitHub
+returns with every contents response - so the many repositories sharing
+the same .metadata template are decoded and parsed once per process.
+Cached results are shared between callers and must not be modified.
+
+Set METADATA_DEBUG=1 to print per-file diagnostics (content preview and
+non-ASCII characters); they are not computed otherwise.
+================================================================================
+"""
+
+import os
+import json
+import base64
+import threading
+
+from git_data_writer import git_blob_sha
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+METADATA_DEBUG = os.environ.get("METADATA_DEBUG", "").lower() in ("1", "true", "yes")
+
+CACHE_SIZE = 4096  # Distinct .metadata contents kept (oldest dropped first)
+
+# Smart quotes and non-breaking spaces that break JSON/YAML parsing
+NORMALISE = str.maketrans({
+    "\u00a0": " ",
+    "\u201c": '"',
+    "\u201d": '"',
+    "\u2018": "'",
+    "\u2019": "'",
+})
+
+_cache = {}
+_cache_lock = threading.Lock()
+_yaml = None  # (yaml module, loader) or False; set on first parse
+
+
+# =============================================================================
+# PARSER
+# =============================================================================
+
+def _yaml_loader():
+    """
+    Import PyYAML on first use (it is optional and slow to import).
+
+    Returns:
+        tuple: (yaml module, CSafeLoader or SafeLoader), or None without PyYAML
+    """
+    global _yaml
+    if _yaml is None:
+        try:
+            import yaml
+            _yaml = (yaml, getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+        except ImportError:
+            _yaml = False
+    return _yaml or None
+
+
+def _parse(content):
+    """Normalise and parse decoded content. Returns (result, [(format, error), ...])."""
+    content = content.translate(NORMALISE)
+    errors = []
+    loader = _yaml_loader()
+    if loader:
+        yaml, yaml_loader = loader
+        try:
+            return yaml.load(content, Loader=yaml_loader), errors
+        except Exception as e:
+            errors.append(("YAML", str(e)))
+    try:
+        return json.loads(content), errors
+    except Exception as e:
+        errors.append(("JSON", str(e)))
+    return None, errors
+
+
+def _cached(key, decode, warn):
+    entry = _cache.get(key)
+    if entry is None:
+        entry = _parse(decode())
+        with _cache_lock:
+            if len(_cache) >= CACHE_SIZE:
+                _cache.pop(next(iter(_cache)), None)
+            _cache[key] = entry
+    result, errors = entry
+    if warn:
+        for fmt, error in errors:
+            warn(fmt, error)
+    return result
+
+
+def parse_metadata(content, warn=None):
+    """
+    Parse decoded .metadata content.
+
+    Args:
+        content: File content (str or UTF-8 bytes)
+        warn: Optional callback(format, error) for each failed parse attempt
+              ("YAML" then "JSON"); also called when the result is cached
+
+    Returns:
+        dict/list or None if it cannot be parsed
+    """
+    if isinstance(content, bytes):
+        content = content.decode("utf-8")
+    return _cached(git_blob_sha(content), lambda: content, warn)
+
+
+def parse_metadata_response(response, warn=None):
+    """
+    Parse a contents API response for .metadata.
+
+    The response's blob "sha" is the cache key, so repeated content is
+    neither base64-decoded nor parsed again.
+
+    Raises:
+        ValueError: If the content is not valid base64/UTF-8
+    """
+    raw_content = response.get("content", "")
+    decode = lambda: base64.b64decode(raw_content).decode("utf-8")
+    key = response.get("sha")
+    if not key:
+        return parse_metadata(decode(), warn)
+    return _cached(key, decode, warn)
+
+
+def metadata_diagnostics(content):
+    """Debug lines describing decoded content: size, preview and non-ASCII characters."""
+    lines = [f"{len(content)} chars", f"First 200 chars: {content[:200]!r}"]
+    non_ascii = [(i, ch, f"U+{ord(ch):04X}") for i, ch in enumerate(content) if ord(ch) > 127]
+    if non_ascii:
+        lines.append(f"Found {len(non_ascii)} non-ASCII chars: {non_ascii[:10]}")
+    return lines
@@ -0,0 +1,180 @@
+"""
+================================================================================
+MULTI-ORGANIZATION RUNS
+================================================================================
+
+Shared by list_archived_repos.py and the org/repo/branch compliance scripts
+to scan several organizations concurrently in one process (--orgs a,b,c).
+
+All organizations share ONE GitHubAPIClient backed by a RateLimitedSession:
+    - One connection pool instead of one TLS connection per request
+    - One request budget: requests from every worker thread are spaced by a
+      shared minimum interval, and when GitHub reports the token is nearly
+      exhausted (X-RateLimit-Remaining) or asks to back off (Retry-After),
+      ALL workers pause together instead of each hitting the limit.
+
+Each organization still gets its own reports (suffixed with the org name);
+a combined JSON report collects the per-org results and summaries.
+================================================================================
+"""
+
+import json
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from rule_registry import json_default
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+DEFAULT_ORG_WORKERS = 4
+SHARED_MIN_INTERVAL = 0.1     # Minimum gap between any two requests (seconds)
+RATE_LIMIT_LOW_WATERMARK = 50  # Pause everyone when this few requests remain
+
+
+# =============================================================================
+# SHARED SESSION
+# =============================================================================
+
+class RateLimitedSession(requests.Session):
+    """
+    requests.Session with a connection pool and a request budget shared by
+    every thread that uses it.
+    """
+
+    def __init__(self, min_interval=SHARED_MIN_INTERVAL, pool_size=DEFAULT_ORG_WORKERS * 4,
+                 low_watermark=RATE_LIMIT_LOW_WATERMARK):
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+        self.min_interval = min_interval
+        self.low_watermark = low_watermark
+        self.remaining = None
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+
+    def request(self, method, url, *args, **kwargs):
+        """Wait for a slot in the shared budget, send, then update the budget."""
+        self._acquire()
+        response = super().request(method, url, *args, **kwargs)
+        self._observe(response)
+        return response
+
+    def _acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot, self._paused_until)
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _observe(self, response):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is not None and remaining.isdigit():
+            self.remaining = int(remaining)
+            if self.remaining <= self.low_watermark and reset and reset.isdigit():
+                wait = max(0, int(reset) - time.time())
+                print(f"  Rate limit low ({self.remaining} left) - pausing all workers for {wait:.0f}s")
+                self._pause(wait)
+
+        retry_after = response.headers.get("Retry-After")
+        if response.status_code in (403, 429) and retry_after and retry_after.isdigit():
+            print(f"  Rate limited - pausing all workers for {retry_after}s")
+            self._pause(int(retry_after))
+
+
+# =============================================================================
+# CONCURRENT ORG RUNNER
+# =============================================================================
+
+def parse_orgs(value):
+    """Split a comma-separated --orgs value, dropping blanks and duplicates."""
+    orgs = []
+    for org in value.split(","):
+        org = org.strip()
+        if org and org not in orgs:
+            orgs.append(org)
+    return orgs
+
+
+def run_orgs(orgs, scan_fn, max_workers=DEFAULT_ORG_WORKERS):
+    """
+    Run scan_fn(org) for every organization concurrently.
+
+    A failure in one organization is recorded and does not stop the others.
+
+    Args:
+        orgs: List of organization names
+        scan_fn: Callable taking an org name and returning its result
+        max_workers: Number of organizations scanned at the same time
+
+    Returns:
+        dict: org -> {"result": ...} or {"error": "..."}, in the order of orgs
+    """
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(scan_fn, org): org for org in orgs}
+        for future in as_completed(futures):
+            org = futures[future]
+            try:
+                outcomes[org] = {"result": future.result()}
+                print(f"\n  [{org}] done")
+            except Exception as e:
+                outcomes[org] = {"error": str(e)}
+                print(f"\n  [{org}] ERROR: {e}")
+    return {org: outcomes[org] for org in orgs}
+
+
+def write_combined_report(report_type, outcomes, filepath):
+    """
+    Merge the per-org JSON reports into one combined JSON report.
+
+    Args:
+        report_type: Report title (e.g. "Branch Protection Compliance")
+        outcomes: Output of run_orgs() where each result may hold "json_report"
+        filepath: Output path
+
+    Returns:
+        dict: The combined report
+    """
+    combined = {
+        "report_type": f"{report_type} (Multi-Organization)",
+        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "organizations": list(outcomes),
+        "summary": {},
+        "errors": {},
+        "reports": {}
+    }
+
+    for org, outcome in outcomes.items():
+        if "error" in outcome:
+            combined["errors"][org] = outcome["error"]
+            continue
+        result = outcome["result"] or {}
+        json_report = result.get("json_report")
+        if json_report:
+            with open(json_report, "r", encoding="utf-8") as f:
+                report = json.load(f)
+            combined["summary"][org] = report.get("summary")
+            combined["reports"][org] = report
+        else:
+            combined["summary"][org] = result
+
+    with open(filepath, "w", encoding="utf-8") as f:
+        json.dump(combined, f, indent=2, default=json_default)
+
+    print(f"  Combined JSON report saved: {filepath}")
+    return combined
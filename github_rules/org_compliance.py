@@ -12,11 +12,27 @@ HOW TO RUN:
        - GITHUB_BASE: GitHub API base URL (e.g., https://api.github.example.com)
     
     2. Run: python org_compliance.py
+       Fix:  python org_compliance.py --apply [--dry-run]
+       Or split the fix into a reviewed plan and a later execution:
+             python org_compliance.py --plan plan.json
+             python org_compliance.py --execute plan.json
+       Several organizations at once (check only, GITHUB_ORG not needed):
+             python org_compliance.py --orgs org-a,org-b,org-c
+       Offline from an inventory snapshot (check only, no API calls):
+             python org_compliance.py --offline inventory_snapshot.db
+       Only some rules (check only, skips fetching data they don't read):
+             python org_compliance.py --rules default_repository_permission,unsecure_org_hooks
     
     3. Output files will be generated:
        - org_compliance_report.json
        - org_compliance_report.md
        - org_compliance_report.xlsx
+       With --orgs: org_compliance_report_<org>.* per organization
+       plus org_compliance_report_combined.json
+       The formats are rendered in parallel worker processes; leave some
+       out with --skip-formats (e.g. --skip-formats excel,markdown).
+       With --history DB the rule outcomes are also recorded for run-to-run
+       deltas: python compliance_history.py delta --scope organization --org <org>
 
 RULES CHECKED (Reference: IBM Cloud Policy 3.1.3, 3.1.4, ITSS Chapter 2):
 
@@ -87,13 +103,18 @@ import requests
 import urllib3
 from datetime import datetime, timedelta, timezone
 
+from remediation_plan import RemediationPlan, execute_plan, DEFAULT_WORKERS
+from multi_org import RateLimitedSession, parse_orgs, run_orgs, write_combined_report
+from rule_registry import Rule, RuleRegistry, RuleEngine, RuleInputs, parse_rule_names, json_default
+from report_renderer import render_reports, parse_formats
+from compliance_history import record_results
+from result_matrix import ResultMatrix
+from metadata_parser import parse_metadata_response
+from inventory_snapshot import open_offline_client, SnapshotError
+
 # Disable SSL warnings for GHE with self-signed certificates
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# Excel support (required for report generation)
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-
 
 # =============================================================================
 # CONFIGURATION
@@ -116,12 +137,16 @@ class GitHubAPIClient:
     Simple GitHub API client with authentication and pagination support.
     """
     
-    def __init__(self, base_url, token):
+    def __init__(self, base_url, token, session=None):
         self.base_url = base_url.rstrip("/")
         self.headers = {
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github.v3+json"
         }
+        # ETag of the last successful GET per endpoint (used as --plan preconditions)
+        self.etags = {}
+        # Shared RateLimitedSession in --orgs mode, plain requests otherwise
+        self.http = session or requests
     
     def get(self, endpoint, allow_404=False):
         """
@@ -135,14 +160,41 @@ class GitHubAPIClient:
             dict or list: JSON response data
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.get(url, headers=self.headers, verify=False)
+        response = self.http.get(url, headers=self.headers, verify=False)
         
         if response.status_code == 404 and allow_404:
             return None
         
         response.raise_for_status()
+        self.etags[endpoint] = response.headers.get("ETag")
         return response.json()
     
+    def get_conditional(self, endpoint, etag=None):
+        """
+        Make a conditional GET request (If-None-Match) to the GitHub API.
+        
+        Used by --execute to verify plan preconditions. A 304 response does
+        not count against the rate limit.
+        
+        Args:
+            endpoint: API endpoint path
+            etag: ETag recorded when the plan was made
+        
+        Returns:
+            tuple: (status_code, JSON data or None for 304/404)
+        """
+        url = f"{self.base_url}{endpoint}"
+        headers = dict(self.headers)
+        if etag:
+            headers["If-None-Match"] = etag
+        response = self.http.get(url, headers=headers, verify=False)
+        
+        if response.status_code in (304, 404):
+            return response.status_code, None
+        
+        response.raise_for_status()
+        return response.status_code, response.json()
+    
     def paginate(self, endpoint):
         """
         Fetch all pages of a paginated API endpoint.
@@ -157,7 +209,7 @@ class GitHubAPIClient:
         url = f"{self.base_url}{endpoint}"
         
         while url:
-            response = requests.get(url, headers=self.headers, verify=False)
+            response = self.http.get(url, headers=self.headers, verify=False)
             response.raise_for_status()
             data = response.json()
             
@@ -190,7 +242,7 @@ class GitHubAPIClient:
             dict: Response JSON
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.put(url, headers=self.headers, json=data, verify=False)
+        response = self.http.put(url, headers=self.headers, json=data, verify=False)
         response.raise_for_status()
         return response.json() if response.text else {}
     
@@ -208,7 +260,7 @@ class GitHubAPIClient:
             dict: Response JSON
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.patch(url, headers=self.headers, json=data, verify=False)
+        response = self.http.patch(url, headers=self.headers, json=data, verify=False)
         response.raise_for_status()
         return response.json() if response.text else {}
     
@@ -223,24 +275,11 @@ class GitHubAPIClient:
             bool: True if successful
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.delete(url, headers=self.headers, verify=False)
+        response = self.http.delete(url, headers=self.headers, verify=False)
         response.raise_for_status()
         return True
 
 
-# =============================================================================
-# YAML SUPPORT
-# =============================================================================
-
-try:
-    import yaml
-    YAML_AVAILABLE = True
-except ImportError:
-    YAML_AVAILABLE = False
-
-import base64
-
-
 # =============================================================================
 # ORGANIZATION QUALIFICATION CHECKER
 # =============================================================================
@@ -280,20 +319,7 @@ class OrgQualificationChecker:
             return None
         
         try:
-            content = base64.b64decode(response.get("content", "")).decode("utf-8")
-            
-            if YAML_AVAILABLE:
-                try:
-                    return yaml.safe_load(content)
-                except:
-                    pass
-            
-            try:
-                return json.loads(content)
-            except:
-                pass
-            
-            return None
+            return parse_metadata_response(response)
         except Exception:
             return None
     
@@ -397,11 +423,13 @@ class OrgComplianceChecker:
     Checks organization-level settings against IBM CISO policy requirements.
     """
     
-    def __init__(self, api_client, org_name):
+    def __init__(self, api_client, org_name, rules=None):
         self.api = api_client
         self.org = org_name
         self.org_data = None
         self.results = []
+        # Selected rules (all by default); only their inputs are fetched
+        self.engine = RuleEngine(ORG_RULES, rules)
     
     def fetch_org_settings(self):
         """
@@ -414,11 +442,23 @@ class OrgComplianceChecker:
         self.org_data = self.api.get(f"/orgs/{self.org}")
         return self.org_data
     
+    def fetch_org_hooks(self):
+        """Fetch organization webhooks. API Call: GET /orgs/{org}/hooks"""
+        hooks = self.api.get(f"/orgs/{self.org}/hooks", allow_404=True) or []
+        time.sleep(SLEEP_INTERVAL)
+        return hooks
+    
+    def fetch_admins(self):
+        """Fetch organization admins. API Call: GET /orgs/{org}/members?role=admin"""
+        admins = self.api.paginate(f"/orgs/{self.org}/members?role=admin&per_page=100")
+        time.sleep(SLEEP_INTERVAL)
+        return admins
+    
     # =========================================================================
     # REQUIRED RULES
     # =========================================================================
     
-    def check_default_repository_permission(self):
+    def check_default_repository_permission(self, org_data):
         """
         REQUIRED RULE: default_repository_permission
         
@@ -438,7 +478,7 @@ class OrgComplianceChecker:
         print("    Checking: default_repository_permission (REQUIRED)")
         
         # Get current value from organization settings
-        current = self.org_data.get("default_repository_permission", "read")
+        current = org_data.get("default_repository_permission", "read")
         expected = "none"
         passed = current == expected
         
@@ -455,10 +495,9 @@ class OrgComplianceChecker:
                 "Base permissions correctly set to 'No permission'."
             )
         }
-        self.results.append(result)
         return result
     
-    def check_org_outside_collaborators(self):
+    def check_org_outside_collaborators(self, org_data):
         """
         REQUIRED RULE: org_outside_collaborators
         
@@ -479,7 +518,7 @@ class OrgComplianceChecker:
         print("    Checking: org_outside_collaborators (REQUIRED)")
         
         # Get current value - True means admins CAN add outside collaborators
-        can_invite = self.org_data.get("members_can_invite_outside_collaborators", True)
+        can_invite = org_data.get("members_can_invite_outside_collaborators", True)
         passed = not can_invite
         
         result = {
@@ -498,10 +537,9 @@ class OrgComplianceChecker:
         # Remove any accidental status: INFO for this rule
         if not passed:
             result.pop("status", None)
-        self.results.append(result)
         return result
     
-    def check_unsecure_org_hooks(self):
+    def check_unsecure_org_hooks(self, hooks):
         """
         REQUIRED RULE: unsecure_org_hooks
         
@@ -524,10 +562,6 @@ class OrgComplianceChecker:
         """
         print("    Checking: unsecure_org_hooks (REQUIRED)")
         
-        # Fetch all organization webhooks
-        hooks = self.api.get(f"/orgs/{self.org}/hooks", allow_404=True) or []
-        time.sleep(SLEEP_INTERVAL)
-        
         # Find hooks with SSL verification disabled
         # insecure_ssl = "1" or 1 or True means SSL is DISABLED (bad)
         # insecure_ssl = "0" or 0 or False or None means SSL is ENABLED (good)
@@ -562,14 +596,13 @@ class OrgComplianceChecker:
                 "All organization webhooks have SSL verification enabled."
             )
         }
-        self.results.append(result)
         return result
     
     # =========================================================================
     # RECOMMENDED RULES
     # =========================================================================
     
-    def check_members_can_create_public_repositories(self):
+    def check_members_can_create_public_repositories(self, org_data):
         """
         RECOMMENDED RULE: members_can_create_public_repositories
         
@@ -588,8 +621,8 @@ class OrgComplianceChecker:
         """
         print("    Checking: members_can_create_public_repositories (RECOMMENDED)")
         
-        can_create_public = self.org_data.get("members_can_create_public_repositories", True)
-        can_create_internal = self.org_data.get("members_can_create_internal_repositories", True)
+        can_create_public = org_data.get("members_can_create_public_repositories", True)
+        can_create_internal = org_data.get("members_can_create_internal_repositories", True)
         passed = not can_create_public
         
         result = {
@@ -605,10 +638,9 @@ class OrgComplianceChecker:
                 "Public repository creation is appropriately restricted."
             )
         }
-        self.results.append(result)
         return result
     
-    def check_visibility_change_disabled(self):
+    def check_visibility_change_disabled(self, org_data):
         """
         RECOMMENDED RULE: visibility_change_disabled
         
@@ -628,7 +660,7 @@ class OrgComplianceChecker:
         """
         print("    Checking: visibility_change_disabled (RECOMMENDED)")
         
-        can_change = self.org_data.get("members_can_change_repo_visibility", True)
+        can_change = org_data.get("members_can_change_repo_visibility", True)
         passed = not can_change
         
         result = {
@@ -644,10 +676,9 @@ class OrgComplianceChecker:
                 "Repository visibility changes are appropriately restricted."
             )
         }
-        self.results.append(result)
         return result
     
-    def check_delete_transfer_disabled(self):
+    def check_delete_transfer_disabled(self, org_data):
         """
         RECOMMENDED RULE: delete_transfer_disabled
         
@@ -667,7 +698,7 @@ class OrgComplianceChecker:
         """
         print("    Checking: delete_transfer_disabled (RECOMMENDED)")
         
-        can_delete = self.org_data.get("members_can_delete_repositories", True)
+        can_delete = org_data.get("members_can_delete_repositories", True)
         passed = not can_delete
         
         result = {
@@ -683,10 +714,9 @@ class OrgComplianceChecker:
                 "Repository deletion/transfer is appropriately restricted."
             )
         }
-        self.results.append(result)
         return result
     
-    def check_team_creation_disabled(self):
+    def check_team_creation_disabled(self, org_data):
         """
         RECOMMENDED RULE: team_creation_disabled
         
@@ -706,7 +736,7 @@ class OrgComplianceChecker:
         """
         print("    Checking: team_creation_disabled (RECOMMENDED)")
         
-        can_create = self.org_data.get("members_can_create_teams", True)
+        can_create = org_data.get("members_can_create_teams", True)
         passed = not can_create
         
         result = {
@@ -722,10 +752,9 @@ class OrgComplianceChecker:
                 "Team creation is appropriately restricted to admins."
             )
         }
-        self.results.append(result)
         return result
     
-    def check_admin_activity_6_months(self):
+    def check_admin_activity_6_months(self, admins):
         """
         RECOMMENDED RULE: admin_activity_6_months
         
@@ -747,10 +776,6 @@ class OrgComplianceChecker:
         """
         print("    Checking: admin_activity_6_months (RECOMMENDED)")
         
-        # Fetch organization admins
-        admins = self.api.paginate(f"/orgs/{self.org}/members?role=admin&per_page=100")
-        time.sleep(SLEEP_INTERVAL)
-        
         six_months_ago = datetime.now(timezone.utc) - timedelta(days=180)
         inactive_admins = []
         
@@ -795,7 +820,6 @@ class OrgComplianceChecker:
             ),
             "status": "INFO" if not passed else None
         }
-        self.results.append(result)
         return result
     
     # =========================================================================
@@ -804,7 +828,10 @@ class OrgComplianceChecker:
     
     def run_all_checks(self):
         """
-        Execute all organization-level compliance checks.
+        Execute the selected organization-level compliance checks.
+        
+        Organization settings, webhooks and admins are only fetched if a
+        selected rule reads them.
         
         Returns:
             list: All check results
@@ -813,24 +840,59 @@ class OrgComplianceChecker:
         print("ORGANIZATION-LEVEL COMPLIANCE CHECKS")
         print("=" * 60)
         
-        # Fetch organization settings first
-        self.fetch_org_settings()
+        inputs = RuleInputs({
+            "org_data": self.fetch_org_settings,
+            "hooks": self.fetch_org_hooks,
+            "admins": self.fetch_admins,
+        })
         
-        print("\n  Running Required Rules...")
-        self.check_default_repository_permission()
-        self.check_org_outside_collaborators()
-        self.check_unsecure_org_hooks()
+        enforcement = []
+        def announce(rule):
+            if enforcement[-1:] != [rule.enforcement]:
+                enforcement.append(rule.enforcement)
+                print(f"\n  Running {rule.enforcement} Rules...")
         
-        print("\n  Running Recommended Rules...")
-        self.check_members_can_create_public_repositories()
-        self.check_visibility_change_disabled()
-        self.check_delete_transfer_disabled()
-        self.check_team_creation_disabled()
-        self.check_admin_activity_6_months()
+        self.results = self.engine.evaluate(self, inputs, on_rule=announce)
         
         return self.results
 
 
+# =============================================================================
+# RULE REGISTRY
+# =============================================================================
+# Each rule declares the inputs it reads; RuleEngine fetches only the inputs
+# of the selected rules (--rules). Order here is the order in the reports.
+
+ORG_RULES = RuleRegistry("organization", [
+    # Required
+    Rule("default_repository_permission", "Required", ["org_data"],
+         lambda c, i: c.check_default_repository_permission(i["org_data"]),
+         expected_value="none"),
+    Rule("org_outside_collaborators", "Required", ["org_data"],
+         lambda c, i: c.check_org_outside_collaborators(i["org_data"]),
+         expected_value="Disabled"),
+    Rule("unsecure_org_hooks", "Required", ["hooks"],
+         lambda c, i: c.check_unsecure_org_hooks(i["hooks"]),
+         expected_value="0 hooks with SSL disabled"),
+    # Recommended
+    Rule("members_can_create_public_repositories", "Recommended", ["org_data"],
+         lambda c, i: c.check_members_can_create_public_repositories(i["org_data"]),
+         expected_value="Public: No"),
+    Rule("visibility_change_disabled", "Recommended", ["org_data"],
+         lambda c, i: c.check_visibility_change_disabled(i["org_data"]),
+         expected_value="Disabled"),
+    Rule("delete_transfer_disabled", "Recommended", ["org_data"],
+         lambda c, i: c.check_delete_transfer_disabled(i["org_data"]),
+         expected_value="Disabled"),
+    Rule("team_creation_disabled", "Recommended", ["org_data"],
+         lambda c, i: c.check_team_creation_disabled(i["org_data"]),
+         expected_value="Disabled"),
+    Rule("admin_activity_6_months", "Recommended", ["admins"],
+         lambda c, i: c.check_admin_activity_6_months(i["admins"]),
+         expected_value="0 inactive admins"),
+])
+
+
 # =============================================================================
 # REPORT GENERATOR
 # =============================================================================
@@ -842,42 +904,55 @@ class ReportGenerator:
     
     def __init__(self, org_name, results):
         self.org = org_name
+        # Columnar results (see result_matrix.py); expanded back to dicts
+        # only for the reports' rule listings
+        if not isinstance(results, ResultMatrix):
+            results = ResultMatrix.from_results("organization", results)
         self.results = results
         self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
+    def _calculate_summary(self):
+        """Calculate summary statistics."""
+        matrix = self.results
+        passed = matrix.count(passed=True)
+        info = matrix.count(passed=False, info=True)
+        return {
+            "total_rules": len(matrix),
+            "passed": passed,
+            "failed": matrix.count(passed=False, info=False),
+            "info": matrix.count(info=True),
+            "compliant": passed + info,
+            "required_failed": matrix.count(passed=False, info=False, enforcement="Required"),
+            "recommended_failed": matrix.count(passed=False, info=False, enforcement="Recommended")
+        }
+    
     def generate_json_report(self, filepath="org_compliance_report.json"):
         """Generate JSON report."""
         report = {
             "report_type": "Organization Compliance",
             "organization": self.org,
             "generated_at": self.timestamp,
-            "summary": {
-                "total_rules": len(self.results),
-                "passed": sum(1 for r in self.results if r["passed"]),
-                "failed": sum(1 for r in self.results if not r["passed"] and r.get("status") != "INFO"),
-                "info": sum(1 for r in self.results if r.get("status") == "INFO"),
-                "compliant": sum(1 for r in self.results if r["passed"] or r.get("status") == "INFO"),
-                "required_failed": sum(1 for r in self.results if not r["passed"] and r.get("status") != "INFO" and r["enforcement"] == "Required"),
-                "recommended_failed": sum(1 for r in self.results if not r["passed"] and r.get("status") != "INFO" and r["enforcement"] == "Recommended")
-            },
-            "results": self.results
+            "summary": self._calculate_summary(),
+            "results": self.results.to_results()
         }
         
         with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(report, f, indent=2, default=str)
+            json.dump(report, f, indent=2, default=json_default)
         
         print(f"  JSON report saved: {filepath}")
         return filepath
     
     def generate_markdown_report(self, filepath="org_compliance_report.md"):
         """Generate Markdown report."""
-        passed = sum(1 for r in self.results if r["passed"])
-        failed = sum(1 for r in self.results if not r["passed"] and r.get("status") != "INFO")
-        info_count = sum(1 for r in self.results if r.get("status") == "INFO")
-        required_failed = sum(1 for r in self.results if not r["passed"] and r.get("status") != "INFO" and r["enforcement"] == "Required")
+        summary = self._calculate_summary()
+        passed = summary["passed"]
+        failed = summary["failed"]
+        info_count = summary["info"]
+        required_failed = summary["required_failed"]
         
+        results = self.results.to_results()
         compliant = passed + info_count
-        compliance_pct = f"{(compliant/len(self.results)*100):.1f}%" if self.results else "N/A"
+        compliance_pct = f"{(compliant/len(results)*100):.1f}%" if results else "N/A"
         lines = [
             "# Organization Compliance Report",
             "",
@@ -886,7 +961,7 @@ class ReportGenerator:
             "",
             "## Summary",
             "",
-            f"- **Total Rules Checked:** {len(self.results)}",
+            f"- **Total Rules Checked:** {len(results)}",
             f"- **Passed:** {passed}",
             f"- **Info (Manual Action - Compliant):** {info_count}",
             f"- **Failed (Non-Compliant):** {failed}",
@@ -899,7 +974,7 @@ class ReportGenerator:
         lines.extend(["## Required Rules", ""])
         lines.append("| Rule | Status | Current Value | Expected Value |")
         lines.append("|------|--------|---------------|----------------|")
-        for r in self.results:
+        for r in results:
             if r["enforcement"] == "Required":
                 if r["passed"]:
                     status = "✅ PASS"
@@ -914,7 +989,7 @@ class ReportGenerator:
         lines.extend(["## Recommended Rules", ""])
         lines.append("| Rule | Status | Current Value | Expected Value |")
         lines.append("|------|--------|---------------|----------------|")
-        for r in self.results:
+        for r in results:
             if r["enforcement"] == "Recommended":
                 if r["passed"]:
                     status = "✅ PASS"
@@ -926,7 +1001,7 @@ class ReportGenerator:
         lines.append("")
         
         # Details for failed rules
-        failed_results = [r for r in self.results if not r["passed"] and r.get("status") != "INFO"]
+        failed_results = [results[i] for i in self.results.cells(passed=False, info=False)]
         if failed_results:
             lines.extend(["## Failed Rule Details", ""])
             for r in failed_results:
@@ -935,7 +1010,7 @@ class ReportGenerator:
                 lines.append("")
         
         # Details for INFO rules (manual action needed)
-        info_results = [r for r in self.results if r.get("status") == "INFO"]
+        info_results = [results[i] for i in self.results.cells(info=True)]
         if info_results:
             lines.extend(["## Manual Action Required", ""])
             for r in info_results:
@@ -951,6 +1026,10 @@ class ReportGenerator:
     
     def generate_excel_report(self, filepath="org_compliance_report.xlsx"):
         """Generate Excel report."""
+        # Imported on first use: runs that write no Excel report never load openpyxl
+        import openpyxl
+        from openpyxl.styles import Font, PatternFill, Border, Side
+        
         wb = openpyxl.Workbook()
         
         # Styles
@@ -968,19 +1047,21 @@ class ReportGenerator:
         ws = wb.active
         ws.title = "Summary"
         
-        passed = sum(1 for r in self.results if r["passed"])
-        failed = sum(1 for r in self.results if not r["passed"] and r.get("status") != "INFO")
-        info_count = sum(1 for r in self.results if r.get("status") == "INFO")
+        summary = self._calculate_summary()
+        passed = summary["passed"]
+        failed = summary["failed"]
+        info_count = summary["info"]
         
+        results = self.results.to_results()
         compliant = passed + info_count
-        compliance_pct = f"{(compliant/len(self.results)*100):.1f}%" if self.results else "N/A"
+        compliance_pct = f"{(compliant/len(results)*100):.1f}%" if results else "N/A"
         summary_data = [
             ["Organization Compliance Report", ""],
             ["", ""],
             ["Organization", self.org],
             ["Generated", self.timestamp],
             ["", ""],
-            ["Total Rules", len(self.results)],
+            ["Total Rules", len(results)],
             ["Passed", passed],
             ["Info (Manual Action - Compliant)", info_count],
             ["Failed (Non-Compliant)", failed],
@@ -1008,7 +1089,7 @@ class ReportGenerator:
         
         info_fill = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid")
         
-        for row_idx, r in enumerate(self.results, 2):
+        for row_idx, r in enumerate(results, 2):
             # Determine display status
             if r["passed"]:
                 display_status = "PASS"
@@ -1050,12 +1131,24 @@ class ReportGenerator:
         print(f"  Excel report saved: {filepath}")
         return filepath
     
-    def generate_all_reports(self):
-        """Generate all report formats."""
+    def generate_all_reports(self, suffix="", skip=None):
+        """
+        Generate all report formats, each in its own worker process
+        (see report_renderer.py).
+        
+        Args:
+            suffix: Appended to the file names (e.g. "_my-org" in --orgs mode)
+            skip: Formats not to generate (--skip-formats)
+        
+        Returns:
+            dict: Report paths keyed by format
+        """
         print("\nGenerating Reports...")
-        self.generate_json_report()
-        self.generate_markdown_report()
-        self.generate_excel_report()
+        return render_reports(self, {
+            "json": f"org_compliance_report{suffix}.json",
+            "markdown": f"org_compliance_report{suffix}.md",
+            "excel": f"org_compliance_report{suffix}.xlsx"
+        }, skip=skip)
 
 
 # =============================================================================
@@ -1095,6 +1188,29 @@ class OrgComplianceApplier:
     - admin_activity_6_months: Governance issue, requires manual admin review
     """
     
+    # Map rule names to API field names
+    FIELD_MAPPING = {
+        "default_repository_permission": "default_repository_permission",
+        "org_outside_collaborators": "members_can_invite_outside_collaborators",
+        "members_can_create_public_repositories": "members_can_create_public_repositories",
+        "visibility_change_disabled": "members_can_change_repo_visibility",
+        "delete_transfer_disabled": "members_can_delete_repositories",
+        "team_creation_disabled": "members_can_create_teams"
+    }
+    
+    # Rules that can be applied automatically
+    AUTO_APPLY_RULES = {
+        "default_repository_permission": ("none", lambda x: x != "none"),
+        "org_outside_collaborators": (False, lambda x: x == "Enabled"),
+        "members_can_create_public_repositories": (False, lambda x: "Public: Yes" in str(x)),
+        "visibility_change_disabled": (False, lambda x: x == "Enabled"),
+        "delete_transfer_disabled": (False, lambda x: x == "Enabled"),
+        "team_creation_disabled": (False, lambda x: x == "Enabled")
+    }
+    
+    # Rules that cannot be applied automatically
+    MANUAL_RULES = ["unsecure_org_hooks", "admin_activity_6_months"]
+    
     def __init__(self, api_client, org_name, dry_run=False):
         self.api = api_client
         self.org = org_name
@@ -1121,6 +1237,27 @@ class OrgComplianceApplier:
             "members_can_create_teams": False                          # Recommended rule
         }
     
+    def extract_backup_settings(self, current_org_data):
+        """
+        Extract the settings that rollback can restore from org data.
+        
+        Args:
+            current_org_data: Current organization settings from API
+        
+        Returns:
+            dict: Setting name -> current value
+        """
+        return {
+            "default_repository_permission": current_org_data.get("default_repository_permission"),
+            "members_can_invite_outside_collaborators": current_org_data.get("members_can_invite_outside_collaborators"),
+            "members_can_create_public_repositories": current_org_data.get("members_can_create_public_repositories"),
+            "members_can_change_repo_visibility": current_org_data.get("members_can_change_repo_visibility"),
+            "members_can_delete_repositories": current_org_data.get("members_can_delete_repositories"),
+            "members_can_create_teams": current_org_data.get("members_can_create_teams"),
+            "members_can_create_internal_repositories": current_org_data.get("members_can_create_internal_repositories"),
+            "members_can_create_private_repositories": current_org_data.get("members_can_create_private_repositories")
+        }
+    
     def backup_current_settings(self, current_org_data, check_results):
         """
         Save current organization settings to backup file.
@@ -1135,25 +1272,15 @@ class OrgComplianceApplier:
         timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
         backup_file = f"org_backup_{timestamp}.json"
         
-        # Extract relevant settings
         backup_data = {
             "timestamp": datetime.now().isoformat(),
             "organization": self.org,
-            "settings": {
-                "default_repository_permission": current_org_data.get("default_repository_permission"),
-                "members_can_invite_outside_collaborators": current_org_data.get("members_can_invite_outside_collaborators"),
-                "members_can_create_public_repositories": current_org_data.get("members_can_create_public_repositories"),
-                "members_can_change_repo_visibility": current_org_data.get("members_can_change_repo_visibility"),
-                "members_can_delete_repositories": current_org_data.get("members_can_delete_repositories"),
-                "members_can_create_teams": current_org_data.get("members_can_create_teams"),
-                "members_can_create_internal_repositories": current_org_data.get("members_can_create_internal_repositories"),
-                "members_can_create_private_repositories": current_org_data.get("members_can_create_private_repositories")
-            },
+            "settings": self.extract_backup_settings(current_org_data),
             "check_results": check_results
         }
         
         with open(backup_file, "w", encoding="utf-8") as f:
-            json.dump(backup_data, f, indent=2, default=str)
+            json.dump(backup_data, f, indent=2, default=json_default)
         
         print(f"  Backup saved: {backup_file}")
         return backup_file
@@ -1170,17 +1297,7 @@ class OrgComplianceApplier:
         Returns:
             dict: Result with success status
         """
-        # Map rule names to API field names
-        field_mapping = {
-            "default_repository_permission": "default_repository_permission",
-            "org_outside_collaborators": "members_can_invite_outside_collaborators",
-            "members_can_create_public_repositories": "members_can_create_public_repositories",
-            "visibility_change_disabled": "members_can_change_repo_visibility",
-            "delete_transfer_disabled": "members_can_delete_repositories",
-            "team_creation_disabled": "members_can_create_teams"
-        }
-        
-        api_field = field_mapping.get(rule_name)
+        api_field = self.FIELD_MAPPING.get(rule_name)
         if not api_field:
             return {
                 "success": False,
@@ -1220,6 +1337,52 @@ class OrgComplianceApplier:
                 "error": str(e)
             }
     
+    def build_plan(self, check_results, current_org_data):
+        """
+        Record the writes apply_all would make, without making any API calls.
+        
+        All auto-appliable failed rules are combined into one PATCH /orgs/{org}.
+        The precondition is the ETag of the GET /orgs/{org} made by the check;
+        if that changed for unrelated reasons, the fields being changed are
+        compared against the values seen during the check instead.
+        
+        Args:
+            check_results: Results from OrgComplianceChecker
+            current_org_data: Organization settings fetched by the check
+        
+        Returns:
+            RemediationPlan: Plan ready to be saved and reviewed
+        """
+        backup = {
+            "settings": self.extract_backup_settings(current_org_data),
+            "check_results": check_results
+        }
+        plan = RemediationPlan("org_compliance", self.org, "org_backup", "org", backup)
+        
+        payload = {}
+        expect = {}
+        rules = []
+        for result in check_results:
+            rule_name = result["rule"]
+            if result["passed"] or rule_name not in self.AUTO_APPLY_RULES:
+                continue
+            api_field = self.FIELD_MAPPING[rule_name]
+            payload[api_field] = self.AUTO_APPLY_RULES[rule_name][0]
+            expect[api_field] = current_org_data.get(api_field)
+            rules.append(rule_name)
+        
+        if payload:
+            endpoint = f"/orgs/{self.org}"
+            plan.add(
+                "PATCH", endpoint,
+                payload=payload,
+                precondition={"endpoint": endpoint, "etag": self.api.etags.get(endpoint), "expect": expect},
+                rules=rules,
+                description="Set " + ", ".join(f"{k}={v}" for k, v in payload.items())
+            )
+        
+        return plan
+    
     def apply_all(self, check_results, current_org_data):
         """
         Apply compliant settings for all failed rules.
@@ -1245,18 +1408,8 @@ class OrgComplianceApplier:
         # Step 2: Identify failed rules that can be applied
         print("\n  Identifying failed rules...")
         
-        # Rules that can be applied automatically
-        auto_apply_rules = {
-            "default_repository_permission": ("none", lambda x: x != "none"),
-            "org_outside_collaborators": (False, lambda x: x == "Enabled"),
-            "members_can_create_public_repositories": (False, lambda x: "Public: Yes" in str(x)),
-            "visibility_change_disabled": (False, lambda x: x == "Enabled"),
-            "delete_transfer_disabled": (False, lambda x: x == "Enabled"),
-            "team_creation_disabled": (False, lambda x: x == "Enabled")
-        }
-        
-        # Rules that cannot be applied automatically
-        manual_rules = ["unsecure_org_hooks", "admin_activity_6_months"]
+        auto_apply_rules = self.AUTO_APPLY_RULES
+        manual_rules = self.MANUAL_RULES
         
         failed_rules = [r for r in check_results if not r["passed"]]
         
@@ -1420,6 +1573,10 @@ Examples:
   %(prog)s --apply              Apply compliant settings to organization
   %(prog)s --apply --dry-run    Preview changes without applying
   %(prog)s --rollback backup.json  Restore settings from backup file
+  %(prog)s --plan plan.json       Check and save intended changes for review
+  %(prog)s --execute plan.json    Apply a reviewed plan (e.g. in a change window)
+  %(prog)s --rules unsecure_org_hooks  Check only the listed rules
+  %(prog)s --orgs org-a,org-b     Check several organizations concurrently
 
 Settings that can be applied automatically:
   - default_repository_permission (set to 'none')
@@ -1452,11 +1609,63 @@ Settings that require manual action:
         metavar="BACKUP_FILE",
         help="Rollback to settings from backup file"
     )
+    mode_group.add_argument(
+        "--plan",
+        metavar="PLAN_FILE",
+        help="Check compliance and record the writes --apply would make, without applying"
+    )
+    mode_group.add_argument(
+        "--execute",
+        metavar="PLAN_FILE",
+        help="Replay a plan file concurrently, skipping resources changed since planning"
+    )
     
     parser.add_argument(
         "--dry-run", "-n",
         action="store_true",
-        help="Preview changes without applying (use with --apply)"
+        help="Preview changes without applying (use with --apply or --execute)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent workers for --execute, or organizations at a time for --orgs (default: {DEFAULT_WORKERS})"
+    )
+    
+    parser.add_argument(
+        "--orgs",
+        type=parse_orgs,
+        metavar="ORG1,ORG2,...",
+        help="Check several organizations concurrently over one shared API client (check mode only)"
+    )
+    
+    parser.add_argument(
+        "--offline",
+        metavar="SNAPSHOT",
+        help="Evaluate rules against an inventory snapshot instead of the API (check mode only)"
+    )
+    
+    parser.add_argument(
+        "--skip-formats",
+        type=parse_formats,
+        default=[],
+        metavar="FORMAT,...",
+        help="Report formats not to generate: json, markdown, excel (e.g. --skip-formats excel)"
+    )
+    
+    parser.add_argument(
+        "--history",
+        metavar="DB",
+        help="Also record rule outcomes in this compliance history (see compliance_history.py)"
+    )
+    
+    parser.add_argument(
+        "--rules",
+        type=parse_rule_names,
+        metavar="RULE1,RULE2,...",
+        help=f"Only evaluate these rules and fetch only the data they read (check mode only). "
+             f"Available: {', '.join(ORG_RULES.names())}"
     )
     
     parser.add_argument(
@@ -1474,12 +1683,87 @@ Settings that require manual action:
     return parser.parse_args()
 
 
+# =============================================================================
+# MULTI-ORGANIZATION MODE
+# =============================================================================
+
+def check_org(api_client, org_name, args):
+    """
+    Run qualification and compliance checks for one organization (--orgs mode).
+    
+    Writes the per-org reports and returns where they are, or why the
+    organization was skipped, for the combined report.
+    """
+    if not args.skip_qualification:
+        qual_result = OrgQualificationChecker(api_client, org_name).check_qualification()
+        if args.qualification_only:
+            return {"qualification": qual_result, "skipped_reason": "Qualification only"}
+        if not qual_result["qualified"]:
+            return {"qualification": qual_result,
+                    "skipped_reason": "Organization does not require compliance checks"}
+    
+    checker = OrgComplianceChecker(api_client, org_name, rules=args.rules)
+    results = checker.run_all_checks()
+    
+    report_gen = ReportGenerator(org_name, results)
+    reports = report_gen.generate_all_reports(suffix=f"_{org_name}", skip=args.skip_formats)
+    if args.history:
+        record_results(args.history, "organization", org_name, results,
+                       generated_at=report_gen.timestamp, complete=not args.rules)
+    return {"json_report": reports["json"]}
+
+
+def run_multi_org(args):
+    """Check several organizations concurrently over one shared client (--orgs)."""
+    if args.apply or args.rollback or args.plan or args.execute:
+        print("ERROR: --orgs only supports check mode. Remediate one organization at a time.")
+        sys.exit(1)
+    if "json" in args.skip_formats:
+        print("ERROR: --orgs needs the JSON reports to build the combined report.")
+        sys.exit(1)
+    
+    print(f"  Organizations: {', '.join(args.orgs)}")
+    print(f"  Mode: CHECK (report only, {args.workers} organizations at a time)")
+    
+    # One client and session: shared connection pool and rate-limit budget
+    api_client = create_api_client(args, session=RateLimitedSession())
+    outcomes = run_orgs(args.orgs, lambda org: check_org(api_client, org, args), max_workers=args.workers)
+    
+    print("\nGenerating Combined Report...")
+    combined = write_combined_report("Organization Compliance", outcomes, "org_compliance_report_combined.json")
+    
+    print("\n" + "=" * 60)
+    print("MULTI-ORGANIZATION SUMMARY")
+    print("=" * 60)
+    for org, outcome in outcomes.items():
+        summary = combined["summary"].get(org) or {}
+        if "error" in outcome:
+            print(f"  {org}: ERROR ({outcome['error']})")
+        elif "skipped_reason" in summary:
+            print(f"  {org}: SKIPPED ({summary['skipped_reason']})")
+        else:
+            print(f"  {org}: {summary['total_rules']} rule(s) checked, {summary['required_failed']} required rule(s) failed")
+    print("\n" + "=" * 60)
+
+
 # =============================================================================
 # MAIN ENTRY POINT
 # =============================================================================
 
+def create_api_client(args, session=None):
+    """GitHub API client, or a snapshot-backed one that makes no calls with --offline."""
+    if args.offline:
+        try:
+            return open_offline_client(args.offline)
+        except SnapshotError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+    return GitHubAPIClient(GITHUB_BASE, GITHUB_TOKEN, session=session)
+
+
 def main():
     """Main entry point."""
+    global SLEEP_INTERVAL
     args = parse_arguments()
     
     print("\n" + "=" * 60)
@@ -1487,19 +1771,42 @@ def main():
     print("=" * 60)
     
     # Validate configuration
-    if not GITHUB_TOKEN:
+    if args.offline:
+        if args.apply or args.rollback or args.plan or args.execute:
+            print("ERROR: --offline only supports check mode. Remediation needs the live API.")
+            sys.exit(1)
+        # No API calls are made, so there is nothing to pace
+        SLEEP_INTERVAL = 0
+    elif not GITHUB_TOKEN:
         print("ERROR: GITHUB_TOKEN environment variable is not set.")
         sys.exit(1)
+    
+    if args.rules:
+        if args.apply or args.rollback or args.plan or args.execute:
+            print("ERROR: --rules only supports check mode. Remediation needs every rule's result.")
+            sys.exit(1)
+        try:
+            ORG_RULES.select(args.rules)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+    
+    if args.orgs:
+        print(f"\nConfiguration:")
+        print(f"  Snapshot: {args.offline} (offline)" if args.offline else f"  API Base URL: {GITHUB_BASE}")
+        run_multi_org(args)
+        return
+    
     if not GITHUB_ORG:
         print("ERROR: GITHUB_ORG environment variable is not set.")
         sys.exit(1)
     
     print(f"\nConfiguration:")
     print(f"  Organization: {GITHUB_ORG}")
-    print(f"  API Base URL: {GITHUB_BASE}")
+    print(f"  Snapshot: {args.offline} (offline)" if args.offline else f"  API Base URL: {GITHUB_BASE}")
     
     # Initialize API client
-    api_client = GitHubAPIClient(GITHUB_BASE, GITHUB_TOKEN)
+    api_client = create_api_client(args)
     
     # Handle ROLLBACK mode
     if args.rollback:
@@ -1508,6 +1815,14 @@ def main():
         print("\n" + "=" * 60)
         return
     
+    # Handle EXECUTE mode (no checks - the plan already holds everything)
+    if args.execute:
+        print(f"  Mode: EXECUTE {args.execute} {'(DRY RUN)' if args.dry_run else ''}")
+        execute_plan(api_client, args.execute, org_name=GITHUB_ORG,
+                     max_workers=args.workers, dry_run=args.dry_run)
+        print("\n" + "=" * 60)
+        return
+    
     # =========================================================================
     # STEP 1: QUALIFICATION CHECK
     # =========================================================================
@@ -1529,7 +1844,7 @@ def main():
                 "timestamp": datetime.now().isoformat(),
                 "organization": GITHUB_ORG,
                 "qualification": qual_result
-            }, f, indent=2, default=str)
+            }, f, indent=2, default=json_default)
         print(f"\n  Qualification report saved: {qual_report_file}")
         
         if args.qualification_only:
@@ -1551,14 +1866,16 @@ def main():
     # STEP 2: COMPLIANCE CHECKS
     # =========================================================================
     
-    # Handle CHECK and APPLY modes
+    # Handle CHECK, APPLY and PLAN modes
     if args.apply:
         print(f"  Mode: APPLY {'(DRY RUN)' if args.dry_run else ''}")
+    elif args.plan:
+        print(f"  Mode: PLAN to {args.plan}")
     else:
         print(f"  Mode: CHECK (report only)")
     
     # Run compliance checks
-    checker = OrgComplianceChecker(api_client, GITHUB_ORG)
+    checker = OrgComplianceChecker(api_client, GITHUB_ORG, rules=args.rules)
     results = checker.run_all_checks()
     
     # Print pre-apply summary
@@ -1606,13 +1923,13 @@ def main():
                     "changes": applier.changes_made,
                     "skipped": applier.skipped,
                     "errors": applier.errors
-                }, f, indent=2, default=str)
+                }, f, indent=2, default=json_default)
             print(f"\n  Apply log saved: {apply_log_file}")
             
             # Re-run checks after apply so reports reflect updated state
             if not args.dry_run:
                 print("\n  Re-checking compliance after applying fixes...")
-                checker2 = OrgComplianceChecker(api_client, GITHUB_ORG)
+                checker2 = OrgComplianceChecker(api_client, GITHUB_ORG, rules=args.rules)
                 results = checker2.run_all_checks()
                 
                 # Mark ALL still-failing rules as INFO after apply
@@ -1650,9 +1967,22 @@ def main():
                 if failed == 0 and info_count == 0:
                     print("\n  ✅ All rules now passing!")
     
+    # Handle PLAN mode
+    if args.plan:
+        applier = OrgComplianceApplier(api_client, GITHUB_ORG)
+        plan = applier.build_plan(results, checker.org_data)
+        print("\n" + "=" * 60)
+        print("REMEDIATION PLAN")
+        print("=" * 60)
+        plan.save(args.plan)
+        print(f"  Review it, then run: --execute {args.plan}")
+    
     # Generate reports (after apply if applicable, so reports reflect final state)
     report_gen = ReportGenerator(GITHUB_ORG, results)
-    report_gen.generate_all_reports()
+    report_gen.generate_all_reports(skip=args.skip_formats)
+    if args.history:
+        record_results(args.history, "organization", GITHUB_ORG, results,
+                       generated_at=report_gen.timestamp, complete=not args.rules)
     
     print("\n" + "=" * 60)
 
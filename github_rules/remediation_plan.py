@@ -0,0 +1,383 @@
+"""
+================================================================================
+REMEDIATION PLAN / EXECUTE SUPPORT
+================================================================================
+
+Shared by org_compliance.py, repo_compliance.py and branch_compliance.py to
+split remediation into two phases:
+
+    1. PLAN    (--plan plan.json)
+       The compliance checks run as usual. Every write that --apply would make
+       is recorded instead of sent: HTTP method, endpoint, payload and a
+       precondition describing the state observed during the check. The plan is
+       built only from data the checks already fetched, so planning costs no
+       API calls beyond the check itself.
+
+    2. EXECUTE (--execute plan.json)
+       The plan is replayed concurrently. Before writing, each precondition is
+       verified so that nothing is changed if the resource drifted after the
+       plan was reviewed.
+
+PRECONDITIONS:
+--------------
+    {"endpoint": ..., "etag": "W/\\"abc\\""}
+        Conditional GET with If-None-Match. 304 means unchanged (and does not
+        count against the GitHub rate limit).
+    {"endpoint": ..., "expect": {"private": false}}
+        GET and compare the listed fields. Also used as a fallback when the
+        ETag no longer matches.
+    {"endpoint": ..., "absent": true}
+        The resource must still return 404 (e.g. no branch protection yet).
+    Contents API writes carry the blob "sha" in their payload, so GitHub
+    itself rejects them with 409 if the file changed.
+
+Operations that share an identical precondition are checked once and then
+run in order on the same worker; independent groups run in parallel.
+
+PLAN FILE FORMAT:
+-----------------
+    {
+        "plan_version": 1,
+        "tool": "branch_compliance",
+        "organization": "org-name",
+        "created_at": "2024-01-15T12:00:00",
+        "backup_prefix": "backup",
+        "log_prefix": "branch",
+        "backup": {...},            # Same format the script's --rollback reads
+        "operations": [
+            {
+                "id": 1,
+                "repository": "repo-name",
+                "rules": ["dismiss_stale", ...],
+                "description": "Apply compliant branch protection",
+                "method": "PUT",
+                "endpoint": "/repos/org/repo/branches/master/protection",
+                "payload": {...},
+                "precondition": {...}
+            }
+        ]
+    }
+================================================================================
+"""
+
+import json
+import time
+import requests
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from rule_registry import json_default
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+PLAN_VERSION = 1
+DEFAULT_WORKERS = 8
+SLEEP_INTERVAL = 0.3  # Delay after each write, per worker
+
+
+# =============================================================================
+# REMEDIATION PLAN
+# =============================================================================
+
+class RemediationPlan:
+    """
+    Ordered list of intended writes plus the backup needed to roll them back.
+    """
+
+    def __init__(self, tool, org_name, backup_prefix, log_prefix, backup=None):
+        self.tool = tool
+        self.org = org_name
+        self.backup_prefix = backup_prefix
+        self.log_prefix = log_prefix
+        self.backup = backup or {}
+        self.created_at = datetime.now().isoformat()
+        self.operations = []
+
+    def add(self, method, endpoint, payload=None, precondition=None, **context):
+        """
+        Record a single write operation.
+
+        Args:
+            method: HTTP method ("PUT", "PATCH" or "DELETE")
+            endpoint: API endpoint path
+            payload: JSON body to send (None for DELETE)
+            precondition: Precondition dict (see module docstring) or None
+            **context: Extra fields for reviewers (repository, rules, description...)
+
+        Returns:
+            dict: The recorded operation
+        """
+        operation = {"id": len(self.operations) + 1}
+        operation.update(context)
+        operation.update({
+            "method": method.upper(),
+            "endpoint": endpoint,
+            "payload": payload,
+            "precondition": precondition
+        })
+        self.operations.append(operation)
+        return operation
+
+    def to_dict(self):
+        """Return the plan in its JSON file format."""
+        return {
+            "plan_version": PLAN_VERSION,
+            "tool": self.tool,
+            "organization": self.org,
+            "created_at": self.created_at,
+            "backup_prefix": self.backup_prefix,
+            "log_prefix": self.log_prefix,
+            "backup": self.backup,
+            "operations": self.operations
+        }
+
+    def save(self, filepath):
+        """Write the plan to a JSON file."""
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, default=json_default)
+
+        print(f"  Plan saved: {filepath} ({len(self.operations)} operations)")
+        return filepath
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Read a plan file written by save().
+
+        Raises:
+            ValueError: If the file is not a supported plan
+        """
+        with open(filepath, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        if data.get("plan_version") != PLAN_VERSION:
+            raise ValueError(f"Unsupported plan version in {filepath}: {data.get('plan_version')}")
+
+        plan = cls(data["tool"], data["organization"], data["backup_prefix"],
+                   data["log_prefix"], data.get("backup"))
+        plan.created_at = data.get("created_at")
+        plan.operations = data.get("operations", [])
+        return plan
+
+
+# =============================================================================
+# PLAN EXECUTION
+# =============================================================================
+
+def check_precondition(api_client, precondition):
+    """
+    Verify that the state recorded at plan time still holds.
+
+    Args:
+        api_client: GitHubAPIClient instance (needs get_conditional)
+        precondition: Precondition dict or None
+
+    Returns:
+        tuple: (ok, detail) where detail explains a failed check
+    """
+    if not precondition:
+        return True, "no precondition"
+
+    endpoint = precondition["endpoint"]
+    if not (precondition.get("etag") or precondition.get("expect") or precondition.get("absent")):
+        return True, "nothing recorded to verify"
+
+    status, data = api_client.get_conditional(endpoint, precondition.get("etag"))
+
+    if precondition.get("absent"):
+        if status == 404:
+            return True, "still absent"
+        return False, f"{endpoint} now exists"
+
+    if status == 304:
+        return True, "ETag unchanged"
+    if status == 404:
+        return False, f"{endpoint} no longer exists"
+
+    expect = precondition.get("expect")
+    if expect:
+        drifted = {k: data.get(k) for k, v in expect.items() if data.get(k) != v}
+        if not drifted:
+            return True, "expected fields unchanged"
+        return False, f"fields changed since plan: {drifted}"
+
+    return False, "ETag changed since plan"
+
+
+def _send(api_client, operation):
+    """Send a single planned write."""
+    method = operation["method"]
+    endpoint = operation["endpoint"]
+
+    if method == "PUT":
+        return api_client.put(endpoint, operation.get("payload"))
+    if method == "PATCH":
+        return api_client.patch(endpoint, operation.get("payload"))
+    if method == "DELETE":
+        return api_client.delete(endpoint)
+    raise ValueError(f"Unsupported method in plan: {method}")
+
+
+def _execute_group(api_client, operations, dry_run):
+    """
+    Check a shared precondition once, then run its operations in order.
+
+    Returns:
+        list: One result dict per operation
+    """
+    results = []
+
+    try:
+        ok, detail = check_precondition(api_client, operations[0].get("precondition"))
+    except requests.exceptions.RequestException as e:
+        ok, detail = False, f"precondition check failed: {e}"
+
+    for operation in operations:
+        result = {
+            "id": operation["id"],
+            "repository": operation.get("repository"),
+            "method": operation["method"],
+            "endpoint": operation["endpoint"],
+            "description": operation.get("description")
+        }
+
+        if not ok:
+            result.update({"status": "stale", "detail": detail})
+        elif dry_run:
+            result.update({"status": "dry_run", "detail": detail})
+        else:
+            try:
+                _send(api_client, operation)
+                result["status"] = "applied"
+                time.sleep(SLEEP_INTERVAL)
+            except requests.exceptions.RequestException as e:
+                # Connection errors and timeouts too: record them and keep
+                # going, so the execute log covers every operation
+                result.update({"status": "error", "detail": str(e)})
+
+        results.append(result)
+
+    return results
+
+
+def group_operations(operations):
+    """
+    Group operations by identical precondition, preserving plan order.
+
+    Operations without a precondition each form their own group.
+    """
+    groups = {}
+    for operation in operations:
+        precondition = operation.get("precondition")
+        if precondition:
+            key = json.dumps(precondition, sort_keys=True)
+        else:
+            key = f"op-{operation['id']}"
+        groups.setdefault(key, []).append(operation)
+    return list(groups.values())
+
+
+def execute_plan(api_client, plan_file, org_name=None, max_workers=DEFAULT_WORKERS, dry_run=False):
+    """
+    Replay a plan file concurrently with precondition checks.
+
+    Process:
+    1. Load plan and write its backup (readable by the script's --rollback)
+    2. Group operations by precondition
+    3. Run groups on a thread pool
+    4. Save an execute log
+
+    Args:
+        api_client: GitHubAPIClient instance
+        plan_file: Path to plan JSON file
+        org_name: Organization from the environment, checked against the plan
+        max_workers: Number of concurrent workers
+        dry_run: Only verify preconditions, do not write
+
+    Returns:
+        dict: Summary of execution results
+    """
+    print("\n" + "=" * 60)
+    print("EXECUTING REMEDIATION PLAN")
+    print("=" * 60)
+
+    plan = RemediationPlan.load(plan_file)
+
+    print(f"\n  Plan from: {plan.created_at}")
+    print(f"  Tool: {plan.tool}")
+    print(f"  Organization: {plan.org}")
+    print(f"  Operations: {len(plan.operations)}")
+    print(f"  Workers: {max_workers}")
+
+    if org_name and org_name != plan.org:
+        print(f"\n  WARNING: GITHUB_ORG is '{org_name}' but plan targets '{plan.org}'. Using plan organization.")
+
+    if dry_run:
+        print("\n  *** DRY RUN MODE - Preconditions are checked, no changes will be made ***")
+
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+    backup_file = None
+    if plan.backup and not dry_run:
+        backup_file = f"{plan.backup_prefix}_{timestamp}.json"
+        backup_data = dict(plan.backup)
+        backup_data["timestamp"] = datetime.now().isoformat()
+        backup_data["organization"] = plan.org
+        with open(backup_file, "w", encoding="utf-8") as f:
+            json.dump(backup_data, f, indent=2, default=json_default)
+        print(f"\n  Backup saved: {backup_file}")
+
+    groups = group_operations(plan.operations)
+    results = []
+
+    print(f"\n  Running {len(groups)} precondition groups...")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_execute_group, api_client, group, dry_run) for group in groups]
+        for future in as_completed(futures):
+            for result in future.result():
+                target = result.get("repository") or plan.org
+                print(f"    [{result['status'].upper()}] {target}: {result['description']}"
+                      + (f" ({result['detail']})" if result["status"] in ("stale", "error") else ""))
+                results.append(result)
+
+    results.sort(key=lambda r: r["id"])
+    counts = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+    summary = {
+        "plan_file": plan_file,
+        "backup_file": backup_file,
+        "operations": len(results),
+        "applied": counts.get("applied", 0),
+        "stale": counts.get("stale", 0),
+        "errors": counts.get("error", 0),
+        "dry_run": dry_run
+    }
+
+    log_file = f"{plan.log_prefix}_execute_log_{timestamp}.json"
+    with open(log_file, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "organization": plan.org,
+            "summary": summary,
+            "results": results
+        }, f, indent=2, default=json_default)
+
+    print("\n" + "-" * 40)
+    print("EXECUTE SUMMARY")
+    print("-" * 40)
+    if backup_file:
+        print(f"  Backup file: {backup_file}")
+    print(f"  Operations: {summary['operations']}")
+    print(f"  Applied: {summary['applied']}")
+    print(f"  Stale (precondition failed, skipped): {summary['stale']}")
+    print(f"  Errors: {summary['errors']}")
+    print(f"  Execute log saved: {log_file}")
+
+    if summary["stale"]:
+        print("\n  ⚠️  Some resources changed after the plan was made. Re-run --plan to refresh them.")
+
+    return summary
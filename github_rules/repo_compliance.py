@@ -12,11 +12,27 @@ HOW TO RUN:
        - GITHUB_BASE: GitHub API base URL (e.g., https://api.github.example.com)
     
     2. Run: python repo_compliance.py
+       Fix:  python repo_compliance.py --apply [--dry-run]
+       Or split the fix into a reviewed plan and a later execution:
+             python repo_compliance.py --plan plan.json
+             python repo_compliance.py --execute plan.json
+       Several organizations at once (check only, GITHUB_ORG not needed):
+             python repo_compliance.py --orgs org-a,org-b,org-c
+       Offline from an inventory snapshot (check only, no API calls):
+             python repo_compliance.py --offline inventory_snapshot.db
+       Only some rules (check only, skips fetching data they don't read):
+             python repo_compliance.py --rules unsecure_hooks,metadata_existing
     
     3. Output files will be generated:
        - repo_compliance_report.json
        - repo_compliance_report.md
        - repo_compliance_report.xlsx
+       With --orgs: repo_compliance_report_<org>.* per organization
+       plus repo_compliance_report_combined.json
+       The formats are rendered in parallel worker processes; leave some
+       out with --skip-formats (e.g. --skip-formats excel,markdown).
+       With --history DB the rule outcomes are also recorded for run-to-run
+       deltas: python compliance_history.py delta --scope repository --org <org>
 
 RULES CHECKED (Reference: IBM Cloud Policy 3.1.3, 3.1.4, ITSS Chapter 2):
 
@@ -80,20 +96,18 @@ import requests
 import urllib3
 from datetime import datetime, timezone
 
+from remediation_plan import RemediationPlan, execute_plan, DEFAULT_WORKERS
+from multi_org import RateLimitedSession, parse_orgs, run_orgs, write_combined_report
+from rule_registry import Rule, RuleRegistry, RuleEngine, RuleInputs, parse_rule_names, json_default
+from report_renderer import render_reports, parse_formats
+from compliance_history import record_results
+from result_matrix import ResultMatrix
+from metadata_parser import parse_metadata_response, metadata_diagnostics, METADATA_DEBUG
+from inventory_snapshot import open_offline_client, SnapshotError
+
 # Disable SSL warnings for GHE with self-signed certificates
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# Excel support
-import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-
-# YAML support (optional)
-try:
-    import yaml
-    YAML_AVAILABLE = True
-except ImportError:
-    YAML_AVAILABLE = False
-
 
 # =============================================================================
 # CONFIGURATION
@@ -116,31 +130,64 @@ class GitHubAPIClient:
     Simple GitHub API client with authentication and pagination support.
     """
     
-    def __init__(self, base_url, token):
+    def __init__(self, base_url, token, session=None):
         self.base_url = base_url.rstrip("/")
         self.headers = {
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github.v3+json"
         }
+        # ETag of the last successful GET per endpoint (used as --plan preconditions)
+        self.etags = {}
+        # Shared RateLimitedSession in --orgs mode, plain requests otherwise
+        self.http = session or requests
     
     def get(self, endpoint, allow_404=False):
         """Make a GET request to the GitHub API."""
         url = f"{self.base_url}{endpoint}"
-        response = requests.get(url, headers=self.headers, verify=False)
+        response = self.http.get(url, headers=self.headers, verify=False)
         
         if response.status_code == 404 and allow_404:
             return None
         
         response.raise_for_status()
+        self.etags[endpoint] = response.headers.get("ETag")
         return response.json()
     
+    def get_conditional(self, endpoint, etag=None):
+        """
+        Make a conditional GET request (If-None-Match) to the GitHub API.
+        
+        Used by --execute to verify plan preconditions. A 304 response does
+        not count against the rate limit.
+        
+        Returns:
+            tuple: (status_code, JSON data or None for 304/404)
+        """
+        url = f"{self.base_url}{endpoint}"
+        headers = dict(self.headers)
+        if etag:
+            headers["If-None-Match"] = etag
+        response = self.http.get(url, headers=headers, verify=False)
+        
+        if response.status_code in (304, 404):
+            return response.status_code, None
+        
+        response.raise_for_status()
+        return response.status_code, response.json()
+    
     def paginate(self, endpoint):
-        """Fetch all pages of a paginated API endpoint."""
+        """
+        Fetch all pages of a paginated API endpoint.
+        
+        The ETag is only recorded for single-page results, since a first-page
+        ETag says nothing about later pages.
+        """
         results = []
         url = f"{self.base_url}{endpoint}"
+        pages = 0
         
         while url:
-            response = requests.get(url, headers=self.headers, verify=False)
+            response = self.http.get(url, headers=self.headers, verify=False)
             response.raise_for_status()
             data = response.json()
             
@@ -156,6 +203,10 @@ class GitHubAPIClient:
                     url = link.split(";")[0].strip()[1:-1]
                     break
             
+            pages += 1
+            if pages == 1 and not url:
+                self.etags[endpoint] = response.headers.get("ETag")
+            
             time.sleep(SLEEP_INTERVAL)
         
         return results
@@ -172,7 +223,7 @@ class GitHubAPIClient:
             dict: Response JSON
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.put(url, headers=self.headers, json=data, verify=False)
+        response = self.http.put(url, headers=self.headers, json=data, verify=False)
         response.raise_for_status()
         return response.json() if response.text else {}
     
@@ -190,7 +241,7 @@ class GitHubAPIClient:
             dict: Response JSON
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.patch(url, headers=self.headers, json=data, verify=False)
+        response = self.http.patch(url, headers=self.headers, json=data, verify=False)
         response.raise_for_status()
         return response.json() if response.text else {}
     
@@ -205,7 +256,7 @@ class GitHubAPIClient:
             bool: True if successful
         """
         url = f"{self.base_url}{endpoint}"
-        response = requests.delete(url, headers=self.headers, verify=False)
+        response = self.http.delete(url, headers=self.headers, verify=False)
         response.raise_for_status()
         return True
 
@@ -249,25 +300,10 @@ class OrgQualificationChecker:
             return None
         
         try:
-            content = base64.b64decode(response.get("content", "")).decode("utf-8")
-            # Fix smart/curly quotes that break JSON parsing
-            content = content.replace('\u201c', '"').replace('\u201d', '"')
-            content = content.replace('\u2018', "'").replace('\u2019', "'")
-            # Fix non-breaking spaces (U+00A0) that break JSON/YAML parsing
-            content = content.replace('\u00a0', ' ')
-            
-            if YAML_AVAILABLE:
-                try:
-                    return yaml.safe_load(content)
-                except Exception as e:
-                    print(f"      WARNING: YAML parse failed for {repo_name}: {e}")
-            
-            try:
-                return json.loads(content)
-            except Exception as e:
-                print(f"      WARNING: JSON parse failed for {repo_name}: {e}")
-            
-            return None
+            return parse_metadata_response(
+                response,
+                warn=lambda fmt, e: print(f"      WARNING: {fmt} parse failed for {repo_name}: {e}")
+            )
         except Exception:
             return None
     
@@ -376,10 +412,15 @@ class RepoComplianceChecker:
     Checks repository-level settings against IBM CISO policy requirements.
     """
     
-    def __init__(self, api_client, org_name):
+    def __init__(self, api_client, org_name, rules=None):
         self.api = api_client
         self.org = org_name
         self.results = []
+        # Raw hooks/collaborators/teams seen during the check, keyed by repo.
+        # Reused by --plan for the backup so planning needs no extra API calls.
+        self.repo_state = {}
+        # Selected rules (all by default); only their inputs are fetched
+        self.engine = RuleEngine(REPO_RULES, rules)
     
     def get_repositories(self, include_archived=True):
         """
@@ -398,6 +439,8 @@ class RepoComplianceChecker:
     def fetch_metadata(self, repo_name, default_branch):
         """
         Fetch and parse .metadata file from repository, with retry logic for connection errors.
+        
+        DEBUG lines are printed only with METADATA_DEBUG=1 (see metadata_parser.py).
         """
         url = f"/repos/{self.org}/{repo_name}/contents/.metadata?ref={default_branch}"
         retries = 3
@@ -406,54 +449,69 @@ class RepoComplianceChecker:
                 response = self.api.get(url, allow_404=True)
                 time.sleep(SLEEP_INTERVAL)
                 if not response:
-                    print(f"      DEBUG [{repo_name}]: API returned 404 - .metadata not found on branch '{default_branch}'")
+                    if METADATA_DEBUG:
+                        print(f"      DEBUG [{repo_name}]: API returned 404 - .metadata not found on branch '{default_branch}'")
                     return None
                 
-                raw_content = response.get("content", "")
-                if not raw_content:
-                    print(f"      DEBUG [{repo_name}]: API returned response but 'content' field is empty")
+                if not response.get("content"):
+                    if METADATA_DEBUG:
+                        print(f"      DEBUG [{repo_name}]: API returned response but 'content' field is empty")
                     return None
                 
-                content = base64.b64decode(raw_content).decode("utf-8")
-                print(f"      DEBUG [{repo_name}]: .metadata fetched OK, {len(content)} chars")
-                print(f"      DEBUG [{repo_name}]: First 200 chars: {content[:200]!r}")
-                
-                # Check for non-ASCII characters that could break parsing
-                non_ascii = [(i, ch, f'U+{ord(ch):04X}') for i, ch in enumerate(content) if ord(ch) > 127]
-                if non_ascii:
-                    print(f"      DEBUG [{repo_name}]: Found {len(non_ascii)} non-ASCII chars: {non_ascii[:10]}")
-                
-                # Fix smart/curly quotes that break JSON parsing
-                content = content.replace('\u201c', '"').replace('\u201d', '"')
-                content = content.replace('\u2018', "'").replace('\u2019', "'")
-                # Fix non-breaking spaces (U+00A0) that break JSON/YAML parsing
-                content = content.replace('\u00a0', ' ')
+                # Diagnostics decode the content separately; only when enabled
+                if METADATA_DEBUG:
+                    content = base64.b64decode(response["content"]).decode("utf-8")
+                    for line in metadata_diagnostics(content):
+                        print(f"      DEBUG [{repo_name}]: {line}")
                 
-                if YAML_AVAILABLE:
-                    try:
-                        result = yaml.safe_load(content)
-                        print(f"      DEBUG [{repo_name}]: YAML parse SUCCESS")
-                        return result
-                    except Exception as e:
-                        print(f"      WARNING: YAML parse failed for {repo_name}: {e}")
-                try:
-                    result = json.loads(content)
-                    print(f"      DEBUG [{repo_name}]: JSON parse SUCCESS")
-                    return result
-                except Exception as e:
-                    print(f"      WARNING: JSON parse failed for {repo_name}: {e}")
-                    print(f"      DEBUG [{repo_name}]: Full content after fix:\n{content}")
-                return None
+                return parse_metadata_response(
+                    response,
+                    warn=lambda fmt, e: print(f"      WARNING: {fmt} parse failed for {repo_name}: {e}")
+                )
             except requests.exceptions.ConnectionError as e:
                 print(f"      WARNING: Connection error fetching .metadata for {repo_name} (attempt {attempt+1}/{retries}): {e}")
                 time.sleep(2)
         return None
     
+    # =========================================================================
+    # RULE INPUTS (fetched only when a selected rule needs them)
+    # =========================================================================
+    
+    def fetch_hooks(self, repo_name):
+        """Fetch repository webhooks. API Call: GET /repos/{org}/{repo}/hooks"""
+        hooks = self.api.get(f"/repos/{self.org}/{repo_name}/hooks", allow_404=True) or []
+        time.sleep(SLEEP_INTERVAL)
+        self.repo_state.setdefault(repo_name, {})["hooks"] = hooks
+        return hooks
+    
+    def fetch_collaborators(self, repo_name, affiliation):
+        """
+        Fetch collaborator logins with the given affiliation ("outside" or "direct").
+        
+        API Call: GET /repos/{org}/{repo}/collaborators?affiliation={affiliation}
+        """
+        collaborators = self.api.paginate(
+            f"/repos/{self.org}/{repo_name}/collaborators?affiliation={affiliation}&per_page=100"
+        )
+        time.sleep(SLEEP_INTERVAL)
+        logins = [c["login"] for c in collaborators]
+        self.repo_state.setdefault(repo_name, {})[f"{affiliation}_collaborators"] = logins
+        return logins
+    
+    def fetch_teams(self, repo_name):
+        """Fetch teams with repository access. API Call: GET /repos/{org}/{repo}/teams"""
+        teams = self.api.paginate(f"/repos/{self.org}/{repo_name}/teams?per_page=100")
+        time.sleep(SLEEP_INTERVAL)
+        self.repo_state.setdefault(repo_name, {})["teams"] = [
+            {"name": t["name"], "slug": t["slug"], "permission": t.get("permission")} for t in teams
+        ]
+        return teams
+    
     # =========================================================================
     # REQUIRED RULES
     # =========================================================================
     
-    def check_unsecure_hooks(self, repo_name):
+    def check_unsecure_hooks(self, repo_name, hooks):
         """
         REQUIRED RULE: unsecure_hooks
         
@@ -476,9 +534,6 @@ class RepoComplianceChecker:
         - Without SSL, this data could be intercepted
         - Confidentiality of code and events would be compromised
         """
-        hooks = self.api.get(f"/repos/{self.org}/{repo_name}/hooks", allow_404=True) or []
-        time.sleep(SLEEP_INTERVAL)
-        
         # Find hooks where SSL verification is disabled
         # config.insecure_ssl = "1" or 1 or True means SSL is DISABLED
         insecure_hooks = []
@@ -510,7 +565,7 @@ class RepoComplianceChecker:
             )
         }
     
-    def check_collaborators_in_org(self, repo_name):
+    def check_collaborators_in_org(self, repo_name, outside_collaborators):
         """
         REQUIRED RULE: collaborators_in_org
         
@@ -531,12 +586,7 @@ class RepoComplianceChecker:
         - Access should only be granted through properly managed teams
         - Individual outside access is harder to track and audit
         """
-        outside_collabs = self.api.paginate(
-            f"/repos/{self.org}/{repo_name}/collaborators?affiliation=outside&per_page=100"
-        )
-        time.sleep(SLEEP_INTERVAL)
-        
-        collab_logins = [c["login"] for c in outside_collabs]
+        collab_logins = outside_collaborators
         passed = len(collab_logins) == 0
         
         return {
@@ -554,7 +604,7 @@ class RepoComplianceChecker:
             )
         }
     
-    def check_collaborators_in_team(self, repo_name):
+    def check_collaborators_in_team(self, repo_name, direct_collaborators):
         """
         REQUIRED RULE: collaborators_in_team
         
@@ -575,12 +625,7 @@ class RepoComplianceChecker:
         - Team access is managed through AccessHub
         - Individual access is harder to audit and manage at scale
         """
-        direct_collabs = self.api.paginate(
-            f"/repos/{self.org}/{repo_name}/collaborators?affiliation=direct&per_page=100"
-        )
-        time.sleep(SLEEP_INTERVAL)
-        
-        collab_logins = [c["login"] for c in direct_collabs]
+        collab_logins = direct_collaborators
         passed = len(collab_logins) == 0
         
         return {
@@ -598,7 +643,7 @@ class RepoComplianceChecker:
             )
         }
     
-    def check_shared_repo_readers(self, repo_name, repo_data, metadata):
+    def check_shared_repo_readers(self, repo_name, repo_data, metadata, teams):
         """
         REQUIRED RULE: shared_repo_readers
         
@@ -628,10 +673,6 @@ class RepoComplianceChecker:
             is_ip_sensitive = str(metadata.get("ip_sensitive", "no")).lower() == "yes"
             is_security_sensitive = str(metadata.get("security_sensitive", "no")).lower() == "yes"
         
-        # Fetch teams with repository access
-        teams = self.api.paginate(f"/repos/{self.org}/{repo_name}/teams?per_page=100")
-        time.sleep(SLEEP_INTERVAL)
-        
         # Check for Cloud_Readers team (case-insensitive)
         has_cloud_readers = any(
             t.get("name", "").lower() == "cloud_readers" 
@@ -667,7 +708,7 @@ class RepoComplianceChecker:
             )
         }
     
-    def check_metadata_existing(self, repo_name, default_branch):
+    def check_metadata_existing(self, repo_name, default_branch, metadata):
         """
         REQUIRED RULE: metadata_existing
         
@@ -687,7 +728,6 @@ class RepoComplianceChecker:
         - Required for automated compliance checking
         - Contains production_code, sensitivity flags, etc.
         """
-        metadata = self.fetch_metadata(repo_name, default_branch)
         passed = metadata is not None
         # Only add .metadata if missing, never overwrite
         if not passed:
@@ -875,27 +915,26 @@ class RepoComplianceChecker:
             print(f"      SKIP: default branch is 'main': {repo_name}")
             return None
         
-        # Fetch metadata first (used by multiple rules)
-        metadata = self.fetch_metadata(repo_name, default_branch)
+        # Inputs are fetched on first use, once, and only for selected rules
+        inputs = RuleInputs(
+            {
+                "metadata": lambda: self.fetch_metadata(repo_name, default_branch),
+                "hooks": lambda: self.fetch_hooks(repo_name),
+                "outside_collaborators": lambda: self.fetch_collaborators(repo_name, "outside"),
+                "direct_collaborators": lambda: self.fetch_collaborators(repo_name, "direct"),
+                "teams": lambda: self.fetch_teams(repo_name),
+            },
+            repo_name=repo_name, repo_data=repo_data, default_branch=default_branch
+        )
         
-        # Run all checks
         results = {
             "repository": repo_name,
             "default_branch": default_branch,
             "private": repo_data.get("private", False),
             "archived": repo_data.get("archived", False),
-            "rules": []
+            "rules": self.engine.evaluate(self, inputs)
         }
         
-        # Required Rules
-        results["rules"].append(self.check_unsecure_hooks(repo_name))
-        results["rules"].append(self.check_collaborators_in_org(repo_name))
-        results["rules"].append(self.check_collaborators_in_team(repo_name))
-        results["rules"].append(self.check_shared_repo_readers(repo_name, repo_data, metadata))
-        results["rules"].append(self.check_metadata_existing(repo_name, default_branch))
-        results["rules"].append(self.check_private_if_sensitive(repo_name, repo_data, metadata))
-        results["rules"].append(self.check_archived_status(repo_name, repo_data, metadata))
-        
         return results
     
     def run_all_checks(self, target_repo=None):
@@ -934,6 +973,38 @@ class RepoComplianceChecker:
         return self.results
 
 
+# =============================================================================
+# RULE REGISTRY
+# =============================================================================
+# Each rule declares the inputs it reads; RuleEngine fetches only the inputs
+# of the selected rules (--rules). Order here is the order in the reports.
+
+REPO_RULES = RuleRegistry("repository", [
+    # Required
+    Rule("unsecure_hooks", "Required", ["repo_name", "hooks"],
+         lambda c, i: c.check_unsecure_hooks(i["repo_name"], i["hooks"]),
+         expected_value="0 hooks with SSL disabled"),
+    Rule("collaborators_in_org", "Required", ["repo_name", "outside_collaborators"],
+         lambda c, i: c.check_collaborators_in_org(i["repo_name"], i["outside_collaborators"]),
+         expected_value="0 outside collaborators"),
+    Rule("collaborators_in_team", "Required", ["repo_name", "direct_collaborators"],
+         lambda c, i: c.check_collaborators_in_team(i["repo_name"], i["direct_collaborators"]),
+         expected_value="0 direct collaborators"),
+    Rule("shared_repo_readers", "Required", ["repo_name", "repo_data", "metadata", "teams"],
+         lambda c, i: c.check_shared_repo_readers(i["repo_name"], i["repo_data"], i["metadata"], i["teams"]),
+         expected_value="No Cloud_Readers for public/sensitive repos"),
+    Rule("metadata_existing", "Required", ["repo_name", "default_branch", "metadata"],
+         lambda c, i: c.check_metadata_existing(i["repo_name"], i["default_branch"], i["metadata"]),
+         expected_value="Exists"),
+    Rule("private_if_sensitive", "Required", ["repo_name", "repo_data", "metadata"],
+         lambda c, i: c.check_private_if_sensitive(i["repo_name"], i["repo_data"], i["metadata"]),
+         expected_value="Private if sensitive (unless override)"),
+    Rule("archived_status", "Required", ["repo_name", "repo_data", "metadata"],
+         lambda c, i: c.check_archived_status(i["repo_name"], i["repo_data"], i["metadata"]),
+         expected_value="Not archived if active production code"),
+])
+
+
 # =============================================================================
 # REPORT GENERATOR
 # =============================================================================
@@ -945,16 +1016,20 @@ class ReportGenerator:
     
     def __init__(self, org_name, results):
         self.org = org_name
+        # Columnar results (see result_matrix.py); expanded back to dicts
+        # only for the JSON report
+        if not isinstance(results, ResultMatrix):
+            results = ResultMatrix.from_results("repository", results)
         self.results = results
         self.timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     def _calculate_summary(self):
         """Calculate summary statistics."""
-        total_repos = len(self.results)
-        total_rules = sum(len(r["rules"]) for r in self.results)
-        total_passed = sum(1 for r in self.results for rule in r["rules"] if rule["passed"])
+        total_repos = len(self.results.rows)
+        total_rules = len(self.results)
+        total_passed = self.results.count(passed=True)
         total_failed = total_rules - total_passed
-        repos_with_issues = sum(1 for r in self.results if any(not rule["passed"] for rule in r["rules"]))
+        repos_with_issues = self.results.rows_with(passed=False)
         
         return {
             "total_repositories": total_repos,
@@ -974,11 +1049,11 @@ class ReportGenerator:
             "organization": self.org,
             "generated_at": self.timestamp,
             "summary": summary,
-            "repositories": self.results
+            "repositories": self.results.to_results()
         }
         
         with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(report, f, indent=2, default=str)
+            json.dump(report, f, indent=2, default=json_default)
         
         print(f"  JSON report saved: {filepath}")
         return filepath
@@ -1006,11 +1081,13 @@ class ReportGenerator:
             ""
         ]
         
-        for repo_result in self.results:
+        matrix = self.results
+        failed_counts = matrix.row_counts(passed=False)
+        for row, repo_result in enumerate(matrix.rows):
             repo_name = repo_result["repository"]
-            rules = repo_result["rules"]
-            passed = sum(1 for r in rules if r["passed"])
-            failed = len(rules) - passed
+            total = matrix.offsets[row + 1] - matrix.offsets[row]
+            failed = failed_counts[row]
+            passed = total - failed
             
             status = "✅" if failed == 0 else "❌"
             lines.append(f"### {status} {repo_name}")
@@ -1018,7 +1095,7 @@ class ReportGenerator:
             lines.append(f"- Branch: `{repo_result['default_branch']}`")
             lines.append(f"- Private: {'Yes' if repo_result['private'] else 'No'}")
             lines.append(f"- Archived: {'Yes' if repo_result['archived'] else 'No'}")
-            lines.append(f"- Rules: {passed}/{len(rules)} passed")
+            lines.append(f"- Rules: {passed}/{total} passed")
             lines.append("")
             
             if failed > 0:
@@ -1026,9 +1103,9 @@ class ReportGenerator:
                 lines.append("")
                 lines.append("| Rule | Current | Expected |")
                 lines.append("|------|---------|----------|")
-                for rule in rules:
-                    if not rule["passed"]:
-                        lines.append(f"| {rule['rule']} | {rule['current_value']} | {rule['expected_value']} |")
+                for i in matrix.cells(row, passed=False):
+                    rule = matrix.result(i)
+                    lines.append(f"| {rule['rule']} | {rule['current_value']} | {rule['expected_value']} |")
                 lines.append("")
         
         with open(filepath, "w", encoding="utf-8") as f:
@@ -1039,6 +1116,10 @@ class ReportGenerator:
     
     def generate_excel_report(self, filepath="repo_compliance_report.xlsx"):
         """Generate Excel report."""
+        # Imported on first use: runs that write no Excel report never load openpyxl
+        import openpyxl
+        from openpyxl.styles import Font, PatternFill, Border, Side
+        
         wb = openpyxl.Workbook()
         
         # Styles
@@ -1090,9 +1171,10 @@ class ReportGenerator:
             cell.border = thin_border
         
         row_idx = 2
-        for repo_result in self.results:
+        matrix = self.results
+        for row, repo_result in enumerate(matrix.rows):
             repo_name = repo_result["repository"]
-            for rule in repo_result["rules"]:
+            for rule in map(matrix.result, matrix.cells(row)):
                 values = [
                     repo_name,
                     rule["rule"],
@@ -1118,16 +1200,40 @@ class ReportGenerator:
         ws2.column_dimensions['F'].width = 30
         ws2.column_dimensions['G'].width = 60
         
+        # By Rule Sheet: pass/fail counts per rule across repositories
+        ws3 = wb.create_sheet("By Rule")
+        for col, header in enumerate(["Rule", "Passed", "Failed"], 1):
+            cell = ws3.cell(row=1, column=col, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.border = thin_border
+        for row_idx, (rule, counts) in enumerate(matrix.rule_counts().items(), 2):
+            for col_idx, value in enumerate([rule, counts["passed"], counts["failed"] + counts["info"]], 1):
+                ws3.cell(row=row_idx, column=col_idx, value=value).border = thin_border
+        ws3.column_dimensions['A'].width = 30
+        
         wb.save(filepath)
         print(f"  Excel report saved: {filepath}")
         return filepath
     
-    def generate_all_reports(self):
-        """Generate all report formats."""
+    def generate_all_reports(self, suffix="", skip=None):
+        """
+        Generate all report formats, each in its own worker process
+        (see report_renderer.py).
+        
+        Args:
+            suffix: Appended to the file names (e.g. "_my-org" in --orgs mode)
+            skip: Formats not to generate (--skip-formats)
+        
+        Returns:
+            dict: Report paths keyed by format
+        """
         print("\nGenerating Reports...")
-        self.generate_json_report()
-        self.generate_markdown_report()
-        self.generate_excel_report()
+        return render_reports(self, {
+            "json": f"repo_compliance_report{suffix}.json",
+            "markdown": f"repo_compliance_report{suffix}.md",
+            "excel": f"repo_compliance_report{suffix}.xlsx"
+        }, skip=skip)
 
 
 # =============================================================================
@@ -1165,6 +1271,45 @@ class RepoComplianceApplier:
     - metadata_existing: Requires creating .metadata file (content unknown)
     """
     
+    # Automated .metadata creation for Tornado repos (Non-Prod Gen1)
+    TORNADO_MISSING_METADATA = [
+        "onecloud-tracker", "vcloud", "defect-analysis-tool", "Office-of-the-CTO",
+        "vuln_scan_output", "JIL_MCV_Architecture", "personal_ms",
+        "vcd-jil-test-automation", "foo-repo", "bar-repo", "vcd-test",
+        "skytap-tracker", "vuln_scan_output_nonprod", "MVCS-Documentation",
+        "NextGenVPC", "LOGAN-Documentation", "mvcs-prototype", "mvcs-tracker",
+        "mvcs-mgmt-comm", "mvcs-mgmt-scheduler", "mvcs-mgmt-worker",
+        "mvcs-mgmt-api", "mvcs-ansible", "mvcs-cli", "Isolation",
+        "artemis-teams", "hpo-hipaa-assessment-2020", "vcd-access",
+        "mvcs-change-management", "vcd-infra-comm", "vcd-infra-api",
+        "vcd-infra-worker", "vcd-infra-scheduler", "codescan", "ursula_env",
+        "non-personal-ids", "git-issue-analysis", "vpc-sp",
+        "newrelic-monitor-synthetic", "vpc-veeam",
+        "atlas-github-app-test-repo", "vcd-billing-resubmission-script",
+        "v2t", "vcd-billing-reporting-script", "vcd-billing-cos-reader",
+        "pvs-bur-sp", "vcd-reports-prototype", "console-e2e",
+        "UIAutomationResult", "add-on-services-team",
+        "vcd-language-translation",
+        "PIM_to_Secrete_Manager_ESXI_Automation", "vcd-iaas-vro",
+        "ipops-vcd-dev-request", "auditree_config", "vcd-SF-rev-20221114",
+        "ic4v-evidence-locker", "ic4v-auditree-config", "vmware-sol-locker",
+        "auditree-VCS-evidence-locker", "auditree-VCS",
+        "gen1-evidence-locker-test1", "gen1-auditree-config", "ic4v-patent",
+        "vcf-on-vpc-documentation", "vcd-pscli-veeam",
+        "VCD-Price-change-July2023", "auditree-vuln-scan-output",
+        "svelte-pocs", "advisory", "bss_cloudant_account_compare",
+        "veeam-customer-schedule", "sf-shared-deprecation",
+        "security-scans-config", "security-scans-compliance-issues",
+        "security-scans-compliance-inventory",
+        "security-scans-compliance-evidence", "postgressqlreportresults",
+        "ic4v-data-analytics", "ic4v-data-analytics-common", "ic4v-vrops",
+        "ic4v-platform-team-synlab", "license-expiry-reminder",
+        "logger-agent-config", "onepipeline-compliance-incident-issues",
+        "onepipeline-compliance-evidence-locker",
+        "onepipeline-compliance-inventory", "kmip4hpcs_monitor",
+        "common-automation", "ic4v-licensing-distro", "ic4v-vcfvpc-tests"
+    ]
+    
     def __init__(self, api_client, org_name, dry_run=False):
         self.api = api_client
         self.org = org_name
@@ -1224,11 +1369,11 @@ class RepoComplianceApplier:
                 "outside_collaborators": [c["login"] for c in outside_collabs],
                 "direct_collaborators": [c["login"] for c in direct_collabs],
                 "teams": [{"name": t["name"], "slug": t["slug"], "permission": t.get("permission")} for t in teams],
-                "rules_checked": repo_result["rules"]
+                "rules_checked": [dict(rule) for rule in repo_result["rules"]]
             })
         
         with open(backup_file, "w", encoding="utf-8") as f:
-            json.dump(backup_data, f, indent=2, default=str)
+            json.dump(backup_data, f, indent=2, default=json_default)
         
         print(f"    Backup saved: {backup_file}")
         print(f"    Backed up {len(backup_data['repositories'])} repository configurations")
@@ -1415,6 +1560,146 @@ class RepoComplianceApplier:
                 "error": str(e)
             }
     
+    def metadata_skip_reason(self, repo_name, default_branch):
+        """
+        Decide whether a missing .metadata may be created automatically.
+        
+        Returns:
+            str or None: Reason to skip creation, or None if it may be created
+        """
+        if repo_name not in self.TORNADO_MISSING_METADATA:
+            return "Repo not in Tornado missing .metadata list, skipping creation"
+        if repo_name.startswith("vcd-") or repo_name.startswith("mvcs-"):
+            return "Repo starts with vcd- or mvcs-, skipping creation"
+        if default_branch == "main":
+            return "Default branch is main, skipping creation"
+        return None
+    
+    def build_metadata_request(self, default_branch):
+        """
+        Build the contents API payload for a Non-Prod Gen1 .metadata file.
+        
+        API: PUT /repos/{org}/{repo}/contents/.metadata
+        """
+        metadata_content = {
+            "service": "vmware-solutions",
+            "production_code": "No",
+            "production_branches": [""],
+            "security_sensitive": "no",
+            "ip_sensitive": "no",
+            "allow_cloud_readers": "yes"
+        }
+        return {
+            "message": "Add .metadata file for compliance",
+            "content": base64.b64encode(json.dumps(metadata_content, indent=2).encode("utf-8")).decode("utf-8"),
+            "branch": default_branch
+        }
+    
+    def build_plan(self, check_results, repo_state, target_repo=None):
+        """
+        Record the writes apply_all would make, without making any API calls.
+        
+        Preconditions come from the check: ETags of the hooks, collaborator and
+        team listings, the visibility/archived flags from the repo listing, and
+        404 for a missing .metadata. The backup is built from the same data in
+        the format rollback_from_backup reads.
+        
+        Args:
+            check_results: Results from RepoComplianceChecker
+            repo_state: RepoComplianceChecker.repo_state
+            target_repo: Optional - only plan for this repository
+        
+        Returns:
+            RemediationPlan: Plan ready to be saved and reviewed
+        """
+        if target_repo:
+            check_results = [r for r in check_results if r["repository"] == target_repo]
+        
+        backup = {"repositories": []}
+        for repo_result in check_results:
+            state = repo_state.get(repo_result["repository"], {})
+            backup["repositories"].append({
+                "repository": repo_result["repository"],
+                "private": repo_result.get("private"),
+                "archived": repo_result.get("archived"),
+                "hooks": state.get("hooks", []),
+                "outside_collaborators": state.get("outside_collaborators", []),
+                "direct_collaborators": state.get("direct_collaborators", []),
+                "teams": state.get("teams", []),
+                "rules_checked": [dict(rule) for rule in repo_result["rules"]]
+            })
+        
+        plan = RemediationPlan("repo_compliance", self.org, "repo_backup", "repo", backup)
+        
+        def listing_precondition(endpoint):
+            return {"endpoint": endpoint, "etag": self.api.etags.get(endpoint)}
+        
+        for repo_result in check_results:
+            repo_name = repo_result["repository"]
+            repo_endpoint = f"/repos/{self.org}/{repo_name}"
+            default_branch = repo_result.get("default_branch", "master")
+            
+            for rule in repo_result["rules"]:
+                if rule["passed"]:
+                    continue
+                rule_name = rule["rule"]
+                context = {"repository": repo_name, "rules": [rule_name]}
+                
+                if rule_name == "unsecure_hooks":
+                    precondition = listing_precondition(f"{repo_endpoint}/hooks")
+                    for hook in rule.get("insecure_hooks", []):
+                        plan.add("PATCH", f"{repo_endpoint}/hooks/{hook['id']}",
+                                 payload={"config": {"insecure_ssl": "0"}},
+                                 precondition=precondition,
+                                 description=f"Enable SSL verification on hook {hook['id']}",
+                                 **context)
+                
+                elif rule_name in ("collaborators_in_org", "collaborators_in_team"):
+                    collab_type = "outside" if rule_name == "collaborators_in_org" else "direct"
+                    precondition = listing_precondition(
+                        f"{repo_endpoint}/collaborators?affiliation={collab_type}&per_page=100"
+                    )
+                    for username in rule.get(f"{collab_type}_collaborators", []):
+                        plan.add("DELETE", f"{repo_endpoint}/collaborators/{username}",
+                                 precondition=precondition,
+                                 description=f"Remove {collab_type} collaborator: {username}",
+                                 **context)
+                
+                elif rule_name == "shared_repo_readers":
+                    plan.add("DELETE", f"/orgs/{self.org}/teams/cloud_readers/repos/{self.org}/{repo_name}",
+                             precondition=listing_precondition(f"{repo_endpoint}/teams?per_page=100"),
+                             description="Remove team access: cloud_readers",
+                             **context)
+                
+                elif rule_name == "private_if_sensitive":
+                    plan.add("PATCH", repo_endpoint,
+                             payload={"private": True},
+                             precondition={"endpoint": repo_endpoint, "expect": {"private": False}},
+                             description="Make repository private",
+                             **context)
+                
+                elif rule_name == "archived_status":
+                    if "Archived: Yes" in rule.get("current_value", ""):
+                        plan.add("PATCH", repo_endpoint,
+                                 payload={"archived": False},
+                                 precondition={"endpoint": repo_endpoint, "expect": {"archived": True}},
+                                 description="Unarchive repository",
+                                 **context)
+                
+                elif rule_name == "metadata_existing":
+                    if self.metadata_skip_reason(repo_name, default_branch):
+                        continue
+                    plan.add("PUT", f"{repo_endpoint}/contents/.metadata",
+                             payload=self.build_metadata_request(default_branch),
+                             precondition={
+                                 "endpoint": f"{repo_endpoint}/contents/.metadata?ref={default_branch}",
+                                 "absent": True
+                             },
+                             description="Create .metadata file",
+                             **context)
+        
+        return plan
+    
     def apply_repo_fixes(self, repo_result):
         """
         Apply fixes for a single repository.
@@ -1435,45 +1720,6 @@ class RepoComplianceApplier:
             "skipped": []
         }
         
-        # Automated .metadata creation for Tornado repos (Non-Prod Gen1)
-        tornado_missing_metadata = [
-            "onecloud-tracker", "vcloud", "defect-analysis-tool", "Office-of-the-CTO",
-            "vuln_scan_output", "JIL_MCV_Architecture", "personal_ms",
-            "vcd-jil-test-automation", "foo-repo", "bar-repo", "vcd-test",
-            "skytap-tracker", "vuln_scan_output_nonprod", "MVCS-Documentation",
-            "NextGenVPC", "LOGAN-Documentation", "mvcs-prototype", "mvcs-tracker",
-            "mvcs-mgmt-comm", "mvcs-mgmt-scheduler", "mvcs-mgmt-worker",
-            "mvcs-mgmt-api", "mvcs-ansible", "mvcs-cli", "Isolation",
-            "artemis-teams", "hpo-hipaa-assessment-2020", "vcd-access",
-            "mvcs-change-management", "vcd-infra-comm", "vcd-infra-api",
-            "vcd-infra-worker", "vcd-infra-scheduler", "codescan", "ursula_env",
-            "non-personal-ids", "git-issue-analysis", "vpc-sp",
-            "newrelic-monitor-synthetic", "vpc-veeam",
-            "atlas-github-app-test-repo", "vcd-billing-resubmission-script",
-            "v2t", "vcd-billing-reporting-script", "vcd-billing-cos-reader",
-            "pvs-bur-sp", "vcd-reports-prototype", "console-e2e",
-            "UIAutomationResult", "add-on-services-team",
-            "vcd-language-translation",
-            "PIM_to_Secrete_Manager_ESXI_Automation", "vcd-iaas-vro",
-            "ipops-vcd-dev-request", "auditree_config", "vcd-SF-rev-20221114",
-            "ic4v-evidence-locker", "ic4v-auditree-config", "vmware-sol-locker",
-            "auditree-VCS-evidence-locker", "auditree-VCS",
-            "gen1-evidence-locker-test1", "gen1-auditree-config", "ic4v-patent",
-            "vcf-on-vpc-documentation", "vcd-pscli-veeam",
-            "VCD-Price-change-July2023", "auditree-vuln-scan-output",
-            "svelte-pocs", "advisory", "bss_cloudant_account_compare",
-            "veeam-customer-schedule", "sf-shared-deprecation",
-            "security-scans-config", "security-scans-compliance-issues",
-            "security-scans-compliance-inventory",
-            "security-scans-compliance-evidence", "postgressqlreportresults",
-            "ic4v-data-analytics", "ic4v-data-analytics-common", "ic4v-vrops",
-            "ic4v-platform-team-synlab", "license-expiry-reminder",
-            "logger-agent-config", "onepipeline-compliance-incident-issues",
-            "onepipeline-compliance-evidence-locker",
-            "onepipeline-compliance-inventory", "kmip4hpcs_monitor",
-            "common-automation", "ic4v-licensing-distro", "ic4v-vcfvpc-tests"
-        ]
-        
         for rule in failed_rules:
             rule_name = rule["rule"]
             
@@ -1536,39 +1782,15 @@ class RepoComplianceApplier:
             
             elif rule_name == "metadata_existing":
                 # Only add .metadata if missing, never overwrite
-                if repo_name not in tornado_missing_metadata:
-                    repo_changes["skipped"].append({
-                        "rule": rule_name,
-                        "reason": "Repo not in Tornado missing .metadata list, skipping creation"
-                    })
-                    continue
-                if repo_name.startswith("vcd-") or repo_name.startswith("mvcs-"):
-                    repo_changes["skipped"].append({
-                        "rule": rule_name,
-                        "reason": "Repo starts with vcd- or mvcs-, skipping creation"
-                    })
-                    continue
-                if repo_result.get("default_branch", "master") == "main":
+                skip_reason = self.metadata_skip_reason(repo_name, repo_result.get("default_branch", "master"))
+                if skip_reason:
                     repo_changes["skipped"].append({
                         "rule": rule_name,
-                        "reason": "Default branch is main, skipping creation"
+                        "reason": skip_reason
                     })
                     continue
-                # Create Non-Prod Gen1 .metadata content
-                metadata_content = {
-                    "service": "vmware-solutions",
-                    "production_code": "No",
-                    "production_branches": [""],
-                    "security_sensitive": "no",
-                    "ip_sensitive": "no",
-                    "allow_cloud_readers": "yes"
-                }
                 url = f"/repos/{self.org}/{repo_name}/contents/.metadata"
-                data = {
-                    "message": "Add .metadata file for compliance",
-                    "content": base64.b64encode(json.dumps(metadata_content, indent=2).encode("utf-8")).decode("utf-8"),
-                    "branch": repo_result.get("default_branch", "master")
-                }
+                data = self.build_metadata_request(repo_result.get("default_branch", "master"))
                 if not self.dry_run:
                     try:
                         resp = self.api.put(url, data)
@@ -1835,6 +2057,9 @@ Examples:
   %(prog)s --repo my-repo --apply     Apply fixes to one repo only
   %(prog)s --rollback backup.json     Restore settings from backup file
   %(prog)s --qualification-only       Only check if org requires compliance
+  %(prog)s --plan plan.json           Check and save intended changes for review
+  %(prog)s --execute plan.json        Apply a reviewed plan (e.g. in a change window)
+  %(prog)s --rules unsecure_hooks     Check only the listed rules
 
 Settings that can be applied automatically:
   - unsecure_hooks (enable SSL verification on webhooks)
@@ -1871,11 +2096,63 @@ Organization Qualification:
         metavar="BACKUP_FILE",
         help="Rollback to settings from backup file"
     )
+    mode_group.add_argument(
+        "--plan",
+        metavar="PLAN_FILE",
+        help="Check compliance and record the writes --apply would make, without applying"
+    )
+    mode_group.add_argument(
+        "--execute",
+        metavar="PLAN_FILE",
+        help="Replay a plan file concurrently, skipping resources changed since planning"
+    )
     
     parser.add_argument(
         "--dry-run", "-n",
         action="store_true",
-        help="Preview changes without applying (use with --apply)"
+        help="Preview changes without applying (use with --apply or --execute)"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Concurrent workers for --execute, or organizations at a time for --orgs (default: {DEFAULT_WORKERS})"
+    )
+    
+    parser.add_argument(
+        "--orgs",
+        type=parse_orgs,
+        metavar="ORG1,ORG2,...",
+        help="Check several organizations concurrently over one shared API client (check mode only)"
+    )
+    
+    parser.add_argument(
+        "--offline",
+        metavar="SNAPSHOT",
+        help="Evaluate rules against an inventory snapshot instead of the API (check mode only)"
+    )
+    
+    parser.add_argument(
+        "--skip-formats",
+        type=parse_formats,
+        default=[],
+        metavar="FORMAT,...",
+        help="Report formats not to generate: json, markdown, excel (e.g. --skip-formats excel)"
+    )
+    
+    parser.add_argument(
+        "--history",
+        metavar="DB",
+        help="Also record rule outcomes in this compliance history (see compliance_history.py)"
+    )
+    
+    parser.add_argument(
+        "--rules",
+        type=parse_rule_names,
+        metavar="RULE1,RULE2,...",
+        help=f"Only evaluate these rules and fetch only the data they read (check mode only). "
+             f"Available: {', '.join(REPO_RULES.names())}"
     )
     
     parser.add_argument(
@@ -1899,12 +2176,89 @@ Organization Qualification:
     return parser.parse_args()
 
 
+# =============================================================================
+# MULTI-ORGANIZATION MODE
+# =============================================================================
+
+def check_org(api_client, org_name, args):
+    """
+    Run qualification and compliance checks for one organization (--orgs mode).
+    
+    Writes the per-org reports and returns where they are, or why the
+    organization was skipped, for the combined report.
+    """
+    if not args.skip_qualification:
+        qual_result = OrgQualificationChecker(api_client, org_name).check_qualification()
+        if args.qualification_only:
+            return {"qualification": qual_result, "skipped_reason": "Qualification only"}
+        if not qual_result["qualified"]:
+            return {"qualification": qual_result,
+                    "skipped_reason": "Organization does not require compliance checks"}
+    
+    checker = RepoComplianceChecker(api_client, org_name, rules=args.rules)
+    results = checker.run_all_checks(target_repo=args.repo)
+    if not results:
+        return {"skipped_reason": "No repositories found"}
+    
+    report_gen = ReportGenerator(org_name, results)
+    reports = report_gen.generate_all_reports(suffix=f"_{org_name}", skip=args.skip_formats)
+    if args.history:
+        record_results(args.history, "repository", org_name, results,
+                       generated_at=report_gen.timestamp, complete=not (args.rules or args.repo))
+    return {"json_report": reports["json"]}
+
+
+def run_multi_org(args):
+    """Check several organizations concurrently over one shared client (--orgs)."""
+    if args.apply or args.rollback or args.plan or args.execute:
+        print("ERROR: --orgs only supports check mode. Remediate one organization at a time.")
+        sys.exit(1)
+    if "json" in args.skip_formats:
+        print("ERROR: --orgs needs the JSON reports to build the combined report.")
+        sys.exit(1)
+    
+    print(f"  Organizations: {', '.join(args.orgs)}")
+    print(f"  Mode: CHECK (report only, {args.workers} organizations at a time)")
+    
+    # One client and session: shared connection pool and rate-limit budget
+    api_client = create_api_client(args, session=RateLimitedSession())
+    outcomes = run_orgs(args.orgs, lambda org: check_org(api_client, org, args), max_workers=args.workers)
+    
+    print("\nGenerating Combined Report...")
+    combined = write_combined_report("Repository Compliance", outcomes, "repo_compliance_report_combined.json")
+    
+    print("\n" + "=" * 60)
+    print("MULTI-ORGANIZATION SUMMARY")
+    print("=" * 60)
+    for org, outcome in outcomes.items():
+        summary = combined["summary"].get(org) or {}
+        if "error" in outcome:
+            print(f"  {org}: ERROR ({outcome['error']})")
+        elif "skipped_reason" in summary:
+            print(f"  {org}: SKIPPED ({summary['skipped_reason']})")
+        else:
+            print(f"  {org}: {summary['total_repositories']} repo(s) checked, {summary['repos_with_issues']} with issues")
+    print("\n" + "=" * 60)
+
+
 # =============================================================================
 # MAIN ENTRY POINT
 # =============================================================================
 
+def create_api_client(args, session=None):
+    """GitHub API client, or a snapshot-backed one that makes no calls with --offline."""
+    if args.offline:
+        try:
+            return open_offline_client(args.offline)
+        except SnapshotError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+    return GitHubAPIClient(GITHUB_BASE, GITHUB_TOKEN, session=session)
+
+
 def main():
     """Main entry point."""
+    global SLEEP_INTERVAL
     args = parse_arguments()
     
     print("\n" + "=" * 60)
@@ -1912,21 +2266,44 @@ def main():
     print("=" * 60)
     
     # Validate configuration
-    if not GITHUB_TOKEN:
+    if args.offline:
+        if args.apply or args.rollback or args.plan or args.execute:
+            print("ERROR: --offline only supports check mode. Remediation needs the live API.")
+            sys.exit(1)
+        # No API calls are made, so there is nothing to pace
+        SLEEP_INTERVAL = 0
+    elif not GITHUB_TOKEN:
         print("ERROR: GITHUB_TOKEN environment variable is not set.")
         sys.exit(1)
+    
+    if args.rules:
+        if args.apply or args.rollback or args.plan or args.execute:
+            print("ERROR: --rules only supports check mode. Remediation needs every rule's result.")
+            sys.exit(1)
+        try:
+            REPO_RULES.select(args.rules)
+        except ValueError as e:
+            print(f"ERROR: {e}")
+            sys.exit(1)
+    
+    if args.orgs:
+        print(f"\nConfiguration:")
+        print(f"  Snapshot: {args.offline} (offline)" if args.offline else f"  API Base URL: {GITHUB_BASE}")
+        run_multi_org(args)
+        return
+    
     if not GITHUB_ORG:
         print("ERROR: GITHUB_ORG environment variable is not set.")
         sys.exit(1)
     
     print(f"\nConfiguration:")
     print(f"  Organization: {GITHUB_ORG}")
-    print(f"  API Base URL: {GITHUB_BASE}")
+    print(f"  Snapshot: {args.offline} (offline)" if args.offline else f"  API Base URL: {GITHUB_BASE}")
     if args.repo:
         print(f"  Target Repo: {args.repo}")
     
     # Initialize API client
-    api_client = GitHubAPIClient(GITHUB_BASE, GITHUB_TOKEN)
+    api_client = create_api_client(args)
     
     # Handle ROLLBACK mode
     if args.rollback:
@@ -1935,6 +2312,14 @@ def main():
         print("\n" + "=" * 60)
         return
     
+    # Handle EXECUTE mode (no checks - the plan already holds everything)
+    if args.execute:
+        print(f"  Mode: EXECUTE {args.execute} {'(DRY RUN)' if args.dry_run else ''}")
+        execute_plan(api_client, args.execute, org_name=GITHUB_ORG,
+                     max_workers=args.workers, dry_run=args.dry_run)
+        print("\n" + "=" * 60)
+        return
+    
     # =========================================================================
     # STEP 1: QUALIFICATION CHECK
     # =========================================================================
@@ -1958,7 +2343,7 @@ def main():
                 "timestamp": datetime.now().isoformat(),
                 "organization": GITHUB_ORG,
                 "qualification": qual_result
-            }, f, indent=2, default=str)
+            }, f, indent=2, default=json_default)
         print(f"\n  Qualification report saved: {qual_report_file}")
         
         if args.qualification_only:
@@ -1980,14 +2365,16 @@ def main():
     # STEP 2: COMPLIANCE CHECKS
     # =========================================================================
     
-    # Handle CHECK and APPLY modes
+    # Handle CHECK, APPLY and PLAN modes
     if args.apply:
         print(f"  Mode: APPLY {'(DRY RUN)' if args.dry_run else ''}")
+    elif args.plan:
+        print(f"  Mode: PLAN to {args.plan}")
     else:
         print(f"  Mode: CHECK (report only)")
     
     # Initialize checker and run checks
-    checker = RepoComplianceChecker(api_client, GITHUB_ORG)
+    checker = RepoComplianceChecker(api_client, GITHUB_ORG, rules=args.rules)
     results = checker.run_all_checks(target_repo=args.repo)
     
     if args.repo and not results:
@@ -2000,13 +2387,17 @@ def main():
     
     # Generate reports
     report_gen = ReportGenerator(GITHUB_ORG, results)
-    report_gen.generate_all_reports()
+    report_gen.generate_all_reports(skip=args.skip_formats)
+    if args.history:
+        record_results(args.history, "repository", GITHUB_ORG, results,
+                       generated_at=report_gen.timestamp, complete=not (args.rules or args.repo))
     
     # Print summary
-    total_repos = len(results)
-    repos_with_issues = sum(1 for r in results if any(not rule["passed"] for rule in r["rules"]))
-    total_rules = sum(len(r["rules"]) for r in results)
-    total_failed = sum(1 for r in results for rule in r["rules"] if not rule["passed"])
+    summary = report_gen._calculate_summary()
+    total_repos = summary["total_repositories"]
+    repos_with_issues = summary["repos_with_issues"]
+    total_rules = summary["total_rules_checked"]
+    total_failed = summary["total_failed"]
     
     print("\n" + "=" * 60)
     print("CHECK SUMMARY")
@@ -2042,9 +2433,19 @@ def main():
                     "changes": applier.changes_made,
                     "skipped": applier.skipped,
                     "errors": applier.errors
-                }, f, indent=2, default=str)
+                }, f, indent=2, default=json_default)
             print(f"\n  Apply log saved: {apply_log_file}")
     
+    # Handle PLAN mode
+    if args.plan:
+        applier = RepoComplianceApplier(api_client, GITHUB_ORG)
+        plan = applier.build_plan(results, checker.repo_state, target_repo=args.repo)
+        print("\n" + "=" * 60)
+        print("REMEDIATION PLAN")
+        print("=" * 60)
+        plan.save(args.plan)
+        print(f"  Review it, then run: --execute {args.plan}")
+    
     print("\n" + "=" * 60)
 
 
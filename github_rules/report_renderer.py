@@ -0,0 +1,109 @@
+"""
+================================================================================
+REPORT RENDERER
+================================================================================
+
+Shared by org_compliance.py, repo_compliance.py and branch_compliance.py.
+
+ReportGenerator.generate_all_reports renders JSON, Markdown and Excel from the
+same results. Excel is much slower than the other two, so the formats are
+rendered side by side instead of one after another:
+
+    1. The results are serialised (pickle) once to a temporary file.
+    2. Each format gets its own worker process, which loads the results from
+       that file, builds the script's ReportGenerator with the parent's
+       timestamp and calls generate_<format>_report.
+    3. The temporary file is removed once every worker has finished.
+
+Report time is then close to that of the slowest single format. Formats can
+be left out with --skip-formats (e.g. --skip-formats excel). A single
+remaining format is rendered in-process, without workers.
+
+Workers are started with "spawn", which is safe from the --orgs thread pool.
+================================================================================
+"""
+
+import os
+import sys
+import pickle
+import argparse
+import tempfile
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+REPORT_FORMATS = ["json", "markdown", "excel"]
+
+
+def parse_formats(value):
+    """Split a comma-separated --skip-formats value into report formats."""
+    formats = []
+    for fmt in value.split(","):
+        fmt = fmt.strip().lower()
+        if not fmt or fmt in formats:
+            continue
+        if fmt not in REPORT_FORMATS:
+            raise argparse.ArgumentTypeError(
+                f"unknown report format '{fmt}' (choose from {', '.join(REPORT_FORMATS)})"
+            )
+        formats.append(fmt)
+    return formats
+
+
+# =============================================================================
+# RENDERING
+# =============================================================================
+
+def _module_name(generator):
+    """Importable name of the module defining the generator's class."""
+    name = type(generator).__module__
+    if name == "__main__":
+        # Script run directly: workers import it by file name instead
+        name = os.path.splitext(os.path.basename(sys.modules["__main__"].__file__))[0]
+    return name
+
+
+def _render(module_name, class_name, org, timestamp, results_path, fmt, filepath):
+    """Worker: rebuild the ReportGenerator from the shared results file and render one format."""
+    module = importlib.import_module(module_name)
+    with open(results_path, "rb") as f:
+        results = pickle.load(f)
+    generator = getattr(module, class_name)(org, results)
+    generator.timestamp = timestamp
+    return getattr(generator, f"generate_{fmt}_report")(filepath)
+
+
+def render_reports(generator, paths, skip=None):
+    """
+    Render every report format not skipped, in parallel worker processes.
+
+    Args:
+        generator: The script's ReportGenerator (org, results and timestamp)
+        paths: {format: output file path}
+        skip: Formats not to render
+
+    Returns:
+        dict: Report paths keyed by format, for the formats rendered
+    """
+    formats = [fmt for fmt in paths if fmt not in (skip or [])]
+    if len(formats) <= 1:
+        return {fmt: getattr(generator, f"generate_{fmt}_report")(paths[fmt]) for fmt in formats}
+
+    handle, results_path = tempfile.mkstemp(prefix="compliance_results_", suffix=".pickle")
+    try:
+        with os.fdopen(handle, "wb") as f:
+            pickle.dump(generator.results, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        args = (_module_name(generator), type(generator).__name__, generator.org,
+                generator.timestamp, results_path)
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=len(formats), mp_context=context) as pool:
+            futures = {fmt: pool.submit(_render, *args, fmt, paths[fmt]) for fmt in formats}
+            return {fmt: future.result() for fmt, future in futures.items()}
+    finally:
+        os.remove(results_path)
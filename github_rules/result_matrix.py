@@ -0,0 +1,303 @@
+"""
+================================================================================
+RESULT MATRIX
+================================================================================
+
+Columnar form of the compliance checkers' results, used by the report
+generators of org_compliance.py, repo_compliance.py and branch_compliance.py.
+
+The checkers return nested dicts (repository -> branch -> rule), each rule
+result repeating its name, expected value, enforcement and a prose reason.
+ReportGenerator used to walk that tree once per statistic and once per
+format. ResultMatrix stores the same results as a subjects x rules matrix:
+
+    rules       Interned rule metadata: (rule, expected_value, enforcement,
+                key order) - one entry per distinct combination
+    rows        One per subject (the organization, a repository or a
+                branch) with its header fields; row i owns cells
+                offsets[i]:offsets[i + 1]
+    cells       Parallel columns, one entry per rule result:
+                  rule_ids   array of rule indexes
+                  codes      bytearray of status bits (PASSED, INFO,
+                             REQUIRED, RECOMMENDED)
+                  current    current_value
+                  reasons    reason, interned (most are repeated verbatim)
+                  extras     rule-specific fields (insecure_hooks, ...)
+                             or None
+
+Counts are taken from the codes bytearray with C-level scans (a 16-entry
+histogram, bytes.translate masks and bytearray.count over row ranges), so
+summaries, per-row statistics, filters and pivots never touch the result
+dicts. to_results() rebuilds the checkers' dicts, key order included, only
+when the JSON report is written - the report is unchanged byte for byte.
+
+The matrix pickles much smaller than the dicts, which is what
+report_renderer.py hands to its worker processes.
+================================================================================
+"""
+
+from array import array
+from collections import Counter
+
+
+# =============================================================================
+# STATUS BITS
+# =============================================================================
+
+PASSED = 1
+INFO = 2          # "status": "INFO" - manual action, counted as compliant
+REQUIRED = 4      # enforcement "Required"
+RECOMMENDED = 8   # enforcement "Recommended"
+
+CODES = range(16)
+
+# Rule result keys held in their own columns (or the rule table)
+RULE_KEYS = ("rule", "expected_value", "enforcement")
+CELL_KEYS = ("passed", "current_value", "reason", "status")
+
+# Header keys holding each scope's children
+CHILDREN = {"organization": None, "repository": "rules", "branch": "branches"}
+
+
+def _selected(passed=None, info=None, enforcement=None):
+    """Status codes matching the conditions (None = either)."""
+    codes = []
+    for code in CODES:
+        if passed is not None and bool(code & PASSED) != passed:
+            continue
+        if info is not None and bool(code & INFO) != info:
+            continue
+        if enforcement == "Required" and not code & REQUIRED:
+            continue
+        if enforcement == "Recommended" and not code & RECOMMENDED:
+            continue
+        codes.append(code)
+    return codes
+
+
+def _mask_table(codes):
+    """bytes.translate table mapping the given status codes to 1, others to 0."""
+    return bytes(1 if code in codes else 0 for code in range(256))
+
+
+def _hashable(value):
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+# =============================================================================
+# RESULT MATRIX
+# =============================================================================
+
+class ResultMatrix:
+    """
+    Subjects x rules outcome matrix for one checker run.
+
+    Build it with ResultMatrix.from_results(scope, results); scope is the
+    RuleRegistry scope ("organization", "repository" or "branch").
+    """
+
+    def __init__(self, scope):
+        if scope not in CHILDREN:
+            raise ValueError(f"unknown scope '{scope}' (choose from {', '.join(CHILDREN)})")
+        self.scope = scope
+        self.rules = []          # [(rule, expected_value, enforcement, keys)]
+        self._rule_index = {}
+        self.groups = []         # Repository headers (branch scope)
+        self.rows = []           # Subject headers (without their rules)
+        self.row_groups = array("I")
+        self.offsets = array("I", [0])
+        self.rule_ids = array("I")
+        self.codes = bytearray()
+        self.current = []
+        self.reasons = []
+        self.extras = []
+        self._strings = {}
+        self._histogram = None
+
+    # -------------------------------------------------------------------------
+    # Building
+    # -------------------------------------------------------------------------
+
+    @classmethod
+    def from_results(cls, scope, results):
+        """Build from a checker's run_all_checks() results."""
+        matrix = cls(scope)
+        if scope == "organization":
+            matrix.add_row({}, results)
+        elif scope == "repository":
+            for repo in results:
+                matrix.add_row(dict(repo, rules=None), repo["rules"])
+        else:
+            for repo in results:
+                group = len(matrix.groups)
+                matrix.groups.append(dict(repo, branches=None))
+                for branch in repo["branches"]:
+                    matrix.add_row(dict(branch, rules=None), branch["rules"], group)
+        return matrix
+
+    def _rule_id(self, result):
+        keys = tuple(result)
+        key = (result["rule"], _hashable(result["expected_value"]), result["enforcement"], keys)
+        rule_id = self._rule_index.get(key)
+        if rule_id is None:
+            rule_id = self._rule_index[key] = len(self.rules)
+            self.rules.append((result["rule"], result["expected_value"], result["enforcement"], keys))
+        return rule_id
+
+    def _intern(self, value):
+        """One shared copy of each distinct string (reasons and values repeat a lot)."""
+        if not isinstance(value, str):
+            return value
+        return self._strings.setdefault(value, value)
+
+    def add_row(self, header, rule_results, group=0):
+        """Append one subject and its rule results."""
+        self.rows.append(header)
+        self.row_groups.append(group)
+        for result in rule_results:
+            rule_id = self._rule_id(result)
+            keys = self.rules[rule_id][3]
+            code = PASSED if result["passed"] else 0
+            if result.get("status") == "INFO":
+                code |= INFO
+            if result["enforcement"] == "Required":
+                code |= REQUIRED
+            elif result["enforcement"] == "Recommended":
+                code |= RECOMMENDED
+            extra = tuple(result[k] for k in keys if k not in RULE_KEYS and k not in CELL_KEYS)
+            self.rule_ids.append(rule_id)
+            self.codes.append(code)
+            self.current.append(self._intern(result["current_value"]))
+            self.reasons.append(self._intern(result["reason"]))
+            self.extras.append(extra or None)
+        self.offsets.append(len(self.codes))
+        self._histogram = None
+
+    # -------------------------------------------------------------------------
+    # Vectorised views
+    # -------------------------------------------------------------------------
+
+    def __len__(self):
+        """Number of rule results (cells)."""
+        return len(self.codes)
+
+    def histogram(self):
+        """Cells per status code (16 C-level scans, cached)."""
+        if self._histogram is None:
+            self._histogram = [self.codes.count(code) for code in CODES]
+        return self._histogram
+
+    def count(self, passed=None, info=None, enforcement=None):
+        """
+        Cells matching the conditions, e.g. count(passed=False, info=False,
+        enforcement="Required") for required rules that failed.
+        """
+        histogram = self.histogram()
+        return sum(histogram[code] for code in _selected(passed, info, enforcement))
+
+    def mask(self, passed=None, info=None, enforcement=None):
+        """bytes with 1 for every cell matching the conditions, 0 otherwise."""
+        return self.codes.translate(_mask_table(_selected(passed, info, enforcement)))
+
+    def row_counts(self, passed=None, info=None, enforcement=None):
+        """Matching cells per row."""
+        mask = self.mask(passed, info, enforcement)
+        offsets = self.offsets
+        return [mask.count(1, offsets[i], offsets[i + 1]) for i in range(len(self.rows))]
+
+    def rows_with(self, passed=None, info=None, enforcement=None):
+        """Number of rows with at least one matching cell."""
+        mask = self.mask(passed, info, enforcement)
+        offsets = self.offsets
+        return sum(1 for i in range(len(self.rows)) if mask.find(1, offsets[i], offsets[i + 1]) != -1)
+
+    def cells(self, row=None, passed=None, info=None, enforcement=None):
+        """Indexes of matching cells, in order (one row, or all rows)."""
+        start, end = (0, len(self.codes)) if row is None else (self.offsets[row], self.offsets[row + 1])
+        if passed is None and info is None and enforcement is None:
+            return range(start, end)
+        mask = self.mask(passed, info, enforcement)
+        found = []
+        i = mask.find(1, start, end)
+        while i != -1:
+            found.append(i)
+            i = mask.find(1, i + 1, end)
+        return found
+
+    def rule_counts(self):
+        """
+        Pivot: per rule name, {"passed", "failed", "info"} counts, in the
+        order rules were first seen.
+        """
+        # Counter counts the (rule, status) pairs in C, first seen first
+        pivot = {}
+        for (rule_id, code), n in Counter(zip(self.rule_ids, self.codes)).items():
+            counts = pivot.setdefault(self.rules[rule_id][0], {"passed": 0, "failed": 0, "info": 0})
+            if code & PASSED:
+                counts["passed"] += n
+            elif code & INFO:
+                counts["info"] += n
+            else:
+                counts["failed"] += n
+        return pivot
+
+    def group_rows(self):
+        """Row indexes per group (repository), in order (branch scope)."""
+        grouped = [[] for _ in self.groups]
+        for row, group in enumerate(self.row_groups):
+            grouped[group].append(row)
+        return grouped
+
+    # -------------------------------------------------------------------------
+    # Expansion to the checkers' dict format
+    # -------------------------------------------------------------------------
+
+    def passed(self, i):
+        return bool(self.codes[i] & PASSED)
+
+    def rule(self, i):
+        """Rule name of cell i."""
+        return self.rules[self.rule_ids[i]][0]
+
+    def result(self, i):
+        """Cell i as the checker's rule result dict (same keys, same order)."""
+        rule, expected, enforcement, keys = self.rules[self.rule_ids[i]]
+        code = self.codes[i]
+        extras = iter(self.extras[i] or ())
+        values = {"rule": rule, "expected_value": expected, "enforcement": enforcement,
+                  "passed": bool(code & PASSED), "current_value": self.current[i],
+                  "reason": self.reasons[i], "status": "INFO" if code & INFO else None}
+        return {k: values[k] if k in values else next(extras) for k in keys}
+
+    def row_results(self, row):
+        """Rule result dicts of one row."""
+        return [self.result(i) for i in range(self.offsets[row], self.offsets[row + 1])]
+
+    def header(self, row):
+        """Row header with its rule results filled back in."""
+        header = dict(self.rows[row])
+        header["rules"] = self.row_results(row)
+        return header
+
+    def to_results(self):
+        """The checker's results, rebuilt (for the JSON report)."""
+        if self.scope == "organization":
+            return self.row_results(0) if self.rows else []
+        if self.scope == "repository":
+            return [self.header(row) for row in range(len(self.rows))]
+        results = []
+        for group, rows in enumerate(self.group_rows()):
+            repo = dict(self.groups[group])
+            repo["branches"] = [self.header(row) for row in rows]
+            results.append(repo)
+        return results
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_strings"] = {}
+        state["_histogram"] = None
+        return state
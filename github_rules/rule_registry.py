@@ -0,0 +1,314 @@
+"""
+================================================================================
+RULE REGISTRY
+================================================================================
+
+Shared by org_compliance.py, repo_compliance.py and branch_compliance.py.
+
+Each checker declares its rules in a table instead of calling every check_*
+method by hand:
+
+    Rule(name, enforcement, inputs, check, expected_value)
+
+    inputs  Names of the data the rule reads ("hooks", "protection",
+            "metadata", ...). Plain values such as the repo name are passed
+            in directly; everything else has a loader that fetches it.
+    check   check(checker, inputs) -> rule result dict (passed, current and
+            expected value, reason), or None when the rule does not apply.
+    expected_value
+            The rule's usual expected value. Constant fields live here
+            instead of in every result.
+
+The engine evaluates a selection of rules (--rules) against each subject
+(organization, repository or branch). Inputs are fetched lazily and at most
+once per subject, so data no selected rule reads is never fetched, and data
+shared by several rules (or by every branch of a repository) is fetched once.
+
+The engine keeps each result as a RuleOutcome. This is a __slots__ record that
+points at its Rule for the rule name, enforcement and usual expected value.
+It reads like the dict the check returned (outcome["passed"], .get(), "key" in
+outcome, dict(outcome)). dict(outcome) or to_dict() gives back the original
+dict, keys in the same order, so reports are unchanged. A result takes about a
+third of the memory of the dict, which adds up over 10,000 branches x 11
+rules. json.dump does not know RuleOutcome: writers pass default=json_default,
+which writes it as that dict.
+================================================================================
+"""
+
+
+class Rule:
+    """One compliance rule: what it reads and how it is evaluated."""
+
+    def __init__(self, name, enforcement, inputs, check, expected_value=None):
+        self.name = name
+        self.enforcement = enforcement
+        self.inputs = tuple(inputs)
+        self.check = check
+        self.expected_value = expected_value
+
+    def __repr__(self):
+        return f"Rule({self.name!r}, {self.enforcement!r}, inputs={list(self.inputs)})"
+
+
+_DEFAULT = object()  # RuleOutcome field that takes its Rule's value
+_MISSING = object()  # RuleOutcome "status" not set
+
+# Keys a RuleOutcome stores in its own slots; any others are rule-specific
+# extras (insecure_hooks, status_checks, ...) kept between enforcement and
+# reason, as the checks write them
+OUTCOME_KEYS = ("rule", "passed", "current_value", "expected_value", "enforcement", "reason", "status")
+
+
+class RuleOutcome:
+    """
+    Result of one rule for one subject; reads and serialises like a dict.
+
+    Rule name and enforcement come from the Rule. Expected value comes from
+    the Rule unless this result differs (e.g. "N/A" when there is nothing to
+    check).
+    """
+
+    __slots__ = ("definition", "passed", "current_value", "reason", "expected", "extras", "status")
+
+    def __init__(self, definition, passed, current_value, reason,
+                 expected_value=_DEFAULT, extras=None, status=_MISSING):
+        self.definition = definition
+        self.passed = passed
+        self.current_value = current_value
+        self.reason = reason
+        self.expected = _DEFAULT if expected_value == definition.expected_value else expected_value
+        self.extras = extras or None
+        self.status = status
+
+    @classmethod
+    def from_result(cls, definition, result):
+        """
+        Record for a check's result dict, or the dict itself if it does not
+        have the standard layout (or names another rule).
+        """
+        keys = list(result)
+        extras = [k for k in keys if k not in OUTCOME_KEYS]
+        layout = ["rule", "passed", "current_value", "expected_value", "enforcement", *extras, "reason"]
+        if "status" in result:
+            layout.append("status")
+        if (keys != layout or result["rule"] != definition.name
+                or result["enforcement"] != definition.enforcement):
+            return result
+        return cls(
+            definition, result["passed"], result["current_value"], result["reason"],
+            expected_value=result["expected_value"],
+            extras={k: result[k] for k in extras},
+            status=result.get("status", _MISSING),
+        )
+
+    @property
+    def rule(self):
+        return self.definition.name
+
+    @property
+    def enforcement(self):
+        return self.definition.enforcement
+
+    @property
+    def expected_value(self):
+        return self.definition.expected_value if self.expected is _DEFAULT else self.expected
+
+    def keys(self):
+        keys = ["rule", "passed", "current_value", "expected_value", "enforcement"]
+        if self.extras:
+            keys.extend(self.extras)
+        keys.append("reason")
+        if self.status is not _MISSING:
+            keys.append("status")
+        return keys
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __contains__(self, key):
+        if key == "status":
+            return self.status is not _MISSING
+        return key in OUTCOME_KEYS or bool(self.extras and key in self.extras)
+
+    def __getitem__(self, key):
+        if key in OUTCOME_KEYS:
+            if key == "status" and self.status is _MISSING:
+                raise KeyError(key)
+            return getattr(self, key)
+        if self.extras and key in self.extras:
+            return self.extras[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in ("passed", "current_value", "reason", "status"):
+            setattr(self, key, value)
+        elif key == "expected_value":
+            self.expected = value
+        elif key in ("rule", "enforcement"):
+            raise KeyError(f"'{key}' comes from the rule definition and cannot be changed")
+        else:
+            if self.extras is None:
+                self.extras = {}
+            self.extras[key] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self):
+        """The result as the check returned it."""
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, (RuleOutcome, dict)):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"RuleOutcome({self.to_dict()!r})"
+
+    def __reduce__(self):
+        # Pickle by rule name: Rule holds the check lambda, which cannot be pickled
+        return (_outcome_from_dict, (self.to_dict(),))
+
+
+_unpickled_rules = {}
+
+
+def _outcome_from_dict(result):
+    """Unpickle a RuleOutcome; outcomes of the same rule share one check-less Rule."""
+    key = (result["rule"], result["enforcement"])
+    definition = _unpickled_rules.get(key)
+    if definition is None:
+        definition = _unpickled_rules[key] = Rule(result["rule"], result["enforcement"], (), None,
+                                                  result["expected_value"])
+    return RuleOutcome.from_result(definition, result)
+
+
+def json_default(value):
+    """json.dump default= hook: a RuleOutcome as its dict, anything else as str()."""
+    if isinstance(value, RuleOutcome):
+        return value.to_dict()
+    return str(value)
+
+
+class RuleRegistry:
+    """Ordered table of the rules of one checker."""
+
+    def __init__(self, scope, rules):
+        self.scope = scope
+        self.rules = {rule.name: rule for rule in rules}
+
+    def names(self):
+        return list(self.rules)
+
+    def select(self, names=None):
+        """
+        Rules to evaluate, in table order.
+
+        Args:
+            names: Rule names to keep, or None/empty for all rules
+
+        Raises:
+            ValueError: If a name is not a rule of this registry
+        """
+        if not names:
+            return list(self.rules.values())
+        unknown = [name for name in names if name not in self.rules]
+        if unknown:
+            raise ValueError(
+                f"unknown {self.scope} rule(s): {', '.join(unknown)} "
+                f"(available: {', '.join(self.rules)})"
+            )
+        return [rule for rule in self.rules.values() if rule.name in names]
+
+
+class RuleInputs:
+    """
+    Input values for one subject, fetched on first use.
+
+    Args:
+        loaders: {input name: zero-argument callable that fetches it}
+        parent: RuleInputs shared with sibling subjects (e.g. the repository
+                of a branch); inputs it holds or can load are reused
+        values: Inputs that are already known (no fetch needed)
+    """
+
+    def __init__(self, loaders=None, parent=None, **values):
+        self.loaders = loaders or {}
+        self.parent = parent
+        self.values = values
+
+    def __getitem__(self, name):
+        if name in self.values:
+            return self.values[name]
+        if name in self.loaders:
+            self.values[name] = self.loaders[name]()
+            return self.values[name]
+        if self.parent is not None:
+            return self.parent[name]
+        raise KeyError(f"no value or loader for rule input '{name}'")
+
+    def loaded(self, name):
+        """True if the input is known without fetching anything."""
+        if name in self.values:
+            return True
+        return name not in self.loaders and self.parent is not None and self.parent.loaded(name)
+
+
+class RuleEngine:
+    """Evaluates a selection of a registry's rules against subjects."""
+
+    def __init__(self, registry, names=None):
+        self.registry = registry
+        self.rules = registry.select(names)
+        self.inputs = []
+        for rule in self.rules:
+            for name in rule.inputs:
+                if name not in self.inputs:
+                    self.inputs.append(name)
+
+    def needs(self, input_name):
+        """True if any selected rule reads the input."""
+        return input_name in self.inputs
+
+    def evaluate(self, checker, inputs, on_rule=None):
+        """
+        Evaluate the selected rules for one subject.
+
+        Args:
+            checker: Checker instance passed to each rule's check
+            inputs: RuleInputs of the subject
+            on_rule: Optional callback(rule) called before each rule
+
+        Returns:
+            list: RuleOutcome per rule, skipping rules that returned None
+        """
+        results = []
+        for rule in self.rules:
+            if on_rule:
+                on_rule(rule)
+            result = rule.check(checker, inputs)
+            if result is not None:
+                results.append(RuleOutcome.from_result(rule, result))
+        return results
+
+
+def parse_rule_names(value):
+    """Split a comma-separated --rules value, dropping blanks and duplicates."""
+    names = []
+    for name in value.split(","):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
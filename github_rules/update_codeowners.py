@@ -9,23 +9,29 @@ HOW TO RUN:
     export GITHUB_TOKEN=<your-token>
     export GITHUB_ORG=tornado        # or vmwsolutions
     python update_codeowners.py
+
+Set INVENTORY_SNAPSHOT=<file> to discover production repos from an inventory
+snapshot (see inventory_snapshot.py) instead of crawling the org again; the
+CODEOWNERS updates themselves always go to the API.
+
+Repos whose CODEOWNERS blob SHA already equals the git blob SHA of the new
+content (computed locally) are skipped without a write, so re-runs only read.
+The remaining updates run concurrently.
 ================================================================================
 """
 
 import requests
 import base64
-import json
 import time
 import os
 import urllib3
+from concurrent.futures import ThreadPoolExecutor
 
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from git_data_writer import git_blob_sha
+from metadata_parser import parse_metadata_response
+from inventory_snapshot import InventorySnapshot
 
-try:
-    import yaml
-    YAML_AVAILABLE = True
-except ImportError:
-    YAML_AVAILABLE = False
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # -----------------------------
 # Updated owners per org
@@ -49,11 +55,13 @@ VMW_OWNERS = [
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 GITHUB_ORG = os.getenv("GITHUB_ORG")
+INVENTORY_SNAPSHOT = os.getenv("INVENTORY_SNAPSHOT")
 
 GITHUB_BASE = "https://github.ibm.com/api/v3"
 GITHUB_WEB = "https://github.ibm.com"
 
 SLEEP_INTERVAL = 0.2
+MAX_WORKERS = 4
 
 # -----------------------------
 # GitHub Client
@@ -92,30 +100,34 @@ def paginate(url):
 # Fetch .metadata
 # -----------------------------
 
-def fetch_metadata(org, repo, branch):
-    url = f"{GITHUB_BASE}/repos/{org}/{repo}/contents/.metadata?ref={branch}"
-    resp = session.get(url, verify=False, timeout=20)
-    if resp.status_code == 404:
-        return None
-    resp.raise_for_status()
+def fetch_metadata(org, repo, branch, snapshot=None):
+    if snapshot:
+        data = snapshot.metadata_response(org, repo, branch)
+        if data is None:
+            return None
+    else:
+        url = f"{GITHUB_BASE}/repos/{org}/{repo}/contents/.metadata?ref={branch}"
+        resp = session.get(url, verify=False, timeout=20)
+        if resp.status_code == 404:
+            return None
+        resp.raise_for_status()
+        data = resp.json()
     try:
-        content = base64.b64decode(resp.json().get("content", "")).decode("utf-8")
-        if YAML_AVAILABLE:
-            try:
-                return yaml.safe_load(content)
-            except:
-                pass
-        return json.loads(content)
-    except:
+        return parse_metadata_response(data)
+    except Exception:
         return None
 
 # -----------------------------
 # Discover production repos
 # -----------------------------
 
-def discover_production_repos(org):
-    print(f"  Fetching all repos from '{org}'...")
-    all_repos = paginate(f"{GITHUB_BASE}/orgs/{org}/repos?per_page=100")
+def discover_production_repos(org, snapshot=None):
+    if snapshot:
+        print(f"  Reading all repos of '{org}' from snapshot {snapshot.path}...")
+        all_repos = snapshot.repos(org)
+    else:
+        print(f"  Fetching all repos from '{org}'...")
+        all_repos = paginate(f"{GITHUB_BASE}/orgs/{org}/repos?per_page=100")
     print(f"  Found {len(all_repos)} total repos")
 
     production_repos = []
@@ -131,7 +143,7 @@ def discover_production_repos(org):
         if default_branch == "main":
             continue
 
-        metadata = fetch_metadata(org, name, "master")
+        metadata = fetch_metadata(org, name, "master", snapshot)
         if not metadata:
             continue
 
@@ -163,6 +175,51 @@ def find_codeowners_with_sha(org, repo, branch):
         time.sleep(SLEEP_INTERVAL)
     return None, None
 
+# -----------------------------
+# Update one repo
+# -----------------------------
+
+def update_repo(repo_info, encoded_content, new_sha):
+    """
+    Update CODEOWNERS in one repo unless its blob SHA already equals new_sha.
+
+    Returns one of: "updated", "up_to_date", "not_found", "protected", "error"
+    """
+    repo = repo_info["name"]
+    branch = repo_info["default_branch"]
+
+    path, sha = find_codeowners_with_sha(GITHUB_ORG, repo, branch)
+
+    if not path or not sha:
+        print(f"  NOT FOUND: {repo} - no CODEOWNERS file")
+        return "not_found"
+
+    # Contents API sha is the blob sha: equal means the file already matches
+    if sha == new_sha:
+        print(f"  UP TO DATE: {repo}/{path}")
+        return "up_to_date"
+
+    # Update the file using PUT with the SHA
+    url = f"{GITHUB_BASE}/repos/{GITHUB_ORG}/{repo}/contents/{path}"
+    data = {
+        "message": "Update CODEOWNERS with corrected reviewer names",
+        "content": encoded_content,
+        "sha": sha,
+        "branch": branch
+    }
+
+    resp = session.put(url, json=data, verify=False, timeout=20)
+    time.sleep(SLEEP_INTERVAL)
+
+    if resp.status_code in (200, 201):
+        print(f"  UPDATED: {repo}/{path}\n    URL: {GITHUB_WEB}/{GITHUB_ORG}/{repo}/blob/{branch}/{path}")
+        return "updated"
+    if resp.status_code == 409:
+        print(f"  SKIPPED (409 conflict): {repo}/{path} - branch is protected, run this script BEFORE applying branch protection")
+        return "protected"
+    print(f"  ERROR: {repo}/{path} - HTTP {resp.status_code}")
+    return "error"
+
 # -----------------------------
 # Main
 # -----------------------------
@@ -182,52 +239,26 @@ def main():
 
     new_content = "* " + " ".join(owners) + "\n"
     encoded_content = base64.b64encode(new_content.encode()).decode()
+    new_sha = git_blob_sha(new_content)
 
-    repos = discover_production_repos(GITHUB_ORG)
-
-    updated = 0
-    not_found = 0
-    skipped_protected = 0
-    errors = 0
-
-    for repo_info in repos:
-        repo = repo_info["name"]
-        branch = repo_info["default_branch"]
+    snapshot = InventorySnapshot(INVENTORY_SNAPSHOT) if INVENTORY_SNAPSHOT else None
+    repos = discover_production_repos(GITHUB_ORG, snapshot)
 
-        path, sha = find_codeowners_with_sha(GITHUB_ORG, repo, branch)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        outcomes = list(executor.map(
+            lambda repo_info: update_repo(repo_info, encoded_content, new_sha), repos
+        ))
 
-        if not path or not sha:
-            print(f"  NOT FOUND: {repo} - no CODEOWNERS file")
-            not_found += 1
-            continue
-
-        # Update the file using PUT with the SHA
-        url = f"{GITHUB_BASE}/repos/{GITHUB_ORG}/{repo}/contents/{path}"
-        data = {
-            "message": "Update CODEOWNERS with corrected reviewer names",
-            "content": encoded_content,
-            "sha": sha,
-            "branch": branch
-        }
-
-        resp = session.put(url, json=data, verify=False, timeout=20)
-
-        if resp.status_code in (200, 201):
-            print(f"  UPDATED: {repo}/{path}")
-            print(f"    URL: {GITHUB_WEB}/{GITHUB_ORG}/{repo}/blob/{branch}/{path}")
-            updated += 1
-        elif resp.status_code == 409:
-            print(f"  SKIPPED (409 conflict): {repo}/{path} - branch is protected, run this script BEFORE applying branch protection")
-            skipped_protected += 1
-        else:
-            print(f"  ERROR: {repo}/{path} - HTTP {resp.status_code}")
-            errors += 1
-
-        time.sleep(SLEEP_INTERVAL)
+    updated = outcomes.count("updated")
+    up_to_date = outcomes.count("up_to_date")
+    not_found = outcomes.count("not_found")
+    skipped_protected = outcomes.count("protected")
+    errors = outcomes.count("error")
 
     print(f"\n--- Summary ---")
     print(f"  Production repos found: {len(repos)}")
     print(f"  CODEOWNERS updated: {updated}")
+    print(f"  CODEOWNERS already up to date: {up_to_date}")
     print(f"  CODEOWNERS not found: {not_found}")
     print(f"  Skipped (409 - branch protected): {skipped_protected}")
     print(f"  Errors: {errors}")
@@ -0,0 +1,448 @@
+"""
+================================================================================
+WEBHOOK RECEIVER - KEEPS THE INVENTORY SNAPSHOT CURRENT
+================================================================================
+
+Small local HTTP receiver for GHE webhooks. Each event updates only the rows
+of the inventory snapshot (see inventory_snapshot.py) that it affects, then
+re-evaluates only the affected repository with the existing checker logic
+(RepoComplianceChecker / BranchComplianceChecker over SnapshotAPIClient).
+Compliance status stays near real-time without full-organization scans.
+
+EVENT -> WHAT IS REFRESHED:
+---------------------------
+    repository              archived/unarchived/publicized/privatized: repo row
+                            from the payload (no API call); edited: + files;
+                            created/transferred: full crawl of the repo;
+                            renamed: old name dropped, new name crawled;
+                            deleted: repo dropped
+    push                    .metadata/CODEOWNERS on the pushed ref, only if the
+                            ref is tracked and the commits touch those files;
+                            branch created/deleted: branches + protection
+    branch_protection_rule  branches + protection
+    member                  collaborators
+    team                    teams of the repo, or of every repo that has the
+                            team when the team itself is edited/deleted
+    repository_hook, meta   hooks
+
+Events are processed one at a time in arrival order. Refreshes call the API
+only for the parts listed above.
+
+HOW TO RUN:
+    1. Crawl the snapshot once:
+       python inventory_snapshot.py snapshot --orgs tornado,vmwsolutions
+
+    2. Set environment variables:
+       - GITHUB_TOKEN: Token used to refresh affected rows
+       - GITHUB_BASE: GitHub API base URL (default: https://api.github.com)
+       - WEBHOOK_SECRET: Webhook secret (optional; X-Hub-Signature-256 is
+         verified when set)
+
+    3. Serve (point the org webhooks at http://<host>:8080/):
+       python webhook_receiver.py serve --db inventory_snapshot.db --port 8080
+       python webhook_receiver.py serve --record events.jsonl   # also record
+
+    4. Replay recorded deliveries locally (same processing, no server):
+       python webhook_receiver.py replay events.jsonl --db inventory_snapshot.db
+
+    Latest evaluation of a repository: GET /status/<org>/<repo>
+================================================================================
+"""
+
+import os
+import sys
+import hmac
+import json
+import hashlib
+import argparse
+import threading
+from datetime import datetime
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+from multi_org import RateLimitedSession
+from rule_registry import json_default
+from inventory_snapshot import (
+    InventorySnapshot, SnapshotAPIClient, SnapshotCrawler, GitHubAPIClient,
+    SnapshotMissError, DEFAULT_DB, METADATA_PATH, CODEOWNERS_LOCATIONS, tracked_refs
+)
+import repo_compliance
+import branch_compliance
+
+# =============================================================================
+# CONFIGURATION
+# =============================================================================
+
+GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN")
+GITHUB_BASE = os.environ.get("GITHUB_BASE", "https://api.github.com")
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET")
+
+DEFAULT_PORT = 8080
+
+# Files whose change on a tracked ref requires re-reading it
+WATCHED_FILES = {METADATA_PATH, *CODEOWNERS_LOCATIONS}
+
+# Repository actions fully described by the payload's repository object
+REPO_ROW_ACTIONS = {"archived", "unarchived", "publicized", "privatized"}
+
+# Evaluation reads the snapshot, so the checkers' API pacing is not needed
+repo_compliance.SLEEP_INTERVAL = 0
+branch_compliance.SLEEP_INTERVAL = 0
+
+
+def verify_signature(secret, body, signature):
+    """Check an X-Hub-Signature-256 header against the raw request body."""
+    if not signature:
+        return False
+    expected = "sha256=" + hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+# =============================================================================
+# EVENT PROCESSOR
+# =============================================================================
+
+class EventProcessor:
+    """
+    Applies webhook events to an InventorySnapshot and re-evaluates the
+    affected repositories.
+    """
+
+    def __init__(self, snapshot, api_client):
+        self.snapshot = snapshot
+        self.crawler = SnapshotCrawler(api_client, snapshot)
+        self.checks = SnapshotAPIClient(snapshot)
+        self._lock = threading.Lock()
+
+    def process(self, event, payload):
+        """
+        Apply one event and re-evaluate what it affected.
+
+        Returns:
+            dict: {"event", "action", "updated": [repo, ...], "dropped": [...],
+                   "evaluations": {repo: {"repository": summary, "branch": summary}}}
+        """
+        with self._lock:
+            outcome = {"event": event, "action": payload.get("action"),
+                       "updated": [], "dropped": [], "evaluations": {}}
+            org = self._org(payload)
+            if org is None or org not in self.snapshot.orgs():
+                outcome["ignored"] = f"organization {org} is not in the snapshot"
+                return outcome
+
+            handler = getattr(self, f"_on_{event}", None)
+            if handler is None:
+                outcome["ignored"] = f"event {event} is not tracked"
+                return outcome
+
+            handler(org, payload, outcome)
+            for repo in outcome["updated"]:
+                outcome["evaluations"][repo] = self.evaluate(org, repo)
+            return outcome
+
+    @staticmethod
+    def _org(payload):
+        if payload.get("organization"):
+            return payload["organization"].get("login")
+        full_name = (payload.get("repository") or {}).get("full_name", "")
+        return full_name.split("/", 1)[0] if "/" in full_name else None
+
+    def _refresh(self, org, repo, parts, outcome, repo_data=None):
+        """Re-crawl parts of one repository (None = all of it)."""
+        if repo_data is None:
+            repo_data = self.snapshot.repo(org, repo)
+            if repo_data is None:
+                # Unknown so far - the snapshot missed its creation; crawl it whole
+                repo_data = self.crawler.api.get(f"/repos/{org}/{repo}", allow_404=True)
+                parts = None
+                if repo_data is None:
+                    return
+        self.crawler.crawl_repo(org, repo_data, parts)
+        if repo not in outcome["updated"]:
+            outcome["updated"].append(repo)
+
+    # -------------------------------------------------------------------------
+    # Event handlers
+    # -------------------------------------------------------------------------
+
+    def _on_repository(self, org, payload, outcome):
+        action = payload.get("action")
+        repo_data = payload["repository"]
+        name = repo_data["name"]
+
+        if action == "deleted":
+            self.snapshot.drop_repo(org, name)
+            outcome["dropped"].append(name)
+        elif action == "renamed":
+            old = payload.get("changes", {}).get("repository", {}).get("name", {}).get("from")
+            if old:
+                self.snapshot.drop_repo(org, old)
+                outcome["dropped"].append(old)
+            self._refresh(org, name, None, outcome, repo_data)
+        elif action in REPO_ROW_ACTIONS:
+            self.snapshot.put_repo(org, repo_data)
+            outcome["updated"].append(name)
+        elif action == "edited":
+            # The default branch may have changed, which changes the tracked refs
+            self._refresh(org, name, ["files"], outcome, repo_data)
+        else:
+            # created, transferred, ...
+            self._refresh(org, name, None, outcome, repo_data)
+
+    def _on_push(self, org, payload, outcome):
+        ref = payload.get("ref", "")
+        if not ref.startswith("refs/heads/"):
+            return
+        branch = ref[len("refs/heads/"):]
+        name = payload["repository"]["name"]
+
+        if payload.get("created") or payload.get("deleted"):
+            self._refresh(org, name, ["branches", "protection", "files"], outcome)
+            return
+
+        repo_data = self.snapshot.repo(org, name)
+        if repo_data is None:
+            self._refresh(org, name, None, outcome)
+            return
+        if branch not in tracked_refs(repo_data):
+            return
+        touched = set()
+        for commit in payload.get("commits", []):
+            for key in ("added", "modified", "removed"):
+                touched.update(commit.get(key, []))
+        if touched & WATCHED_FILES:
+            self.crawler.crawl_files(org, name, branch, payload.get("after"))
+            outcome["updated"].append(name)
+
+    def _on_branch_protection_rule(self, org, payload, outcome):
+        self._refresh(org, payload["repository"]["name"], ["branches", "protection"], outcome)
+
+    def _on_member(self, org, payload, outcome):
+        self._refresh(org, payload["repository"]["name"], ["collaborators"], outcome)
+
+    def _on_team(self, org, payload, outcome):
+        if payload.get("repository"):
+            repos = [payload["repository"]["name"]]
+        else:
+            # The team itself changed - every repository it has access to
+            repos = self.snapshot.repos_with_team(org, payload["team"]["slug"])
+        for name in repos:
+            self._refresh(org, name, ["teams"], outcome)
+
+    def _on_repository_hook(self, org, payload, outcome):
+        self._refresh(org, payload["repository"]["name"], ["hooks"], outcome)
+
+    def _on_meta(self, org, payload, outcome):
+        # Sent when a repository webhook is deleted
+        if payload.get("repository"):
+            self._on_repository_hook(org, payload, outcome)
+
+    # -------------------------------------------------------------------------
+    # Re-evaluation
+    # -------------------------------------------------------------------------
+
+    def evaluate(self, org, repo):
+        """
+        Run the repository and branch checkers on one repository from the
+        snapshot, store the results and return a short summary per checker.
+        """
+        repo_data = self.snapshot.repo(org, repo)
+        summaries = {}
+        checkers = {
+            "repository": repo_compliance.RepoComplianceChecker(self.checks, org),
+            "branch": branch_compliance.BranchComplianceChecker(self.checks, org, target_repo=repo),
+        }
+        for name, checker in checkers.items():
+            try:
+                result = checker.check_repository(repo_data)
+            except SnapshotMissError as e:
+                summaries[name] = {"error": str(e)}
+                continue
+            self.snapshot.put_evaluation(org, repo, name, result)
+            summaries[name] = summarize(result)
+        return summaries
+
+
+def summarize(result):
+    """Count failed rules in a repository or branch check result (None = skipped)."""
+    if result is None:
+        return {"skipped": True}
+    if "branches" in result:
+        rules = [rule for branch in result["branches"] for rule in branch["rules"]]
+    else:
+        rules = result["rules"]
+    failed = [rule for rule in rules if not rule["passed"]]
+    return {
+        "rules": len(rules),
+        "failed": len(failed),
+        "required_failed": sorted({r["rule"] for r in failed if r.get("enforcement") == "Required"})
+    }
+
+
+def print_outcome(outcome):
+    label = f"{outcome['event']}" + (f".{outcome['action']}" if outcome.get("action") else "")
+    if outcome.get("ignored"):
+        print(f"  [{label}] ignored: {outcome['ignored']}")
+        return
+    for repo in outcome["dropped"]:
+        print(f"  [{label}] {repo}: removed from snapshot")
+    for repo, summaries in outcome["evaluations"].items():
+        for checker, summary in summaries.items():
+            if summary.get("error"):
+                status = f"ERROR ({summary['error']})"
+            elif summary.get("skipped"):
+                status = "skipped"
+            else:
+                status = f"{summary['failed']}/{summary['rules']} failed"
+                if summary["required_failed"]:
+                    status += f" (required: {', '.join(summary['required_failed'])})"
+            print(f"  [{label}] {repo} {checker}: {status}")
+    if not outcome["updated"] and not outcome["dropped"]:
+        print(f"  [{label}] no tracked data changed")
+
+
+# =============================================================================
+# HTTP SERVER
+# =============================================================================
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """POST / receives deliveries; GET /status/<org>/<repo> shows evaluations."""
+
+    processor = None
+    secret = None
+    record_path = None
+
+    def _reply(self, status, body):
+        data = json.dumps(body, default=json_default).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.secret and not verify_signature(self.secret, body, self.headers.get("X-Hub-Signature-256")):
+            self._reply(401, {"error": "invalid signature"})
+            return
+
+        event = self.headers.get("X-GitHub-Event", "")
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            self._reply(400, {"error": "payload is not JSON"})
+            return
+
+        if self.record_path:
+            with open(self.record_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"event": event, "delivery": self.headers.get("X-GitHub-Delivery"),
+                                    "payload": payload}) + "\n")
+
+        try:
+            outcome = self.processor.process(event, payload)
+        except Exception as e:
+            print(f"  [{event}] ERROR: {e}")
+            self._reply(500, {"error": str(e)})
+            return
+        print_outcome(outcome)
+        self._reply(200, outcome)
+
+    def do_GET(self):
+        parts = self.path.strip("/").split("/")
+        if parts == ["health"]:
+            self._reply(200, {"status": "ok"})
+        elif len(parts) == 3 and parts[0] == "status":
+            self._reply(200, self.processor.snapshot.evaluations(parts[1], parts[2]))
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def log_message(self, format, *args):
+        pass  # Outcomes are printed per event instead
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+
+def replay(processor, path):
+    """Process recorded deliveries (JSON lines of {"event", "payload"}) in order."""
+    count = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            delivery = json.loads(line)
+            print_outcome(processor.process(delivery["event"], delivery["payload"]))
+            count += 1
+    return count
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Keep an inventory snapshot current from GHE webhooks.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python webhook_receiver.py serve --db inventory_snapshot.db --port 8080
+  python webhook_receiver.py serve --record events.jsonl
+  python webhook_receiver.py replay events.jsonl --db inventory_snapshot.db
+        """
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Receive webhook deliveries over HTTP")
+    serve.add_argument("--db", default=DEFAULT_DB, help=f"Snapshot file (default: {DEFAULT_DB})")
+    serve.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    serve.add_argument("--record", metavar="FILE", help="Append every delivery to FILE for later replay")
+
+    rerun = subparsers.add_parser("replay", help="Process recorded deliveries from a JSON lines file")
+    rerun.add_argument("file", help="Recorded deliveries ({\"event\": ..., \"payload\": ...} per line)")
+    rerun.add_argument("--db", default=DEFAULT_DB, help=f"Snapshot file (default: {DEFAULT_DB})")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("\n" + "=" * 60)
+    print("WEBHOOK RECEIVER")
+    print("=" * 60)
+
+    if not GITHUB_TOKEN:
+        print("ERROR: GITHUB_TOKEN environment variable is not set.")
+        sys.exit(1)
+    if not os.path.exists(args.db):
+        print(f"ERROR: snapshot not found: {args.db} (run inventory_snapshot.py snapshot first)")
+        sys.exit(1)
+
+    snapshot = InventorySnapshot(args.db)
+    api_client = GitHubAPIClient(GITHUB_BASE, GITHUB_TOKEN, session=RateLimitedSession())
+    processor = EventProcessor(snapshot, api_client)
+    print(f"  Snapshot     : {args.db}")
+    print(f"  Organizations: {', '.join(snapshot.orgs())}")
+
+    if args.command == "replay":
+        count = replay(processor, args.file)
+        print(f"\n  Replayed {count} deliveries")
+        print("=" * 60)
+        return
+
+    WebhookHandler.processor = processor
+    WebhookHandler.secret = WEBHOOK_SECRET
+    WebhookHandler.record_path = args.record
+    if not WEBHOOK_SECRET:
+        print("  WARNING: WEBHOOK_SECRET is not set - deliveries are not authenticated")
+    print(f"  Listening on http://{args.host}:{args.port}/  ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')})")
+
+    server = HTTPServer((args.host, args.port), WebhookHandler)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n  Stopped")
+    finally:
+        server.server_close()
+        snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
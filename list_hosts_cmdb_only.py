@@ -1,24 +1,66 @@
 import json
-from common.cmdb_client import CMDBClient
+from itertools import chain
+from common.cmdb_client import CMDBClient, CMDB_LIST_PARTITIONS
+from common.cmdb_mirror import get_cmdb_mirror
 
-def list_hosts_cmdb_only(c_code, dns_domain=None):
+
+def encode_hosts(hosts):
+    """
+    Encodes the success body chunk by chunk, as hosts come out of CMDB,
+    so the host list is never held in memory. count follows data since it
+    is only known once the last host has been written.
+    """
+    yield '{"status": "success", "data": ['
+    count = 0
+    for host in hosts:
+        yield (", " if count else "") + json.dumps(host)
+        count += 1
+    yield f'], "count": {count}}}'
+
+
+def list_hosts_cmdb_only(c_code, dns_domain=None, stream=False, fields=None, display_value=True):
     """
     Fetches all CMDB hosts for a given c_code and optional dns_domain.
+    Served from the local CMDB mirror when one is configured (CMDB_MIRROR_DB);
+    otherwise the sys_id keyspace is listed in CMDB_LIST_PARTITIONS
+    concurrent ranges.
+
+    With stream=True the body is an iterator of JSON chunks (encode_hosts)
+    for runtimes that can send a response as it is produced.
+
+    fields (a list or comma-separated string) limits the columns returned,
+    and display_value=False returns raw CMDB values; both make large
+    listings much cheaper.
     """
     try:
-        client = CMDBClient()
-        hosts = client.fetch_cmdb_server_list_paginated(
-            c_code=c_code,
-            dns_domain=dns_domain,
-        )
+        if isinstance(fields, str):
+            fields = fields.split(",")
+        mirror = get_cmdb_mirror()
+        if mirror is not None:
+            hosts = mirror.iter_servers(
+                c_code=c_code,
+                dns_domain=dns_domain,
+                fields=fields,
+                display_value=display_value,
+            )
+        else:
+            hosts = CMDBClient().iter_cmdb_servers(
+                c_code=c_code,
+                dns_domain=dns_domain,
+                partitions=CMDB_LIST_PARTITIONS,
+                fields=fields,
+                display_value=display_value,
+            )
+        if stream:
+            # Wait for the first page so CMDB errors still come back as a 500
+            first = next(hosts, None)
+            body = encode_hosts(chain([first], hosts) if first is not None else [])
+        else:
+            body = "".join(encode_hosts(hosts))
         return {
             "statusCode": 200,
             "headers": {"Content-Type": "application/json"},
-            "body": json.dumps({
-                "status": "success",
-                "count": len(hosts),
-                "data": hosts,
-            }),
+            "body": body,
         }
     except Exception as e:
         return {
@@ -1,5 +1,5 @@
 from typing import List, Dict
-from common.cmdb_client import CMDBClient
+from common.cmdb_client import CMDBClient, CMDB_BULK_MAX_HOSTS
 from common.constants import IBM_CLOUD_DATACENTER_LIST, IBM_CLOUD_ZONES_MAP
 import ipaddress
 
@@ -83,10 +83,10 @@ def register_hosts_cmdb_only(data: List[Dict], user: str) -> dict:
         }
 
     # 2. Limit check
-    if len(data) > 100:
+    if len(data) > CMDB_BULK_MAX_HOSTS:
         return {
             "statusCode": 413,
-            "body": {"status": "error", "message": "Max 100 hosts allowed"},
+            "body": {"status": "error", "message": f"Max {CMDB_BULK_MAX_HOSTS} hosts allowed"},
         }
 
     # 3. Prepare CMDB payload
@@ -97,9 +97,9 @@ def register_hosts_cmdb_only(data: List[Dict], user: str) -> dict:
             "body": {"status": "error", "message": error},
         }
 
-    # 4. Upload to CMDB
+    # 4. Upload to CMDB, in concurrent chunks
     try:
-        response = CMDBClient().upload_ips_to_cmdb_inventory(hosts)
+        outcomes = CMDBClient().bulk_upload_to_cmdb_inventory(hosts)
     except Exception as e:
         return {
             "statusCode": 500,
@@ -109,18 +109,27 @@ def register_hosts_cmdb_only(data: List[Dict], user: str) -> dict:
             },
         }
 
-    # 5. Defensive CMDB response handling
-    # CMDB may return None / {} / success response
-    if response is not None and isinstance(response, dict):
-        status = response.get("status")
-        if status and status.lower() not in ("success", "ok", "created"):
-            return {
-                "statusCode": 500,
-                "body": {
-                    "status": "error",
-                    "message": f"CMDB did not confirm host creation: {response}",
-                },
-            }
+    # 5. Per-host outcomes: hosts in failed chunks or rejected by CMDB are
+    # reported individually, the others are uploaded
+    failed = [outcome for outcome in outcomes if outcome["status"] == "error"]
+    if outcomes and len(failed) == len(outcomes):
+        return {
+            "statusCode": 500,
+            "body": {
+                "status": "error",
+                "message": failed[0]["message"],
+                "results": outcomes,
+            },
+        }
+    if failed:
+        return {
+            "statusCode": 207,
+            "body": {
+                "status": "partial",
+                "message": f"{len(outcomes) - len(failed)} of {len(outcomes)} host(s) uploaded to CMDB, {len(failed)} failed",
+                "results": outcomes,
+            },
+        }
 
     # 6. Success
     return {
@@ -128,5 +137,6 @@ def register_hosts_cmdb_only(data: List[Dict], user: str) -> dict:
         "body": {
             "status": "success",
             "message": f"{len(hosts)} host(s) uploaded to CMDB successfully",
+            "results": outcomes,
         },
     }
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from common.cmdb_async_client import AsyncCMDBClient
+from common.cmdb_client import CMDB_POOL_SIZE
+
+
+@pytest.fixture
+def cmdb_env(monkeypatch):
+    monkeypatch.setenv("CMDB_GETCI_PROD_API_URL", "https://cmdb.example.com/getci")
+    monkeypatch.setenv("CMDB_INSERT_MULTIPLE_PROD_API_URL", "https://cmdb.example.com/insert")
+    monkeypatch.setenv("CMDB_ACCESS_TOKEN", "token")
+
+
+def make_client(handler):
+    return AsyncCMDBClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
+async def call(handler, method, *args, **kwargs):
+    async with make_client(handler) as cmdb:
+        return await getattr(cmdb, method)(*args, **kwargs)
+
+
+@pytest.mark.unit
+class TestAsyncCMDBClient:
+
+    def test_default_client_pool_is_capped_at_the_pool_size(self, cmdb_env):
+        cmdb = AsyncCMDBClient()
+
+        pool = cmdb.client._transport._pool
+        assert pool._max_connections == CMDB_POOL_SIZE
+        assert pool._max_keepalive_connections == CMDB_POOL_SIZE
+        asyncio.run(cmdb.aclose())
+
+    def test_partitions_are_fetched_concurrently_and_merged(self, cmdb_env):
+        queries = []
+
+        def handler(request):
+            query = request.url.params["sysparm_query"]
+            queries.append(query)
+            sys_id = "1a" if "sys_id<80000000" in query else "9c"
+            return httpx.Response(200, json={"result": [{"sys_id": sys_id}]})
+
+        records = asyncio.run(call(handler, "fetch_cmdb_server_list_paginated", c_code="abc", partitions=2))
+
+        assert [record["sys_id"] for record in records] == ["1a", "9c"]
+        assert sorted(queries) == [
+            "u_c_code=abc^u_dcim_status=Live^sys_id<80000000^ORDERBYsys_id",
+            "u_c_code=abc^u_dcim_status=Live^sys_id>=80000000^ORDERBYsys_id",
+        ]
+
+    def test_throttled_requests_are_retried_after_retry_after(self, cmdb_env):
+        responses = [
+            httpx.Response(429, headers={"Retry-After": "0"}),
+            httpx.Response(200, json={"result": [{"sys_id": "a"}]}),
+        ]
+
+        def handler(request):
+            assert request.headers["Authorization"] == "Bearer token"
+            return responses.pop(0)
+
+        records = asyncio.run(call(handler, "fetch_cmdb_server_list", hostname="host1"))
+
+        assert records == [{"sys_id": "a"}]
+        assert responses == []
+
+    def test_post_is_not_retried_on_server_errors(self, cmdb_env):
+        posts = []
+
+        def handler(request):
+            posts.append(request)
+            return httpx.Response(503)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(call(handler, "upload_ips_to_cmdb_inventory", []))
+
+        assert len(posts) == 1
+
+    def test_upload_timeout_is_reported(self, cmdb_env):
+        def handler(request):
+            raise httpx.ReadTimeout("timed out", request=request)
+
+        with pytest.raises(TimeoutError):
+            asyncio.run(call(handler, "remove_hosts_from_cmdb", []))
@@ -0,0 +1,330 @@
+import pytest
+from unittest.mock import MagicMock
+
+from common import cmdb_client
+from common.cmdb_client import CMDBClient, CMDBRetry, get_cmdb_session, sys_id_ranges
+
+
+@pytest.fixture
+def cmdb_env(monkeypatch):
+    monkeypatch.setenv("CMDB_GETCI_PROD_API_URL", "https://cmdb.example.com/getci")
+    monkeypatch.setenv("CMDB_INSERT_MULTIPLE_PROD_API_URL", "https://cmdb.example.com/insert")
+    monkeypatch.setenv("CMDB_ACCESS_TOKEN", "token")
+
+
+def make_response(status_code=200, result=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = {"result": result if result is not None else []}
+    return response
+
+
+@pytest.mark.unit
+class TestCMDBSession:
+
+    def test_clients_share_one_pooled_session(self, cmdb_env):
+        assert CMDBClient().session is CMDBClient().session
+        assert CMDBClient().session is get_cmdb_session()
+
+    def test_session_mounts_retrying_adapter(self):
+        adapter = get_cmdb_session().get_adapter("https://cmdb.example.com")
+        assert isinstance(adapter.max_retries, CMDBRetry)
+        assert adapter.max_retries.respect_retry_after_header
+
+    def test_get_is_retried_on_throttling_and_server_errors(self):
+        retry = CMDBRetry(total=3, status_forcelist=(429, 503), allowed_methods=frozenset({"GET"}))
+        assert retry.is_retry("GET", 429)
+        assert retry.is_retry("GET", 503)
+        assert not retry.is_retry("GET", 404)
+
+    def test_post_is_only_retried_on_throttling(self):
+        retry = CMDBRetry(total=3, status_forcelist=(429, 503), allowed_methods=frozenset({"GET"}))
+        assert retry.is_retry("POST", 429)
+        assert not retry.is_retry("POST", 503)
+
+    def test_requests_use_the_access_token(self, cmdb_env):
+        session = MagicMock()
+        session.get.return_value = make_response(result=[])
+        CMDBClient(session=session).fetch_cmdb_server_list(hostname="host1")
+
+        headers = session.get.call_args.kwargs["headers"]
+        assert headers["Authorization"] == "Bearer token"
+
+    def test_fetch_returns_records_fetched_before_a_failure(self, cmdb_env):
+        session = MagicMock()
+        first_page = make_response(result=[{"sys_id": str(i)} for i in range(1000)])
+        session.get.side_effect = [first_page, cmdb_client.requests.ConnectionError("down")]
+
+        records = CMDBClient(session=session).fetch_cmdb_server_list()
+
+        assert len(records) == 1000
+        assert session.get.call_count == 2
+
+    def test_upload_timeout_is_reported(self, cmdb_env):
+        session = MagicMock()
+        session.post.side_effect = cmdb_client.requests.exceptions.Timeout()
+
+        with pytest.raises(TimeoutError):
+            CMDBClient(session=session).upload_ips_to_cmdb_inventory([])
+
+
+@pytest.mark.unit
+class TestFetchCmdbServerListPaginated:
+
+    def test_pages_by_sys_id_instead_of_offset(self, cmdb_env):
+        session = MagicMock()
+        session.get.side_effect = [
+            make_response(result=[{"sys_id": f"{i:04d}"} for i in range(1000)]),
+            make_response(result=[{"sys_id": "1000"}]),
+        ]
+
+        records = CMDBClient(session=session).fetch_cmdb_server_list_paginated(
+            c_code="abc", dns_domain="example.com"
+        )
+
+        assert len(records) == 1001
+        first, second = [call.kwargs["params"] for call in session.get.call_args_list]
+        assert first["sysparm_query"] == "u_c_code=abc^u_dcim_status=Live^u_dns_domain=example.com^ORDERBYsys_id"
+        assert second["sysparm_query"].endswith("^ORDERBYsys_id^sys_id>0999")
+        assert "sysparm_offset" not in second
+
+    def test_raises_on_error_status(self, cmdb_env):
+        session = MagicMock()
+        session.get.return_value = make_response(status_code=500)
+
+        with pytest.raises(RuntimeError):
+            CMDBClient(session=session).fetch_cmdb_server_list_paginated()
+
+    def test_ranges_cover_the_keyspace_without_overlap(self):
+        ranges = sys_id_ranges(4)
+        assert ranges == [("", "40000000"), ("40000000", "80000000"), ("80000000", "c0000000"), ("c0000000", "")]
+
+    def test_partitions_are_fetched_by_range_and_deduplicated(self, cmdb_env):
+        session = MagicMock()
+
+        def get(url, headers, params, timeout):
+            query = params["sysparm_query"]
+            if "sys_id<80000000" in query:
+                return make_response(result=[{"sys_id": "1a"}, {"sys_id": "7f"}])
+            return make_response(result=[{"sys_id": "7f"}, {"sys_id": "9c"}])
+
+        session.get.side_effect = get
+
+        records = CMDBClient(session=session).fetch_cmdb_server_list_paginated(
+            c_code="abc", partitions=2, max_workers=2
+        )
+
+        assert [r["sys_id"] for r in records] == ["1a", "7f", "9c"]
+        queries = sorted(call.kwargs["params"]["sysparm_query"] for call in session.get.call_args_list)
+        assert queries == [
+            "u_c_code=abc^u_dcim_status=Live^sys_id<80000000^ORDERBYsys_id",
+            "u_c_code=abc^u_dcim_status=Live^sys_id>=80000000^ORDERBYsys_id",
+        ]
+
+    def test_iter_yields_a_page_before_requesting_the_next(self, cmdb_env):
+        session = MagicMock()
+        session.get.side_effect = [
+            make_response(result=[{"sys_id": f"{i:04d}"} for i in range(1000)]),
+            make_response(result=[]),
+        ]
+
+        records = CMDBClient(session=session).iter_cmdb_servers(c_code="abc")
+
+        assert next(records)["sys_id"] == "0000"
+        assert session.get.call_count == 1
+        assert len(list(records)) == 999
+        assert session.get.call_count == 2
+
+    def test_partitioned_errors_are_raised_to_the_caller(self, cmdb_env):
+        session = MagicMock()
+        session.get.return_value = make_response(status_code=500)
+
+        with pytest.raises(RuntimeError):
+            list(CMDBClient(session=session).iter_cmdb_servers(partitions=4))
+
+    def test_fields_are_projected_with_sys_id(self, cmdb_env):
+        session = MagicMock()
+        session.get.return_value = make_response(result=[])
+
+        CMDBClient(session=session).fetch_cmdb_server_list_paginated(
+            fields=["name", "ip_address"], display_value=False
+        )
+
+        params = session.get.call_args.kwargs["params"]
+        assert params["sysparm_fields"] == "sys_id,name,ip_address"
+        assert params["sysparm_display_value"] == "false"
+
+    def test_updates_are_paged_by_sys_id_after_the_watermark(self, cmdb_env):
+        session = MagicMock()
+        page = [{"sys_id": {"display_value": f"{i:04d}", "value": f"{i:04d}"}} for i in range(1000)]
+        session.get.side_effect = [make_response(result=page), make_response(result=[])]
+
+        records = list(CMDBClient(session=session).iter_cmdb_updates(c_code="abc", updated_since="2026-01-01 00:00:00"))
+
+        assert len(records) == 1000
+        first, second = [call.kwargs["params"] for call in session.get.call_args_list]
+        assert first["sysparm_query"] == "u_c_code=abc^sys_updated_on>=2026-01-01 00:00:00^ORDERBYsys_id"
+        assert first["sysparm_display_value"] == "all"
+        assert second["sysparm_query"].endswith("^sys_id>0999")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Fake monotonic clock, advanced by time.sleep; returns the sleeps."""
+    now = [1000.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(cmdb_client.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(cmdb_client.time, "sleep", sleep)
+    return sleeps
+
+
+@pytest.mark.unit
+class TestCMDBRateLimiter:
+
+    def test_tokens_are_paced_at_the_rate_after_the_burst(self, clock):
+        limiter = cmdb_client.CMDBRateLimiter(rate=10, burst=2)
+
+        for _ in range(4):
+            limiter.acquire()
+
+        assert clock == [pytest.approx(0.1), pytest.approx(0.1)]
+
+    def test_throttling_halves_the_rate_once_and_pauses_everyone(self, clock):
+        limiter = cmdb_client.CMDBRateLimiter(rate=10, burst=1)
+
+        limiter.throttled(5)
+        limiter.throttled(5)
+        limiter.acquire()
+
+        assert limiter.rate == 5
+        assert sum(clock) >= 5
+
+    def test_requests_resume_at_the_new_rate_after_a_pause(self, clock):
+        limiter = cmdb_client.CMDBRateLimiter(rate=8, burst=10)
+
+        limiter.throttled(1.5)
+        for _ in range(3):
+            limiter.acquire()
+
+        assert clock == [1.5, 0.25, 0.25, 0.25]
+
+    def test_success_raises_the_rate_once_per_second_up_to_the_maximum(self, clock):
+        limiter = cmdb_client.CMDBRateLimiter(rate=10, max_rate=11, step=0.5)
+
+        for _ in range(5):
+            limiter.succeeded()
+        assert limiter.rate == 10.5
+
+        for _ in range(3):
+            cmdb_client.time.sleep(1)
+            limiter.succeeded()
+        assert limiter.rate == 11
+
+    def test_only_successful_responses_raise_the_rate(self, clock, monkeypatch):
+        limiter = cmdb_client.CMDBRateLimiter(rate=10)
+        monkeypatch.setattr(cmdb_client, "cmdb_rate_limiter", limiter)
+        monkeypatch.setattr(cmdb_client.HTTPAdapter, "send", lambda self, request, **kwargs: MagicMock(status_code=503))
+
+        cmdb_client.CMDBAdapter().send(MagicMock())
+
+        assert limiter.rate == 10
+
+    def test_throttled_retry_slows_down_every_request(self, clock, monkeypatch):
+        limiter = cmdb_client.CMDBRateLimiter(rate=10)
+        monkeypatch.setattr(cmdb_client, "cmdb_rate_limiter", limiter)
+
+        response = MagicMock(status=429)
+        response.headers = {"Retry-After": "5"}
+        CMDBRetry(total=3, respect_retry_after_header=True).sleep(response)
+
+        assert limiter.rate == 5
+        assert sum(clock) >= 5
+
+
+@pytest.mark.unit
+class TestBulkUploadToCmdbInventory:
+
+    def hosts(self, n):
+        return [{"hostname": f"host{i}", "ip": f"10.0.0.{i}"} for i in range(n)]
+
+    def test_only_failed_chunks_are_retried(self, cmdb_env, monkeypatch):
+        monkeypatch.setattr(cmdb_client.time, "sleep", lambda seconds: None)
+        session = MagicMock()
+        sent = []
+
+        def post(url, headers, json, timeout):
+            names = [record["u_name"] for record in json["records"]]
+            sent.append(names)
+            if names[0] == "host2" and sent.count(names) == 1:
+                raise cmdb_client.requests.ConnectionError("reset")
+            response = make_response(result=[{"status": "inserted", "sys_id": name} for name in names])
+            response.json.return_value["status"] = "success"
+            return response
+
+        session.post.side_effect = post
+
+        outcomes = CMDBClient(session=session).bulk_upload_to_cmdb_inventory(self.hosts(5), chunk_size=2)
+
+        assert sorted(sent) == [["host0", "host1"], ["host2", "host3"], ["host2", "host3"], ["host4"]]
+        assert [outcome["status"] for outcome in outcomes] == ["inserted"] * 5
+        assert [outcome["sys_id"] for outcome in outcomes] == [f"host{i}" for i in range(5)]
+
+    def test_outcomes_report_chunks_that_keep_failing(self, cmdb_env, monkeypatch):
+        monkeypatch.setattr(cmdb_client.time, "sleep", lambda seconds: None)
+        session = MagicMock()
+        rejected = MagicMock(status_code=400)
+        error = cmdb_client.requests.HTTPError("400 Client Error", response=rejected)
+
+        def post(url, headers, json, timeout):
+            if json["records"][0]["u_name"] == "host2":
+                raise error
+            return make_response(result=[])
+
+        session.post.side_effect = post
+
+        outcomes = CMDBClient(session=session).bulk_upload_to_cmdb_inventory(self.hosts(3), chunk_size=2, attempts=3)
+
+        assert [outcome["status"] for outcome in outcomes] == ["uploaded", "uploaded", "error"]
+        assert "400 Client Error" in outcomes[2]["message"]
+        assert session.post.call_count == 2
+
+
+@pytest.mark.unit
+class TestLookupCmdbServers:
+
+    def test_queries_are_chunked_to_the_url_limit(self, monkeypatch):
+        monkeypatch.setattr(cmdb_client, "CMDB_MAX_QUERY_LENGTH", 120)
+
+        queries = cmdb_client.in_query_chunks("u_c_code=abc", "name", [f"host{i}" for i in range(6)])
+
+        assert len(queries) > 1
+        # Later pages carry the keyset suffix with a full 32-character sys_id
+        paged = [cmdb_client.keyset_query(query, "f" * 32) for query in queries]
+        assert all(len(cmdb_client.quote(query, safe="")) <= 120 for query in paged)
+        assert ",".join(query.split("^nameIN")[1] for query in queries) == ",".join(f"host{i}" for i in range(6))
+
+    def test_results_are_keyed_by_hostname_and_serial(self, cmdb_env):
+        session = MagicMock()
+
+        def get(url, headers, params, timeout):
+            query = params["sysparm_query"]
+            if "^nameIN" in query:
+                return make_response(result=[{"sys_id": "1", "name": "host1.example.com", "serial_number": "SN1"}])
+            return make_response(result=[{"sys_id": "2", "name": "other", "serial_number": "sn2"}])
+
+        session.get.side_effect = get
+
+        found = CMDBClient(session=session).lookup_cmdb_servers(
+            hostnames=["HOST1.example.com", "host9"], serial_numbers=["SN2"], status="Live"
+        )
+
+        assert list(found["hostname"]) == ["HOST1.example.com"]
+        assert found["serial_number"]["SN2"][0]["sys_id"] == "2"
+        queries = sorted(call.kwargs["params"]["sysparm_query"] for call in session.get.call_args_list)
+        assert queries[0].startswith("u_c_code=ic4vmws^u_dcim_status=Live^nameINHOST1.example.com,host9^")
+        assert queries[1].startswith("u_c_code=ic4vmws^u_dcim_status=Live^serial_numberINSN2^")
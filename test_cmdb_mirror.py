@@ -0,0 +1,100 @@
+import calendar
+
+import pytest
+from unittest.mock import MagicMock
+
+from common import cmdb_mirror
+from common.cmdb_mirror import CMDBMirror
+
+
+def make_record(sys_id, name, status="Live", updated="2026-01-01 10:00:00", serial="SN1"):
+    def field(value, display=None):
+        return {"display_value": display or value, "value": value}
+
+    return {
+        "sys_id": field(sys_id),
+        "name": field(name),
+        "serial_number": field(serial),
+        "ip_address": field("10.0.0.1"),
+        "u_dns_domain": field("example.com"),
+        "u_dcim_status": field(status),
+        "sys_updated_on": field(updated, "01/01/2026 11:00:00"),
+    }
+
+
+@pytest.fixture
+def client():
+    client = MagicMock()
+    client.iter_cmdb_updates.return_value = [
+        make_record("a1", "host1.example.com"),
+        make_record("b2", "host2.example.com", status="Graveyard", updated="2026-01-02 09:00:00", serial="SN2"),
+    ]
+    return client
+
+
+@pytest.mark.unit
+class TestCMDBMirror:
+
+    def test_first_sync_is_full_and_sets_the_watermark(self, tmp_path, client):
+        mirror = CMDBMirror(str(tmp_path / "mirror.db"), client=client)
+
+        assert mirror.sync("abc") == 2
+
+        client.iter_cmdb_updates.assert_called_once_with(c_code="abc", updated_since=None)
+        assert mirror._state("abc")[0] == "2026-01-02 09:00:00"
+
+    def test_next_sync_fetches_only_updates(self, tmp_path, client):
+        mirror = CMDBMirror(str(tmp_path / "mirror.db"), client=client)
+        mirror.sync("abc")
+        client.iter_cmdb_updates.return_value = [make_record("a1", "host1.example.com", status="Graveyard")]
+
+        mirror.sync("abc")
+
+        assert client.iter_cmdb_updates.call_args.kwargs["updated_since"] == "2026-01-02 09:00:00"
+        assert mirror._state("abc")[0] == "2026-01-02 09:00:00"
+        assert list(mirror.iter_servers("abc")) == []
+
+    def test_watermark_is_capped_at_the_sync_start(self, tmp_path, client, monkeypatch):
+        # a1 was read before CMDB updated it mid-sync, b2 (updated later) after
+        started = calendar.timegm((2026, 1, 2, 10, 0, 0))
+        monkeypatch.setattr(cmdb_mirror.time, "time", lambda: started)
+        client.iter_cmdb_updates.return_value = [
+            make_record("a1", "host1.example.com", updated="2026-01-01 10:00:00"),
+            make_record("b2", "host2.example.com", updated="2026-01-02 10:00:05"),
+        ]
+        mirror = CMDBMirror(str(tmp_path / "mirror.db"), client=client)
+
+        mirror.sync("abc")
+        mirror.sync("abc")
+
+        assert client.iter_cmdb_updates.call_args.kwargs["updated_since"] == "2026-01-02 09:59:00"
+
+    def test_listing_is_served_locally_while_fresh(self, tmp_path, client):
+        mirror = CMDBMirror(str(tmp_path / "mirror.db"), client=client)
+
+        first = list(mirror.iter_servers("abc", dns_domain="EXAMPLE.com"))
+        second = list(mirror.iter_servers("abc", fields=["name"], display_value=False))
+
+        assert client.iter_cmdb_updates.call_count == 1
+        assert [host["name"] for host in first] == ["host1.example.com"]
+        assert first[0]["sys_updated_on"] == "01/01/2026 11:00:00"
+        assert second == [{"sys_id": "a1", "name": "host1.example.com"}]
+
+    def test_stale_mirror_is_synced_incrementally(self, tmp_path, client):
+        mirror = CMDBMirror(str(tmp_path / "mirror.db"), client=client, ttl=0)
+
+        list(mirror.iter_servers("abc"))
+        list(mirror.iter_servers("abc"))
+
+        assert [call.kwargs["updated_since"] for call in client.iter_cmdb_updates.call_args_list] == [
+            None,
+            "2026-01-02 09:00:00",
+        ]
+
+    def test_find_matches_names_and_serial_numbers_of_any_status(self, tmp_path, client):
+        mirror = CMDBMirror(str(tmp_path / "mirror.db"), client=client)
+
+        found = mirror.find("abc", names=["HOST1.example.com"], serial_numbers=["sn2", "SN9"])
+
+        assert [record["sys_id"] for record in found] == ["a1", "b2"]
+        assert found[1]["u_dcim_status"] == "Graveyard"
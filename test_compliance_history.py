@@ -0,0 +1,96 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "github_rules"))
+
+from compliance_history import ComplianceHistory, HistoryError, report_runs
+
+
+def repos(**outcomes):
+    """Repository results from {repo: {rule: passed}}."""
+    return [{"repository": repo, "rules": [{"rule": rule, "passed": passed, "enforcement": "Required"}
+                                            for rule, passed in rules.items()]}
+            for repo, rules in outcomes.items()]
+
+
+def changes(delta, key):
+    return [(item["repository"], item["rule"], item["before"], item["after"]) for item in delta[key]]
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = ComplianceHistory(str(tmp_path / "history.db"))
+    yield history
+    history.close()
+
+
+@pytest.mark.unit
+class TestComplianceHistory:
+
+    def test_delta_between_the_last_two_runs(self, history):
+        history.record("repository", "acme", repos(api={"teams": True, "hooks": False}, docs={"teams": False}))
+        history.record("repository", "acme", repos(api={"teams": False, "hooks": True}, docs={"teams": False}))
+
+        delta = history.delta("repository", "acme")
+
+        assert (delta["from_run"], delta["to_run"]) == (1, 2)
+        assert changes(delta, "newly_failing") == [("api", "teams", True, False)]
+        assert changes(delta, "newly_passing") == [("api", "hooks", False, True)]
+        assert changes(delta, "removed") == []
+
+    def test_unchanged_outcomes_are_not_stored_again(self, history):
+        history.record("repository", "acme", repos(api={"teams": True, "hooks": False}))
+
+        run = history.record("repository", "acme", repos(api={"teams": True, "hooks": False}))
+
+        assert run == {"run_id": 2, "outcomes": 2, "failed": 1, "changes": 0}
+        assert changes(history.delta("repository", "acme"), "newly_failing") == []
+
+    def test_outcome_that_changed_back_in_between_is_not_reported(self, history):
+        history.record("repository", "acme", repos(api={"teams": True}))
+        history.record("repository", "acme", repos(api={"teams": False}))
+        history.record("repository", "acme", repos(api={"teams": True}))
+
+        delta = history.delta("repository", "acme", from_run=1, to_run=3)
+
+        assert delta["newly_failing"] == delta["newly_passing"] == []
+
+    def test_complete_run_removes_what_it_no_longer_evaluates(self, history):
+        history.record("repository", "acme", repos(api={"teams": True}, docs={"teams": False}))
+        history.record("repository", "acme", repos(api={"teams": True}))
+
+        assert changes(history.delta("repository", "acme"), "removed") == [("docs", "teams", False, None)]
+
+    def test_incomplete_or_rules_only_runs_keep_the_other_outcomes(self, history):
+        history.record("repository", "acme", repos(api={"teams": True, "hooks": False}, docs={"teams": False}))
+        history.record("repository", "acme", repos(api={"teams": True}), complete=False)
+        history.record("repository", "acme", repos(api={"hooks": True}, docs={}))
+
+        delta = history.delta("repository", "acme", from_run=1, to_run=3)
+
+        assert changes(delta, "newly_passing") == [("api", "hooks", False, True)]
+        assert changes(delta, "removed") == []
+
+    def test_runs_of_other_scopes_or_orgs_are_not_compared(self, history):
+        history.record("repository", "acme", repos(api={"teams": True}))
+        history.record("repository", "other", repos(api={"teams": False}))
+
+        with pytest.raises(HistoryError, match="nothing to compare"):
+            history.delta("repository", "acme")
+        with pytest.raises(HistoryError, match="not a repository run of acme"):
+            history.delta("repository", "acme", from_run=1, to_run=2)
+
+    def test_combined_reports_give_one_run_per_organization(self):
+        report = {"reports": {
+            "acme": {"report_type": "Organization Compliance", "organization": "acme",
+                     "generated_at": "2026-01-01 00:00:00", "results": []},
+            "other": {"report_type": "Repository Compliance", "organization": "other",
+                      "generated_at": "2026-01-02 00:00:00", "repositories": repos(api={"teams": True})},
+        }}
+
+        runs = [(scope, org, generated_at) for scope, org, generated_at, _ in report_runs(report)]
+
+        assert runs == [("organization", "acme", "2026-01-01 00:00:00"),
+                        ("repository", "other", "2026-01-02 00:00:00")]
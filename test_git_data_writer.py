@@ -0,0 +1,88 @@
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "github_rules"))
+
+from git_data_writer import GitDataWriter, git_blob_sha
+
+
+def make_response(status_code, json_data=None):
+    response = MagicMock(status_code=status_code, text="")
+    response.json.return_value = json_data or {}
+    return response
+
+
+class FakeSession:
+    """Replies to (method, path) in order from a table; records the calls."""
+
+    def __init__(self, replies):
+        self.headers = {}
+        self.replies = replies
+        self.calls = []
+
+    def request(self, method, url, json=None, verify=True):
+        key = (method, url.replace("https://ghe.example.com/api/v3", ""))
+        self.calls.append(key)
+        return self.replies[key].pop(0)
+
+
+TREE = "/repos/org/repo/git/trees/main"
+HEAD = {"commit": {"sha": "parent", "commit": {"tree": {"sha": "base"}}}}
+
+
+def writer(replies):
+    return GitDataWriter("https://ghe.example.com/api/v3", session=FakeSession(replies))
+
+
+@pytest.mark.unit
+class TestGitDataWriter:
+
+    def test_blob_sha_matches_git(self):
+        # git hash-object of an empty file and of "hello\n"
+        assert git_blob_sha("") == "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"
+        assert git_blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+    def test_file_with_the_desired_content_is_not_written(self):
+        tree = {"tree": [{"path": ".metadata", "type": "blob", "sha": git_blob_sha("{}\n")}]}
+        git = writer({("GET", TREE): [make_response(200, tree)]})
+
+        result = git.write_file("org", "repo", "main", ".metadata", "{}\n", "Add .metadata")
+
+        assert result["action"] == "unchanged"
+        assert not result["applied"]
+        assert git.session.calls == [("GET", TREE)]
+
+    def test_create_only_leaves_a_different_file_alone(self):
+        tree = {"tree": [{"path": ".metadata", "type": "blob", "sha": "other"}]}
+        git = writer({("GET", TREE): [make_response(200, tree)]})
+
+        result = git.write_file("org", "repo", "main", ".metadata", "{}\n", "Add .metadata", create_only=True)
+
+        assert result["action"] == "exists"
+        assert len(git.session.calls) == 1
+
+    def test_missing_file_is_committed_and_retried_once_if_the_branch_moved(self):
+        git = writer({
+            ("GET", TREE): [make_response(200, {"tree": []})],
+            ("GET", "/repos/org/repo/branches/main"): [make_response(200, HEAD), make_response(200, HEAD)],
+            ("POST", "/repos/org/repo/git/trees"): [make_response(201, {"sha": "tree"})] * 2,
+            ("POST", "/repos/org/repo/git/commits"): [make_response(201, {"sha": "c1"}),
+                                                      make_response(201, {"sha": "c2"})],
+            ("PATCH", "/repos/org/repo/git/refs/heads/main"): [make_response(422), make_response(200)],
+        })
+
+        result = git.write_file("org", "repo", "main", ".metadata", "{}\n", "Add .metadata")
+
+        assert result == {"action": "create", "applied": True, "commit": "c2", "status_code": None, "error": None}
+        assert len(git.session.calls) == 9
+
+    def test_dry_run_only_reads_the_tree(self):
+        git = writer({("GET", TREE): [make_response(200, {"tree": []})]})
+
+        result = git.write_file("org", "repo", "main", ".metadata", "{}\n", "Add .metadata", dry_run=True)
+
+        assert result["action"] == "create"
+        assert git.session.calls == [("GET", TREE)]
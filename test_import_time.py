@@ -0,0 +1,64 @@
+import json
+import os
+import subprocess
+import sys
+import importlib.util
+
+import pytest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+GITHUB_RULES = os.path.join(ROOT, "github_rules")
+
+# Generous on purpose: the module checks below catch regressions, the time
+# budget catches a new heavy import nobody noticed. Override on slow runners.
+IMPORT_BUDGET_SECONDS = float(os.environ.get("IMPORT_BUDGET_SECONDS", "2.0"))
+
+
+def import_in_fresh_interpreter(module, cwd):
+    """Import module in a new interpreter; return its import time and sys.modules."""
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "seconds = time.perf_counter() - start\n"
+        "print(json.dumps({'seconds': seconds, 'modules': sorted(sys.modules)}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("module", [
+    "org_compliance",
+    "repo_compliance",
+    "branch_compliance",
+    "list_archived_repos",
+    "inventory_snapshot",
+])
+def test_compliance_scripts_defer_openpyxl_and_yaml(module):
+    loaded = import_in_fresh_interpreter(module, GITHUB_RULES)
+
+    assert "openpyxl" not in loaded["modules"]
+    assert "yaml" not in loaded["modules"]
+    assert loaded["seconds"] < IMPORT_BUDGET_SECONDS
+
+
+@pytest.mark.unit
+def test_github_api_defers_openpyxl():
+    loaded = import_in_fresh_interpreter("github_api", ROOT)
+
+    assert "openpyxl" not in loaded["modules"]
+    assert loaded["seconds"] < IMPORT_BUDGET_SECONDS
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(importlib.util.find_spec("common") is None, reason="common package not installed")
+def test_api_v2_main_defers_route_imports():
+    loaded = import_in_fresh_interpreter("api.v2.main", ROOT)
+
+    assert not [m for m in loaded["modules"] if m.startswith("api.v1.")]
+    for heavy in ("sqlalchemy", "openpyxl", "box_sdk_gen"):
+        assert heavy not in loaded["modules"]
+    assert loaded["seconds"] < IMPORT_BUDGET_SECONDS
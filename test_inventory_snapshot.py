@@ -0,0 +1,128 @@
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "github_rules"))
+
+import branch_compliance
+import org_compliance
+import repo_compliance
+from inventory_snapshot import (
+    InventorySnapshot, SnapshotAPIClient, SnapshotCrawler, SnapshotError, SnapshotMissError,
+    open_offline_client
+)
+
+
+@pytest.fixture(autouse=True)
+def no_pacing(monkeypatch):
+    for module in (org_compliance, repo_compliance, branch_compliance):
+        monkeypatch.setattr(module, "SLEEP_INTERVAL", 0)
+
+
+@pytest.fixture
+def snapshot(tmp_path, github):
+    snapshot = InventorySnapshot(str(tmp_path / "snapshot.db"))
+    SnapshotCrawler(github, snapshot, workers=2).crawl_org("acme")
+    yield snapshot
+    snapshot.close()
+
+
+def run_checkers(api_client):
+    """Results of the three checkers, as their JSON reports would hold them."""
+    results = {
+        "organization": org_compliance.OrgComplianceChecker(api_client, "acme").run_all_checks(),
+        "repository": repo_compliance.RepoComplianceChecker(api_client, "acme").run_all_checks(),
+        "branch": branch_compliance.BranchComplianceChecker(api_client, "acme").run_all_checks(),
+    }
+    return json.loads(json.dumps(results, default=org_compliance.json_default))
+
+
+@pytest.mark.unit
+class TestSnapshotAPIClient:
+
+    def test_checkers_get_the_same_results_offline(self, snapshot, github):
+        online = run_checkers(github)
+        calls = len(github.calls)
+
+        offline = run_checkers(SnapshotAPIClient(snapshot))
+
+        assert offline == online
+        assert len(github.calls) == calls
+        assert [repo["repository"] for repo in offline["branch"]] == ["api"]
+
+    def test_every_endpoint_the_checkers_read_is_served(self, snapshot, github):
+        github.calls.clear()
+        run_checkers(github)
+        client = SnapshotAPIClient(snapshot)
+
+        for endpoint in dict.fromkeys(github.calls):
+            served, live = client.get(endpoint, allow_404=True), github.get(endpoint, allow_404=True)
+            if "CODEOWNERS" in endpoint and live:
+                # Only where CODEOWNERS is (its blob sha) is stored, not its content
+                served, live = served["sha"], live["sha"]
+            assert served == live, endpoint
+
+    def test_missing_files_are_recorded_as_absent(self, snapshot):
+        client = SnapshotAPIClient(snapshot)
+
+        assert client.get("/repos/acme/docs/contents/.metadata?ref=master", allow_404=True) is None
+        assert client.get("/repos/acme/api/contents/CODEOWNERS?ref=master", allow_404=True) is None
+        assert client.get("/repos/acme/api/branches/release/protection", allow_404=True) is None
+        with pytest.raises(requests.exceptions.HTTPError):
+            client.get("/repos/acme/docs/contents/.metadata?ref=master")
+
+    def test_data_never_crawled_is_a_miss_not_an_absence(self, snapshot):
+        client = SnapshotAPIClient(snapshot)
+
+        for endpoint in ("/orgs/other", "/repos/acme/api/contents/README.md",
+                         "/repos/acme/api/collaborators?affiliation=all", "/repos/acme/api/git/trees/head1"):
+            with pytest.raises(SnapshotMissError):
+                client.get(endpoint, allow_404=True)
+
+    def test_writes_are_refused(self, snapshot):
+        client = SnapshotAPIClient(snapshot)
+
+        with pytest.raises(SnapshotError):
+            client.patch("/repos/acme/api", {"private": True})
+
+    def test_offline_client_needs_an_existing_snapshot(self, tmp_path):
+        with pytest.raises(SnapshotError):
+            open_offline_client(str(tmp_path / "missing.db"))
+
+
+@pytest.mark.unit
+class TestSnapshotCrawler:
+
+    def test_crawl_reads_only_files_that_exist(self, snapshot, github):
+        assert "/repos/acme/docs/contents/.metadata?ref=master" not in github.calls
+        assert "/repos/acme/api/branches/release/protection" not in github.calls
+        assert not any("/contents/" in call and "CODEOWNERS" in call for call in github.calls)
+        assert snapshot.codeowners("acme", "api", "master", ".github/CODEOWNERS") == "owners1"
+
+    def test_failed_part_is_recorded_and_reads_as_a_miss(self, tmp_path, github):
+        snapshot = InventorySnapshot(str(tmp_path / "snapshot.db"))
+        SnapshotCrawler(FailingHooks(github), snapshot).crawl_org("acme")
+
+        with pytest.raises(SnapshotMissError):
+            snapshot.hooks("acme", "api")
+        assert snapshot.hooks("acme", "docs") == []
+        assert snapshot.teams("acme", "api") == github.responses["/repos/acme/api/teams?per_page=100"]
+        snapshot.close()
+
+
+class FailingHooks:
+    """Passes calls through, failing the api repository's hooks."""
+
+    def __init__(self, api):
+        self.api = api
+
+    def get(self, endpoint, allow_404=False):
+        if endpoint == "/repos/acme/api/hooks":
+            raise requests.exceptions.ConnectionError("connection reset")
+        return self.api.get(endpoint, allow_404)
+
+    def paginate(self, endpoint):
+        return self.api.paginate(endpoint)
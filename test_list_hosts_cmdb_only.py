@@ -2,7 +2,7 @@ import json
 import pytest
 from unittest.mock import patch, MagicMock
 
-from ic4v_vmc_cli.commands.list_hosts import list_hosts_cmdb_only
+from ic4v_vmc_cli.commands.list_hosts import list_hosts_cmdb_only, CMDB_LIST_PARTITIONS
 
 
 @pytest.mark.unit
@@ -12,30 +12,28 @@ class TestListHostsCmdbOnly:
     def test_returns_success_with_hosts(self, mock_cmdb_client):
         # Arrange
         mock_client_instance = MagicMock()
-        mock_client_instance.fetch_cmdb_server_list_paginated.return_value = [
+        mock_client_instance.iter_cmdb_servers.return_value = [
             {"hostname": "host1", "ip": "10.0.0.1"},
             {"hostname": "host2", "ip": "10.0.0.2"},
         ]
         mock_cmdb_client.return_value = mock_client_instance
 
         # Act
-        response = list_hosts_cmdb_only("IC4VMWS", offset=0, limit=2)
+        response = list_hosts_cmdb_only("IC4VMWS")
         body = json.loads(response["body"])
 
         # Assert
         assert response["statusCode"] == 200
         assert body["status"] == "success"
         assert body["count"] == 2
-        assert body["offset"] == 0
-        assert body["limit"] == 2
-        assert len(body["data"]) == 2
+        assert [host["hostname"] for host in body["data"]] == ["host1", "host2"]
 
 
     @patch("ic4v_vmc_cli.commands.list_hosts.CMDBClient")
     def test_returns_success_with_empty_list(self, mock_cmdb_client):
         # Arrange
         mock_client_instance = MagicMock()
-        mock_client_instance.fetch_cmdb_server_list_paginated.return_value = []
+        mock_client_instance.iter_cmdb_servers.return_value = []
         mock_cmdb_client.return_value = mock_client_instance
 
         # Act
@@ -53,7 +51,7 @@ class TestListHostsCmdbOnly:
     def test_returns_500_if_cmdb_throws_exception(self, mock_cmdb_client):
         # Arrange
         mock_client_instance = MagicMock()
-        mock_client_instance.fetch_cmdb_server_list_paginated.side_effect = Exception("CMDB failure")
+        mock_client_instance.iter_cmdb_servers.side_effect = Exception("CMDB failure")
         mock_cmdb_client.return_value = mock_client_instance
 
         # Act
@@ -67,20 +65,45 @@ class TestListHostsCmdbOnly:
 
 
     @patch("ic4v_vmc_cli.commands.list_hosts.CMDBClient")
-    def test_offset_and_limit_are_converted_to_int(self, mock_cmdb_client):
+    def test_listing_options_are_passed_to_cmdb(self, mock_cmdb_client, monkeypatch):
         # Arrange
+        monkeypatch.delenv("CMDB_MIRROR_DB", raising=False)
         mock_client_instance = MagicMock()
-        mock_client_instance.fetch_cmdb_server_list_paginated.return_value = []
+        mock_client_instance.iter_cmdb_servers.return_value = []
         mock_cmdb_client.return_value = mock_client_instance
 
         # Act
-        response = list_hosts_cmdb_only("IC4VMWS", offset="10", limit="20")
+        response = list_hosts_cmdb_only(
+            "IC4VMWS", dns_domain="example.com", fields="name,ip_address", display_value=False
+        )
 
-        # Assert CMDB call received integers
-        mock_client_instance.fetch_cmdb_server_list_paginated.assert_called_once_with(
+        # Assert the comma-separated fields reach CMDB as a list
+        mock_client_instance.iter_cmdb_servers.assert_called_once_with(
             c_code="IC4VMWS",
-            offset=10,
-            limit=20,
+            dns_domain="example.com",
+            partitions=CMDB_LIST_PARTITIONS,
+            fields=["name", "ip_address"],
+            display_value=False,
         )
 
         assert response["statusCode"] == 200
+
+
+    @patch("ic4v_vmc_cli.commands.list_hosts.CMDBClient")
+    def test_stream_returns_body_in_chunks(self, mock_cmdb_client):
+        # Arrange
+        mock_client_instance = MagicMock()
+        mock_client_instance.iter_cmdb_servers.return_value = iter([
+            {"hostname": "host1", "ip": "10.0.0.1"},
+            {"hostname": "host2", "ip": "10.0.0.2"},
+        ])
+        mock_cmdb_client.return_value = mock_client_instance
+
+        # Act
+        response = list_hosts_cmdb_only("IC4VMWS", stream=True)
+        body = json.loads("".join(response["body"]))
+
+        # Assert
+        assert response["statusCode"] == 200
+        assert body["count"] == 2
+        assert [host["hostname"] for host in body["data"]] == ["host1", "host2"]
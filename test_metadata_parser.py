@@ -0,0 +1,62 @@
+import base64
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "github_rules"))
+
+import metadata_parser
+from metadata_parser import parse_metadata, parse_metadata_response
+
+
+def response(text, sha="meta1"):
+    return {"sha": sha, "content": base64.b64encode(text.encode("utf-8")).decode("ascii")}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(metadata_parser, "_cache", {})
+
+
+@pytest.mark.unit
+class TestMetadataParser:
+
+    def test_yaml_and_json_are_parsed(self):
+        assert parse_metadata("production_code: yes\n") == {"production_code": True}
+        assert parse_metadata('{"production_code": "yes"}') == {"production_code": "yes"}
+
+    def test_smart_quotes_and_non_breaking_spaces_are_normalised(self):
+        text = "{\u201cproduction_code\u201d:\u00a0\u201cyes\u201d}"
+
+        assert parse_metadata(text.encode("utf-8")) == {"production_code": "yes"}
+
+    def test_unparseable_content_warns_and_returns_none(self):
+        warnings = []
+
+        result = parse_metadata("a: [unclosed", warn=lambda fmt, error: warnings.append(fmt))
+
+        assert result is None
+        assert warnings == ["YAML", "JSON"]
+
+    def test_json_is_used_without_pyyaml(self, monkeypatch):
+        monkeypatch.setattr(metadata_parser, "_yaml", False)
+
+        assert parse_metadata('{"production_code": "yes"}') == {"production_code": "yes"}
+
+    def test_responses_are_parsed_once_per_blob_sha(self, monkeypatch):
+        parses = []
+        parse = metadata_parser._parse
+        monkeypatch.setattr(metadata_parser, "_parse", lambda content: parses.append(content) or parse(content))
+
+        first = parse_metadata_response(response('{"production_code": "yes"}'))
+        second = parse_metadata_response(response('{"production_code": "yes"}'))
+
+        assert first == second == {"production_code": "yes"}
+        assert len(parses) == 1
+
+    def test_response_without_sha_is_keyed_on_its_content(self):
+        text = '{"production_code": "no"}'
+
+        assert parse_metadata_response(response(text, sha=None)) == {"production_code": "no"}
+        assert metadata_parser.git_blob_sha(text) in metadata_parser._cache
@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "github_rules"))
+
+import multi_org
+from multi_org import RateLimitedSession, parse_orgs, run_orgs, write_combined_report
+
+
+@pytest.mark.unit
+class TestRunOrgs:
+
+    def test_orgs_are_parsed_without_blanks_or_duplicates(self):
+        assert parse_orgs(" a,b,,a , c") == ["a", "b", "c"]
+
+    def test_one_failing_org_does_not_stop_the_others(self):
+        def scan(org):
+            if org == "b":
+                raise RuntimeError("403 Forbidden")
+            return {"total": len(org)}
+
+        outcomes = run_orgs(["c", "b", "a"], scan, max_workers=3)
+
+        assert list(outcomes) == ["c", "b", "a"]
+        assert outcomes["b"] == {"error": "403 Forbidden"}
+        assert outcomes["a"] == {"result": {"total": 1}}
+
+    def test_combined_report_collects_each_org_report(self, tmp_path):
+        report = tmp_path / "report_a.json"
+        report.write_text(json.dumps({"summary": {"passed": 3}, "results": []}))
+        outcomes = {"a": {"result": {"json_report": str(report)}}, "b": {"error": "boom"}}
+
+        combined = write_combined_report("Org Compliance", outcomes, str(tmp_path / "combined.json"))
+
+        assert combined["summary"] == {"a": {"passed": 3}}
+        assert combined["errors"] == {"b": "boom"}
+        assert json.loads((tmp_path / "combined.json").read_text())["reports"]["a"]["summary"] == {"passed": 3}
+
+
+@pytest.mark.unit
+class TestRateLimitedSession:
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        now = [100.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        monkeypatch.setattr(multi_org.time, "monotonic", lambda: now[0])
+        monkeypatch.setattr(multi_org.time, "sleep", sleep)
+        return sleeps
+
+    def test_requests_are_spaced_by_the_shared_interval(self, clock):
+        session = RateLimitedSession(min_interval=0.5)
+
+        for _ in range(3):
+            session._acquire()
+
+        assert clock == [0.5, 0.5]
+
+    def test_retry_after_pauses_every_worker(self, clock):
+        session = RateLimitedSession(min_interval=0)
+        response = MagicMock(status_code=429, headers={"Retry-After": "30"})
+
+        session._observe(response)
+        session._acquire()
+
+        assert clock == [30]
@@ -1,6 +1,10 @@
 import unittest
 from unittest.mock import patch, Mock
-from api.v1.register_hosts import register_hosts_cmdb_only
+from api.v1.register_hosts import register_hosts_cmdb_only, CMDB_BULK_MAX_HOSTS
+
+
+def uploaded(status="inserted", message=""):
+    return [{"hostname": "server01.example.com", "ip": "192.168.1.10", "status": status, "message": message}]
 
 
 class TestRegisterHosts(unittest.TestCase):
@@ -18,6 +22,8 @@ class TestRegisterHosts(unittest.TestCase):
                 "serial_number": "SN12345",
                 "domain": "example.com",
                 "host_type": "VCFaaS",
+                "workload_domain": "wld01",
+                "vcd_org": "org01",
             }
         ]
 
@@ -26,9 +32,7 @@ class TestRegisterHosts(unittest.TestCase):
         """Test successful host registration"""
         # Mock CMDB client response
         mock_instance = Mock()
-        mock_instance.upload_ips_to_cmdb_inventory.return_value = {
-            "status": "success"
-        }
+        mock_instance.bulk_upload_to_cmdb_inventory.return_value = uploaded()
         mock_cmdb_client.return_value = mock_instance
         
         result = register_hosts_cmdb_only(self.valid_host_data, "test_user")
@@ -68,6 +72,9 @@ class TestRegisterHosts(unittest.TestCase):
                 "platform": "linux",
                 "datacenter": "DAL10",
                 "serial_number": "SN12345",
+                "host_type": "VCFaaS",
+                "workload_domain": "wld01",
+                "vcd_org": "org01",
             }
         ]
         
@@ -99,15 +106,14 @@ class TestRegisterHosts(unittest.TestCase):
         self.assertIn("Invalid host_type", result["body"]["message"])
 
     def test_register_hosts_fails_exceeds_max_hosts(self):
-        """Test failure when exceeding max 100 hosts"""
-        # Create 101 hosts
-        too_many_hosts = [self.valid_host_data[0].copy() for _ in range(101)]
+        """Test failure when exceeding max CMDB_BULK_MAX_HOSTS hosts"""
+        too_many_hosts = [self.valid_host_data[0].copy() for _ in range(CMDB_BULK_MAX_HOSTS + 1)]
         
         result = register_hosts_cmdb_only(too_many_hosts, "test_user")
         
         self.assertEqual(result["statusCode"], 413)
         self.assertEqual(result["body"]["status"], "error")
-        self.assertEqual(result["body"]["message"], "Max 100 hosts allowed")
+        self.assertEqual(result["body"]["message"], f"Max {CMDB_BULK_MAX_HOSTS} hosts allowed")
 
     @patch("api.v1.register_hosts.IBM_CLOUD_ZONES_MAP", {"dal10-1": {"datacenter": "DAL10"}})
     @patch("api.v1.register_hosts.IBM_CLOUD_DATACENTER_LIST", [])
@@ -115,9 +121,7 @@ class TestRegisterHosts(unittest.TestCase):
     def test_register_hosts_succeeds_with_zone_mapping(self, mock_cmdb_client):
         """Test successful registration with zone to datacenter mapping"""
         mock_instance = Mock()
-        mock_instance.upload_ips_to_cmdb_inventory.return_value = {
-            "status": "success"
-        }
+        mock_instance.bulk_upload_to_cmdb_inventory.return_value = uploaded()
         mock_cmdb_client.return_value = mock_instance
         
         zone_data = [
@@ -130,6 +134,9 @@ class TestRegisterHosts(unittest.TestCase):
                 "datacenter": "dal10-1",
                 "serial_number": "SN12345",
                 "domain": "example.com",
+                "host_type": "VCFaaS",
+                "workload_domain": "wld01",
+                "vcd_org": "org01",
             }
         ]
         
@@ -137,6 +144,8 @@ class TestRegisterHosts(unittest.TestCase):
         
         self.assertEqual(result["statusCode"], 200)
         self.assertEqual(result["body"]["status"], "success")
+        hosts = mock_instance.bulk_upload_to_cmdb_inventory.call_args.args[0]
+        self.assertEqual(hosts[0]["datacenter"], "DAL10")
 
     @patch("api.v1.register_hosts.IBM_CLOUD_DATACENTER_LIST", [])
     @patch("api.v1.register_hosts.IBM_CLOUD_ZONES_MAP", {})
@@ -152,6 +161,9 @@ class TestRegisterHosts(unittest.TestCase):
                 "datacenter": "INVALID_DC",
                 "serial_number": "SN12345",
                 "domain": "example.com",
+                "host_type": "VCFaaS",
+                "workload_domain": "wld01",
+                "vcd_org": "org01",
             }
         ]
         
@@ -165,7 +177,7 @@ class TestRegisterHosts(unittest.TestCase):
     def test_register_hosts_fails_cmdb_upload_exception(self, mock_cmdb_client):
         """Test failure when CMDB upload raises exception"""
         mock_instance = Mock()
-        mock_instance.upload_ips_to_cmdb_inventory.side_effect = Exception("Connection failed")
+        mock_instance.bulk_upload_to_cmdb_inventory.side_effect = Exception("Connection failed")
         mock_cmdb_client.return_value = mock_instance
         
         result = register_hosts_cmdb_only(self.valid_host_data, "test_user")
@@ -178,10 +190,9 @@ class TestRegisterHosts(unittest.TestCase):
     def test_register_hosts_fails_cmdb_response_not_success(self, mock_cmdb_client):
         """Test failure when CMDB returns non-success status"""
         mock_instance = Mock()
-        mock_instance.upload_ips_to_cmdb_inventory.return_value = {
-            "status": "failed",
-            "error": "Database error"
-        }
+        mock_instance.bulk_upload_to_cmdb_inventory.return_value = uploaded(
+            "error", "CMDB did not confirm host creation: {'status': 'failed', 'error': 'Database error'}"
+        )
         mock_cmdb_client.return_value = mock_instance
         
         result = register_hosts_cmdb_only(self.valid_host_data, "test_user")
@@ -190,13 +201,48 @@ class TestRegisterHosts(unittest.TestCase):
         self.assertEqual(result["body"]["status"], "error")
         self.assertIn("CMDB did not confirm host creation", result["body"]["message"])
 
+    @patch("api.v1.register_hosts.CMDBClient")
+    def test_register_hosts_reports_partial_upload(self, mock_cmdb_client):
+        """Test per-host outcomes when only some hosts reach CMDB"""
+        mock_instance = Mock()
+        mock_instance.bulk_upload_to_cmdb_inventory.return_value = uploaded() + uploaded(
+            "error", "CMDB upload failed: 503 Server Error"
+        )
+        mock_cmdb_client.return_value = mock_instance
+
+        hosts = [
+            dict(self.valid_host_data[0], fqdn=f"server0{i}.example.com", serial_number=f"SN1234{i}")
+            for i in (1, 2)
+        ]
+
+        result = register_hosts_cmdb_only(hosts, "test_user")
+
+        mock_instance.bulk_upload_to_cmdb_inventory.assert_called_once()
+        self.assertEqual(result["statusCode"], 207)
+        self.assertEqual(result["body"]["status"], "partial")
+        self.assertIn("1 of 2 host(s) uploaded to CMDB, 1 failed", result["body"]["message"])
+        results = result["body"]["results"]
+        self.assertEqual([outcome["status"] for outcome in results], ["inserted", "error"])
+        self.assertIn("503 Server Error", results[1]["message"])
+
+    @patch("api.v1.register_hosts.CMDBClient")
+    def test_register_hosts_succeeds_with_no_hosts(self, mock_cmdb_client):
+        """Test that an empty host list is not reported as a failed upload"""
+        mock_instance = Mock()
+        mock_instance.bulk_upload_to_cmdb_inventory.return_value = []
+        mock_cmdb_client.return_value = mock_instance
+
+        result = register_hosts_cmdb_only([], "test_user")
+
+        self.assertEqual(result["statusCode"], 200)
+        self.assertEqual(result["body"]["status"], "success")
+        self.assertEqual(result["body"]["results"], [])
+
     @patch("api.v1.register_hosts.CMDBClient")
     def test_register_hosts_succeeds_with_optional_fields(self, mock_cmdb_client):
         """Test successful registration with optional fields"""
         mock_instance = Mock()
-        mock_instance.upload_ips_to_cmdb_inventory.return_value = {
-            "status": "success"
-        }
+        mock_instance.bulk_upload_to_cmdb_inventory.return_value = uploaded()
         mock_cmdb_client.return_value = mock_instance
         
         data_with_optional = [
@@ -214,6 +260,9 @@ class TestRegisterHosts(unittest.TestCase):
                 "owned_by": "team_lead",
                 "u_exclude_patching": True,
                 "u_exclude_reason": "Critical system",
+                "host_type": "VCFaaS",
+                "workload_domain": "wld01",
+                "vcd_org": "org01",
             }
         ]
         
@@ -221,6 +270,7 @@ class TestRegisterHosts(unittest.TestCase):
         
         self.assertEqual(result["statusCode"], 200)
         self.assertEqual(result["body"]["status"], "success")
+        mock_instance.bulk_upload_to_cmdb_inventory.assert_called_once()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,138 @@
+import json
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "github_rules"))
+
+import remediation_plan
+from remediation_plan import RemediationPlan, check_precondition, execute_plan
+
+
+class FakeAPI:
+    """Answers conditional GETs from a table and records the writes."""
+
+    def __init__(self, states, fail=()):
+        self.states = states
+        self.fail = fail
+        self.checks = []
+        self.writes = []
+
+    def get_conditional(self, endpoint, etag=None):
+        self.checks.append((endpoint, etag))
+        status, data = self.states[endpoint]
+        if status == 200 and etag and data.get("etag") == etag:
+            return 304, None
+        return status, data
+
+    def _write(self, method, endpoint, payload=None):
+        if endpoint in self.fail:
+            raise requests.exceptions.ConnectionError("connection reset")
+        self.writes.append((method, endpoint, payload))
+
+    def put(self, endpoint, payload):
+        self._write("PUT", endpoint, payload)
+
+    def patch(self, endpoint, payload):
+        self._write("PATCH", endpoint, payload)
+
+    def delete(self, endpoint):
+        self._write("DELETE", endpoint)
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(remediation_plan, "SLEEP_INTERVAL", 0)
+    return tmp_path
+
+
+def save_plan(workdir, *operations):
+    plan = RemediationPlan("repo_compliance", "org", "repo_backup", "repo", {"repositories": ["a", "b"]})
+    for method, endpoint, precondition in operations:
+        plan.add(method, endpoint, {"private": True}, precondition, repository=endpoint.split("/")[3],
+                 description=f"{method} {endpoint}")
+    return plan.save(str(workdir / "plan.json"))
+
+
+@pytest.mark.unit
+class TestCheckPrecondition:
+
+    def test_unchanged_etag_holds(self):
+        api = FakeAPI({"/repos/org/a": (200, {"etag": "W/\"1\""})})
+
+        assert check_precondition(api, {"endpoint": "/repos/org/a", "etag": "W/\"1\""}) == (True, "ETag unchanged")
+
+    def test_changed_fields_are_reported(self):
+        api = FakeAPI({"/repos/org/a": (200, {"private": True})})
+
+        ok, detail = check_precondition(api, {"endpoint": "/repos/org/a", "expect": {"private": False}})
+
+        assert not ok
+        assert detail == "fields changed since plan: {'private': True}"
+
+    def test_absent_resource_must_still_be_missing(self):
+        api = FakeAPI({"/protection": (404, None), "/other": (200, {})})
+
+        assert check_precondition(api, {"endpoint": "/protection", "absent": True})[0]
+        assert not check_precondition(api, {"endpoint": "/other", "absent": True})[0]
+
+
+@pytest.mark.unit
+class TestExecutePlan:
+
+    def test_writes_whose_precondition_holds_are_applied_and_others_skipped(self, workdir):
+        api = FakeAPI({
+            "/repos/org/a": (200, {"etag": "W/\"1\"", "private": False}),
+            "/repos/org/b": (200, {"private": True}),
+        })
+        plan_file = save_plan(
+            workdir,
+            ("PATCH", "/repos/org/a", {"endpoint": "/repos/org/a", "etag": "W/\"1\""}),
+            ("PATCH", "/repos/org/b", {"endpoint": "/repos/org/b", "expect": {"private": False}}),
+        )
+
+        summary = execute_plan(api, plan_file)
+
+        assert (summary["applied"], summary["stale"], summary["errors"]) == (1, 1, 0)
+        assert api.writes == [("PATCH", "/repos/org/a", {"private": True})]
+        log = json.loads(next(workdir.glob("repo_execute_log_*.json")).read_text())
+        assert [result["status"] for result in log["results"]] == ["applied", "stale"]
+        backup = json.loads((workdir / summary["backup_file"]).read_text())
+        assert backup["repositories"] == ["a", "b"]
+
+    def test_shared_precondition_is_checked_once(self, workdir):
+        precondition = {"endpoint": "/repos/org/a", "etag": "W/\"1\""}
+        api = FakeAPI({"/repos/org/a": (200, {"etag": "W/\"1\""})})
+        plan_file = save_plan(
+            workdir,
+            ("PUT", "/repos/org/a/topics", precondition),
+            ("PATCH", "/repos/org/a", precondition),
+        )
+
+        summary = execute_plan(api, plan_file)
+
+        assert summary["applied"] == 2
+        assert api.checks == [("/repos/org/a", "W/\"1\"")]
+        assert [write[1] for write in api.writes] == ["/repos/org/a/topics", "/repos/org/a"]
+
+    def test_dry_run_checks_preconditions_without_writing(self, workdir):
+        api = FakeAPI({"/repos/org/a": (200, {"etag": "W/\"1\""})})
+        plan_file = save_plan(workdir, ("PATCH", "/repos/org/a", {"endpoint": "/repos/org/a", "etag": "W/\"1\""}))
+
+        summary = execute_plan(api, plan_file, dry_run=True)
+
+        assert summary["applied"] == 0
+        assert summary["backup_file"] is None
+        assert api.checks and not api.writes
+
+    def test_connection_errors_are_recorded_and_the_rest_applied(self, workdir):
+        api = FakeAPI({}, fail=("/repos/org/a",))
+        plan_file = save_plan(workdir, ("PATCH", "/repos/org/a", None), ("PATCH", "/repos/org/b", None))
+
+        summary = execute_plan(api, plan_file)
+
+        assert (summary["applied"], summary["errors"]) == (1, 1)
+        assert api.writes == [("PATCH", "/repos/org/b", {"private": True})]
@@ -0,0 +1,61 @@
+import argparse
+import glob
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "github_rules"))
+
+from org_compliance import ReportGenerator
+from report_renderer import parse_formats, render_reports
+
+RESULTS = [
+    {"rule": "two_factor_requirement", "passed": True, "current_value": True,
+     "expected_value": True, "enforcement": "Required", "reason": "2FA is required"},
+    {"rule": "default_repository_permission", "passed": False, "current_value": "write",
+     "expected_value": "read", "enforcement": "Required", "reason": "Members get write access"},
+]
+
+
+@pytest.fixture
+def generator():
+    generator = ReportGenerator("acme", RESULTS)
+    generator.timestamp = "2024-01-01 00:00:00"
+    return generator
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.unit
+class TestReportRenderer:
+
+    def test_skip_formats_are_parsed_without_blanks_or_duplicates(self):
+        assert parse_formats("Excel, ,markdown,excel") == ["excel", "markdown"]
+        with pytest.raises(argparse.ArgumentTypeError, match="unknown report format 'pdf'"):
+            parse_formats("pdf")
+
+    def test_workers_render_what_the_generator_renders(self, generator, tmp_path):
+        paths = {"json": str(tmp_path / "report.json"), "markdown": str(tmp_path / "report.md")}
+        pickles = set(glob.glob(os.path.join(tempfile.gettempdir(), "compliance_results_*.pickle")))
+
+        assert render_reports(generator, paths) == paths
+
+        assert set(glob.glob(os.path.join(tempfile.gettempdir(), "compliance_results_*.pickle"))) == pickles
+        generator.generate_json_report(str(tmp_path / "expected.json"))
+        generator.generate_markdown_report(str(tmp_path / "expected.md"))
+        assert read(paths["json"]) == read(tmp_path / "expected.json")
+        assert read(paths["markdown"]) == read(tmp_path / "expected.md")
+
+    def test_single_format_is_rendered_in_process(self, generator, tmp_path, monkeypatch):
+        monkeypatch.setattr("report_renderer.ProcessPoolExecutor", None)
+        paths = {"json": str(tmp_path / "report.json"), "markdown": str(tmp_path / "report.md")}
+
+        assert render_reports(generator, paths, skip=["markdown"]) == {"json": paths["json"]}
+
+        assert os.path.exists(paths["json"])
+        assert not os.path.exists(paths["markdown"])
@@ -0,0 +1,121 @@
+import json
+import os
+import pickle
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "github_rules"))
+
+from result_matrix import ResultMatrix
+from rule_registry import Rule, RuleOutcome
+
+
+def rule(name, passed, enforcement="Required", **extra):
+    result = {"rule": name, "passed": passed, "current_value": "on" if passed else "off",
+              "expected_value": "on", "enforcement": enforcement,
+              "reason": "Setting is on" if passed else "Setting is off"}
+    result.update(extra)
+    return result
+
+
+ORGANIZATION = [
+    rule("two_factor_requirement", True),
+    rule("members_can_create_repositories", False, "Recommended"),
+    rule("admin_activity", False, expected_value="N/A", status="INFO"),
+]
+
+REPOSITORY = [
+    {"repository": "api", "private": True, "rules": [
+        rule("metadata_existing", True),
+        rule("unsecure_hooks", False, insecure_hooks=["http://ci.example.com"]),
+        rule("teams", True, "Recommended"),
+    ]},
+    {"repository": "docs", "private": False, "rules": [
+        rule("metadata_existing", False),
+        rule("outside_collaborators", False, "Recommended", status="INFO", collaborators=["bob"]),
+    ]},
+    {"repository": "empty", "private": True, "rules": []},
+]
+
+BRANCH = [
+    {"repository": "api", "production": True, "branches": [
+        {"branch": "master", "protected": True, "rules": [rule("needed_protection", True),
+                                                          rule("code_owner_reviews", False)]},
+        {"branch": "release", "protected": False, "rules": [rule("needed_protection", False)]},
+    ]},
+    {"repository": "docs", "production": False, "branches": []},
+]
+
+
+def cells(scope, results):
+    """Rule results of every subject, flattened."""
+    if scope == "organization":
+        return results
+    if scope == "repository":
+        return [result for repo in results for result in repo["rules"]]
+    return [result for repo in results for branch in repo["branches"] for result in branch["rules"]]
+
+
+def is_info(result):
+    return result.get("status") == "INFO"
+
+
+@pytest.mark.unit
+class TestResultMatrix:
+
+    @pytest.mark.parametrize("scope, results", [
+        ("organization", ORGANIZATION), ("repository", REPOSITORY), ("branch", BRANCH),
+    ])
+    def test_to_results_gives_back_the_checker_results(self, scope, results):
+        rebuilt = ResultMatrix.from_results(scope, results).to_results()
+
+        assert rebuilt == results
+        # Key order included, so the JSON report is unchanged
+        assert json.dumps(rebuilt) == json.dumps(results)
+
+    def test_rule_outcomes_are_rebuilt_as_dicts(self):
+        outcomes = [RuleOutcome.from_result(Rule(result["rule"], result["enforcement"], [], None), result)
+                    for result in ORGANIZATION]
+
+        assert ResultMatrix.from_results("organization", outcomes).to_results() == ORGANIZATION
+
+    @pytest.mark.parametrize("scope, results", [
+        ("organization", ORGANIZATION), ("repository", REPOSITORY), ("branch", BRANCH),
+    ])
+    def test_counts_match_the_result_dicts(self, scope, results):
+        matrix = ResultMatrix.from_results(scope, results)
+        flat = cells(scope, results)
+
+        assert len(matrix) == len(flat)
+        assert matrix.count(passed=True) == sum(r["passed"] for r in flat)
+        assert matrix.count(info=True) == sum(is_info(r) for r in flat)
+        assert matrix.count(passed=False, info=False, enforcement="Required") == sum(
+            not r["passed"] and not is_info(r) and r["enforcement"] == "Required" for r in flat)
+        assert matrix.count(passed=False, info=False, enforcement="Recommended") == sum(
+            not r["passed"] and not is_info(r) and r["enforcement"] == "Recommended" for r in flat)
+
+    def test_row_and_rule_counts_match_the_result_dicts(self):
+        matrix = ResultMatrix.from_results("repository", REPOSITORY)
+
+        assert matrix.row_counts(passed=False) == [sum(not r["passed"] for r in repo["rules"])
+                                                   for repo in REPOSITORY]
+        assert matrix.rows_with(passed=False, info=False) == 2
+        assert matrix.rule_counts() == {
+            "metadata_existing": {"passed": 1, "failed": 1, "info": 0},
+            "unsecure_hooks": {"passed": 0, "failed": 1, "info": 0},
+            "teams": {"passed": 1, "failed": 0, "info": 0},
+            "outside_collaborators": {"passed": 0, "failed": 0, "info": 1},
+        }
+
+    def test_pickle_round_trip_keeps_the_results(self):
+        matrix = ResultMatrix.from_results("branch", BRANCH)
+
+        restored = pickle.loads(pickle.dumps(matrix))
+
+        assert restored.to_results() == BRANCH
+        assert restored.count(passed=False) == matrix.count(passed=False)
+
+    def test_unknown_scope_is_rejected(self):
+        with pytest.raises(ValueError, match="unknown scope 'team'"):
+            ResultMatrix.from_results("team", [])
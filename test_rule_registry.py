@@ -0,0 +1,129 @@
+import json
+import os
+import pickle
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "github_rules"))
+
+from remediation_plan import RemediationPlan
+from rule_registry import (
+    Rule, RuleEngine, RuleInputs, RuleOutcome, RuleRegistry, json_default, parse_rule_names
+)
+
+
+HOOKS = Rule("insecure_hooks", "Required", ["hooks"], None, expected_value="0 insecure hooks")
+
+
+def hooks_result(**changes):
+    result = {
+        "rule": "insecure_hooks",
+        "passed": False,
+        "current_value": "1 insecure hook",
+        "expected_value": "0 insecure hooks",
+        "enforcement": "Required",
+        "insecure_hooks": ["http://hook.example.com"],
+        "reason": "Webhook without TLS",
+    }
+    result.update(changes)
+    return result
+
+
+@pytest.mark.unit
+class TestRuleOutcome:
+
+    def test_standard_results_become_outcomes_that_read_like_the_dict(self):
+        outcome = RuleOutcome.from_result(HOOKS, hooks_result())
+
+        assert isinstance(outcome, RuleOutcome)
+        assert outcome == hooks_result()
+        assert list(outcome) == list(hooks_result())
+        assert outcome["insecure_hooks"] == ["http://hook.example.com"]
+        assert "status" not in outcome
+
+    def test_results_of_another_layout_are_kept_as_dicts(self):
+        result = hooks_result(rule="other_rule")
+
+        assert RuleOutcome.from_result(HOOKS, result) is result
+
+    def test_json_round_trip_gives_the_check_result(self):
+        outcome = RuleOutcome.from_result(HOOKS, hooks_result(expected_value="N/A", status="INFO"))
+
+        text = json.dumps({"check_results": [outcome]}, default=json_default)
+
+        assert json.loads(text) == {"check_results": [hooks_result(expected_value="N/A", status="INFO")]}
+        assert json.dumps(outcome.to_dict()) in text
+
+    def test_json_default_still_writes_other_values_as_strings(self):
+        assert json.loads(json.dumps({"when": HOOKS}, default=json_default)) == {"when": repr(HOOKS)}
+
+    def test_pickle_round_trip_keeps_the_outcome(self):
+        outcomes = [RuleOutcome.from_result(HOOKS, hooks_result()),
+                    RuleOutcome.from_result(HOOKS, hooks_result(passed=True, current_value="0 insecure hooks"))]
+
+        restored = pickle.loads(pickle.dumps(outcomes))
+
+        assert all(isinstance(outcome, RuleOutcome) for outcome in restored)
+        assert restored == outcomes
+        assert restored[0].definition is restored[1].definition
+
+    def test_plan_backup_holds_the_rule_dicts(self, tmp_path):
+        outcome = RuleOutcome.from_result(HOOKS, hooks_result())
+        plan = RemediationPlan("org_compliance", "org", "org_backup", "org", {"check_results": [outcome]})
+
+        plan.save(str(tmp_path / "plan.json"))
+
+        assert RemediationPlan.load(str(tmp_path / "plan.json")).backup == {"check_results": [hooks_result()]}
+
+
+@pytest.mark.unit
+class TestRuleEngine:
+
+    @pytest.fixture
+    def registry(self):
+        return RuleRegistry("repository", [
+            Rule("metadata_existing", "Required", ["metadata"],
+                 lambda c, i: hooks_result(rule="metadata_existing", passed=i["metadata"] is not None)),
+            Rule("unsecure_hooks", "Required", ["hooks"],
+                 lambda c, i: None if not i["hooks"] else hooks_result(rule="unsecure_hooks")),
+            Rule("teams", "Recommended", ["metadata", "teams"],
+                 lambda c, i: hooks_result(rule="teams", enforcement="Recommended", passed=bool(i["teams"]))),
+        ])
+
+    def test_only_inputs_of_selected_rules_are_fetched_once(self, registry):
+        fetched = []
+
+        def loader(name, value):
+            return lambda: fetched.append(name) or value
+
+        engine = RuleEngine(registry, ["metadata_existing", "teams"])
+        inputs = RuleInputs({name: loader(name, {}) for name in ("metadata", "hooks", "teams")})
+
+        results = engine.evaluate(None, inputs)
+
+        assert [result["rule"] for result in results] == ["metadata_existing", "teams"]
+        assert fetched == ["metadata", "teams"]
+        assert not engine.needs("hooks")
+
+    def test_rules_returning_none_are_left_out(self, registry):
+        inputs = RuleInputs(metadata={}, hooks=[], teams=[])
+
+        results = RuleEngine(registry).evaluate(None, inputs)
+
+        assert [result["rule"] for result in results] == ["metadata_existing", "teams"]
+
+    def test_inputs_are_shared_with_child_subjects(self):
+        fetched = []
+        repo = RuleInputs({"codeowners": lambda: fetched.append("codeowners") or "CODEOWNERS"})
+        branches = [RuleInputs(parent=repo, branch=name) for name in ("master", "release")]
+
+        assert [inputs["codeowners"] for inputs in branches] == ["CODEOWNERS", "CODEOWNERS"]
+        assert fetched == ["codeowners"]
+
+    def test_unknown_rule_names_are_rejected(self, registry):
+        with pytest.raises(ValueError, match="unknown repository rule"):
+            registry.select(["metadata_existing", "nope"])
+
+    def test_rule_names_are_parsed_without_blanks_or_duplicates(self):
+        assert parse_rule_names("teams, ,hooks,teams") == ["teams", "hooks"]
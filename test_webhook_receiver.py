@@ -0,0 +1,126 @@
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+from http.server import HTTPServer
+from urllib.request import urlopen
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "github_rules"))
+
+from inventory_snapshot import InventorySnapshot, SnapshotCrawler
+from webhook_receiver import EventProcessor, WebhookHandler, replay, verify_signature
+
+ACME = {"login": "acme"}
+
+# As recorded by "webhook_receiver.py serve --record"
+DELIVERIES = [
+    # The insecure webhook of api was fixed
+    {"event": "repository_hook", "delivery": "d1",
+     "payload": {"action": "edited", "organization": ACME, "repository": {"name": "api", "full_name": "acme/api"}}},
+    # A push that does not touch .metadata or CODEOWNERS
+    {"event": "push", "delivery": "d2",
+     "payload": {"ref": "refs/heads/master", "after": "head4", "organization": ACME,
+                 "repository": {"name": "api", "full_name": "acme/api"},
+                 "commits": [{"added": [], "modified": ["README.md"], "removed": []}]}},
+    # docs was archived
+    {"event": "repository", "delivery": "d3",
+     "payload": {"action": "archived", "organization": ACME,
+                 "repository": {"name": "docs", "full_name": "acme/docs", "default_branch": "master",
+                                "private": False, "archived": True, "visibility": "public"}}},
+    # Another organization
+    {"event": "repository_hook", "delivery": "d4",
+     "payload": {"action": "created", "organization": {"login": "other"}, "repository": {"name": "x"}}},
+]
+
+
+@pytest.fixture
+def processor(tmp_path, github):
+    snapshot = InventorySnapshot(str(tmp_path / "snapshot.db"))
+    SnapshotCrawler(github, snapshot).crawl_org("acme")
+    github.calls.clear()
+    yield EventProcessor(snapshot, github)
+    snapshot.close()
+
+
+@pytest.fixture
+def recorded(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_text("".join(json.dumps(delivery) + "\n" for delivery in DELIVERIES))
+    return str(path)
+
+
+def rules(evaluation):
+    return {rule["rule"]: rule["passed"] for rule in evaluation["result"]["rules"]}
+
+
+@pytest.mark.unit
+class TestReplay:
+
+    def test_replay_refreshes_only_what_each_event_changed(self, processor, recorded, github):
+        github.responses["/repos/acme/api/hooks"] = []
+
+        assert replay(processor, recorded) == 4
+
+        assert github.calls == ["/repos/acme/api/hooks"]
+        evaluations = processor.snapshot.evaluations("acme", "api")
+        assert rules(evaluations["repository"])["unsecure_hooks"] is True
+        assert processor.snapshot.repo("acme", "docs")["archived"] is True
+        assert processor.snapshot.evaluations("acme", "docs")["repository"]["result"] is None
+
+    def test_stored_evaluations_hold_rule_dicts(self, processor, recorded):
+        replay(processor, recorded)
+
+        evaluation = processor.snapshot.evaluations("acme", "api")["branch"]
+        branch = evaluation["result"]["branches"][0]
+        assert branch["branch"] == "master"
+        assert isinstance(branch["rules"][0], dict)
+        assert branch["rules"][0]["rule"] == "needed_protection"
+
+    def test_push_to_a_watched_file_rereads_the_ref(self, processor, github):
+        outcome = processor.process("push", {
+            "ref": "refs/heads/master", "after": "head2", "organization": ACME,
+            "repository": {"name": "api", "full_name": "acme/api"},
+            "commits": [{"added": [], "modified": [], "removed": [".github/CODEOWNERS"]}],
+        })
+
+        assert outcome["updated"] == ["api"]
+        assert github.calls == ["/repos/acme/api/git/trees/head2",
+                                "/repos/acme/api/contents/.metadata?ref=master"]
+        assert processor.snapshot.codeowners("acme", "api", "master", ".github/CODEOWNERS") is None
+
+    def test_events_of_other_organizations_are_ignored(self, processor):
+        outcome = processor.process(DELIVERIES[3]["event"], DELIVERIES[3]["payload"])
+
+        assert outcome["ignored"] == "organization other is not in the snapshot"
+
+
+@pytest.mark.unit
+class TestWebhookHandler:
+
+    def test_signature_is_checked_against_the_body(self):
+        body = b'{"zen": "hi"}'
+        signature = "sha256=" + hmac.new(b"secret", body, hashlib.sha256).hexdigest()
+
+        assert verify_signature("secret", body, signature)
+        assert not verify_signature("secret", body + b" ", signature)
+        assert not verify_signature("secret", body, None)
+
+    def test_status_shows_the_latest_evaluation(self, processor, recorded, monkeypatch):
+        replay(processor, recorded)
+        monkeypatch.setattr(WebhookHandler, "processor", processor)
+        server = HTTPServer(("127.0.0.1", 0), WebhookHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            with urlopen(f"http://127.0.0.1:{server.server_port}/status/acme/api") as response:
+                status = json.loads(response.read())
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert rules(status["repository"])["unsecure_hooks"] is False
+        assert status["repository"]["result"]["rules"][0]["enforcement"] == "Required"